@@ -1,13 +1,19 @@
 from datetime import datetime
+import hashlib
+import json
 import pytz
+from beartype.typing import Callable, Iterable, Iterator, Optional
 
 from models.question import Question
 from models.document import Document
-from models.loggingModels import VectorStoreLog
+from models.commitFile import CommitFile
+from models.loggingModels import VectorStoreLog, LoadingStage
 from entities.chromaDocumentEntity import ChromaDocumentEntity
 from ports.similaritySearchPort import SimilaritySearchPort
 from ports.loadFilesInVectorStorePort import LoadFilesInVectorStorePort
 from repositories.chromaVectorStoreRepository import ChromaVectorStoreRepository
+from utils.content_defined_chunker import ContentDefinedChunker
+from utils.stage_timer import StageTimer
 from utils.logger import logger
 from utils.beartype_personalized import beartype_personalized
 
@@ -17,42 +23,129 @@ class ChromaVectorStoreAdapter(SimilaritySearchPort, LoadFilesInVectorStorePort)
     Adapter class for interacting with a Chroma vector store repository.
     This class provides methods to load documents into the vector store,
     split documents into chunks, and perform similarity searches.
+    The documents of the item types with token settings are split in token-aware mode: on the structural boundaries
+    of their item type, into chunks of about the target number of tokens, overlapping by up to the given number of tokens.
+    The other documents are split on lines, into chunks of up to max_chunk_size characters.
     Attributes:
         max_chunk_size (int): Maximum size of each document chunk.
         chroma_vector_store_repository (ChromaVectorStoreRepository): Repository for interacting with the Chroma vector store.
+        token_settings (dict[str, tuple[int, int]]): The target and overlap number of tokens of the chunks, by item type.
+        count_tokens (Callable[[str], int]): The function counting the tokens of a text.
     """
 
-    def __init__(self, max_chunk_size: int, chroma_vector_store_repository: ChromaVectorStoreRepository):
+    # Inizio delle sezioni su cui dividere i documenti di ciascun tipo: definizioni, blocchi di codice e titoli
+    # per i file, titoli per le pagine Confluence, file e hunk delle patch per i commit
+    __BOUNDARY_PATTERNS = {
+        "GitHub File": r"^(?:[ \t]{0,4}(?:(?:export\s+)?(?:default\s+)?(?:async\s+)?(?:def|class|function|interface|enum|func|fn)\b"
+                       r"|(?:public|private|protected)\s)|```|#{1,6} )",
+        "Confluence Page": r"^#{1,6} ",
+        "GitHub Commit": r"^(?:diff --git |@@ )",
+    }
+    # Paragrafi, per i tipi senza una struttura propria
+    __PARAGRAPH_PATTERN = r"^\s*\n(?=\S)"
+
+    def __init__(self, max_chunk_size: int, chroma_vector_store_repository: ChromaVectorStoreRepository,
+                 token_settings: Optional[dict[str, tuple[int, int]]] = None,
+                 count_tokens: Optional[Callable[[str], int]] = None):
         """
         Initializes the ChromaVectorStoreAdapter with the specified maximum chunk size and repository.
         Args:
             max_chunk_size (int): Maximum size of each document chunk.
             chroma_vector_store_repository (ChromaVectorStoreRepository): Repository for interacting with the Chroma vector store.
+            token_settings (Optional[dict[str, tuple[int, int]]], optional): The target and overlap number of tokens
+                of the chunks, by item type. Defaults to None, to split every document on lines.
+            count_tokens (Optional[Callable[[str], int]], optional): The function counting the tokens of a text.
+                Defaults to an approximation of one token every two characters.
         """
         self.__max_chunk_size = max_chunk_size
+        self.__chunker = ContentDefinedChunker(max_chunk_size)
         self.__chroma_vector_store_repository = chroma_vector_store_repository
+        count_tokens = count_tokens if count_tokens is not None else self.__approximate_tokens
+        # Chunk tra metà e il doppio del target: in media il target, dato che i confini oltre il minimo cadono
+        # in media ogni metà del target
+        self.__token_chunkers = {
+            item_type: ContentDefinedChunker(2 * target_tokens, target_tokens // 2, max(target_tokens // 2, 1),
+                                             size_function=count_tokens,
+                                             boundary_pattern=self.__BOUNDARY_PATTERNS.get(item_type, self.__PARAGRAPH_PATTERN),
+                                             overlap_size=overlap_tokens)
+            for item_type, (target_tokens, overlap_tokens) in (token_settings or {}).items()
+        }
 
-    def load(self, documents: list[Document]) -> VectorStoreLog:
+    def __approximate_tokens(self, text: str) -> int:
+        """
+        Approximates the number of tokens of the given text, as one token every two characters.
+        Args:
+            text (str): The text.
+        Returns:
+            int: The approximate number of tokens.
+        """
+        return len(text) // 2
+
+    def load(self, documents: Iterable[Document], preserved_item_types: Optional[set[str]] = None) -> VectorStoreLog:
         """
         Loads the given documents into the Chroma vector store after splitting them into chunks.
+        The documents are split one at a time, while the repository consumes the chunks in batches,
+        so that the chunks of the whole corpus are never held in memory at the same time.
+        The time spent splitting is measured apart and logged as a stage before the ones of the repository.
         Args:
-            documents (list[Document]): List of documents to be loaded.
+            documents (Iterable[Document]): The documents to be loaded.
+            preserved_item_types (Optional[set[str]], optional): The item types whose loaded documents are kept even if
+                not among the given ones. Defaults to None.
         Returns:
             VectorStoreLog: Log of the load operation, including the outcome and number of items added, modified, and deleted.
         """
         try:
-            chroma_documents = self.__split(documents)
-            result = self.__chroma_vector_store_repository.load(chroma_documents)
-            return result
+            split_timer = StageTimer(LoadingStage.Splitting)
+            split_stats = [0, 0]
+            chroma_documents = self.__split_stream(documents, split_timer, split_stats)
+            result = self.__chroma_vector_store_repository.load(chroma_documents, preserved_item_types)
+            # Il log della suddivisione precede quelli del repository, nell'ordine delle fasi
+            return VectorStoreLog(result.get_timestamp(), result.get_outcome(), result.get_num_added_items(),
+                                  result.get_num_modified_items(), result.get_num_deleted_items(),
+                                  [split_timer.get_stage_log(split_stats[0], split_stats[1])] + result.get_stage_logs())
         except Exception as e:
             logger.error(f"Error in adapting documents to load in Chroma: {e}")
             raise e
 
-    def __split(self, documents: list[Document]) -> list[ChromaDocumentEntity]:
+    def __split_stream(self, documents: Iterable[Document], split_timer: Optional[StageTimer] = None,
+                       split_stats: Optional[list[int]] = None) -> Iterator[ChromaDocumentEntity]:
+        """
+        Splits the given documents into chunks lazily, one document at a time.
+        Args:
+            documents (Iterable[Document]): The documents to be split.
+            split_timer (Optional[StageTimer], optional): The timer measuring the time spent splitting. Defaults to None.
+            split_stats (Optional[list[int]], optional): The number of chunks produced and the bytes of their contents,
+                updated while splitting. Defaults to None.
+        Returns:
+            Iterator[ChromaDocumentEntity]: The chunks of the documents, in order.
+        Raises:
+            ValueError: If a document does not have an 'id' field in its metadata.
+        """
+        # Gli id già visti vengono condivisi tra le chiamate, per scartare i duplicati su tutto il flusso
+        seen_doc_ids = set()
+        split_timer = split_timer if split_timer is not None else StageTimer(LoadingStage.Splitting)
+        split_stats = split_stats if split_stats is not None else [0, 0]
+        for document in documents:
+            # Viene misurata solo la suddivisione: non la lettura dei documenti né il consumo dei chunk
+            with split_timer:
+                chunks = self.__split([document], seen_doc_ids)
+                split_stats[0] += len(chunks)
+                split_stats[1] += sum(len(chunk.get_page_content().encode("utf-8")) for chunk in chunks)
+            yield from chunks
+
+    def __split(self, documents: list[Document], seen_doc_ids: Optional[set[str]] = None) -> list[ChromaDocumentEntity]:
         """
-        Splits the given documents into chunks based on the maximum chunk size.
+        Splits the given documents into chunks with content-defined boundaries: in token-aware mode for the item types
+        with token settings, on lines and no larger than the maximum chunk size for the others.
+        The patches of the files of a commit are appended to its content, and only the summary of the files is kept
+        in the metadata.
+        In token-aware mode each chunk starts with the last lines of the previous one, whose length is stored in the
+        overlap_length metadata. The id of each chunk derives from the hash of its content, so that after an edit the chunks left untouched
+        keep their id, and only the chunks around the edit have to be embedded again.
         Args:
             documents (list[Document]): List of documents to be split.
+            seen_doc_ids (Optional[set[str]]): The ids of the documents already split, updated with the ids of the given
+                documents: the documents with an id already seen are skipped as duplicates.
         Returns:
             list[ChromaDocumentEntity]: List of document chunks as ChromaDocumentEntity objects.
         Raises:
@@ -60,7 +153,7 @@ class ChromaVectorStoreAdapter(SimilaritySearchPort, LoadFilesInVectorStorePort)
         """
         try:
             chroma_documents = []
-            seen_doc_ids = set()
+            seen_doc_ids = seen_doc_ids if seen_doc_ids is not None else set()
             date_format = "%Y-%m-%d %H:%M:%S"
 
             for document in documents:
@@ -76,16 +169,30 @@ class ChromaVectorStoreAdapter(SimilaritySearchPort, LoadFilesInVectorStorePort)
                     continue
                 seen_doc_ids.add(doc_id)
 
-                chunks = [page_content[i:i + self.__max_chunk_size] for i in range(0, len(page_content), self.__max_chunk_size)]
+                # I documenti invariati non hanno contenuto: vengono passati così come sono, per mantenere i loro chunk
+                if metadata.get("unchanged"):
+                    chroma_documents.append(ChromaDocumentEntity(page_content="", metadata=metadata.copy()))
+                    continue
+
+                # Le patch dei file del commit diventano contenuto da suddividere sugli hunk e da indicizzare,
+                # invece di essere copiate nei metadati di ogni chunk
+                if isinstance(metadata.get("files"), list):
+                    page_content += self.__render_patches(metadata["files"])
+
+                chunker = self.__token_chunkers.get(metadata.get("item_type"), self.__chunker)
+                chunks = chunker.split(page_content)
+                overlaps = [""] + [chunker.overlap(chunk) for chunk in chunks[:-1]]
+                chunks = [overlap + chunk for overlap, chunk in zip(overlaps, chunks)]
+                chunk_ids = self.__chunk_ids(doc_id, chunks)
                 if len(chunks) > 1:
                     logger.info(f"Splitted document {doc_id} into {len(chunks)} chunks")
 
                 for chunk_index, chunk in enumerate(chunks):
                     chunk_metadata = metadata.copy()
 
-                    # Convert list of files to string
+                    # Chroma accetta solo metadati scalari: la lista dei file del commit viene codificata in JSON
                     if "files" in chunk_metadata and isinstance(chunk_metadata["files"], list):
-                        chunk_metadata["files"] = "\n".join(chunk_metadata["files"])
+                        chunk_metadata["files"] = self.__encode_commit_files(chunk_metadata["files"])
 
                     # Format dates as strings
                     if "date" in chunk_metadata and hasattr(chunk_metadata["date"], "strftime"):
@@ -101,7 +208,9 @@ class ChromaVectorStoreAdapter(SimilaritySearchPort, LoadFilesInVectorStorePort)
 
                     # Add chunk metadata
                     chunk_metadata["chunk_index"] = chunk_index
-                    chunk_metadata["doc_id"] = f"{doc_id}_{chunk_index}"
+                    chunk_metadata["doc_id"] = chunk_ids[chunk_index]
+                    if overlaps[chunk_index]:
+                        chunk_metadata["overlap_length"] = len(overlaps[chunk_index])
 
                     chroma_documents.append(ChromaDocumentEntity(page_content=chunk, metadata=chunk_metadata))
 
@@ -110,6 +219,87 @@ class ChromaVectorStoreAdapter(SimilaritySearchPort, LoadFilesInVectorStorePort)
             logger.error(f"Error in splitting Documents before loading in Chroma: {e}")
             raise e
 
+    def __chunk_ids(self, doc_id: str, chunks: list[str]) -> list[str]:
+        """
+        Computes the ids of the chunks of a document from the hash of their content.
+        Args:
+            doc_id (str): The id of the document.
+            chunks (list[str]): The chunks of the document, in order.
+        Returns:
+            list[str]: The id of each chunk. The repeated chunks of the same document get a progressive suffix.
+        """
+        chunk_ids = []
+        occurrences = {}
+        for chunk in chunks:
+            chunk_hash = hashlib.sha256(chunk.encode("utf-8")).hexdigest()[:16]
+            occurrence = occurrences.get(chunk_hash, 0)
+            occurrences[chunk_hash] = occurrence + 1
+            chunk_ids.append(f"{doc_id}_{chunk_hash}" if occurrence == 0 else f"{doc_id}_{chunk_hash}_{occurrence}")
+        return chunk_ids
+
+    def __render_patches(self, commit_files: list[CommitFile]) -> str:
+        """
+        Renders the patches of the files of a commit as a unified diff, to be appended to the content of the commit.
+        Args:
+            commit_files (list[CommitFile]): The files of the commit.
+        Returns:
+            str: The diff of the files with a patch, each one after a "diff --git" header, or an empty string.
+        """
+        return "".join(
+            f"\n\ndiff --git a/{commit_file.get_filename()} b/{commit_file.get_filename()}\n{commit_file.get_patch()}"
+            for commit_file in commit_files if commit_file.get_patch()
+        )
+
+    def __encode_commit_files(self, commit_files: list[CommitFile]) -> str:
+        """
+        Encodes the summary of the files of a commit as a JSON string, to be stored as Chroma metadata.
+        The patches are left out, since they are stored in the content of the chunks.
+        Args:
+            commit_files (list[CommitFile]): The files of the commit.
+        Returns:
+            str: The JSON encoding of the files, without their patches.
+        """
+        return json.dumps([{key: value for key, value in commit_file.to_dict().items() if key != "patch"}
+                           for commit_file in commit_files])
+
+    def __decode_commit_files(self, encoded_files: str) -> list[CommitFile] | None:
+        """
+        Decodes the list of files of a commit from the JSON string stored as Chroma metadata.
+        Args:
+            encoded_files (str): The JSON encoding of the files.
+        Returns:
+            list[CommitFile] | None: The files of the commit, or None if the string is not in the JSON format,
+                as happens for the commits loaded by previous versions.
+        """
+        try:
+            return [CommitFile(**commit_file) for commit_file in json.loads(encoded_files)] if encoded_files else []
+        except Exception:
+            return None
+
+    def get_loaded_ids(self, item_type: str) -> set[str]:
+        """
+        Retrieves the ids of the documents of the given item type already loaded in Chroma.
+        Args:
+            item_type (str): The item type of the documents (e.g. "GitHub File").
+        Returns:
+            set[str]: The ids of the loaded documents.
+        """
+        try:
+            return self.__chroma_vector_store_repository.get_ids(item_type)
+        except Exception as e:
+            logger.error(f"Error in getting ids of documents loaded in Chroma: {e}")
+            raise e
+
+    def resync(self):
+        """
+        Rebuilds the manifest of the documents loaded in Chroma from the collection.
+        """
+        try:
+            self.__chroma_vector_store_repository.resync_manifest()
+        except Exception as e:
+            logger.error(f"Error in resyncing the Chroma manifest: {e}")
+            raise e
+
     def similarity_search(self, user_input: Question) -> list[Document]:
         """
         Performs a similarity search on the Chroma vector store using the given user input.
@@ -136,6 +326,12 @@ class ChromaVectorStoreAdapter(SimilaritySearchPort, LoadFilesInVectorStorePort)
                     # Aggiungi la distanza come metadato
                     metadata["distance"] = distance
 
+                    # Ripristina la lista strutturata dei file del commit, se salvata in JSON
+                    if isinstance(metadata.get("files"), str):
+                        commit_files = self.__decode_commit_files(metadata["files"])
+                        if commit_files is not None:
+                            metadata["files"] = commit_files
+
                     # Aggiungi il documento alla lista dei risultati
                     relevant_docs.append(Document(page_content=document, metadata=metadata))
 
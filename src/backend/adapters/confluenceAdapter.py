@@ -1,4 +1,4 @@
-from beartype.typing import List, Tuple
+from beartype.typing import List, Tuple, Optional
 
 from models.document import Document
 from models.loggingModels import PlatformLog
@@ -45,16 +45,29 @@ class ConfluenceAdapter(ConfluencePort):
             logger.error(f"Error converting Confluence pages timestamp: {e}")
             raise e
 
-    def load_confluence_pages(self) -> Tuple[PlatformLog, List[Document]]:
+    def get_space_key(self) -> str:
+        """
+        Returns the key of the Confluence space, used as source of the loading watermarks.
+        Returns:
+            str: The key of the Confluence space.
+        """
+        return self.__confluence_repository.get_space_key()
+
+    def load_confluence_pages(self, modified_since: Optional[datetime] = None) -> Tuple[PlatformLog, List[Document]]:
         """
         Loads Confluence pages and converts them to Document objects.
+        If modified_since is given, only the pages modified since then are downloaded and converted: the ids of all the
+        pages are listed to return the other ones as documents without content, with the "unchanged" metadata set to True,
+        so that the vector store keeps their chunks untouched and deletes only the chunks of the pages removed from Confluence.
+        Args:
+            modified_since (Optional[datetime]): The moment from which the modified pages are loaded.
         Returns:
             Tuple[PlatformLog, List[Document]]: A tuple containing the platform log and a list of Document objects.
         Raises:
             Exception: If there is an error loading the Confluence pages.
         """
         try:
-            platform_log, page_entities = self.__confluence_repository.load_confluence_pages()
+            platform_log, page_entities = self.__confluence_repository.load_confluence_pages(modified_since)
             documents = [
                 Document(
                     page_content=(
@@ -107,6 +120,21 @@ class ConfluenceAdapter(ConfluencePort):
                 )
                 for page in page_entities
             ]
+
+            if modified_since is not None and platform_log.get_outcome():
+                ids_log, page_ids = self.__confluence_repository.load_confluence_page_ids()
+                if not ids_log.get_outcome():
+                    return ids_log, []
+                # Il log riporta le richieste di entrambi i caricamenti
+                platform_log = PlatformLog(platform_log.get_loading_items(), platform_log.get_timestamp(), True,
+                                           platform_log.get_num_bytes() + ids_log.get_num_bytes(),
+                                           platform_log.get_num_api_calls() + ids_log.get_num_api_calls())
+                modified_ids = {document.get_metadata()["id"] for document in documents}
+                documents.extend(
+                    Document(page_content="", metadata={"item_type": "Confluence Page", "id": page_id, "unchanged": True})
+                    for page_id in page_ids if page_id not in modified_ids
+                )
+
             return platform_log, documents
         except Exception as e:
             logger.error(f"Error adapting Confluence pages: {e}")
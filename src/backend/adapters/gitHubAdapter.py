@@ -1,12 +1,14 @@
 import base64
-from beartype.typing import List, Tuple
+from beartype.typing import List, Tuple, Optional
 from datetime import datetime
 from pytz import timezone
 
 from models.document import Document
+from models.commitFile import CommitFile
 from models.loggingModels import PlatformLog
 from ports.gitHubPort import GitHubPort
 from repositories.gitHubRepository import GitHubRepository
+from repositories.gitMirrorRepository import GitMirrorRepository
 from utils.logger import logger
 from utils.beartype_personalized import beartype_personalized
 
@@ -18,11 +20,12 @@ class GitHubAdapter(GitHubPort):
     and convert them into a document format.
     """
 
-    def __init__(self, github_repository: GitHubRepository):
+    def __init__(self, github_repository: GitHubRepository | GitMirrorRepository):
         """
-        Initialize the GitHubAdapter with a GitHubRepository instance.
+        Initialize the GitHubAdapter with a GitHubRepository or a GitMirrorRepository instance.
         Args:
-            github_repository (GitHubRepository): An instance of GitHubRepository to interact with GitHub.
+            github_repository (GitHubRepository | GitMirrorRepository): The repository used to read commits and files,
+                either through the GitHub API or from a local git mirror.
         """
         self.__github_repository = github_repository
 
@@ -39,16 +42,26 @@ class GitHubAdapter(GitHubPort):
         timestamp_str_tz = timestamp_tz.strftime("%Y-%m-%d %H:%M:%S")
         return timestamp_str_tz
 
-    def load_github_commits(self) -> Tuple[PlatformLog, List[Document]]:
+    def get_repository_name(self) -> str:
+        """
+        Returns the name identifying the GitHub repository, used as source of the loading watermarks.
+        Returns:
+            str: The full name of the GitHub repository.
+        """
+        return self.__github_repository.get_full_name()
+
+    def load_github_commits(self, since: Optional[datetime] = None) -> Tuple[PlatformLog, List[Document]]:
         """
         Load commits from the GitHub repository and convert them into documents.
+        Args:
+            since (Optional[datetime]): If given, only the commits committed from this date onwards are loaded.
         Returns:
             tuple: A tuple containing the log and a list of Document instances representing the commits.
         Raises:
             Exception: If there is an error while loading commits.
         """
         try:
-            log, commit_entities = self.__github_repository.load_github_commits()
+            log, commit_entities = self.__github_repository.load_github_commits(since)
             documents = [
                 Document(
                     page_content=commit.get_message()
@@ -65,14 +78,8 @@ class GitHubAdapter(GitHubPort):
                         if commit.get_author_date() is not None
                         else "/",
                         "files": [
-                            (
-                                f"- {file.get_filename() if file.get_filename() is not None else '/'} "
-                                f"(Status: {file.get_status() if file.get_status() is not None else '/'}, "
-                                f"Changes: {file.get_changes() if file.get_changes() is not None else '/'}, "
-                                f"Additions: {file.get_additions() if file.get_additions() is not None else '/'}, "
-                                f"Deletions: {file.get_deletions() if file.get_deletions() is not None else '/'})\n"
-                                f"  Patch:\n{file.get_patch() if file.get_patch() is not None else '/'}"
-                            )
+                            CommitFile(file.get_filename(), file.get_status(), file.get_changes(),
+                                       file.get_additions(), file.get_deletions(), file.get_patch())
                             for file in (commit.get_files() if commit.get_files() is not None else [])
                         ],
                         "item_type": "GitHub Commit",
@@ -91,18 +98,36 @@ class GitHubAdapter(GitHubPort):
             logger.error(f"Error while adapting GitHub commits: {e}")
             raise e
 
-    def load_github_files(self) -> Tuple[PlatformLog, List[Document]]:
+    def load_github_files(self, known_shas: Optional[set[str]] = None) -> Tuple[PlatformLog, List[Document]]:
         """
         Load files from the GitHub repository and convert them into documents.
+        The files whose SHA is among the known ones are returned as documents without content, with the "unchanged"
+        metadata set to True, so that the vector store keeps their chunks untouched.
+        Args:
+            known_shas (Optional[set[str]]): The SHAs of the files already loaded in the vector store.
         Returns:
             tuple: A tuple containing the log and a list of Document instances representing the files.
         Raises:
             Exception: If there is an error while loading files.
         """
         try:
-            log, file_entities = self.__github_repository.load_github_files()
+            log, file_entities = self.__github_repository.load_github_files_from_tree(known_shas)
             documents = []
             for file in file_entities:
+                if file.is_unchanged():
+                    documents.append(
+                        Document(
+                            page_content="",
+                            metadata={
+                                "name": file.get_name() if file.get_name() is not None else "/",
+                                "path": file.get_path() if file.get_path() is not None else "/",
+                                "item_type": "GitHub File",
+                                "id": file.get_sha() if file.get_sha() is not None else "/",
+                                "unchanged": True,
+                            },
+                        )
+                    )
+                    continue
                 try:
                     documents.append(
                         Document(
@@ -1,4 +1,4 @@
-from beartype.typing import List, Tuple
+from beartype.typing import List, Tuple, Optional
 
 from models.document import Document
 from models.loggingModels import PlatformLog
@@ -25,16 +25,29 @@ class JiraAdapter(JiraPort):
         """
         self.__jira_repository = jira_repository
 
-    def load_jira_issues(self) -> Tuple[PlatformLog, List[Document]]:
+    def get_project_key(self) -> str:
+        """
+        Returns the key of the Jira project, used as source of the loading watermarks.
+        Returns:
+            str: The key of the Jira project.
+        """
+        return self.__jira_repository.get_project_key()
+
+    def load_jira_issues(self, updated_since: Optional[datetime] = None) -> Tuple[PlatformLog, List[Document]]:
         """
         Loads Jira issues and adapts them into a list of Document objects.
+        If updated_since is given, only the issues updated since then are downloaded and adapted: the keys of all the
+        issues are listed to return the other ones as documents without content, with the "unchanged" metadata set to True,
+        so that the vector store keeps their chunks untouched and deletes only the chunks of the issues removed from Jira.
+        Args:
+            updated_since (Optional[datetime]): The moment from which the updated issues are loaded.
         Returns:
             Tuple[PlatformLog, List[Document]]: A tuple containing the platform log and a list of adapted documents.
         Raises:
             Exception: If an error occurs while loading or adapting Jira issues.
         """
         try:
-            platform_log, issue_entities = self.__jira_repository.load_jira_issues()
+            platform_log, issue_entities = self.__jira_repository.load_jira_issues(updated_since)
 
             documents = [
                 Document(
@@ -66,6 +79,21 @@ class JiraAdapter(JiraPort):
                 )
                 for issue in issue_entities
             ]
+
+            if updated_since is not None and platform_log.get_outcome():
+                keys_log, issue_keys = self.__jira_repository.load_jira_issue_keys()
+                if not keys_log.get_outcome():
+                    return keys_log, []
+                # Il log riporta le richieste di entrambi i caricamenti
+                platform_log = PlatformLog(platform_log.get_loading_items(), platform_log.get_timestamp(), True,
+                                           platform_log.get_num_bytes() + keys_log.get_num_bytes(),
+                                           platform_log.get_num_api_calls() + keys_log.get_num_api_calls())
+                updated_keys = {document.get_metadata()["id"] for document in documents}
+                documents.extend(
+                    Document(page_content="", metadata={"item_type": "Jira Issue", "id": key, "unchanged": True})
+                    for key in issue_keys if key not in updated_keys
+                )
+
             return platform_log, documents
         except Exception as e:
             logger.error(f"An error occurred while adapting Jira issues: {e}")
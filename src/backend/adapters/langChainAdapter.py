@@ -2,6 +2,7 @@ from models.question import Question
 from models.answer import Answer
 from models.header import Header
 from models.document import Document
+from models.commitFile import CommitFile
 from models.questionAnswerCouple import QuestionAnswerCouple
 from models.nextPossibleQuestions import NextPossibleQuestions
 from models.possibleQuestion import PossibleQuestion
@@ -50,7 +51,7 @@ class LangChainAdapter(GenerateAnswerPort, GetNextPossibleQuestionsPort):
             # Aggiorna page_content di ogni documento con metadati e contenuto completo
             # Perchè create_stuff_documents_chain fornisce al chatbot solo il campo page_content di ogni documento
             for doc in relevant_docs:
-                doc.set_page_content(f"Metadata: {doc.get_metadata()}\nContent: {doc.get_page_content()}")
+                doc.set_page_content(f"Metadata: {self.__render_metadata(doc.get_metadata())}\nContent: {doc.get_page_content()}")
 
             # Inizializza il conteggio dei token con header e user_input (in quest'ordine)
             total_tokens = self.__count_tokens(header) + self.__count_tokens(user_input)
@@ -133,6 +134,23 @@ class LangChainAdapter(GenerateAnswerPort, GetNextPossibleQuestionsPort):
             logger.error(f"An error occured in get_next_possible_questions of LangChainAdapter: {e}")
             raise e
 
+    def __render_metadata(self, metadata: dict) -> dict:
+        """
+        Renders the structured metadata of a document in the textual form shown to the LLM.
+        The list of files of a GitHub commit is converted into one description for each file.
+        Args:
+            metadata (dict): The metadata of the document.
+        Returns:
+            dict: A copy of the metadata, with the list of commit files rendered as text.
+        """
+        rendered_metadata = metadata.copy()
+        if isinstance(rendered_metadata.get("files"), list):
+            rendered_metadata["files"] = "\n".join(
+                commit_file.to_text() if isinstance(commit_file, CommitFile) else str(commit_file)
+                for commit_file in rendered_metadata["files"]
+            )
+        return rendered_metadata
+
     def __count_tokens(self, text: str) -> int:
         """
         Calculates the approximate number of tokens based on the provided text.
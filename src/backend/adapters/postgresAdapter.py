@@ -1,25 +1,34 @@
-from beartype.typing import List
+from beartype.typing import List, Optional
+from datetime import datetime
 
 from models.dbSaveOperationResponse import DbSaveOperationResponse
-from models.loggingModels import LoadingAttempt
+from models.loggingModels import LoadingAttempt, LoadingItems, LoadingStage, StageLog
 from models.quantity import Quantity
 from models.page import Page
 from models.message import Message, MessageSender
 from models.lastLoadOutcome import LastLoadOutcome
+from models.watermark import Watermark
 from entities.postgresSaveOperationResponse import PostgresSaveOperationResponse
-from entities.loggingEntities import PostgresLoadingAttempt, PostgresPlatformLog, PostgresVectorStoreLog, PostgresLoadingItems
+from entities.loggingEntities import (PostgresLoadingAttempt, PostgresPlatformLog, PostgresVectorStoreLog, PostgresLoadingItems,
+                                      PostgresLoadingStage, PostgresStageLog)
 from entities.postgresMessage import PostgresMessage, PostgresMessageSender
 from entities.postgresLastLoadOutcome import PostgresLastLoadOutcome
+from entities.postgresWatermark import PostgresWatermark
 from ports.saveLoadingAttemptInDbPort import SaveLoadingAttemptInDbPort
 from ports.saveMessagePort import SaveMessagePort
 from ports.getMessagesPort import GetMessagesPort
 from ports.getLastLoadOutcomePort import GetLastLoadOutcomePort
+from ports.getLastLoadStagesPort import GetLastLoadStagesPort
+from ports.refreshLeasePort import RefreshLeasePort
+from ports.gitHubFileDatesPort import GitHubFileDatesPort
+from ports.watermarkPort import WatermarkPort
 from repositories.postgresRepository import PostgresRepository
 from utils.logger import logger
 from utils.beartype_personalized import beartype_personalized
 
 @beartype_personalized
-class PostgresAdapter(SaveLoadingAttemptInDbPort, SaveMessagePort, GetMessagesPort, GetLastLoadOutcomePort):
+class PostgresAdapter(SaveLoadingAttemptInDbPort, SaveMessagePort, GetMessagesPort, GetLastLoadOutcomePort, GetLastLoadStagesPort,
+                      WatermarkPort, RefreshLeasePort, GitHubFileDatesPort):
     """
     Adapter class for interacting with a PostgreSQL repository.
     This class provides methods to save and retrieve data, and convert responses
@@ -109,6 +118,183 @@ class PostgresAdapter(SaveLoadingAttemptInDbPort, SaveMessagePort, GetMessagesPo
             logger.error(f"Error in get_last_load_outcome of PostgresAdapter: {e}")
             raise e
 
+    def get_last_load_stage_logs(self) -> List[StageLog]:
+        """
+        Retrieve the logs of the stages of the last loading attempt from the PostgreSQL repository.
+        Returns:
+            List[StageLog]: The logs of the stages of the last loading attempt.
+        Raises:
+            Exception: If there is an error during the retrieval operation.
+        """
+        try:
+            postgres_stage_logs = self.__repository.get_last_load_stage_logs()
+            return [
+                StageLog(
+                    stage=LoadingStage[psl.get_postgres_loading_stage().name],
+                    duration=psl.get_duration(),
+                    num_items=psl.get_num_items(),
+                    num_bytes=psl.get_num_bytes(),
+                    num_api_calls=psl.get_num_api_calls(),
+                    peak_memory=psl.get_peak_memory()
+                ) for psl in postgres_stage_logs
+            ]
+        except Exception as e:
+            logger.error(f"Error in get_last_load_stage_logs of PostgresAdapter: {e}")
+            raise e
+
+    def get_watermark(self, loading_items: LoadingItems, source: str) -> Optional[Watermark]:
+        """
+        Retrieve the watermark of the given platform and source from the PostgreSQL repository.
+        Args:
+            loading_items (LoadingItems): The items the watermark refers to.
+            source (str): The source the watermark refers to.
+        Returns:
+            Optional[Watermark]: The saved watermark, or None if no watermark has been saved yet.
+        Raises:
+            Exception: If there is an error during the retrieval operation.
+        """
+        try:
+            postgres_watermark = self.__repository.get_watermark(PostgresLoadingItems[loading_items.name], source)
+            if postgres_watermark is None:
+                return None
+            return Watermark(
+                loading_items=LoadingItems[postgres_watermark.get_postgres_loading_items().name],
+                source=postgres_watermark.get_source(),
+                last_timestamp=postgres_watermark.get_last_timestamp(),
+                last_id=postgres_watermark.get_last_id()
+            )
+        except Exception as e:
+            logger.error(f"Error in get_watermark of PostgresAdapter: {e}")
+            raise e
+
+    def save_watermark(self, watermark: Watermark) -> DbSaveOperationResponse:
+        """
+        Save a watermark to the PostgreSQL repository.
+        Args:
+            watermark (Watermark): The watermark to be saved.
+        Returns:
+            DbSaveOperationResponse: The response from the save operation.
+        Raises:
+            Exception: If there is an error during the save operation.
+        """
+        try:
+            postgres_watermark = PostgresWatermark(
+                postgres_loading_items=PostgresLoadingItems[watermark.get_loading_items().name],
+                source=watermark.get_source(),
+                last_timestamp=watermark.get_last_timestamp(),
+                last_id=watermark.get_last_id()
+            )
+            postgres_response = self.__repository.save_watermark(postgres_watermark)
+            return self.__dsor_converter(postgres_response)
+        except Exception as e:
+            logger.error(f"Error in save_watermark of PostgresAdapter: {e}")
+            raise e
+
+    def acquire_lease(self, name: str, holder: str, ttl: int) -> bool:
+        """
+        Acquire or renew a lease in the PostgreSQL repository.
+        Args:
+            name (str): The name of the lease.
+            holder (str): The identifier of the holder of the lease.
+            ttl (int): The seconds after which the lease expires if not renewed.
+        Returns:
+            bool: True if the lease is now held by the given holder, False otherwise.
+        Raises:
+            Exception: If there is an error during the acquisition.
+        """
+        try:
+            return self.__repository.acquire_lease(name, holder, ttl)
+        except Exception as e:
+            logger.error(f"Error in acquire_lease of PostgresAdapter: {e}")
+            raise e
+
+    def release_lease(self, name: str, holder: str) -> bool:
+        """
+        Release a lease in the PostgreSQL repository.
+        Args:
+            name (str): The name of the lease.
+            holder (str): The identifier of the holder of the lease.
+        Returns:
+            bool: True if the lease has been released, False if it was not held by the given holder.
+        Raises:
+            Exception: If there is an error during the release.
+        """
+        try:
+            return self.__repository.release_lease(name, holder)
+        except Exception as e:
+            logger.error(f"Error in release_lease of PostgresAdapter: {e}")
+            raise e
+
+    def swap_lease_replica(self, name: str, replica: str) -> Optional[str]:
+        """
+        Record the last replica that acquired a lease in the PostgreSQL repository.
+        Args:
+            name (str): The name of the lease.
+            replica (str): The identifier of the replica, shared by its processes.
+        Returns:
+            Optional[str]: The replica that acquired the lease before, or None if no replica has been recorded yet.
+        Raises:
+            Exception: If there is an error while recording the replica.
+        """
+        try:
+            return self.__repository.swap_lease_replica(name, replica)
+        except Exception as e:
+            logger.error(f"Error in swap_lease_replica of PostgresAdapter: {e}")
+            raise e
+
+    def get_github_file_dates(self, source: str, paths: set[str]) -> dict[str, tuple[Optional[datetime], Optional[datetime]]]:
+        """
+        Retrieve the dates of the given GitHub files of the given source from the PostgreSQL repository.
+        Args:
+            source (str): The source the files belong to.
+            paths (set[str]): The paths of the files.
+        Returns:
+            dict[str, tuple[Optional[datetime], Optional[datetime]]]: The last update and the creation date of each file,
+                by path.
+        Raises:
+            Exception: If there is an error during the retrieval.
+        """
+        try:
+            return self.__repository.get_github_file_dates(source, paths)
+        except Exception as e:
+            logger.error(f"Error in get_github_file_dates of PostgresAdapter: {e}")
+            raise e
+
+    def has_github_file_dates(self, source: str) -> bool:
+        """
+        Check whether any GitHub file date of the given source has been saved in the PostgreSQL repository.
+        Args:
+            source (str): The source the files belong to.
+        Returns:
+            bool: True if the dates of at least one file have been saved, False otherwise.
+        Raises:
+            Exception: If there is an error during the check.
+        """
+        try:
+            return self.__repository.has_github_file_dates(source)
+        except Exception as e:
+            logger.error(f"Error in has_github_file_dates of PostgresAdapter: {e}")
+            raise e
+
+    def save_github_file_dates(self, source: str, dates: dict[str, tuple[Optional[datetime], Optional[datetime]]]) -> DbSaveOperationResponse:
+        """
+        Save the dates of the GitHub files of the given source to the PostgreSQL repository.
+        Args:
+            source (str): The source the files belong to.
+            dates (dict[str, tuple[Optional[datetime], Optional[datetime]]]): The last update and the creation date of
+                each file, by path.
+        Returns:
+            DbSaveOperationResponse: The response from the save operation.
+        Raises:
+            Exception: If there is an error during the save operation.
+        """
+        try:
+            postgres_response = self.__repository.save_github_file_dates(source, dates)
+            return self.__dsor_converter(postgres_response)
+        except Exception as e:
+            logger.error(f"Error in save_github_file_dates of PostgresAdapter: {e}")
+            raise e
+
     def __dsor_converter(self, psor: PostgresSaveOperationResponse) -> DbSaveOperationResponse:
         """
         Convert a PostgresSaveOperationResponse to a DbSaveOperationResponse.
@@ -202,10 +388,21 @@ class PostgresAdapter(SaveLoadingAttemptInDbPort, SaveMessagePort, GetMessagesPo
                 num_modified_items=loading_attempt.get_vector_store_log().get_num_modified_items(),
                 num_deleted_items=loading_attempt.get_vector_store_log().get_num_deleted_items()
             )
+            postgres_stage_logs = [
+                PostgresStageLog(
+                    postgres_loading_stage=PostgresLoadingStage[log.get_stage().name],
+                    duration=log.get_duration(),
+                    num_items=log.get_num_items(),
+                    num_bytes=log.get_num_bytes(),
+                    num_api_calls=log.get_num_api_calls(),
+                    peak_memory=log.get_peak_memory()
+                ) for log in loading_attempt.get_stage_logs()
+            ]
             return PostgresLoadingAttempt(
                 postgres_platform_logs=postgres_platform_logs,
                 postgres_vector_store_log=postgres_vector_store_log,
-                starting_timestamp=loading_attempt.get_starting_timestamp()
+                starting_timestamp=loading_attempt.get_starting_timestamp(),
+                postgres_stage_logs=postgres_stage_logs
             )
         except Exception as e:
             logger.error(f"Error in postgres_loading_attempt_converter of PostgresAdapter: {e}")
@@ -5,6 +5,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from dto.messageDTO import MessageDTO
 from dto.lastLoadOutcomeDTO import LastLoadOutcomeDTO
+from dto.stageLogDTO import StageLogDTO
 from utils.dependency_injection import dependency_injection_frontend
 from utils.logger import logger
 from utils.beartype_personalized import beartype_personalized
@@ -33,6 +34,7 @@ frontend_dependencies = dependency_injection_frontend()
 
 chat_controller = frontend_dependencies["chat_controller"]
 get_last_load_outcome_controller = frontend_dependencies["get_last_load_outcome_controller"]
+get_last_load_stages_controller = frontend_dependencies["get_last_load_stages_controller"]
 save_message_controller = frontend_dependencies["save_message_controller"]
 get_messages_controller = frontend_dependencies["get_messages_controller"]
 get_next_possible_questions_controller = frontend_dependencies["get_next_possible_questions_controller"]
@@ -143,6 +145,25 @@ async def get_last_load_outcome() -> LastLoadOutcomeDTO | JSONResponse:
         return JSONResponse(content={"status": "error", "message": error_message}, status_code=500)
 
 
+@beartype_personalized
+@app.post("/api/get_last_load_stages", summary="Get the duration and the throughput of the stages of the last load",
+          response_model=List[StageLogDTO])
+async def get_last_load_stages() -> List[StageLogDTO] | JSONResponse:
+    """
+    Retrieves the duration, the number of items, the bytes, the API calls and the peak memory of each stage of the last load.
+    Returns:
+        Union[List[StageLogDTO], JSONResponse]: 
+            - If successful, returns a list of StageLogDTO objects, one for each stage of the last load
+            - If an error occurs, returns a JSONResponse with error details and 500 status code
+    """
+    try:
+        return get_last_load_stages_controller.get_last_load_stages()
+    except Exception as e:
+        error_message = f"Error getting the stages of the last load: {e}"
+        logger.error(error_message)
+        return JSONResponse(content={"status": "error", "message": error_message}, status_code=500)
+
+
 
 if __name__ == "__main__":
     import uvicorn
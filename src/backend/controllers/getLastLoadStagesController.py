@@ -0,0 +1,46 @@
+from beartype.typing import List
+
+from dto.stageLogDTO import StageLogDTO
+from use_cases.getLastLoadStagesUseCase import GetLastLoadStagesUseCase
+from utils.logger import logger
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class GetLastLoadStagesController:
+    """
+    Controller for handling the retrieval of the logs of the stages of the last loading attempt.
+    Attributes:
+        get_last_load_stages_use_case (GetLastLoadStagesUseCase): Use case for getting the stage logs.
+    """
+
+    def __init__(self, get_last_load_stages_use_case: GetLastLoadStagesUseCase):
+        """
+        Initializes the GetLastLoadStagesController with the provided use case.
+        Args:
+            get_last_load_stages_use_case (GetLastLoadStagesUseCase): The use case for getting the stage logs.
+        """
+        self.get_last_load_stages_use_case = get_last_load_stages_use_case
+
+    def get_last_load_stages(self) -> List[StageLogDTO]:
+        """
+        Retrieves the logs of the stages of the last loading attempt.
+        Returns:
+            List[StageLogDTO]: Data transfer objects containing the duration and the throughput of each stage.
+        Raises:
+            Exception: If there is an error while getting the stage logs.
+        """
+        try:
+            stage_logs = self.get_last_load_stages_use_case.get_last_load_stage_logs()
+            return [
+                StageLogDTO(
+                    stage=stage_log.get_stage().value,
+                    duration=stage_log.get_duration(),
+                    num_items=stage_log.get_num_items(),
+                    num_bytes=stage_log.get_num_bytes(),
+                    num_api_calls=stage_log.get_num_api_calls(),
+                    peak_memory=stage_log.get_peak_memory()
+                ) for stage_log in stage_logs
+            ]
+        except Exception as e:
+            logger.error(f"Error getting last load stage logs in GetLastLoadStagesController: {e}")
+            raise e
@@ -0,0 +1,52 @@
+from pydantic import BaseModel
+
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class StageLogDTO(BaseModel):
+    stage: str
+    duration: float
+    num_items: int
+    num_bytes: int
+    num_api_calls: int
+    peak_memory: int
+
+    def __init__(self, stage: str, duration: float, num_items: int, num_bytes: int, num_api_calls: int, peak_memory: int):
+        super().__init__(stage=stage, duration=duration, num_items=num_items, num_bytes=num_bytes,
+                         num_api_calls=num_api_calls, peak_memory=peak_memory)
+        self.__stage = stage
+        self.__duration = duration
+        self.__num_items = num_items
+        self.__num_bytes = num_bytes
+        self.__num_api_calls = num_api_calls
+        self.__peak_memory = peak_memory
+
+    def get_stage(self) -> str:
+        return self.__stage
+
+    def get_duration(self) -> float:
+        return self.__duration
+
+    def get_num_items(self) -> int:
+        return self.__num_items
+
+    def get_num_bytes(self) -> int:
+        return self.__num_bytes
+
+    def get_num_api_calls(self) -> int:
+        return self.__num_api_calls
+
+    def get_peak_memory(self) -> int:
+        return self.__peak_memory
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, StageLogDTO):
+            return False
+        return (
+            self.__stage == other.get_stage() and
+            self.__duration == other.get_duration() and
+            self.__num_items == other.get_num_items() and
+            self.__num_bytes == other.get_num_bytes() and
+            self.__num_api_calls == other.get_num_api_calls() and
+            self.__peak_memory == other.get_peak_memory()
+        )
@@ -0,0 +1,49 @@
+from beartype.typing import Optional
+
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class ChromaManifestEntryEntity:
+    def __init__(self, id: str, item_type: Optional[str], content_hash: str, chunk_ids: list[str],
+                 source_version: Optional[str] = None, path: Optional[str] = None):
+        self.__id = id
+        self.__item_type = item_type
+        self.__content_hash = content_hash
+        self.__chunk_ids = chunk_ids
+        self.__source_version = source_version
+        self.__path = path
+
+    def get_id(self) -> str:
+        return self.__id
+
+    def get_item_type(self) -> Optional[str]:
+        return self.__item_type
+
+    def get_content_hash(self) -> str:
+        return self.__content_hash
+
+    def get_chunk_ids(self) -> list[str]:
+        return self.__chunk_ids
+
+    def get_num_chunks(self) -> int:
+        return len(self.__chunk_ids)
+
+    def get_source_version(self) -> Optional[str]:
+        return self.__source_version
+
+    def get_path(self) -> Optional[str]:
+        return self.__path
+
+    def __repr__(self) -> str:
+        return (f"ChromaManifestEntryEntity(id={self.__id}, item_type={self.__item_type}, content_hash={self.__content_hash}, "
+                f"chunk_ids={self.__chunk_ids}, source_version={self.__source_version}, path={self.__path})")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ChromaManifestEntryEntity):
+            return False
+        return (self.__id == other.get_id() and
+            self.__item_type == other.get_item_type() and
+            self.__content_hash == other.get_content_hash() and
+            self.__chunk_ids == other.get_chunk_ids() and
+            self.__source_version == other.get_source_version() and
+            self.__path == other.get_path())
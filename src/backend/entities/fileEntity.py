@@ -2,7 +2,8 @@ from utils.beartype_personalized import beartype_personalized
 
 @beartype_personalized
 class FileEntity:
-    def __init__(self, type: str, encoding: str, size: int, name: str, path: str, content: str, sha: str, url: str, html_url: str, download_url: str, git_url: str):
+    def __init__(self, type: str, encoding: str, size: int, name: str, path: str, content: str, sha: str, url: str, html_url: str, download_url: str, git_url: str,
+                 unchanged: bool = False):
         """
         Inizializza un nuovo oggetto FileEntity, basato su un file di GitHub.
 
@@ -18,6 +19,8 @@ class FileEntity:
             html_url (str): L'URL HTML per visualizzare il contenuto su GitHub.
             download_url (str): L'URL per scaricare il contenuto.
             git_url (str): L'URL Git per accedere al contenuto.
+            unchanged (bool): True se il file è già presente nel database vettoriale con lo stesso SHA, e quindi il suo
+                contenuto non è stato scaricato.
         """
         self.__type = type
         self.__encoding = encoding
@@ -30,6 +33,7 @@ class FileEntity:
         self.__html_url = html_url
         self.__download_url = download_url
         self.__git_url = git_url
+        self.__unchanged = unchanged
 
     def get_type(self) -> str:
         return self.__type
@@ -64,10 +68,13 @@ class FileEntity:
     def get_git_url(self) -> str:
         return self.__git_url
 
+    def is_unchanged(self) -> bool:
+        return self.__unchanged
+
     def __repr__(self):
         return (f"FileEntity(type={self.__type}, encoding={self.__encoding}, size={self.__size}, name={self.__name}, "
                 f"path={self.__path}, content={self.__content}, sha={self.__sha}, url={self.__url}, html_url={self.__html_url}, "
-                f"download_url={self.__download_url}, git_url={self.__git_url})")
+                f"download_url={self.__download_url}, git_url={self.__git_url}, unchanged={self.__unchanged})")
     
     def __eq__(self, other) -> bool:
         if not isinstance(other, FileEntity):
@@ -82,4 +89,5 @@ class FileEntity:
             self.__url == other.get_url() and
             self.__html_url == other.get_html_url() and
             self.__download_url == other.get_download_url() and
-            self.__git_url == other.get_git_url())
+            self.__git_url == other.get_git_url() and
+            self.__unchanged == other.is_unchanged())
@@ -1,5 +1,6 @@
 from enum import Enum
 from datetime import datetime
+from beartype.typing import Optional
 
 from utils.beartype_personalized import beartype_personalized
 
@@ -9,6 +10,59 @@ class PostgresLoadingItems(Enum):
     JiraIssues = "Jira Issues"
     ConfluencePages = "Confluence Pages"
 
+class PostgresLoadingStage(Enum):
+    GitHubCommitsFetch = "GitHub Commits fetch"
+    GitHubFilesFetch = "GitHub Files fetch"
+    JiraIssuesFetch = "Jira Issues fetch"
+    ConfluencePagesFetch = "Confluence Pages fetch"
+    GitHubMetadataEnrichment = "GitHub metadata enrichment"
+    ConfluenceCleaning = "Confluence cleaning"
+    Splitting = "Splitting"
+    Diff = "Diff"
+    Deletes = "Deletes"
+    Adds = "Adds"
+    LeaseWait = "Lease wait"
+    LeaseHold = "Lease hold"
+
+@beartype_personalized
+class PostgresStageLog:
+    def __init__(self, postgres_loading_stage: PostgresLoadingStage, duration: float, num_items: int, num_bytes: int,
+                 num_api_calls: int, peak_memory: int):
+        self.__postgres_loading_stage = postgres_loading_stage
+        self.__duration = duration
+        self.__num_items = num_items
+        self.__num_bytes = num_bytes
+        self.__num_api_calls = num_api_calls
+        self.__peak_memory = peak_memory
+
+    def get_postgres_loading_stage(self) -> PostgresLoadingStage:
+        return self.__postgres_loading_stage
+
+    def get_duration(self) -> float:
+        return self.__duration
+
+    def get_num_items(self) -> int:
+        return self.__num_items
+
+    def get_num_bytes(self) -> int:
+        return self.__num_bytes
+
+    def get_num_api_calls(self) -> int:
+        return self.__num_api_calls
+
+    def get_peak_memory(self) -> int:
+        return self.__peak_memory
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PostgresStageLog):
+            return False
+        return (self.__postgres_loading_stage == other.get_postgres_loading_stage() and
+            self.__duration == other.get_duration() and
+            self.__num_items == other.get_num_items() and
+            self.__num_bytes == other.get_num_bytes() and
+            self.__num_api_calls == other.get_num_api_calls() and
+            self.__peak_memory == other.get_peak_memory())
+
 @beartype_personalized
 class PostgresPlatformLog:
     def __init__(self, postgres_loading_items: PostgresLoadingItems, timestamp: datetime, outcome: bool):
@@ -67,10 +121,12 @@ class PostgresVectorStoreLog:
 
 @beartype_personalized
 class PostgresLoadingAttempt:
-    def __init__(self, postgres_platform_logs: list[PostgresPlatformLog], postgres_vector_store_log: PostgresVectorStoreLog, starting_timestamp: datetime):
+    def __init__(self, postgres_platform_logs: list[PostgresPlatformLog], postgres_vector_store_log: PostgresVectorStoreLog, starting_timestamp: datetime,
+                 postgres_stage_logs: Optional[list[PostgresStageLog]] = None):
         self.__postgres_platform_logs = postgres_platform_logs
         self.__postgres_vector_store_log = postgres_vector_store_log
         self.__starting_timestamp = starting_timestamp
+        self.__postgres_stage_logs = postgres_stage_logs if postgres_stage_logs is not None else []
         self.__ending_timestamp = postgres_vector_store_log.get_timestamp()
         self.__outcome = all(log.get_outcome() for log in postgres_platform_logs) and postgres_vector_store_log.get_outcome()
 
@@ -89,10 +145,14 @@ class PostgresLoadingAttempt:
     def get_outcome(self) -> bool:
         return self.__outcome
 
+    def get_postgres_stage_logs(self) -> list[PostgresStageLog]:
+        return self.__postgres_stage_logs
+
     def __eq__(self, other) -> bool:
         if not isinstance(other, PostgresLoadingAttempt):
             return False
         return (self.__postgres_platform_logs == other.get_postgres_platform_logs() and
+            self.__postgres_stage_logs == other.get_postgres_stage_logs() and
             self.__postgres_vector_store_log == other.get_postgres_vector_store_log() and
             self.__starting_timestamp == other.get_starting_timestamp() and
             self.__ending_timestamp == other.get_ending_timestamp() and
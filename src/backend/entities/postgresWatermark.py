@@ -0,0 +1,37 @@
+from datetime import datetime
+from beartype.typing import Optional
+
+from entities.loggingEntities import PostgresLoadingItems
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class PostgresWatermark:
+    def __init__(self, postgres_loading_items: PostgresLoadingItems, source: str, last_timestamp: datetime, last_id: Optional[str] = None):
+        self.__postgres_loading_items = postgres_loading_items
+        self.__source = source
+        self.__last_timestamp = last_timestamp
+        self.__last_id = last_id
+
+    def get_postgres_loading_items(self) -> PostgresLoadingItems:
+        return self.__postgres_loading_items
+
+    def get_source(self) -> str:
+        return self.__source
+
+    def get_last_timestamp(self) -> datetime:
+        return self.__last_timestamp
+
+    def get_last_id(self) -> Optional[str]:
+        return self.__last_id
+
+    def __repr__(self) -> str:
+        return (f"PostgresWatermark(postgres_loading_items={self.__postgres_loading_items}, source={self.__source}, "
+                f"last_timestamp={self.__last_timestamp}, last_id={self.__last_id})")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PostgresWatermark):
+            return False
+        return (self.__postgres_loading_items == other.get_postgres_loading_items() and
+            self.__source == other.get_source() and
+            self.__last_timestamp == other.get_last_timestamp() and
+            self.__last_id == other.get_last_id())
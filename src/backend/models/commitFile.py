@@ -0,0 +1,57 @@
+from beartype.typing import Optional
+
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class CommitFile:
+    def __init__(self, filename: str, status: str, changes: int, additions: int, deletions: int, patch: Optional[str] = None):
+        self.__filename = filename
+        self.__status = status
+        self.__changes = changes
+        self.__additions = additions
+        self.__deletions = deletions
+        self.__patch = patch
+
+    def get_filename(self) -> str:
+        return self.__filename
+
+    def get_status(self) -> str:
+        return self.__status
+
+    def get_changes(self) -> int:
+        return self.__changes
+
+    def get_additions(self) -> int:
+        return self.__additions
+
+    def get_deletions(self) -> int:
+        return self.__deletions
+
+    def get_patch(self) -> Optional[str]:
+        return self.__patch
+
+    def to_dict(self) -> dict:
+        return {
+            "filename": self.__filename,
+            "status": self.__status,
+            "changes": self.__changes,
+            "additions": self.__additions,
+            "deletions": self.__deletions,
+            "patch": self.__patch,
+        }
+
+    def to_text(self) -> str:
+        # Forma testuale usata solo quando il file viene mostrato al modello linguistico.
+        # I file letti dal database vettoriale non hanno la patch, che si trova nel contenuto del commit
+        summary = (f"- {self.__filename} (Status: {self.__status}, Changes: {self.__changes}, "
+                   f"Additions: {self.__additions}, Deletions: {self.__deletions})")
+        return f"{summary}\n  Patch:\n{self.__patch}" if self.__patch is not None else summary
+
+    def __repr__(self) -> str:
+        return (f"CommitFile(filename={self.__filename}, status={self.__status}, changes={self.__changes}, "
+                f"additions={self.__additions}, deletions={self.__deletions}, patch={self.__patch})")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CommitFile):
+            return False
+        return self.to_dict() == other.to_dict()
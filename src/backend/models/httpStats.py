@@ -0,0 +1,36 @@
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class HttpStats:
+    def __init__(self, num_requests: int, num_retries: int, num_bytes: int, total_latency: float):
+        self.__num_requests = num_requests
+        self.__num_retries = num_retries
+        self.__num_bytes = num_bytes
+        self.__total_latency = total_latency
+
+    def get_num_requests(self) -> int:
+        return self.__num_requests
+
+    def get_num_retries(self) -> int:
+        return self.__num_retries
+
+    def get_num_bytes(self) -> int:
+        return self.__num_bytes
+
+    def get_total_latency(self) -> float:
+        return self.__total_latency
+
+    def get_average_latency(self) -> float:
+        return self.__total_latency / self.__num_requests if self.__num_requests > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return (f"HttpStats(num_requests={self.__num_requests}, num_retries={self.__num_retries}, "
+                f"num_bytes={self.__num_bytes}, average_latency={self.get_average_latency():.3f}s)")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, HttpStats):
+            return False
+        return (self.__num_requests == other.get_num_requests() and
+            self.__num_retries == other.get_num_retries() and
+            self.__num_bytes == other.get_num_bytes() and
+            self.__total_latency == other.get_total_latency())
@@ -0,0 +1,54 @@
+from datetime import datetime
+from beartype.typing import Optional
+
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class IngestionDaemonState:
+    def __init__(self, running: bool, consecutive_failures: int, last_start: Optional[datetime] = None,
+                 last_end: Optional[datetime] = None, last_outcome: Optional[bool] = None, last_error: Optional[str] = None,
+                 next_run: Optional[datetime] = None):
+        self.__running = running
+        self.__consecutive_failures = consecutive_failures
+        self.__last_start = last_start
+        self.__last_end = last_end
+        self.__last_outcome = last_outcome
+        self.__last_error = last_error
+        self.__next_run = next_run
+
+    def get_running(self) -> bool:
+        return self.__running
+
+    def get_consecutive_failures(self) -> int:
+        return self.__consecutive_failures
+
+    def get_last_start(self) -> Optional[datetime]:
+        return self.__last_start
+
+    def get_last_end(self) -> Optional[datetime]:
+        return self.__last_end
+
+    def get_last_outcome(self) -> Optional[bool]:
+        return self.__last_outcome
+
+    def get_last_error(self) -> Optional[str]:
+        return self.__last_error
+
+    def get_next_run(self) -> Optional[datetime]:
+        return self.__next_run
+
+    def __repr__(self) -> str:
+        return (f"IngestionDaemonState(running={self.__running}, consecutive_failures={self.__consecutive_failures}, "
+                f"last_start={self.__last_start}, last_end={self.__last_end}, last_outcome={self.__last_outcome}, "
+                f"last_error={self.__last_error}, next_run={self.__next_run})")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, IngestionDaemonState):
+            return False
+        return (self.__running == other.get_running() and
+            self.__consecutive_failures == other.get_consecutive_failures() and
+            self.__last_start == other.get_last_start() and
+            self.__last_end == other.get_last_end() and
+            self.__last_outcome == other.get_last_outcome() and
+            self.__last_error == other.get_last_error() and
+            self.__next_run == other.get_next_run())
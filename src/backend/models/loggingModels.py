@@ -1,5 +1,6 @@
 from enum import Enum
 from datetime import datetime
+from beartype.typing import Optional
 
 from utils.beartype_personalized import beartype_personalized
 
@@ -9,12 +10,72 @@ class LoadingItems(Enum):
     JiraIssues = "Jira Issues"
     ConfluencePages = "Confluence Pages"
 
+class LoadingStage(Enum):
+    GitHubCommitsFetch = "GitHub Commits fetch"
+    GitHubFilesFetch = "GitHub Files fetch"
+    JiraIssuesFetch = "Jira Issues fetch"
+    ConfluencePagesFetch = "Confluence Pages fetch"
+    GitHubMetadataEnrichment = "GitHub metadata enrichment"
+    ConfluenceCleaning = "Confluence cleaning"
+    Splitting = "Splitting"
+    Diff = "Diff"
+    Deletes = "Deletes"
+    Adds = "Adds"
+    LeaseWait = "Lease wait"
+    LeaseHold = "Lease hold"
+
+@beartype_personalized
+class StageLog:
+    def __init__(self, stage: LoadingStage, duration: float, num_items: int, num_bytes: int = 0, num_api_calls: int = 0,
+                 peak_memory: int = 0):
+        self.__stage = stage
+        self.__duration = duration
+        self.__num_items = num_items
+        self.__num_bytes = num_bytes
+        self.__num_api_calls = num_api_calls
+        self.__peak_memory = peak_memory
+
+    def get_stage(self) -> LoadingStage:
+        return self.__stage
+
+    def get_duration(self) -> float:
+        return self.__duration
+
+    def get_num_items(self) -> int:
+        return self.__num_items
+
+    def get_num_bytes(self) -> int:
+        return self.__num_bytes
+
+    def get_num_api_calls(self) -> int:
+        return self.__num_api_calls
+
+    def get_peak_memory(self) -> int:
+        return self.__peak_memory
+
+    def __repr__(self) -> str:
+        return (f"StageLog(stage={self.__stage.value}, duration={self.__duration:.3f}s, num_items={self.__num_items}, "
+                f"num_bytes={self.__num_bytes}, num_api_calls={self.__num_api_calls}, peak_memory={self.__peak_memory})")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, StageLog):
+            return False
+        return (self.__stage == other.get_stage() and
+            self.__duration == other.get_duration() and
+            self.__num_items == other.get_num_items() and
+            self.__num_bytes == other.get_num_bytes() and
+            self.__num_api_calls == other.get_num_api_calls() and
+            self.__peak_memory == other.get_peak_memory())
+
 @beartype_personalized
 class PlatformLog:
-    def __init__(self, loading_items: LoadingItems, timestamp: datetime, outcome: bool):
+    def __init__(self, loading_items: LoadingItems, timestamp: datetime, outcome: bool, num_bytes: int = 0, num_api_calls: int = 0):
         self.__loading_items = loading_items
         self.__timestamp = timestamp
         self.__outcome = outcome
+        # Statistiche delle richieste del caricamento, riportate nel log della fase di fetch
+        self.__num_bytes = num_bytes
+        self.__num_api_calls = num_api_calls
 
     def get_loading_items(self) -> LoadingItems:
         return self.__loading_items
@@ -25,7 +86,14 @@ class PlatformLog:
     def get_outcome(self) -> bool:
         return self.__outcome
 
+    def get_num_bytes(self) -> int:
+        return self.__num_bytes
+
+    def get_num_api_calls(self) -> int:
+        return self.__num_api_calls
+
     def __eq__(self, other) -> bool:
+        # Le statistiche delle richieste cambiano a ogni caricamento: non fanno parte dell'uguaglianza
         if not isinstance(other, PlatformLog):
             return False
         return (self.__loading_items == other.get_loading_items() and
@@ -34,12 +102,14 @@ class PlatformLog:
 
 @beartype_personalized
 class VectorStoreLog:
-    def __init__(self, timestamp: datetime, outcome: bool, num_added_items: int, num_modified_items: int, num_deleted_items: int):
+    def __init__(self, timestamp: datetime, outcome: bool, num_added_items: int, num_modified_items: int, num_deleted_items: int,
+                 stage_logs: Optional[list[StageLog]] = None):
         self.__timestamp = timestamp
         self.__outcome = outcome
         self.__num_added_items = num_added_items
         self.__num_modified_items = num_modified_items
         self.__num_deleted_items = num_deleted_items
+        self.__stage_logs = stage_logs if stage_logs is not None else []
 
     def get_timestamp(self) -> datetime:
         return self.__timestamp
@@ -56,7 +126,11 @@ class VectorStoreLog:
     def get_num_deleted_items(self) -> int:
         return self.__num_deleted_items
 
+    def get_stage_logs(self) -> list[StageLog]:
+        return self.__stage_logs
+
     def __eq__(self, other) -> bool:
+        # Le misure delle fasi cambiano a ogni caricamento: non fanno parte dell'uguaglianza
         if not isinstance(other, VectorStoreLog):
             return False
         return (self.__timestamp == other.get_timestamp() and
@@ -67,10 +141,12 @@ class VectorStoreLog:
 
 @beartype_personalized
 class LoadingAttempt:
-    def __init__(self, platform_logs: list[PlatformLog], vector_store_log: VectorStoreLog, starting_timestamp: datetime):
+    def __init__(self, platform_logs: list[PlatformLog], vector_store_log: VectorStoreLog, starting_timestamp: datetime,
+                 stage_logs: Optional[list[StageLog]] = None):
         self.__platform_logs = platform_logs
         self.__vector_store_log = vector_store_log
         self.__starting_timestamp = starting_timestamp
+        self.__stage_logs = stage_logs if stage_logs is not None else []
         self.__ending_timestamp = vector_store_log.get_timestamp()
         self.__outcome = all(log.get_outcome() for log in platform_logs) and vector_store_log.get_outcome()
 
@@ -89,7 +165,11 @@ class LoadingAttempt:
     def get_outcome(self) -> bool:
         return self.__outcome
 
+    def get_stage_logs(self) -> list[StageLog]:
+        return self.__stage_logs
+
     def __eq__(self, other) -> bool:
+        # Le misure delle fasi cambiano a ogni caricamento: non fanno parte dell'uguaglianza
         if not isinstance(other, LoadingAttempt):
             return False
         return (self.__platform_logs == other.get_platform_logs() and
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from beartype.typing import Tuple, List
+from datetime import datetime
+from beartype.typing import Tuple, List, Optional
 
 from models.document import Document
 from models.loggingModels import PlatformLog
@@ -11,9 +12,21 @@ class ConfluencePort(ABC):
     """
 
     @abstractmethod
-    def load_confluence_pages(self) -> Tuple[PlatformLog, List[Document]]:
+    def get_space_key(self) -> str:
+        """
+        Returns the key of the Confluence space, used as source of the loading watermarks.
+        Returns:
+            str: The key of the Confluence space.
+        """
+
+    @abstractmethod
+    def load_confluence_pages(self, modified_since: Optional[datetime] = None) -> Tuple[PlatformLog, List[Document]]:
         """
         Loads Confluence pages and converts them to Document objects.
+        If modified_since is given, only the pages modified since then are downloaded; the other pages still present
+        in Confluence are returned as documents without content, marked as unchanged.
+        Args:
+            modified_since (Optional[datetime]): The moment from which the modified pages are loaded.
         Returns:
             Tuple[PlatformLog, List[Document]]: A tuple containing the platform log and a list of Document objects.
         """
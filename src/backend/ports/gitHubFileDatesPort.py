@@ -0,0 +1,48 @@
+from abc import ABC, abstractmethod
+from beartype.typing import Optional
+from datetime import datetime
+
+from models.dbSaveOperationResponse import DbSaveOperationResponse
+
+class GitHubFileDatesPort(ABC):
+    """
+    Interface for reading and saving the dates of the GitHub files, taken from the commits in which they appear.
+    The dates are kept outside the vector store, so that the incremental loadings update them from the new commits
+    only, without reading the commits already loaded.
+    """
+
+    @abstractmethod
+    def get_github_file_dates(self, source: str, paths: set[str]) -> dict[str, tuple[Optional[datetime], Optional[datetime]]]:
+        """
+        Retrieves the dates of the given files of the given source.
+        Args:
+            source (str): The source the files belong to (e.g. the GitHub repository name).
+            paths (set[str]): The paths of the files.
+        Returns:
+            dict[str, tuple[Optional[datetime], Optional[datetime]]]: The date of the last commit in which each file
+                appears and the date of the last commit in which it is added or renamed, by path. The files without
+                saved dates are missing.
+        """
+
+    @abstractmethod
+    def has_github_file_dates(self, source: str) -> bool:
+        """
+        Checks whether any date has been saved for the files of the given source.
+        Args:
+            source (str): The source the files belong to (e.g. the GitHub repository name).
+        Returns:
+            bool: True if the dates of at least one file have been saved, False otherwise.
+        """
+
+    @abstractmethod
+    def save_github_file_dates(self, source: str, dates: dict[str, tuple[Optional[datetime], Optional[datetime]]]) -> DbSaveOperationResponse:
+        """
+        Saves the given dates of the files of the given source, keeping for each file the most recent of the saved
+        and the given dates.
+        Args:
+            source (str): The source the files belong to (e.g. the GitHub repository name).
+            dates (dict[str, tuple[Optional[datetime], Optional[datetime]]]): The date of the last commit in which each
+                file appears and the date of the last commit in which it is added or renamed, by path.
+        Returns:
+            DbSaveOperationResponse: The response from the save operation.
+        """
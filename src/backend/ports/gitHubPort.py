@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from beartype.typing import Tuple, List
+from beartype.typing import Tuple, List, Optional
+from datetime import datetime
 
 from models.document import Document
 from models.loggingModels import PlatformLog
@@ -11,17 +12,30 @@ class GitHubPort(ABC):
     """
     
     @abstractmethod
-    def load_github_commits(self) -> Tuple[PlatformLog, List[Document]]:
+    def get_repository_name(self) -> str:
+        """
+        Returns the name identifying the GitHub repository, used as source of the loading watermarks.
+        Returns:
+            str: The full name of the GitHub repository.
+        """
+
+    @abstractmethod
+    def load_github_commits(self, since: Optional[datetime] = None) -> Tuple[PlatformLog, List[Document]]:
         """
         Load commits from the GitHub repository and convert them into documents.
+        Args:
+            since (Optional[datetime]): If given, only the commits committed from this date onwards are loaded.
         Returns:
             tuple: A tuple containing the log and a list of Document instances representing the commits.
         """
 
     @abstractmethod
-    def load_github_files(self) -> Tuple[PlatformLog, List[Document]]:
+    def load_github_files(self, known_shas: Optional[set[str]] = None) -> Tuple[PlatformLog, List[Document]]:
         """
         Load files from the GitHub repository and convert them into documents.
+        The files whose SHA is among the known ones are returned as documents without content, marked as unchanged.
+        Args:
+            known_shas (Optional[set[str]]): The SHAs of the files already loaded in the vector store.
         Returns:
             tuple: A tuple containing the log and a list of Document instances representing the files.
         """
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from beartype.typing import Tuple, List
+from datetime import datetime
+from beartype.typing import Tuple, List, Optional
 
 from models.document import Document
 from models.loggingModels import PlatformLog
@@ -11,9 +12,21 @@ class JiraPort(ABC):
     """
 
     @abstractmethod
-    def load_jira_issues(self) -> Tuple[PlatformLog, List[Document]]:
+    def get_project_key(self) -> str:
+        """
+        Returns the key of the Jira project, used as source of the loading watermarks.
+        Returns:
+            str: The key of the Jira project.
+        """
+
+    @abstractmethod
+    def load_jira_issues(self, updated_since: Optional[datetime] = None) -> Tuple[PlatformLog, List[Document]]:
         """
         Loads Jira issues and adapts them into a list of Document objects.
+        If updated_since is given, only the issues updated since then are downloaded; the other issues still present
+        in Jira are returned as documents without content, marked as unchanged.
+        Args:
+            updated_since (Optional[datetime]): The moment from which the updated issues are loaded.
         Returns:
             Tuple[PlatformLog, List[Document]]: A tuple containing the platform log and a list of adapted documents.
         """
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from beartype.typing import Iterable, Optional
 
 from models.document import Document
 from models.loggingModels import VectorStoreLog
@@ -11,11 +12,31 @@ class LoadFilesInVectorStorePort(ABC):
     """
 
     @abstractmethod
-    def load(self, documents: list[Document]) -> VectorStoreLog:
+    def load(self, documents: Iterable[Document], preserved_item_types: Optional[set[str]] = None) -> VectorStoreLog:
         """
-        Abstract method to load a list of documents into a vector store.
+        Abstract method to load the given documents into a vector store.
+        The documents can be consumed as a stream, without holding all of them in memory at the same time.
         Args:
-            documents (list[Document]): A list of Document objects to be loaded.
+            documents (Iterable[Document]): The Document objects to be loaded.
+            preserved_item_types (Optional[set[str]], optional): The item types whose loaded documents are kept even if
+                not among the given ones (e.g. those of a platform whose loading failed). Defaults to None.
         Returns:
             VectorStoreLog: An instance of VectorStoreLog containing information about the load operation.
         """
+
+    @abstractmethod
+    def get_loaded_ids(self, item_type: str) -> set[str]:
+        """
+        Abstract method to retrieve the ids of the documents of the given item type already loaded in the vector store.
+        Args:
+            item_type (str): The item type of the documents (e.g. "GitHub File").
+        Returns:
+            set[str]: The ids of the loaded documents, as set in their "id" metadata.
+        """
+
+    @abstractmethod
+    def resync(self):
+        """
+        Abstract method to rebuild the state kept locally about the loaded documents (e.g. a manifest) from the vector
+        store, since another process may have changed the vector store meanwhile.
+        """
@@ -0,0 +1,41 @@
+from abc import ABC, abstractmethod
+from beartype.typing import Optional
+
+class RefreshLeasePort(ABC):
+    """
+    Interface for acquiring and releasing the leases that let a single replica at a time refresh the shared data.
+    """
+
+    @abstractmethod
+    def acquire_lease(self, name: str, holder: str, ttl: int) -> bool:
+        """
+        Abstract method to acquire or renew a lease, if it is free, expired or already held by the same holder.
+        Args:
+            name (str): The name of the lease.
+            holder (str): The identifier of the holder of the lease.
+            ttl (int): The seconds after which the lease expires if not renewed.
+        Returns:
+            bool: True if the lease is now held by the given holder, False otherwise.
+        """
+
+    @abstractmethod
+    def release_lease(self, name: str, holder: str) -> bool:
+        """
+        Abstract method to release a lease held by the given holder.
+        Args:
+            name (str): The name of the lease.
+            holder (str): The identifier of the holder of the lease.
+        Returns:
+            bool: True if the lease has been released, False if it was not held by the given holder.
+        """
+
+    @abstractmethod
+    def swap_lease_replica(self, name: str, replica: str) -> Optional[str]:
+        """
+        Abstract method to record the given replica as the last one that acquired a lease, returning the previous one.
+        Args:
+            name (str): The name of the lease.
+            replica (str): The identifier of the replica, shared by its processes.
+        Returns:
+            Optional[str]: The replica that acquired the lease before, or None if no replica has been recorded yet.
+        """
@@ -0,0 +1,33 @@
+from abc import ABC, abstractmethod
+from beartype.typing import Optional
+
+from models.loggingModels import LoadingItems
+from models.watermark import Watermark
+from models.dbSaveOperationResponse import DbSaveOperationResponse
+
+class WatermarkPort(ABC):
+    """
+    Interface for reading and saving the watermarks of the incremental loadings.
+    A watermark records, for a given platform and source, the most recent item already loaded in the vector store.
+    """
+
+    @abstractmethod
+    def get_watermark(self, loading_items: LoadingItems, source: str) -> Optional[Watermark]:
+        """
+        Retrieves the watermark of the given platform and source.
+        Args:
+            loading_items (LoadingItems): The items the watermark refers to.
+            source (str): The source the watermark refers to (e.g. the GitHub repository name).
+        Returns:
+            Optional[Watermark]: The saved watermark, or None if no watermark has been saved yet.
+        """
+
+    @abstractmethod
+    def save_watermark(self, watermark: Watermark) -> DbSaveOperationResponse:
+        """
+        Saves the given watermark, replacing the previous one of the same platform and source.
+        Args:
+            watermark (Watermark): The watermark to be saved.
+        Returns:
+            DbSaveOperationResponse: The response from the save operation.
+        """
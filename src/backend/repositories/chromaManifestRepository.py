@@ -0,0 +1,178 @@
+import json
+import sqlite3
+from contextlib import closing
+from beartype.typing import Iterable
+
+from entities.chromaManifestEntryEntity import ChromaManifestEntryEntity
+from utils.logger import logger
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class ChromaManifestRepository:
+    """
+    A repository class for the local manifest of the documents loaded in the Chroma vector store.
+    For each document the manifest stores the hash of its chunks, the ids of the chunks and the version of the source,
+    so that the changes can be detected without reading the whole collection from the Chroma server.
+    Next to the manifest are kept the ids of the pending chunks, written to or about to be deleted from the collection
+    but possibly not referenced by the manifest, so that a loading interrupted between two checkpoints can be resumed
+    by deleting only them.
+    The manifest is kept in a SQLite database, created if missing.
+    Attributes:
+        path (str): The path of the SQLite database file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initializes the ChromaManifestRepository, creating the manifest table if it does not exist.
+        A table in the format of a previous version is dropped: the manifest is then rebuilt from the collection.
+        Args:
+            path (str): The path of the SQLite database file.
+        Raises:
+            sqlite3.Error: If an error occurs while creating the table.
+        """
+        self.__path = path
+        with closing(sqlite3.connect(self.__path)) as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(manifest)").fetchall()}
+        if columns and "chunk_ids" not in columns:
+            logger.info("Dropping Chroma manifest in a previous format.")
+            self.__execute_many("DROP TABLE manifest")
+        self.__execute_many(
+            """
+            CREATE TABLE IF NOT EXISTS manifest (
+                id TEXT PRIMARY KEY,
+                item_type TEXT,
+                content_hash TEXT NOT NULL,
+                chunk_ids TEXT NOT NULL,
+                source_version TEXT,
+                path TEXT
+            )
+            """
+        )
+        self.__execute_many("CREATE TABLE IF NOT EXISTS pending_chunks (chunk_id TEXT PRIMARY KEY)")
+
+    def __execute_many(self, query: str, params_list: Iterable[tuple] = ((),), clear: bool = False):
+        """
+        Executes the given SQL query once for each set of parameters, in a single transaction.
+        Args:
+            query (str): The SQL query to be executed.
+            params_list (Iterable[tuple], optional): The parameters of each execution. Defaults to a single execution
+                without parameters.
+            clear (bool, optional): Whether to empty the manifest in the same transaction, before the executions.
+                Defaults to False.
+        Raises:
+            sqlite3.Error: If an error occurs while executing the query.
+        """
+        try:
+            # Il context manager della connessione esegue il commit, o il rollback in caso di errore
+            with closing(sqlite3.connect(self.__path)) as conn, conn:
+                if clear:
+                    conn.execute("DELETE FROM manifest")
+                conn.executemany(query, params_list)
+        except Exception as e:
+            logger.error(f"An error occurred while writing the Chroma manifest: {e}")
+            raise e
+
+    def get_entries(self) -> dict[str, ChromaManifestEntryEntity]:
+        """
+        Retrieves all the entries of the manifest.
+        Returns:
+            dict[str, ChromaManifestEntryEntity]: The entries of the manifest, by document id.
+        Raises:
+            sqlite3.Error: If an error occurs while reading the manifest.
+        """
+        try:
+            with closing(sqlite3.connect(self.__path)) as conn:
+                rows = conn.execute(
+                    "SELECT id, item_type, content_hash, chunk_ids, source_version, path FROM manifest"
+                ).fetchall()
+            return {
+                row[0]: ChromaManifestEntryEntity(row[0], row[1], row[2], json.loads(row[3]), row[4], row[5])
+                for row in rows
+            }
+        except Exception as e:
+            logger.error(f"An error occurred while reading the Chroma manifest: {e}")
+            raise e
+
+    def save_entries(self, entries: Iterable[ChromaManifestEntryEntity]):
+        """
+        Inserts the given entries in the manifest, replacing the entries with the same document id.
+        Args:
+            entries (Iterable[ChromaManifestEntryEntity]): The entries to save.
+        Raises:
+            sqlite3.Error: If an error occurs while writing the manifest.
+        """
+        self.__execute_many(
+            "INSERT OR REPLACE INTO manifest (id, item_type, content_hash, chunk_ids, source_version, path) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [self.__to_row(entry) for entry in entries]
+        )
+
+    def replace_entries(self, entries: Iterable[ChromaManifestEntryEntity]):
+        """
+        Replaces the whole content of the manifest with the given entries.
+        Args:
+            entries (Iterable[ChromaManifestEntryEntity]): The new entries of the manifest.
+        Raises:
+            sqlite3.Error: If an error occurs while writing the manifest.
+        """
+        self.__execute_many(
+            "INSERT INTO manifest (id, item_type, content_hash, chunk_ids, source_version, path) VALUES (?, ?, ?, ?, ?, ?)",
+            [self.__to_row(entry) for entry in entries],
+            clear=True
+        )
+
+    def delete_entries(self, ids: Iterable[str]):
+        """
+        Deletes the entries of the given documents from the manifest.
+        Args:
+            ids (Iterable[str]): The ids of the documents.
+        Raises:
+            sqlite3.Error: If an error occurs while writing the manifest.
+        """
+        self.__execute_many("DELETE FROM manifest WHERE id = ?", [(doc_id,) for doc_id in ids])
+
+    def get_pending_chunk_ids(self) -> list[str]:
+        """
+        Retrieves the ids of the pending chunks.
+        Returns:
+            list[str]: The ids of the chunks written to or deleted from the collection since the last checkpoint.
+        Raises:
+            sqlite3.Error: If an error occurs while reading the manifest.
+        """
+        try:
+            with closing(sqlite3.connect(self.__path)) as conn:
+                rows = conn.execute("SELECT chunk_id FROM pending_chunks").fetchall()
+            return [row[0] for row in rows]
+        except Exception as e:
+            logger.error(f"An error occurred while reading the Chroma manifest: {e}")
+            raise e
+
+    def add_pending_chunk_ids(self, chunk_ids: Iterable[str]):
+        """
+        Records the given chunks as pending, before they are written to or deleted from the collection.
+        Args:
+            chunk_ids (Iterable[str]): The ids of the chunks.
+        Raises:
+            sqlite3.Error: If an error occurs while writing the manifest.
+        """
+        self.__execute_many("INSERT OR IGNORE INTO pending_chunks (chunk_id) VALUES (?)",
+                            [(chunk_id,) for chunk_id in chunk_ids])
+
+    def clear_pending_chunk_ids(self):
+        """
+        Forgets all the pending chunks, once their writes and deletes are reflected by the manifest.
+        Raises:
+            sqlite3.Error: If an error occurs while writing the manifest.
+        """
+        self.__execute_many("DELETE FROM pending_chunks")
+
+    def __to_row(self, entry: ChromaManifestEntryEntity) -> tuple:
+        """
+        Converts an entry of the manifest into the parameters of the SQL queries.
+        Args:
+            entry (ChromaManifestEntryEntity): The entry to convert.
+        Returns:
+            tuple: The values of the columns of the entry.
+        """
+        return (entry.get_id(), entry.get_item_type(), entry.get_content_hash(), json.dumps(entry.get_chunk_ids()),
+                entry.get_source_version(), entry.get_path())
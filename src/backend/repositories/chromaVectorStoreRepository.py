@@ -1,11 +1,21 @@
 import chromadb
+import hashlib
+import json
 import pytz
 import requests
+import time
+from itertools import groupby
+from beartype.typing import Iterable, Optional
 from requests.exceptions import ConnectTimeout
 
-from models.loggingModels import VectorStoreLog
+from models.loggingModels import VectorStoreLog, LoadingStage, StageLog
 from entities.chromaDocumentEntity import ChromaDocumentEntity
+from entities.chromaManifestEntryEntity import ChromaManifestEntryEntity
 from entities.queryResultEntity import QueryResultEntity
+from repositories.chromaManifestRepository import ChromaManifestRepository
+from utils.chroma_batch_writer import ChromaBatchWriter
+from utils.embedding_cache import EmbeddingCache
+from utils.stage_timer import StageTimer, get_peak_memory
 from utils.logger import logger
 from datetime import datetime
 from utils.beartype_personalized import beartype_personalized
@@ -19,200 +29,230 @@ class ChromaVectorStoreRepository:
         client (chromadb.HttpClient): The client to connect to the Chroma server.
         collection_name (str): The name of the collection in the Chroma.
         collection (chromadb.Collection): The collection object to interact with the Chroma.
+        manifest_repository (ChromaManifestRepository): The repository of the manifest of the loaded documents.
+        batch_size (int): The number of chunks read from and written to Chroma in each request while loading.
+        write_workers (int): The maximum number of batches written to Chroma at the same time.
+        write_retries (int): The maximum number of retries of a batch whose writing failed.
+        embedding_cache (Optional[EmbeddingCache]): The cache of the embeddings of the chunks.
+        checkpoint_size (int): The number of chunks written or updated between two checkpoints of the manifest.
     Raises:
         Exception: If an error occurs during initialization or while interacting with the vector store.
     """
 
-    def __init__(self, collection: chromadb.Collection):
+    # Metadati che cambiano a ogni caricamento senza che cambi il documento: esclusi dall'hash dei chunk
+    __VOLATILE_KEYS = ("vector_store_insertion_date",)
+
+    def __init__(self, collection: chromadb.Collection, manifest_repository: ChromaManifestRepository, batch_size: int = 500,
+                 write_workers: int = 1, write_retries: int = 0, embedding_cache: Optional[EmbeddingCache] = None,
+                 checkpoint_size: int = 5000):
         """ 
         Initializes the ChromaVectorStoreRepository by connecting to the Chroma server and setting up the collection.
         Args:
             collection (chromadb.Collection): The collection object to interact with Chroma.
+            manifest_repository (ChromaManifestRepository): The repository of the manifest of the loaded documents.
+            batch_size (int): The number of chunks read from and written to Chroma in each request while loading.
+                It should not exceed the maximum batch size accepted by the Chroma server.
+            write_workers (int): The maximum number of batches written to Chroma at the same time.
+            write_retries (int): The maximum number of retries of a batch whose writing failed.
+            embedding_cache (Optional[EmbeddingCache]): The cache of the embeddings of the chunks, used to pass precomputed
+                embeddings to Chroma. If None, the embeddings are computed by the collection.
+            checkpoint_size (int): The number of chunks written or updated between two checkpoints of the manifest, i.e.
+                the work lost at most if the loading is interrupted.
         """
         self.__collection = collection
+        self.__manifest_repository = manifest_repository
+        self.__batch_size = batch_size
+        self.__write_workers = write_workers
+        self.__write_retries = write_retries
+        self.__embedding_cache = embedding_cache
+        self.__checkpoint_size = checkpoint_size
 
-    def load(self, documents: list[ChromaDocumentEntity]) -> VectorStoreLog:
+    def load(self, documents: Iterable[ChromaDocumentEntity], preserved_item_types: Optional[set[str]] = None) -> VectorStoreLog:
         """
         Loads the provided documents into the Chroma vector store.
+        The changes are detected against the local manifest of the loaded documents, without reading the collection:
+        the chunks of each incoming document are hashed, and only the documents whose hash differs from the one in the
+        manifest are written. The documents are consumed as a stream and their chunks are handed to a batched writer,
+        which writes up to write_workers batches in parallel and retries each failed batch on its own.
+        The manifest is updated at checkpoints, every checkpoint_size chunks, once the batches queued until then have been
+        written: if the loading is interrupted, the next one resumes from the last checkpoint, since the documents committed
+        in the manifest are unchanged. The chunks written after the last checkpoint are recorded as pending before being
+        written, so that the next loading deletes them (see __get_manifest) and writes them again.
         This method also handles:
-         - Identifying obsolete documents (present in Chroma but not among the incoming ones).
-         - Preparing new documents (not already present in Chroma).
-         - For updates of non-GitHub File documents, if the "last_update" field of the incoming document is more recent,
-           the document is considered updated (modified).
-         - For GitHub Files, the "creation_date" field (incoming) is compared with the "insertion_date" field (DB) to determine
-           whether the file should be counted as "added" or "modified".
+         - Keeping untouched the chunks of the documents marked as "unchanged", which are passed without content.
+         - Writing, for a modified document, only the chunks not already stored: the ids of the chunks derive from their
+           content, so the chunks with an id already in the manifest get only their metadata updated, without embedding.
+         - Deleting the chunks of the previous version of a modified document that are no longer among its chunks.
+         - Deleting obsolete documents (present in the manifest but not among the incoming ones) after the last batch,
+           except those of the preserved item types, whose source could not be loaded and so is not known to lack them.
+         - Counting as modified, rather than added and deleted, a new document replacing an obsolete document of the
+           same type with the same "path" (e.g. a GitHub File whose content, and so whose id, has changed).
         Args:
-            documents (list[ChromaDocumentEntity]): A list of documents to be loaded.
+            documents (Iterable[ChromaDocumentEntity]): The chunks of the documents to be loaded, with the chunks of the
+                same document one after the other.
+            preserved_item_types (Optional[set[str]], optional): The item types whose documents in the manifest are kept
+                even if not among the incoming ones. Defaults to None, for no preserved item type.
         Returns:
-            VectorStoreLog: An object containing the log of the operation.
+            VectorStoreLog: An object containing the log of the operation, with the logs of the diff, deletes and adds stages.
         Raises:
             Exception: If an error occurs while loading the documents.
             (requests.exceptions.ConnectTimeout, ConnectTimeoutError): If a timeout occurs while connecting to the Chroma server.
         """
         try:
-            date_format = "%Y-%m-%d %H:%M:%S"
-
-            # Preparazione dei documenti in arrivo: mappatura doc_id -> (metadata, page_content)
-            try:
-                incoming_docs = {
-                    doc.get_metadata()["doc_id"]: (doc.get_metadata(), doc.get_page_content())
-                    for doc in documents
-                }
-            except Exception as e:
-                logger.error(f"Error preparing new data for update: {e}")
-                raise e
-
             # Inizializza i contatori
             num_initial_items = 0
             num_added_items = 0
             num_modified_items = 0
             num_deleted_items = 0
             num_final_items = 0
+            num_written_chunks = 0
+            started = time.monotonic()
 
-            # Fetch dei documenti già presenti in Chroma
-            try:
-                db_docs = {}
-                chroma_data = self.__collection.get(include=["metadatas"])
-                i = 0
-                for doc_id in chroma_data['ids']:
-                    db_docs[doc_id] = chroma_data['metadatas'][i]
-                    i += 1
-            except Exception as e:
-                logger.error(f"Error getting old data from chroma: {e}")
-                raise e
-
-            num_initial_items = len(db_docs)
-            logger.info(f"Fetched {num_initial_items} documents from Chroma vector store.")
-
-            # Creazione della lista degli id da eliminare: documenti presenti in DB ma non negli incoming
-            db_ids_to_delete = [doc_id for doc_id in db_docs.keys() if doc_id not in incoming_docs.keys()]
-            db_docs_to_delete = {doc_id: db_docs[doc_id] for doc_id in db_ids_to_delete}
-            num_deleted_items += len(db_ids_to_delete)
-            for doc_id in db_ids_to_delete:
-                db_docs.pop(doc_id)
-
-            # Creazione del dizionario dei documenti da aggiungere: quelli presenti negli incoming ma non in DB
-            incoming_docs_to_add = {
-                doc_id: value for doc_id, value in incoming_docs.items() if doc_id not in db_docs.keys()
-            }
-            num_added_items += len(incoming_docs_to_add)
-            for doc_id in list(incoming_docs_to_add.keys()):
-                incoming_docs.pop(doc_id)
-
-            # Tolti tutti gli elementi presenti in db e non in incoming, tolti tutti gli elementi presenti in incoming e non in db,
-            # rimangono solo gli elementi presenti in entrambi.
-
-            # -------------------------------------------------------------------------------
-            # Sezione: Aggiornamento per documenti NON GitHub File
-            # -------------------------------------------------------------------------------
-            try:
-                for incoming_id, incoming_value in list(incoming_docs.items()):
-                    metadata = incoming_value[0]
-                    # Se non è un GitHub File, procedi con il confronto delle date "last_update"
-                    if metadata.get("item_type") == "GitHub File":
-                        continue
-                    try:
-                        incoming_last_update = datetime.strptime(
-                            metadata.get("last_update"), date_format
-                        )
-                        db_last_update = datetime.strptime(
-                            db_docs[incoming_id]["last_update"], date_format
-                        )
-                    except Exception as e:
-                        logger.error(f"Error parsing datetime for doc_id {incoming_id}: {e}")
-                        raise e
-
-                    if incoming_last_update > db_last_update:
-                        # Il documento è stato aggiornato: verrà inserito in Chroma, e conta come modified.
-                        db_ids_to_delete.append(incoming_id)
-                        num_modified_items += 1
-                        incoming_docs_to_add[incoming_id] = incoming_value
-                        incoming_docs.pop(incoming_id)
-            except Exception as e:
-                logger.error(f"Error checking for modified documents: {e}")
-                raise e
-            # Fine sezione aggiornamenti non GitHub File.
-
-            # -------------------------------------------------------------------------------
-            # Sezione: Controllo specifico per i GitHub File
-            # Confronta "creation_date" (incoming) con "insertion_date" (DB) per stabilire se il file è aggiunto o modificato.
-            # -------------------------------------------------------------------------------
+            # Lettura del manifest dei documenti già presenti in Chroma
+            diff_timer = StageTimer(LoadingStage.Diff)
+            with diff_timer:
+                try:
+                    manifest = self.__get_manifest()
+                except Exception as e:
+                    logger.error(f"Error getting old data from chroma: {e}")
+                    raise e
+
+            num_initial_items = len(manifest)
+            logger.info(f"Fetched {num_initial_items} documents from Chroma manifest.")
+
+            # Stato mantenuto tra un documento e l'altro: solo gli id visti e le voci del manifest da aggiornare
+            seen_ids = set()
+            added_paths = set()
+            entries_to_save = []
+            chunks_to_write = []
+            chunks_to_update = []
+            stale_chunk_ids = []
+            num_queued_chunks = 0
+
+            writer = ChromaBatchWriter(self.__collection, self.__batch_size, self.__write_workers, self.__write_retries,
+                                       embedding_cache=self.__embedding_cache)
+            if self.__embedding_cache is not None:
+                initial_hits = self.__embedding_cache.get_num_hits()
+                initial_misses = self.__embedding_cache.get_num_misses()
             try:
-                # Costruiamo una mapping per i GitHub File già presenti in Chroma basata sul campo "path"
-                db_github_by_path = {}
-                for _, metadata in db_docs_to_delete.items():
-                    if metadata.get("item_type") == "GitHub File":
-                        path = metadata.get("path")
-                        if path:
-                            db_github_by_path[path] = metadata
-
-                for incoming_id, incoming_value in incoming_docs_to_add.items():
-                    metadata = incoming_value[0]
-                    if metadata.get("item_type") != "GitHub File":
-                        continue
-                    path = metadata.get("path")
-                    if not path:
-                        raise ValueError(f"Missing 'path' field in metadata for GitHub File with doc_id {incoming_id}")
-                    if path in db_github_by_path:
-                        db_metadata = db_github_by_path[path]
+                for doc_id, doc_chunks in groupby(documents, key=lambda chunk: chunk.get_metadata()["id"]):
+                    # Il confronto con il manifest viene misurato separatamente dalle scritture
+                    with diff_timer:
+                        doc_chunks = list(doc_chunks)
+                        seen_ids.add(doc_id)
+                        metadata = doc_chunks[0].get_metadata()
+
+                        # I documenti invariati non hanno contenuto: servono solo a indicare quali chunk mantenere
+                        if metadata.get("unchanged"):
+                            continue
+
                         try:
-                            incoming_creation_date = datetime.strptime(
-                                metadata.get("creation_date"), date_format
-                            )
-                            db_insertion_date = datetime.strptime(
-                                db_metadata.get("vector_store_insertion_date"), date_format
+                            entry = ChromaManifestEntryEntity(
+                                id=doc_id,
+                                item_type=metadata.get("item_type"),
+                                content_hash=self.__hash(doc_chunks),
+                                chunk_ids=[chunk.get_metadata()["doc_id"] for chunk in doc_chunks],
+                                source_version=metadata.get("last_update") or metadata.get("date"),
+                                path=metadata.get("path")
                             )
                         except Exception as e:
-                            logger.error(f"Error parsing dates for GitHub File with path {path}: {e}")
+                            logger.error(f"Error preparing new data for update: {e}")
                             raise e
-                        if incoming_creation_date < db_insertion_date:
-                            # Il file è stato creato prima dell'ultimo aggiornamento, quindi in questo aggiornamento viene solo modificato.
-                            # Non si considera quindi aggiunto (ricreato) e neanche eliminato, ma bensì modificato.
+
+                        old_entry = manifest.get(doc_id)
+                        if old_entry is not None and old_entry.get_content_hash() == entry.get_content_hash():
+                            continue
+
+                        old_chunk_ids = set(old_entry.get_chunk_ids()) if old_entry is not None else set()
+                        if old_entry is None:
+                            num_added_items += 1
+                            if entry.get_path():
+                                added_paths.add((entry.get_item_type(), entry.get_path()))
+                        else:
                             num_modified_items += 1
+                            # I chunk della versione precedente che non compaiono nella nuova vengono eliminati
+                            new_chunk_ids = set(entry.get_chunk_ids())
+                            stale_chunk_ids.extend(chunk_id for chunk_id in old_entry.get_chunk_ids() if chunk_id not in new_chunk_ids)
+
+                        # Gli id dei chunk derivano dal loro contenuto: i chunk già presenti hanno lo stesso testo,
+                        # quindi ne vengono aggiornati solo i metadati, senza ricalcolarne l'embedding
+                        entries_to_save.append(entry)
+                        new_chunks = [chunk for chunk in doc_chunks if chunk.get_metadata()["doc_id"] not in old_chunk_ids]
+                        chunks_to_write.extend(new_chunks)
+                        chunks_to_update.extend(chunk for chunk in doc_chunks if chunk.get_metadata()["doc_id"] in old_chunk_ids)
+                        num_written_chunks += len(new_chunks)
+                        num_queued_chunks += len(doc_chunks)
+                    if len(chunks_to_write) >= self.__batch_size:
+                        self.__write(writer, chunks_to_write)
+                        chunks_to_write = []
+                    if len(chunks_to_update) >= self.__batch_size:
+                        self.__update_metadata(writer, chunks_to_update)
+                        chunks_to_update = []
+                    if num_queued_chunks >= self.__checkpoint_size:
+                        self.__checkpoint(writer, chunks_to_write, chunks_to_update, stale_chunk_ids, entries_to_save, [])
+                        chunks_to_write = []
+                        chunks_to_update = []
+                        stale_chunk_ids = []
+                        entries_to_save = []
+                        num_queued_chunks = 0
+
+                # Documenti presenti nel manifest ma non negli incoming: da eliminare.
+                # Un documento nuovo con lo stesso tipo e percorso di uno eliminato lo sostituisce, e conta come modificato
+                # I documenti dei tipi preservati, la cui sorgente non è stata caricata, non sono mai obsoleti
+                with diff_timer:
+                    preserved_item_types = preserved_item_types or set()
+                    if preserved_item_types:
+                        logger.info(f"Keeping the loaded documents of the item types: {', '.join(sorted(preserved_item_types))}.")
+                    obsolete_entries = [entry for doc_id, entry in manifest.items()
+                                        if doc_id not in seen_ids and entry.get_item_type() not in preserved_item_types]
+                    for entry in obsolete_entries:
+                        stale_chunk_ids.extend(entry.get_chunk_ids())
+                        if entry.get_path() and (entry.get_item_type(), entry.get_path()) in added_paths:
+                            added_paths.discard((entry.get_item_type(), entry.get_path()))
                             num_added_items -= 1
-                            num_deleted_items -= 1
+                            num_modified_items += 1
+                        else:
+                            num_deleted_items += 1
 
-            except Exception as e:
-                logger.error(f"Error checking for GitHub File modifications: {e}")
-                raise e
+                # -------------------------------------------------------------------------------
+                # Aggiornamento del DB: ultimo checkpoint ed eliminazione dei chunk obsoleti
+                # -------------------------------------------------------------------------------
+                self.__checkpoint(writer, chunks_to_write, chunks_to_update, stale_chunk_ids, entries_to_save,
+                                  [entry.get_id() for entry in obsolete_entries])
+            finally:
+                writer.close()
 
-            # -------------------------------------------------------------------------------
-            # Aggiornamento del DB: eliminazione e aggiunta dei documenti identificati
-            # -------------------------------------------------------------------------------
-            try:
-                if db_ids_to_delete:
-                    self.__collection.delete(ids=db_ids_to_delete)
-            except Exception as e:
-                logger.error(f"Error deleting documents from db: {e}")
-                raise e
+            elapsed = time.monotonic() - started
+            logger.info(f"Written {num_written_chunks} chunks to Chroma vector store in {elapsed:.2f} seconds "
+                        f"({num_written_chunks / elapsed if elapsed > 0 else 0.0:.1f} chunks/s).")
+            timings = writer.get_timings()
+            if timings:
+                logger.info(f"Written {len(timings)} batches to Chroma vector store in {sum(timings):.2f} seconds "
+                            f"(slowest batch: {max(timings):.2f} seconds).")
+            if self.__embedding_cache is not None:
+                logger.info(f"Embedding cache -> Hits: {self.__embedding_cache.get_num_hits() - initial_hits}; "
+                            f"Misses: {self.__embedding_cache.get_num_misses() - initial_misses}.")
 
-            logger.info(f"Deleted {len(db_ids_to_delete)} documents from Chroma vector store -> "
-                        f"Deleted: {num_deleted_items}; Will be modified: {num_modified_items}.")
+            logger.info(f"Successfully loaded documents into Chroma vector store -> "
+                        f"Added: {num_added_items}; Modified: {num_modified_items}; Deleted: {num_deleted_items}.")
 
-            try:
-                if incoming_docs_to_add:
-                    self.__collection.add(
-                        ids=[doc_id for doc_id in incoming_docs_to_add.keys()],
-                        documents=[doc[1] for doc in incoming_docs_to_add.values()],
-                        metadatas=[doc[0] for doc in incoming_docs_to_add.values()],
-                    )
-            except Exception as e:
-                logger.error(f"Error adding documents to db: {e}")
-                raise e
-
-            logger.info(f"Successfully loaded {len(incoming_docs_to_add)} documents into Chroma vector store -> "
-                        f"Added: {num_added_items}; Modified: {num_modified_items}.")
-            
             num_final_items = num_initial_items - num_deleted_items + num_added_items
             logger.info(f"Final number of documents in Chroma vector store: {num_final_items}")
 
+            stage_logs = [
+                diff_timer.get_stage_log(len(seen_ids)),
+                self.__operations_stage_log(writer, LoadingStage.Deletes, ["delete"]),
+                self.__operations_stage_log(writer, LoadingStage.Adds, ["add", "upsert", "update"])
+            ]
+
             italy_tz = pytz.timezone('Europe/Rome')
             log = VectorStoreLog(
                 timestamp=datetime.now(italy_tz),
                 outcome=True,
                 num_added_items=num_added_items,
                 num_modified_items=num_modified_items,
-                num_deleted_items=num_deleted_items
+                num_deleted_items=num_deleted_items,
+                stage_logs=stage_logs
             )
 
             return log
@@ -231,6 +271,238 @@ class ChromaVectorStoreRepository:
             logger.error(f"Error loading documents into Chroma vector store: {e}")
             raise e
 
+    def __operations_stage_log(self, writer: ChromaBatchWriter, stage: LoadingStage, operations: list[str]) -> StageLog:
+        """
+        Creates the log of a stage of the loading from the statistics of the given operations of the writer.
+        Args:
+            writer (ChromaBatchWriter): The writer of the loading.
+            stage (LoadingStage): The stage.
+            operations (list[str]): The operations of the writer making up the stage.
+        Returns:
+            StageLog: The log of the stage. Its duration is the sum of the durations of the batches, which with more
+                than one write worker can exceed the elapsed time.
+        """
+        stats = [writer.get_operation_stats(operation) for operation in operations]
+        return StageLog(stage, sum(stat[3] for stat in stats), sum(stat[0] for stat in stats),
+                        sum(stat[2] for stat in stats), sum(stat[1] for stat in stats), get_peak_memory())
+
+    def __checkpoint(self, writer: ChromaBatchWriter, chunks_to_write: list[ChromaDocumentEntity],
+                     chunks_to_update: list[ChromaDocumentEntity], stale_chunk_ids: list[str],
+                     entries_to_save: list[ChromaManifestEntryEntity], obsolete_ids: list[str]):
+        """
+        Writes the queued chunks, waits for all the pending batches and commits the written documents in the manifest,
+        then deletes the chunks no longer referenced by it.
+        The chunks to delete are recorded as pending before the manifest stops referencing them, so that the next loading
+        deletes them if this one is interrupted before doing it.
+        Args:
+            writer (ChromaBatchWriter): The writer of the chunks.
+            chunks_to_write (list[ChromaDocumentEntity]): The chunks still to write.
+            chunks_to_update (list[ChromaDocumentEntity]): The chunks whose metadata must still be updated.
+            stale_chunk_ids (list[str]): The ids of the chunks to delete.
+            entries_to_save (list[ChromaManifestEntryEntity]): The entries of the documents written since the last checkpoint.
+            obsolete_ids (list[str]): The ids of the documents to remove from the manifest.
+        Raises:
+            Exception: If an error occurs while writing the chunks or the manifest.
+        """
+        try:
+            self.__write(writer, chunks_to_write)
+            self.__update_metadata(writer, chunks_to_update)
+            self.__manifest_repository.add_pending_chunk_ids(stale_chunk_ids)
+            # Attende la scrittura delle batch ancora in corso, sollevando l'errore della prima fallita
+            writer.flush()
+            self.__manifest_repository.save_entries(entries_to_save)
+            self.__manifest_repository.delete_entries(obsolete_ids)
+            writer.delete(stale_chunk_ids)
+            writer.flush()
+            self.__manifest_repository.clear_pending_chunk_ids()
+            logger.info(f"Checkpoint of the Chroma manifest: committed {len(entries_to_save)} documents.")
+        except Exception as e:
+            logger.error(f"Error writing documents to db: {e}")
+            raise e
+
+    def __write(self, writer: ChromaBatchWriter, chunks: list[ChromaDocumentEntity]):
+        """
+        Records the given chunks as pending and hands them to the writer.
+        The chunks are written with an upsert, so that writing again a chunk already present, e.g. because the manifest
+        was not updated after a failed loading, replaces it instead of failing.
+        Args:
+            writer (ChromaBatchWriter): The writer of the chunks.
+            chunks (list[ChromaDocumentEntity]): The chunks to write.
+        Raises:
+            Exception: If an error occurs while writing the chunks.
+        """
+        try:
+            if chunks:
+                self.__manifest_repository.add_pending_chunk_ids(chunk.get_metadata()["doc_id"] for chunk in chunks)
+                writer.upsert(
+                    ids=[chunk.get_metadata()["doc_id"] for chunk in chunks],
+                    documents=[chunk.get_page_content() for chunk in chunks],
+                    metadatas=[chunk.get_metadata() for chunk in chunks],
+                )
+        except Exception as e:
+            logger.error(f"Error adding documents to db: {e}")
+            raise e
+
+    def __update_metadata(self, writer: ChromaBatchWriter, chunks: list[ChromaDocumentEntity]):
+        """
+        Hands to the writer the new metadata of the given chunks, whose content is already stored in Chroma.
+        Args:
+            writer (ChromaBatchWriter): The writer of the chunks.
+            chunks (list[ChromaDocumentEntity]): The chunks whose metadata must be updated.
+        Raises:
+            Exception: If an error occurs while updating the chunks.
+        """
+        try:
+            if chunks:
+                writer.update(
+                    ids=[chunk.get_metadata()["doc_id"] for chunk in chunks],
+                    metadatas=[chunk.get_metadata() for chunk in chunks],
+                )
+        except Exception as e:
+            logger.error(f"Error updating documents in db: {e}")
+            raise e
+
+    def __hash_chunk(self, page_content: str, metadata: dict) -> str:
+        """
+        Computes the hash of a chunk from its content and its metadata, excluding the metadata that change at every loading.
+        Args:
+            page_content (str): The content of the chunk.
+            metadata (dict): The metadata of the chunk.
+        Returns:
+            str: The hexadecimal SHA-256 hash of the chunk.
+        """
+        stable_metadata = {key: value for key, value in metadata.items() if key not in self.__VOLATILE_KEYS}
+        digest = hashlib.sha256(page_content.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(json.dumps(stable_metadata, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    def __hash(self, chunks: list[ChromaDocumentEntity]) -> str:
+        """
+        Computes the hash of a document from the hashes of its chunks, in order.
+        Args:
+            chunks (list[ChromaDocumentEntity]): The chunks of the document, in order.
+        Returns:
+            str: The hexadecimal SHA-256 hash of the document.
+        """
+        return self.__combine_hashes([self.__hash_chunk(chunk.get_page_content(), chunk.get_metadata()) for chunk in chunks])
+
+    def __combine_hashes(self, chunk_hashes: list[str]) -> str:
+        """
+        Combines the hashes of the chunks of a document into the hash of the document.
+        Args:
+            chunk_hashes (list[str]): The hashes of the chunks, in order.
+        Returns:
+            str: The hexadecimal SHA-256 hash of the document.
+        """
+        return hashlib.sha256("".join(chunk_hashes).encode("utf-8")).hexdigest()
+
+    def __get_manifest(self) -> dict[str, ChromaManifestEntryEntity]:
+        """
+        Retrieves the manifest of the documents loaded in Chroma.
+        The pending chunks of an interrupted loading that are not referenced by the manifest are first deleted from the
+        collection, so that the loading resumes from its last checkpoint.
+        The number of chunks in the manifest is compared with the number of chunks in the collection, which costs a single
+        request: if they differ, e.g. because the manifest is missing or the collection was emptied, the manifest is
+        rebuilt from the collection.
+        Returns:
+            dict[str, ChromaManifestEntryEntity]: The entries of the manifest, by document id.
+        """
+        manifest = self.__manifest_repository.get_entries()
+        pending_chunk_ids = self.__manifest_repository.get_pending_chunk_ids()
+        if pending_chunk_ids:
+            referenced_chunk_ids = {chunk_id for entry in manifest.values() for chunk_id in entry.get_chunk_ids()}
+            orphan_chunk_ids = [chunk_id for chunk_id in pending_chunk_ids if chunk_id not in referenced_chunk_ids]
+            logger.info(f"Resuming an interrupted loading from its last checkpoint: deleting {len(orphan_chunk_ids)} "
+                        f"uncommitted chunks.")
+            for i in range(0, len(orphan_chunk_ids), self.__batch_size):
+                self.__collection.delete(ids=orphan_chunk_ids[i:i + self.__batch_size])
+            self.__manifest_repository.clear_pending_chunk_ids()
+        num_chunks = sum(entry.get_num_chunks() for entry in manifest.values())
+        if self.__collection.count() == num_chunks:
+            return manifest
+
+        logger.info(f"Chroma manifest out of sync with the collection ({num_chunks} chunks): rebuilding it.")
+        manifest = self.__rebuild_manifest()
+        self.__manifest_repository.replace_entries(manifest.values())
+        return manifest
+
+    def resync_manifest(self):
+        """
+        Rebuilds the manifest from the collection, e.g. because another replica may have written to the collection
+        after this one last updated its manifest.
+        The pending chunks are forgotten without deleting them: their ids derive from their content, so they may now be
+        referenced by the documents written by the other replica. The rebuilt manifest holds the hashes of the chunks
+        actually stored, so a document written only in part is written again by the next loading.
+        Raises:
+            Exception: If an error occurs while reading the collection or writing the manifest.
+        """
+        try:
+            logger.info("Rebuilding the Chroma manifest from the collection.")
+            self.__manifest_repository.clear_pending_chunk_ids()
+            self.__manifest_repository.replace_entries(self.__rebuild_manifest().values())
+        except Exception as e:
+            logger.error(f"Error rebuilding the Chroma manifest: {e}")
+            raise e
+
+    def __rebuild_manifest(self) -> dict[str, ChromaManifestEntryEntity]:
+        """
+        Rebuilds the manifest reading, in pages of batch_size chunks, all the chunks stored in the collection.
+        Only the id and the hash of each chunk are kept in memory, not its content.
+        Returns:
+            dict[str, ChromaManifestEntryEntity]: The entries of the manifest, by document id.
+        """
+        chunk_hashes = {}
+        metadatas = {}
+        offset = 0
+        while True:
+            chroma_data = self.__collection.get(include=["documents", "metadatas"], limit=self.__batch_size, offset=offset)
+            for chunk_id, document, metadata in zip(chroma_data["ids"], chroma_data["documents"], chroma_data["metadatas"]):
+                doc_id = metadata.get("id")
+                if doc_id is None:
+                    continue
+                chunk_hashes.setdefault(doc_id, []).append(
+                    (metadata.get("chunk_index", 0), self.__hash_chunk(document or "", metadata), chunk_id)
+                )
+                metadatas.setdefault(doc_id, metadata)
+            if len(chroma_data["ids"]) < self.__batch_size:
+                break
+            offset += self.__batch_size
+
+        manifest = {}
+        for doc_id, hashes in chunk_hashes.items():
+            hashes.sort()
+            metadata = metadatas[doc_id]
+            manifest[doc_id] = ChromaManifestEntryEntity(
+                id=doc_id,
+                item_type=metadata.get("item_type"),
+                content_hash=self.__combine_hashes([chunk_hash for _, chunk_hash, _ in hashes]),
+                chunk_ids=[chunk_id for _, _, chunk_id in hashes],
+                source_version=metadata.get("last_update") or metadata.get("date"),
+                path=metadata.get("path")
+            )
+        return manifest
+
+    def get_ids(self, item_type: str) -> set[str]:
+        """
+        Retrieves the ids of the documents of the given item type stored in the collection, from the manifest.
+        Args:
+            item_type (str): The value of the "item_type" metadata of the documents.
+        Returns:
+            set[str]: The values of the "id" metadata of the stored chunks.
+        Raises:
+            Exception: If an error occurs while retrieving the ids.
+        """
+        try:
+            ids = {doc_id for doc_id, entry in self.__get_manifest().items() if entry.get_item_type() == item_type}
+
+            logger.info(f"Fetched {len(ids)} ids of type {item_type} from Chroma manifest.")
+
+            return ids
+        except Exception as e:
+            logger.error(f"Error getting ids of type {item_type} from Chroma vector store: {e}")
+            raise e
+
     def similarity_search(self, query: str) -> QueryResultEntity:
         """ 
         Performs a similarity search in the collection and returns the most relevant documents. 
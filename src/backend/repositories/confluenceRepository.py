@@ -1,10 +1,12 @@
 import requests
 from datetime import datetime
 import pytz
-from beartype.typing import List, Tuple
+from beartype.typing import List, Tuple, Optional
 
 from models.loggingModels import PlatformLog, LoadingItems
+from models.httpStats import HttpStats
 from entities.pageEntity import PageEntity
+from utils.http_client import HttpClient
 from utils.logger import logger
 from utils.beartype_personalized import beartype_personalized
 
@@ -17,9 +19,13 @@ class ConfluenceRepository:
         project_key (str): The key of the Confluence project/space.
         timeout (int): The timeout for API requests.
         headers (dict[str, str]): The headers to include in API requests.
+        http_client (HttpClient): The HTTP client used to download the pages of the results.
     """
 
-    def __init__(self, base_url: str, project_key: str, timeout: int, headers: dict[str, str]):
+    # Chiave delle statistiche delle richieste di questa piattaforma, nel client HTTP condiviso
+    __STATS_KEY = LoadingItems.ConfluencePages.value
+
+    def __init__(self, base_url: str, project_key: str, timeout: int, headers: dict[str, str], http_client: HttpClient | None = None):
         """
         Initializes the ConfluenceRepository with the given parameters.
         Args:
@@ -27,11 +33,14 @@ class ConfluenceRepository:
             project_key (str): The key of the Confluence project/space.
             timeout (int): The timeout for API requests.
             headers (dict[str, str]): The headers to include in API requests.
+            http_client (HttpClient | None): The HTTP client used to download the pages of the results.
+                If not given, a client with the default settings is created.
         """
         self.__base_url = base_url
         self.__project_key = project_key
         self.__timeout = timeout
         self.__headers = headers
+        self.__http_client = http_client if http_client is not None else HttpClient(timeout, headers)
 
     def get_base_url(self) -> str:
         """
@@ -41,68 +50,150 @@ class ConfluenceRepository:
         """
         return self.__base_url
 
-    def load_confluence_pages(self) -> Tuple[PlatformLog, List[PageEntity]]:
+    def get_space_key(self) -> str:
+        """
+        Returns the key of the Confluence space.
+        Returns:
+            str: The key of the Confluence space.
+        """
+        return self.__project_key
+
+    def load_confluence_pages(self, modified_since: Optional[datetime] = None) -> Tuple[PlatformLog, List[PageEntity]]:
         """
         Fetches all pages from the Confluence space using pagination.
+        If modified_since is given, only the pages modified from this moment onwards are fetched, through a CQL search.
+        Args:
+            modified_since (Optional[datetime]): If given, only the pages modified from this moment onwards are fetched.
         Returns:
             Tuple[PlatformLog, List[PageEntity]]: A tuple containing a log of the operation and a list of pages.
         Raises:
             requests.RequestException: If there is an error during the API request.
         """
         try:
-            url = f"{self.__base_url}/rest/api/content"
-            start = 0
+            initial_stats = self.__http_client.get_stats(self.__STATS_KEY)
             limit = 100
-            pages = []
-
-            while True:
-                params = {
-                    "spaceKey": self.__project_key,
-                    "expand": "body.view,version,ancestors,space,extensions,links",
-                    "limit": limit,
-                    "start": start
-                }
-
-                response = requests.get(url, headers=self.__headers, params=params, timeout=self.__timeout)
-                response.raise_for_status()
-                data = response.json()
-                pages_data = data.get('results', [])
-                
-                # Converte ogni page in PageEntity
-                pages.extend([
-                    PageEntity(
-                        id=page['id'],
-                        type=page['type'],
-                        title=page['title'],
-                        space=page['space'],
-                        body=page['body'],
-                        version=page['version'],
-                        status=page['status'],
-                        ancestors=page['ancestors'],
-                        extensions=page['extensions'],
-                        links=page['_links']
-                    ) for page in pages_data
-                ])
-
-                # logger.info(f"Fetched {len(pages_data)} pages (start={start}) from Confluence space {self.__project_key}") # Per debug
-
-                # Incrementa il valore di start per la prossima chiamata
-                start += limit
+            params = {
+                "expand": "body.view,version,ancestors,space,extensions,links",
+                "limit": limit
+            }
+            if modified_since is None:
+                url = f"{self.__base_url}/rest/api/content"
+                params["spaceKey"] = self.__project_key
+            else:
+                # CQL accetta date con la precisione del minuto, interpretate nel fuso orario del profilo dell'utente
+                # Confluence, che non è noto: la data viene espressa nel fuso orario di Roma, e LoadFilesService anticipa
+                # il watermark di un margine che copre la differenza con il fuso orario del profilo
+                italy_tz = pytz.timezone('Europe/Rome')
+                url = f"{self.__base_url}/rest/api/content/search"
+                params["cql"] = (f'space="{self.__project_key}" AND type=page AND '
+                                 f'lastmodified >= "{modified_since.astimezone(italy_tz).strftime("%Y/%m/%d %H:%M")}"')
 
-                # Se il numero di elementi restituiti è inferiore al limite, non ci sono altre pagine
-                if len(pages_data) < limit:
-                    break
+            # Converte ogni page in PageEntity
+            pages = [
+                PageEntity(
+                    id=page['id'],
+                    type=page['type'],
+                    title=page['title'],
+                    space=page['space'],
+                    body=page['body'],
+                    version=page['version'],
+                    status=page['status'],
+                    ancestors=page['ancestors'],
+                    extensions=page['extensions'],
+                    links=page['_links']
+                ) for page in self.__fetch_results(url, params, limit)
+            ]
 
-            logger.info(f"Fetched {len(pages)} pages from Confluence space {self.__project_key}")
-            italy_tz = pytz.timezone('Europe/Rome')
-            log = PlatformLog(LoadingItems.ConfluencePages, datetime.now(italy_tz), True)
+            logger.info(f"Fetched {len(pages)} pages from Confluence space {self.__project_key} ({self.__http_client.get_stats()})")
+            log = self.__platform_log(True, initial_stats)
 
             return log, pages
         except requests.RequestException as e:
             logger.error(f"Error fetching Confluence pages: {e}")
-            italy_tz = pytz.timezone('Europe/Rome')
-            log = PlatformLog(LoadingItems.ConfluencePages, datetime.now(italy_tz), False)
+            log = self.__platform_log(False, initial_stats)
             return log, []
         except Exception as e:
             logger.error(f"Error loading Confluence pages: {e}")
             raise e
+
+    def load_confluence_page_ids(self) -> Tuple[PlatformLog, List[str]]:
+        """
+        Fetches the ids of all the pages of the Confluence space, without their bodies.
+        It is used to detect the pages deleted from Confluence without downloading the unchanged ones.
+        Returns:
+            Tuple[PlatformLog, List[str]]: A tuple containing a log of the operation and the list of page ids.
+        Raises:
+            requests.RequestException: If there is an error during the API request.
+        """
+        try:
+            initial_stats = self.__http_client.get_stats(self.__STATS_KEY)
+            url = f"{self.__base_url}/rest/api/content"
+            limit = 1000
+            # Senza expand Confluence restituisce solo i campi essenziali di ogni pagina, senza il corpo
+            params = {"spaceKey": self.__project_key, "type": "page", "limit": limit}
+            ids = [page['id'] for page in self.__fetch_results(url, params, limit)]
+
+            logger.info(f"Fetched {len(ids)} page ids from Confluence space {self.__project_key} ({self.__http_client.get_stats()})")
+            log = self.__platform_log(True, initial_stats)
+
+            return log, ids
+        except requests.RequestException as e:
+            logger.error(f"Error fetching Confluence page ids: {e}")
+            log = self.__platform_log(False, initial_stats)
+            return log, []
+        except Exception as e:
+            logger.error(f"Error loading Confluence page ids: {e}")
+            raise e
+
+    def __fetch_results(self, url: str, params: dict, limit: int) -> list[dict]:
+        """
+        Fetches all the results of a paginated Confluence request.
+        The API does not tell the total number of results, so after the first page the following ones are requested
+        speculatively in batches of max_in_flight parallel requests, until a page shorter than the limit is found.
+        Args:
+            url (str): The URL of the API endpoint.
+            params (dict): The query parameters of the request, without the pagination ones.
+            limit (int): The number of results requested for each page.
+        Returns:
+            list[dict]: The results, in the order returned by Confluence.
+        Raises:
+            requests.RequestException: If there is an error during the API request.
+        """
+        first_page = self.__http_client.fetch(url, {**params, "start": 0}, self.__STATS_KEY)
+        results = list(first_page.get('results', []))
+
+        # Confluence può ridurre il limite richiesto: le pagine successive usano quello effettivo
+        step = first_page.get('limit', limit)
+        start = len(results)
+        last_page_full = step > 0 and len(results) >= step
+
+        while last_page_full:
+            starts = [start + i * step for i in range(self.__http_client.get_max_in_flight())]
+            batch = self.__http_client.fetch_all(url, [{**params, "start": batch_start} for batch_start in starts],
+                                                 self.__STATS_KEY)
+            for page in batch:
+                page_results = page.get('results', [])
+                results.extend(page_results)
+                # Se il numero di elementi restituiti è inferiore al limite, non ci sono altre pagine
+                if len(page_results) < step:
+                    last_page_full = False
+                    break
+            start = starts[-1] + step
+
+        # logger.info(f"Fetched {len(results)} results from {url}") # Per debug
+        return results
+
+    def __platform_log(self, outcome: bool, initial_stats: HttpStats) -> PlatformLog:
+        """
+        Creates the log of a loading from Confluence, with the statistics of the requests sent since the given ones.
+        Args:
+            outcome (bool): The outcome of the loading.
+            initial_stats (HttpStats): The statistics of the requests of Confluence at the start of the loading.
+        Returns:
+            PlatformLog: The log of the loading.
+        """
+        italy_tz = pytz.timezone('Europe/Rome')
+        stats = self.__http_client.get_stats(self.__STATS_KEY)
+        return PlatformLog(LoadingItems.ConfluencePages, datetime.now(italy_tz), outcome,
+                           stats.get_num_bytes() - initial_stats.get_num_bytes(),
+                           stats.get_num_requests() - initial_stats.get_num_requests())
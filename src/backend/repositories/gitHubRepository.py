@@ -1,11 +1,16 @@
 from github.Repository import Repository
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import quote
 import pytz
-from beartype.typing import Tuple, List
+from beartype.typing import Tuple, List, Optional
 
 from models.loggingModels import PlatformLog, LoadingItems
 from entities.commitEntity import CommitEntity, CommitFileEntity
 from entities.fileEntity import FileEntity
+from models.httpStats import HttpStats
+from utils.github_http_cache import GitHubHttpCache
+from utils.rate_limit_budget import RateLimitBudget
 from utils.logger import logger
 from utils.beartype_personalized import beartype_personalized
 
@@ -15,43 +20,89 @@ class GitHubRepository:
     A repository class to interact with a GitHub repository using the provided GitHub API.
     Attributes:
         github_repo (Repository): The GitHub repository object.
+        max_concurrency (int): The maximum number of commit details fetched at the same time.
+        http_cache (Optional[GitHubHttpCache]): The HTTP cache the requests of PyGithub go through, if any.
+        rate_limit_budget (Optional[RateLimitBudget]): The budget of the requests to the GitHub API, if any.
     """
 
-    def __init__(self, github_repo: Repository):
+    # Risorse della repository, nei percorsi delle API, richieste dal caricamento di ciascun tipo di elemento
+    __STATS_KEYS = {
+        LoadingItems.GitHubCommits: ("commits",),
+        LoadingItems.GitHubFiles: ("contents", "git")
+    }
+
+    def __init__(self, github_repo: Repository, max_concurrency: int = 1, http_cache: Optional[GitHubHttpCache] = None,
+                 rate_limit_budget: Optional[RateLimitBudget] = None):
         """
         Initializes the GitHubRepository with a given GitHub repository object.
         Args:
             github_repo (Repository): The GitHub repository object.
+            max_concurrency (int, optional): The maximum number of commit details fetched at the same time. GitHub limits
+                the concurrent requests of a token (secondary rate limits), so it should stay small. With more than one
+                request at a time, the connections of PyGithub must be safe to use from several threads, e.g. those of
+                GitHubHttpCache. Defaults to 1.
+            http_cache (Optional[GitHubHttpCache], optional): The HTTP cache the requests of PyGithub go through: its
+                statistics are reported in the logs of the loadings. Defaults to None, for no statistics.
+            rate_limit_budget (Optional[RateLimitBudget], optional): The budget of the requests to the GitHub API: the
+                deferred requests and the remaining quota are logged at the end of the loadings. Defaults to None.
         """
         self.__github_repo = github_repo
+        self.__max_concurrency = max_concurrency
+        self.__http_cache = http_cache
+        self.__rate_limit_budget = rate_limit_budget
+
+    def get_full_name(self) -> str:
+        """
+        Returns the full name of the GitHub repository, in the form "owner/repo".
+        Returns:
+            str: The full name of the GitHub repository.
+        """
+        return self.__github_repo.full_name
 
-    def load_github_commits(self) -> Tuple[PlatformLog, List[CommitEntity]]:
+    def load_github_commits(self, since: Optional[datetime] = None) -> Tuple[PlatformLog, List[CommitEntity]]:
         """
         Loads the commits from the GitHub repository.
+        The list of the commits does not include the changed files, which are fetched with a request for each commit:
+        these requests are sent in parallel, up to max_concurrency at a time, and the commits are returned in the order
+        of the list.
+        Args:
+            since (Optional[datetime]): If given, only the commits committed from this date onwards are loaded. A naive
+                date is taken as UTC.
         Returns:
             tuple: A tuple containing a PlatformLog object and a list of CommitEntity objects.
         Raises:
             Exception: If there is an error fetching commits for the repository.
         """
+        initial_stats = self.__get_stats(LoadingItems.GitHubCommits)
         try:
-            commits = self.__github_repo.get_commits()
-            commit_entities = []
+            # Con since vengono richiesti solo i commit successivi al watermark, evitando di scorrere l'intera storia.
+            # PyGithub formatta la data come UTC senza convertirla: una data con fuso orario va prima convertita in UTC
+            if since is not None and since.tzinfo is not None:
+                since = since.astimezone(timezone.utc)
+            commits = self.__github_repo.get_commits(since=since) if since is not None else self.__github_repo.get_commits()
 
-            for commit in commits:
-                files = [CommitFileEntity(f.filename, f.status, f.changes, f.additions, f.deletions, f.patch) for f in commit.files]
-                commit_entity = CommitEntity(commit.sha, commit.commit.message, commit.commit.author.name, commit.commit.author.email, commit.commit.author.date, commit.html_url, files)
-                commit_entities.append(commit_entity)
+            # map restituisce i risultati nell'ordine dei commit, indipendentemente dall'ordine di completamento
+            with ThreadPoolExecutor(max_workers=self.__max_concurrency, thread_name_prefix="github_commits") as executor:
+                commit_entities = list(executor.map(self.__to_commit_entity, commits))
 
             logger.info(f"Fetched {len(commit_entities)} commits for repository {self.__github_repo.full_name}")
-            italy_tz = pytz.timezone('Europe/Rome')
-            log = PlatformLog(LoadingItems.GitHubCommits, datetime.now(italy_tz), True)
-
-            return log, commit_entities
+            return self.__platform_log(LoadingItems.GitHubCommits, True, initial_stats), commit_entities
         except Exception as e:
             logger.error(f"Error fetching commits for repository {self.__github_repo.full_name}: {e}")
-            italy_tz = pytz.timezone('Europe/Rome')
-            log = PlatformLog(LoadingItems.GitHubCommits, datetime.now(italy_tz), False)
-            return log, []
+            return self.__platform_log(LoadingItems.GitHubCommits, False, initial_stats), []
+
+    def __to_commit_entity(self, commit) -> CommitEntity:
+        """
+        Converts a commit of the list into a CommitEntity, fetching its changed files.
+        Args:
+            commit (github.Commit.Commit): The commit, as returned by the list of the commits.
+        Returns:
+            CommitEntity: The commit, with its changed files.
+        """
+        # L'accesso a files completa il commit con una richiesta dedicata
+        files = [CommitFileEntity(f.filename, f.status, f.changes, f.additions, f.deletions, f.patch) for f in commit.files]
+        return CommitEntity(commit.sha, commit.commit.message, commit.commit.author.name, commit.commit.author.email,
+                            commit.commit.author.date, commit.html_url, files)
 
     def load_github_files(self) -> Tuple[PlatformLog, List[FileEntity]]:
         """
@@ -61,6 +112,7 @@ class GitHubRepository:
         Raises:
             Exception: If there is an error fetching files for the repository.
         """
+        initial_stats = self.__get_stats(LoadingItems.GitHubFiles)
         try:
             contents = self.__github_repo.get_contents("")
             file_entities = []
@@ -74,12 +126,105 @@ class GitHubRepository:
                     file_entities.append(file_entity)
 
             logger.info(f"Fetched {len(file_entities)} files for repository {self.__github_repo.full_name}")
-            italy_tz = pytz.timezone('Europe/Rome')
-            log = PlatformLog(LoadingItems.GitHubFiles, datetime.now(italy_tz), True)
-
-            return log, file_entities
+            return self.__platform_log(LoadingItems.GitHubFiles, True, initial_stats), file_entities
         except Exception as e:
             logger.error(f"Error fetching files for repository {self.__github_repo.full_name}: {e}")
-            italy_tz = pytz.timezone('Europe/Rome')
-            log = PlatformLog(LoadingItems.GitHubFiles, datetime.now(italy_tz), False)
-            return log, []
+            return self.__platform_log(LoadingItems.GitHubFiles, False, initial_stats), []
+
+    def load_github_files_from_tree(self, known_shas: Optional[set[str]] = None) -> Tuple[PlatformLog, List[FileEntity]]:
+        """
+        Loads the files from the GitHub repository listing the whole tree of the default branch with a single recursive request.
+        The content is downloaded only for the blobs whose SHA is not among the known ones: the other files are returned
+        without content and marked as unchanged.
+        If GitHub truncates the tree because the repository is too large, the files are loaded directory by directory.
+        Args:
+            known_shas (Optional[set[str]]): The SHAs of the files already loaded in the vector store.
+        Returns:
+            tuple: A tuple containing a PlatformLog object and a list of FileEntity objects.
+        Raises:
+            Exception: If there is an error fetching files for the repository.
+        """
+        initial_stats = self.__get_stats(LoadingItems.GitHubFiles)
+        try:
+            known_shas = known_shas if known_shas is not None else set()
+            branch = self.__github_repo.default_branch
+            tree = self.__github_repo.get_git_tree(branch, recursive=True)
+
+            if tree.truncated:
+                logger.info(f"Tree of repository {self.__github_repo.full_name} is truncated: loading files directory by directory")
+                return self.load_github_files()
+
+            file_entities = []
+            num_downloaded_files = 0
+
+            for element in tree.tree:
+                # Le directory ("tree") e i submodule ("commit") non hanno contenuto da caricare
+                if element.type != "blob":
+                    continue
+
+                name = element.path.rsplit("/", 1)[-1]
+                html_url = f"{self.__github_repo.html_url}/blob/{quote(branch)}/{quote(element.path)}"
+                download_url = f"https://raw.githubusercontent.com/{self.__github_repo.full_name}/{quote(branch)}/{quote(element.path)}"
+
+                if element.sha in known_shas:
+                    # Il file è già presente nel database vettoriale con lo stesso contenuto: non viene scaricato
+                    file_entity = FileEntity("file", "base64", element.size, name, element.path, "", element.sha, element.url,
+                                             html_url, download_url, element.url, unchanged=True)
+                else:
+                    blob = self.__github_repo.get_git_blob(element.sha)
+                    num_downloaded_files += 1
+                    file_entity = FileEntity("file", blob.encoding, element.size, name, element.path, blob.content, element.sha, element.url,
+                                             html_url, download_url, element.url)
+                file_entities.append(file_entity)
+
+            logger.info(f"Fetched {len(file_entities)} files for repository {self.__github_repo.full_name}, "
+                        f"of which {num_downloaded_files} new or changed")
+            return self.__platform_log(LoadingItems.GitHubFiles, True, initial_stats), file_entities
+        except Exception as e:
+            logger.error(f"Error fetching files tree for repository {self.__github_repo.full_name}: {e}")
+            return self.__platform_log(LoadingItems.GitHubFiles, False, initial_stats), []
+
+    def __get_stats(self, loading_items: LoadingItems) -> Tuple[HttpStats, int, int]:
+        """
+        Returns the statistics of the requests sent for the given items since the creation of the repository.
+        Args:
+            loading_items (LoadingItems): The type of the loaded items.
+        Returns:
+            Tuple[HttpStats, int, int]: The statistics of the requests, the number of responses 304 (Not Modified) and
+                the number of requests deferred by the rate limit budget. Without an HTTP cache, the statistics are zero.
+        """
+        num_requests, num_bytes, total_latency, num_not_modified = 0, 0, 0.0, 0
+        if self.__http_cache is not None:
+            for stats_key in self.__STATS_KEYS[loading_items]:
+                stats = self.__http_cache.get_stats(stats_key)
+                num_requests += stats.get_num_requests()
+                num_bytes += stats.get_num_bytes()
+                total_latency += stats.get_total_latency()
+                num_not_modified += self.__http_cache.get_num_not_modified(stats_key)
+        num_deferred = self.__rate_limit_budget.get_num_deferred() if self.__rate_limit_budget is not None else 0
+        return HttpStats(num_requests, 0, num_bytes, total_latency), num_not_modified, num_deferred
+
+    def __platform_log(self, loading_items: LoadingItems, outcome: bool, initial_stats: Tuple[HttpStats, int, int]) -> PlatformLog:
+        """
+        Creates the log of a loading from GitHub, with the statistics of the requests sent since the given ones, and
+        logs the responses read from the cache and the requests deferred by the rate limit budget.
+        Args:
+            loading_items (LoadingItems): The type of the loaded items.
+            outcome (bool): The outcome of the loading.
+            initial_stats (Tuple[HttpStats, int, int]): The statistics of the requests at the start of the loading.
+        Returns:
+            PlatformLog: The log of the loading.
+        """
+        initial_http_stats, initial_not_modified, initial_deferred = initial_stats
+        http_stats, num_not_modified, num_deferred = self.__get_stats(loading_items)
+        num_requests = http_stats.get_num_requests() - initial_http_stats.get_num_requests()
+        num_bytes = http_stats.get_num_bytes() - initial_http_stats.get_num_bytes()
+        if self.__http_cache is not None:
+            # Le richieste di commit e file possono essere concorrenti: i rinvii e la quota rimasta sono dell'intero token
+            remaining = self.__rate_limit_budget.get_remaining() if self.__rate_limit_budget is not None else None
+            logger.info(f"{loading_items.value}: {num_requests} GitHub requests, "
+                        f"{num_not_modified - initial_not_modified} not modified (304), "
+                        f"{num_deferred - initial_deferred} deferred by the rate limit budget, "
+                        f"{remaining if remaining is not None else 'unknown'} remaining")
+        italy_tz = pytz.timezone('Europe/Rome')
+        return PlatformLog(loading_items, datetime.now(italy_tz), outcome, num_bytes, num_requests)
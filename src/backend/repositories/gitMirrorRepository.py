@@ -0,0 +1,289 @@
+import base64
+import os
+import subprocess
+import threading
+from datetime import datetime
+from urllib.parse import quote
+import pytz
+from beartype.typing import Tuple, List, Optional
+
+from models.loggingModels import PlatformLog, LoadingItems
+from entities.commitEntity import CommitEntity, CommitFileEntity
+from entities.fileEntity import FileEntity
+from utils.logger import logger
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class GitMirrorRepository:
+    """
+    A repository class to read commits and files of a GitHub repository from a bare mirror kept on local disk.
+    The mirror is cloned the first time and then updated with "git fetch", so that the whole history is read
+    with a few local git commands instead of one REST request for each commit and file.
+    Attributes:
+        remote_url (str): The URL of the remote repository to mirror.
+        mirror_path (str): The path of the bare mirror on local disk.
+        full_name (str): The full name of the GitHub repository, in the form "owner/repo".
+        html_url (str): The URL of the GitHub repository web page, used to build the links to commits and files.
+        token (Optional[str]): The token used to authenticate the fetches, if the repository is private.
+    """
+
+    # Mappa gli stati di "git log --name-status" sugli stati restituiti dalle API di GitHub
+    __STATUSES = {"A": "added", "M": "modified", "D": "removed", "R": "renamed", "C": "copied", "T": "changed"}
+
+    def __init__(self, remote_url: str, mirror_path: str, full_name: str, html_url: str, token: Optional[str] = None):
+        """
+        Initializes the GitMirrorRepository with the remote repository and the path of its local mirror.
+        Args:
+            remote_url (str): The URL of the remote repository to mirror.
+            mirror_path (str): The path of the bare mirror on local disk.
+            full_name (str): The full name of the GitHub repository, in the form "owner/repo".
+            html_url (str): The URL of the GitHub repository web page.
+            token (Optional[str]): The token used to authenticate the fetches, if the repository is private.
+        """
+        self.__remote_url = remote_url
+        self.__mirror_path = mirror_path
+        self.__full_name = full_name
+        self.__html_url = html_url.rstrip("/")
+        self.__token = token
+        # Commit e file vengono caricati in parallelo: gli aggiornamenti del mirror non devono sovrapporsi
+        self.__lock = threading.Lock()
+
+    def get_full_name(self) -> str:
+        """
+        Returns the full name of the GitHub repository, in the form "owner/repo".
+        Returns:
+            str: The full name of the GitHub repository.
+        """
+        return self.__full_name
+
+    def __git(self, args: list[str], input: Optional[bytes] = None) -> bytes:
+        """
+        Runs a git command and returns its standard output.
+        Args:
+            args (list[str]): The arguments of the git command.
+            input (Optional[bytes]): The data to write on the standard input of the command.
+        Returns:
+            bytes: The standard output of the command.
+        Raises:
+            subprocess.CalledProcessError: If the git command fails.
+        """
+        env = os.environ.copy()
+        if self.__token:
+            # L'header viene passato tramite variabili d'ambiente, così il token non compare né nella configurazione
+            # del mirror né tra gli argomenti del processo
+            credentials = base64.b64encode(f"x-access-token:{self.__token}".encode("utf-8")).decode("ascii")
+            env["GIT_CONFIG_COUNT"] = "1"
+            env["GIT_CONFIG_KEY_0"] = "http.extraHeader"
+            env["GIT_CONFIG_VALUE_0"] = f"Authorization: Basic {credentials}"
+        result = subprocess.run(["git", *args], input=input, capture_output=True, env=env, check=True)
+        return result.stdout
+
+    def update_mirror(self):
+        """
+        Clones the bare mirror of the remote repository if it does not exist yet, otherwise fetches the new objects.
+        Raises:
+            subprocess.CalledProcessError: If the clone or the fetch fails.
+        """
+        try:
+            with self.__lock:
+                if os.path.isfile(os.path.join(self.__mirror_path, "HEAD")):
+                    self.__git(["--git-dir", self.__mirror_path, "fetch", "--prune", "--quiet", "origin"])
+                else:
+                    self.__git(["clone", "--mirror", "--quiet", self.__remote_url, self.__mirror_path])
+                    logger.info(f"Created git mirror of repository {self.__full_name} in {self.__mirror_path}")
+        except Exception as e:
+            logger.error(f"Error updating git mirror of repository {self.__full_name}: {e}")
+            raise e
+
+    def __log(self, args: list[str], since: Optional[datetime]) -> list[str]:
+        """
+        Runs "git log" on the default branch of the mirror and splits its output into one record for each commit.
+        Args:
+            args (list[str]): The additional arguments of the "git log" command.
+            since (Optional[datetime]): If given, only the commits from this date onwards are listed.
+        Returns:
+            list[str]: The output of the command for each commit, without the record separator.
+        """
+        command = ["--git-dir", self.__mirror_path, "-c", "core.quotePath=false", "log", "-M", "--diff-merges=first-parent", *args]
+        if since is not None:
+            command.append(f"--since={since.isoformat()}")
+        command.append("HEAD")
+        output = self.__git(command).decode("utf-8", errors="replace")
+        return output.split("\x1e")[1:]
+
+    def __parse_name_status(self, tokens: list[str]) -> list[Tuple[str, str]]:
+        """
+        Parses the NUL separated output of "git log --name-status -z" for a single commit.
+        Args:
+            tokens (list[str]): The tokens of the output, with the empty ones removed.
+        Returns:
+            list[tuple[str, str]]: The status and the path of each changed file.
+        """
+        changes = []
+        i = 0
+        while i < len(tokens):
+            status = tokens[i][0]
+            # Per rinomine e copie git riporta sia il vecchio sia il nuovo percorso: GitHub mostra il nuovo
+            if status in ("R", "C"):
+                changes.append((self.__STATUSES[status], tokens[i + 2]))
+                i += 3
+            else:
+                changes.append((self.__STATUSES.get(status, "modified"), tokens[i + 1]))
+                i += 2
+        return changes
+
+    def __parse_numstat(self, tokens: list[str]) -> list[Tuple[int, int]]:
+        """
+        Parses the NUL separated output of "git log --numstat -z" for a single commit.
+        Args:
+            tokens (list[str]): The tokens of the output, with the empty ones removed.
+        Returns:
+            list[tuple[int, int]]: The number of added and deleted lines of each changed file, 0 for binary files.
+        """
+        stats = []
+        i = 0
+        while i < len(tokens):
+            additions, deletions, path = tokens[i].split("\t", 2)
+            stats.append((int(additions) if additions != "-" else 0, int(deletions) if deletions != "-" else 0))
+            # Per le rinomine il percorso è vuoto e seguono il vecchio e il nuovo percorso
+            i += 3 if path == "" else 1
+        return stats
+
+    def __parse_patches(self, record: str) -> list[str | None]:
+        """
+        Splits the output of "git log -p" for a single commit into the patches of the changed files.
+        Args:
+            record (str): The output of the command for the commit, starting with its SHA.
+        Returns:
+            list[str | None]: The patch of each changed file, from the first hunk onwards, or None if not available.
+        """
+        patches = []
+        for section in record.split("\ndiff --git ")[1:]:
+            hunk_start = section.find("\n@@")
+            patches.append(section[hunk_start + 1:].rstrip("\n") if hunk_start != -1 else None)
+        return patches
+
+    def load_github_commits(self, since: Optional[datetime] = None) -> Tuple[PlatformLog, List[CommitEntity]]:
+        """
+        Loads the commits of the default branch from the local mirror, after updating it.
+        Args:
+            since (Optional[datetime]): If given, only the commits from this date onwards are loaded.
+        Returns:
+            tuple: A tuple containing a PlatformLog object and a list of CommitEntity objects.
+        Raises:
+            Exception: If there is an error reading the commits from the mirror.
+        """
+        try:
+            self.update_mirror()
+
+            # Tre passate sull'intera storia: stati dei file, righe aggiunte e rimosse, patch.
+            # L'ordine dei file è lo stesso in tutte e tre, quindi i risultati vengono uniti per posizione
+            headers = self.__log(["-z", "--format=%x1e%H%x1f%an%x1f%ae%x1f%aI%x1f%B%x1f", "--name-status"], since)
+            numstats = self.__log(["-z", "--format=%x1e%H", "--numstat"], since)
+            patches = self.__log(["-p", "--format=%x1e%H"], since)
+
+            commit_entities = []
+            for header, numstat, patch in zip(headers, numstats, patches):
+                sha, author_name, author_email, author_date, message, name_status = header.split("\x1f", 5)
+                changes = self.__parse_name_status([t.lstrip("\n") for t in name_status.split("\0") if t.strip("\n")])
+                stats = self.__parse_numstat([t.lstrip("\n") for t in numstat.split("\0")[1:] if t.strip("\n")])
+                file_patches = self.__parse_patches(patch)
+
+                files = []
+                for index, (status, filename) in enumerate(changes):
+                    additions, deletions = stats[index] if index < len(stats) else (0, 0)
+                    file_patch = file_patches[index] if index < len(file_patches) else None
+                    files.append(CommitFileEntity(filename, status, additions + deletions, additions, deletions, file_patch))
+
+                commit_entity = CommitEntity(sha, message.rstrip("\n"), author_name, author_email, datetime.fromisoformat(author_date),
+                                             f"{self.__html_url}/commit/{sha}", files)
+                commit_entities.append(commit_entity)
+
+            logger.info(f"Fetched {len(commit_entities)} commits for repository {self.__full_name} from the git mirror")
+            italy_tz = pytz.timezone('Europe/Rome')
+            log = PlatformLog(LoadingItems.GitHubCommits, datetime.now(italy_tz), True)
+
+            return log, commit_entities
+        except Exception as e:
+            logger.error(f"Error fetching commits for repository {self.__full_name} from the git mirror: {e}")
+            italy_tz = pytz.timezone('Europe/Rome')
+            log = PlatformLog(LoadingItems.GitHubCommits, datetime.now(italy_tz), False)
+            return log, []
+
+    def __read_blobs(self, shas: list[str]) -> dict[str, bytes]:
+        """
+        Reads the content of the given blobs with a single "git cat-file --batch" process.
+        Args:
+            shas (list[str]): The SHAs of the blobs to read.
+        Returns:
+            dict[str, bytes]: The content of each blob, indexed by SHA.
+        """
+        if not shas:
+            return {}
+        output = self.__git(["--git-dir", self.__mirror_path, "cat-file", "--batch"], input="".join(f"{sha}\n" for sha in shas).encode("ascii"))
+
+        blobs = {}
+        position = 0
+        for sha in shas:
+            header_end = output.index(b"\n", position)
+            _, _, size = output[position:header_end].decode("ascii").split(" ")
+            content_start = header_end + 1
+            blobs[sha] = output[content_start:content_start + int(size)]
+            # Ogni contenuto è seguito da un carattere di a capo
+            position = content_start + int(size) + 1
+        return blobs
+
+    def load_github_files_from_tree(self, known_shas: Optional[set[str]] = None) -> Tuple[PlatformLog, List[FileEntity]]:
+        """
+        Loads the files of the default branch from the local mirror, after updating it.
+        The content is read only for the blobs whose SHA is not among the known ones: the other files are returned
+        without content and marked as unchanged.
+        Args:
+            known_shas (Optional[set[str]]): The SHAs of the files already loaded in the vector store.
+        Returns:
+            tuple: A tuple containing a PlatformLog object and a list of FileEntity objects.
+        Raises:
+            Exception: If there is an error reading the files from the mirror.
+        """
+        try:
+            known_shas = known_shas if known_shas is not None else set()
+            self.update_mirror()
+
+            branch = self.__git(["--git-dir", self.__mirror_path, "symbolic-ref", "--short", "HEAD"]).decode("utf-8").strip()
+            tree = self.__git(["--git-dir", self.__mirror_path, "ls-tree", "-r", "-l", "-z", "HEAD"]).decode("utf-8", errors="replace")
+
+            elements = []
+            for entry in filter(None, tree.split("\0")):
+                info, path = entry.split("\t", 1)
+                _, element_type, sha, size = info.split()
+                # I submodule ("commit") non hanno contenuto da caricare
+                if element_type == "blob":
+                    elements.append((path, sha, int(size)))
+
+            blobs = self.__read_blobs(sorted({sha for _, sha, _ in elements if sha not in known_shas}))
+
+            file_entities = []
+            for path, sha, size in elements:
+                name = path.rsplit("/", 1)[-1]
+                html_url = f"{self.__html_url}/blob/{quote(branch)}/{quote(path)}"
+                download_url = f"{self.__html_url}/raw/{quote(branch)}/{quote(path)}"
+
+                if sha in known_shas:
+                    # Il file è già presente nel database vettoriale con lo stesso contenuto: non viene letto
+                    file_entity = FileEntity("file", "base64", size, name, path, "", sha, html_url, html_url, download_url, html_url, unchanged=True)
+                else:
+                    content = base64.b64encode(blobs[sha]).decode("ascii")
+                    file_entity = FileEntity("file", "base64", size, name, path, content, sha, html_url, html_url, download_url, html_url)
+                file_entities.append(file_entity)
+
+            logger.info(f"Fetched {len(file_entities)} files for repository {self.__full_name} from the git mirror, "
+                        f"of which {len(blobs)} new or changed")
+            italy_tz = pytz.timezone('Europe/Rome')
+            log = PlatformLog(LoadingItems.GitHubFiles, datetime.now(italy_tz), True)
+
+            return log, file_entities
+        except Exception as e:
+            logger.error(f"Error fetching files for repository {self.__full_name} from the git mirror: {e}")
+            italy_tz = pytz.timezone('Europe/Rome')
+            log = PlatformLog(LoadingItems.GitHubFiles, datetime.now(italy_tz), False)
+            return log, []
@@ -1,10 +1,12 @@
 import requests
 from datetime import datetime
 import pytz
-from beartype.typing import List, Tuple
+from beartype.typing import List, Tuple, Optional
 
 from models.loggingModels import PlatformLog, LoadingItems
+from models.httpStats import HttpStats
 from entities.issueEntity import IssueEntity
+from utils.http_client import HttpClient
 from utils.logger import logger
 from utils.beartype_personalized import beartype_personalized
 
@@ -17,9 +19,13 @@ class JiraRepository:
         project_key (str): The key of the Jira project.
         timeout (int): The timeout for API requests.
         headers (dict[str, str]): The headers to include in API requests.
+        http_client (HttpClient): The HTTP client used to download the pages of the search results.
     """
 
-    def __init__(self, base_url: str, project_key: str, timeout: int, headers: dict[str, str]):
+    # Chiave delle statistiche delle richieste di questa piattaforma, nel client HTTP condiviso
+    __STATS_KEY = LoadingItems.JiraIssues.value
+
+    def __init__(self, base_url: str, project_key: str, timeout: int, headers: dict[str, str], http_client: HttpClient | None = None):
         """
         Initializes the JiraRepository with the given parameters.
         Args:
@@ -27,85 +33,137 @@ class JiraRepository:
             project_key (str): The key of the Jira project.
             timeout (int): The timeout for API requests.
             headers (dict[str, str]): The headers to include in API requests.
+            http_client (HttpClient | None): The HTTP client used to download the pages of the search results.
+                If not given, a client with the default settings is created.
         """
         self.__base_url = base_url
         self.__project_key = project_key
         self.__timeout = timeout
         self.__headers = headers
+        self.__http_client = http_client if http_client is not None else HttpClient(timeout, headers)
 
     def get_base_url(self) -> str:
         return self.__base_url
 
-    def load_jira_issues(self) -> Tuple[PlatformLog, List[IssueEntity]]:
+    def get_project_key(self) -> str:
+        return self.__project_key
+
+    def load_jira_issues(self, updated_since: Optional[datetime] = None) -> Tuple[PlatformLog, List[IssueEntity]]:
         """
-        Fetches all issues from the Jira project using pagination.
+        Fetches the issues from the Jira project using pagination.
+        Args:
+            updated_since (Optional[datetime]): If given, only the issues updated from this moment onwards are fetched.
         Returns:
             Tuple[PlatformLog, List[IssueEntity]]: A tuple containing a log of the operation and a list of issues.
         Raises:
             requests.RequestException: If there is an error during the API request.
         """
         try:
-            url = f"{self.__base_url}/rest/api/2/search"
-            start_at = 0
-            max_results = 100
-            issues = []
-            total = None  # Il totale delle issues, impostato al primo fetch
-
-            while total is None or start_at < total:
-                params = {
-                    'jql': f'project={self.__project_key}',
-                    'startAt': start_at,
-                    'maxResults': max_results
-                }
-
-                response = requests.get(url, headers=self.__headers, params=params, timeout=self.__timeout)
-                response.raise_for_status()
-                data = response.json()
-
-                # Al primo ciclo, impostiamo il totale delle issues presenti in Jira
-                if total is None:
-                    total = data.get('total', 0)
-
-                issues_data = data.get('issues', [])
-
-                # Converte ogni issue in IssueEntity
-                issues.extend([
-                    IssueEntity(
-                        id=issue['id'],
-                        key=issue['key'],
-                        summary=issue['fields']['summary'],
-                        description=issue['fields'].get('description', ''),
-                        issuetype=issue['fields']['issuetype'],
-                        project=issue['fields']['project'],
-                        status=issue['fields']['status'],
-                        priority=issue['fields'].get('priority', {}),
-                        assignee=issue['fields'].get('assignee', {}),
-                        reporter=issue['fields'].get('reporter', {}),
-                        created=issue['fields']['created'],
-                        updated=issue['fields']['updated'],
-                        attachment=issue['fields'].get('attachment', [])
-                    ) for issue in issues_data
-                ])
-
-                # logger.info(f"Fetched {len(issues_data)} issues (startAt={start_at}) from Jira project {self.__project_key}") # Per debug
-
-                # Incrementa il valore di start_at per la prossima chiamata
-                start_at += max_results
-
-                # Se non sono state ritornate altre issues, interrompiamo il ciclo
-                if len(issues_data) < max_results:
-                    break
-
-            logger.info(f"Fetched {len(issues)} issues from Jira project {self.__project_key}")
-            italy_tz = pytz.timezone('Europe/Rome')
-            log = PlatformLog(LoadingItems.JiraIssues, datetime.now(italy_tz), True)
+            initial_stats = self.__http_client.get_stats(self.__STATS_KEY)
+            jql = f'project={self.__project_key}'
+            if updated_since is not None:
+                # JQL accetta date con la precisione del minuto, interpretate nel fuso orario del profilo dell'utente Jira,
+                # che non è noto: la data viene espressa nel fuso orario di Roma, e LoadFilesService anticipa il watermark
+                # di un margine che copre la differenza con il fuso orario del profilo
+                italy_tz = pytz.timezone('Europe/Rome')
+                jql += f' AND updated >= "{updated_since.astimezone(italy_tz).strftime("%Y/%m/%d %H:%M")}"'
+
+            # Converte ogni issue in IssueEntity
+            issues = [
+                IssueEntity(
+                    id=issue['id'],
+                    key=issue['key'],
+                    summary=issue['fields']['summary'],
+                    description=issue['fields'].get('description', ''),
+                    issuetype=issue['fields']['issuetype'],
+                    project=issue['fields']['project'],
+                    status=issue['fields']['status'],
+                    priority=issue['fields'].get('priority', {}),
+                    assignee=issue['fields'].get('assignee', {}),
+                    reporter=issue['fields'].get('reporter', {}),
+                    created=issue['fields']['created'],
+                    updated=issue['fields']['updated'],
+                    attachment=issue['fields'].get('attachment', [])
+                ) for issue in self.__search({'jql': jql}, 100)
+            ]
+
+            logger.info(f"Fetched {len(issues)} issues from Jira project {self.__project_key} ({self.__http_client.get_stats()})")
+            log = self.__platform_log(True, initial_stats)
 
             return log, issues
         except requests.RequestException as e:
             logger.error(f"Error fetching Jira issues: {e}")
-            italy_tz = pytz.timezone('Europe/Rome')
-            log = PlatformLog(LoadingItems.JiraIssues, datetime.now(italy_tz), False)
+            log = self.__platform_log(False, initial_stats)
             return log, []
         except Exception as e:
             logger.error(f"Error loading Jira issues: {e}")
             raise e
+
+    def __search(self, params: dict, max_results: int) -> list[dict]:
+        """
+        Fetches all the results of a Jira search.
+        The first page tells the total number of results: the remaining pages are then fetched in parallel.
+        Args:
+            params (dict): The query parameters of the search, without the pagination ones.
+            max_results (int): The number of results requested for each page.
+        Returns:
+            list[dict]: The issues found, in the order returned by Jira.
+        Raises:
+            requests.RequestException: If there is an error during the API request.
+        """
+        url = f"{self.__base_url}/rest/api/2/search"
+        first_page = self.__http_client.fetch(url, {**params, 'startAt': 0, 'maxResults': max_results}, self.__STATS_KEY)
+        total = first_page.get('total', 0)
+        issues = list(first_page.get('issues', []))
+
+        # Jira può restituire meno risultati di quelli richiesti per pagina: le pagine successive usano la dimensione effettiva
+        page_size = len(issues)
+        if page_size > 0:
+            pages = self.__http_client.fetch_all(url, [
+                {**params, 'startAt': start_at, 'maxResults': max_results} for start_at in range(page_size, total, page_size)
+            ], self.__STATS_KEY)
+            for page in pages:
+                issues.extend(page.get('issues', []))
+
+        # logger.info(f"Fetched {len(issues)} of {total} results of Jira search {params}") # Per debug
+        return issues
+
+    def load_jira_issue_keys(self) -> Tuple[PlatformLog, List[str]]:
+        """
+        Fetches the keys of all the issues of the Jira project, without any other field.
+        It is used to detect the issues deleted from Jira without downloading the unchanged ones.
+        Returns:
+            Tuple[PlatformLog, List[str]]: A tuple containing a log of the operation and the list of issue keys.
+        Raises:
+            requests.RequestException: If there is an error during the API request.
+        """
+        try:
+            initial_stats = self.__http_client.get_stats(self.__STATS_KEY)
+            keys = [issue['key'] for issue in self.__search({'jql': f'project={self.__project_key}', 'fields': 'key'}, 1000)]
+
+            logger.info(f"Fetched {len(keys)} issue keys from Jira project {self.__project_key} ({self.__http_client.get_stats()})")
+            log = self.__platform_log(True, initial_stats)
+
+            return log, keys
+        except requests.RequestException as e:
+            logger.error(f"Error fetching Jira issue keys: {e}")
+            log = self.__platform_log(False, initial_stats)
+            return log, []
+        except Exception as e:
+            logger.error(f"Error loading Jira issue keys: {e}")
+            raise e
+
+    def __platform_log(self, outcome: bool, initial_stats: HttpStats) -> PlatformLog:
+        """
+        Creates the log of a loading from Jira, with the statistics of the requests sent since the given ones.
+        Args:
+            outcome (bool): The outcome of the loading.
+            initial_stats (HttpStats): The statistics of the requests of Jira at the start of the loading.
+        Returns:
+            PlatformLog: The log of the loading.
+        """
+        italy_tz = pytz.timezone('Europe/Rome')
+        stats = self.__http_client.get_stats(self.__STATS_KEY)
+        return PlatformLog(LoadingItems.JiraIssues, datetime.now(italy_tz), outcome,
+                           stats.get_num_bytes() - initial_stats.get_num_bytes(),
+                           stats.get_num_requests() - initial_stats.get_num_requests())
@@ -1,10 +1,12 @@
 import psycopg2
 from beartype.typing import Optional, Tuple, List
+from datetime import datetime
 
-from entities.loggingEntities import PostgresLoadingAttempt
+from entities.loggingEntities import PostgresLoadingAttempt, PostgresLoadingItems, PostgresLoadingStage, PostgresStageLog
 from entities.postgresSaveOperationResponse import PostgresSaveOperationResponse
 from entities.postgresMessage import PostgresMessage, PostgresMessageSender
 from entities.postgresLastLoadOutcome import PostgresLastLoadOutcome
+from entities.postgresWatermark import PostgresWatermark
 from utils.logger import logger
 from utils.beartype_personalized import beartype_personalized
 
@@ -24,7 +26,8 @@ class PostgresRepository:
         '''
         self.__conn = conn
 
-    def __execute_query(self, query: str, params: Optional[Tuple] = None, fetch_one: bool = False, fetch_all: bool = False) -> tuple | list | None:
+    def __execute_query(self, query: str, params: Optional[Tuple] = None, fetch_one: bool = False, fetch_all: bool = False,
+                        commit: bool = False) -> tuple | list | None:
         '''
         Executes a given SQL query with optional parameters and fetch options.
         Args:
@@ -32,6 +35,7 @@ class PostgresRepository:
             params (tuple), optional: The parameters to be used in the SQL query. Defaults to None.
             fetch_one (bool), optional: Whether to fetch a single result. Defaults to False.
             fetch_all (bool), optional: Whether to fetch all results. Defaults to False.
+            commit (bool), optional: Whether to commit also after fetching, for the writes returning rows. Defaults to False.
         Returns:
             tuple or list: The fetched result(s) if fetch_one or fetch_all is True, otherwise None.
         Raises:
@@ -41,7 +45,10 @@ class PostgresRepository:
             with self.__conn.cursor() as cur:  # Cursor creato nel contesto e chiuso automaticamente
                 cur.execute(query, params or ())
                 if fetch_one:
-                    return cur.fetchone()
+                    result = cur.fetchone()
+                    if commit:
+                        self.__conn.commit()
+                    return result
                 if fetch_all:
                     return cur.fetchall()
                 self.__conn.commit()  # Commit solo per operazioni di scrittura
@@ -140,6 +147,10 @@ class PostgresRepository:
             INSERT INTO vector_store_logs (loading_attempt_id, timestamp, outcome, num_added_items, num_modified_items, num_deleted_items)
             VALUES (%s, %s, %s, %s, %s, %s);
             """
+            insert_stage_logs_query = """
+            INSERT INTO stage_logs (loading_attempt_id, stage, duration, num_items, num_bytes, num_api_calls, peak_memory)
+            VALUES (%s, %s, %s, %s, %s, %s, %s);
+            """
 
             # Insert loading attempt
             params = (
@@ -169,6 +180,18 @@ class PostgresRepository:
                 vector_log.get_num_deleted_items()
             ))
 
+            # Insert stage logs
+            for stage_log in postgres_loading_attempt.get_postgres_stage_logs():
+                self.__execute_query(insert_stage_logs_query, params=(
+                    loading_attempt_id,
+                    stage_log.get_postgres_loading_stage().value,
+                    stage_log.get_duration(),
+                    stage_log.get_num_items(),
+                    stage_log.get_num_bytes(),
+                    stage_log.get_num_api_calls(),
+                    stage_log.get_peak_memory()
+                ))
+
             return PostgresSaveOperationResponse(success=True, message="Loading attempt saved successfully in the Postgres database.")
 
         except psycopg2.Error as e:
@@ -213,3 +236,293 @@ class PostgresRepository:
         except Exception as e:
             logger.error(f"An error occurred while retrieving the last load outcome from the Postgres database: {e}")
             raise e
+
+    def get_last_load_stage_logs(self) -> List[PostgresStageLog]:
+        '''
+        Retrieves the logs of the stages of the most recent loading attempt from the PostgreSQL database.
+        Returns:
+            List[PostgresStageLog]: The logs of the stages, in the order in which they were saved, or an empty list if
+                there is no loading attempt or the most recent one has no stage logs.
+        Raises:
+            psycopg2.Error: If an error occurs while retrieving the stage logs from the PostgreSQL database.
+        '''
+        try:
+            get_last_load_stage_logs_query = """
+            SELECT stage, duration, num_items, num_bytes, num_api_calls, peak_memory
+            FROM stage_logs
+            WHERE loading_attempt_id = (
+                SELECT id
+                FROM loading_attempts
+                ORDER BY ending_timestamp DESC
+                LIMIT 1
+            )
+            ORDER BY id;
+            """
+            stage_logs = self.__execute_query(get_last_load_stage_logs_query, fetch_all=True)
+
+            if stage_logs is None:
+                return []
+
+            logger.info("Last load stage logs retrieved successfully from the Postgres database.")
+
+            return [
+                PostgresStageLog(PostgresLoadingStage(stage_log[0]), float(stage_log[1]), stage_log[2], stage_log[3],
+                                 stage_log[4], stage_log[5])
+                for stage_log in stage_logs
+            ]
+
+        except Exception as e:
+            logger.error(f"An error occurred while retrieving the last load stage logs from the Postgres database: {e}")
+            raise e
+
+    def acquire_lease(self, name: str, holder: str, ttl: int) -> bool:
+        '''
+        Acquires or renews the lease with the given name for the given holder, if it is free, expired or already held
+        by the same holder. The check and the write are performed by a single atomic statement.
+        Args:
+            name (str): The name of the lease.
+            holder (str): The identifier of the holder of the lease.
+            ttl (int): The seconds after which the lease expires if not renewed.
+        Returns:
+            bool: True if the lease is now held by the given holder, False if it is held by another one.
+        Raises:
+            psycopg2.Error: If an error occurs while acquiring the lease in the PostgreSQL database.
+        '''
+        try:
+            acquire_lease_query = """
+            INSERT INTO leases (name, holder, expires_at)
+            VALUES (%s, %s, NOW() + %s * INTERVAL '1 second')
+            ON CONFLICT (name)
+            DO UPDATE SET holder = EXCLUDED.holder, expires_at = EXCLUDED.expires_at
+            WHERE leases.expires_at < NOW() OR leases.holder = EXCLUDED.holder
+            RETURNING holder;
+            """
+            result = self.__execute_query(acquire_lease_query, params=(name, holder, ttl), fetch_one=True, commit=True)
+            return result is not None
+
+        except Exception as e:
+            logger.error(f"An error occurred while acquiring the lease {name} in the Postgres database: {e}")
+            raise e
+
+    def release_lease(self, name: str, holder: str) -> bool:
+        '''
+        Releases the lease with the given name, if it is held by the given holder.
+        Args:
+            name (str): The name of the lease.
+            holder (str): The identifier of the holder of the lease.
+        Returns:
+            bool: True if the lease has been released, False if it was not held by the given holder.
+        Raises:
+            psycopg2.Error: If an error occurs while releasing the lease in the PostgreSQL database.
+        '''
+        try:
+            release_lease_query = """
+            DELETE FROM leases
+            WHERE name = %s AND holder = %s
+            RETURNING holder;
+            """
+            result = self.__execute_query(release_lease_query, params=(name, holder), fetch_one=True, commit=True)
+            return result is not None
+
+        except Exception as e:
+            logger.error(f"An error occurred while releasing the lease {name} in the Postgres database: {e}")
+            raise e
+
+    def swap_lease_replica(self, name: str, replica: str) -> Optional[str]:
+        '''
+        Records the given replica as the last one that acquired the lease with the given name, returning the previous one.
+        The read and the write are performed by a single atomic statement.
+        Args:
+            name (str): The name of the lease.
+            replica (str): The identifier of the replica, shared by its processes.
+        Returns:
+            Optional[str]: The replica that acquired the lease before, or None if no replica has been recorded yet.
+        Raises:
+            psycopg2.Error: If an error occurs while recording the replica in the PostgreSQL database.
+        '''
+        try:
+            # La CTE legge la riga precedente alla scrittura, nella stessa istruzione
+            swap_lease_replica_query = """
+            WITH previous AS (SELECT replica FROM lease_replicas WHERE name = %s)
+            INSERT INTO lease_replicas (name, replica)
+            VALUES (%s, %s)
+            ON CONFLICT (name)
+            DO UPDATE SET replica = EXCLUDED.replica
+            RETURNING (SELECT replica FROM previous);
+            """
+            result = self.__execute_query(swap_lease_replica_query, params=(name, name, replica), fetch_one=True, commit=True)
+            return result[0] if result is not None else None
+
+        except Exception as e:
+            logger.error(f"An error occurred while recording the replica of the lease {name} in the Postgres database: {e}")
+            raise e
+
+    def get_watermark(self, postgres_loading_items: PostgresLoadingItems, source: str) -> Optional[PostgresWatermark]:
+        '''
+        Retrieves the watermark of the given loading items and source from the PostgreSQL database.
+        Args:
+            postgres_loading_items (PostgresLoadingItems): The items the watermark refers to.
+            source (str): The source the watermark refers to.
+        Returns:
+            Optional[PostgresWatermark]: The saved watermark, or None if no watermark has been saved yet.
+        Raises:
+            psycopg2.Error: If an error occurs while retrieving the watermark from the PostgreSQL database.
+        '''
+        try:
+            get_watermark_query = """
+            SELECT last_timestamp, last_id
+            FROM watermarks
+            WHERE loading_item = %s AND source = %s;
+            """
+            result = self.__execute_query(get_watermark_query, params=(postgres_loading_items.value, source), fetch_one=True)
+
+            if result is None:
+                return None
+
+            logger.info(f"Watermark of {postgres_loading_items.value} ({source}) retrieved successfully from the Postgres database.")
+
+            return PostgresWatermark(postgres_loading_items, source, last_timestamp=result[0], last_id=result[1])
+
+        except Exception as e:
+            logger.error(f"An error occurred while retrieving the watermark from the Postgres database: {e}")
+            raise e
+
+    def save_watermark(self, postgres_watermark: PostgresWatermark) -> PostgresSaveOperationResponse:
+        '''
+        Saves a watermark into the PostgreSQL database, replacing the previous one of the same loading items and source.
+        Args:
+            postgres_watermark (PostgresWatermark): The watermark to be saved.
+        Returns:
+            PostgresSaveOperationResponse: The response indicating the success or failure of the save operation.
+        Raises:
+            psycopg2.Error: If an error occurs while saving the watermark in the PostgreSQL database.
+        '''
+        try:
+            # Template
+            upsert_watermark_query = """
+            INSERT INTO watermarks (loading_item, source, last_timestamp, last_id)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (loading_item, source)
+            DO UPDATE SET last_timestamp = EXCLUDED.last_timestamp, last_id = EXCLUDED.last_id;
+            """
+
+            # Upsert watermark
+            params = (
+                postgres_watermark.get_postgres_loading_items().value,
+                postgres_watermark.get_source(),
+                postgres_watermark.get_last_timestamp(),
+                postgres_watermark.get_last_id()
+            )
+            self.__execute_query(upsert_watermark_query, params=params)
+
+            return PostgresSaveOperationResponse(success=True, message="Watermark saved successfully in the Postgres database.")
+
+        except psycopg2.Error as e:
+            message = f"A connection error occurred while saving the watermark in the Postgres database: {e}"
+            logger.error(message)
+            return PostgresSaveOperationResponse(success=False, message=message)
+        except Exception as e:
+            logger.error(f"An error occurred while saving the watermark in the Postgres database: {e}")
+            raise e
+
+    def get_github_file_dates(self, source: str, paths: set[str]) -> dict[str, tuple[Optional[datetime], Optional[datetime]]]:
+        '''
+        Retrieves the dates of the given GitHub files of the given source from the PostgreSQL database.
+        Args:
+            source (str): The source the files belong to.
+            paths (set[str]): The paths of the files.
+        Returns:
+            dict[str, tuple[Optional[datetime], Optional[datetime]]]: The last update and the creation date of each file,
+                by path. The files without saved dates are missing.
+        Raises:
+            psycopg2.Error: If an error occurs while retrieving the dates from the PostgreSQL database.
+        '''
+        try:
+            if not paths:
+                return {}
+
+            get_github_file_dates_query = """
+            SELECT path, last_update, creation_date
+            FROM github_file_dates
+            WHERE source = %s AND path = ANY(%s);
+            """
+            result = self.__execute_query(get_github_file_dates_query, params=(source, sorted(paths)), fetch_all=True)
+
+            logger.info(f"Dates of {len(result)} GitHub files ({source}) retrieved successfully from the Postgres database.")
+
+            return {path: (last_update, creation_date) for path, last_update, creation_date in result}
+
+        except Exception as e:
+            logger.error(f"An error occurred while retrieving the GitHub file dates from the Postgres database: {e}")
+            raise e
+
+    def has_github_file_dates(self, source: str) -> bool:
+        '''
+        Checks whether any GitHub file date of the given source has been saved in the PostgreSQL database.
+        Args:
+            source (str): The source the files belong to.
+        Returns:
+            bool: True if the dates of at least one file have been saved, False otherwise.
+        Raises:
+            psycopg2.Error: If an error occurs while reading the PostgreSQL database.
+        '''
+        try:
+            has_github_file_dates_query = """
+            SELECT 1
+            FROM github_file_dates
+            WHERE source = %s
+            LIMIT 1;
+            """
+            result = self.__execute_query(has_github_file_dates_query, params=(source,), fetch_one=True)
+            return result is not None
+
+        except Exception as e:
+            logger.error(f"An error occurred while checking the GitHub file dates in the Postgres database: {e}")
+            raise e
+
+    def save_github_file_dates(self, source: str, dates: dict[str, tuple[Optional[datetime], Optional[datetime]]]) -> PostgresSaveOperationResponse:
+        '''
+        Saves the given dates of the GitHub files of the given source into the PostgreSQL database, keeping for each
+        file the most recent of the saved and the given dates.
+        Args:
+            source (str): The source the files belong to.
+            dates (dict[str, tuple[Optional[datetime], Optional[datetime]]]): The last update and the creation date of
+                each file, by path.
+        Returns:
+            PostgresSaveOperationResponse: The response indicating the success or failure of the save operation.
+        Raises:
+            psycopg2.Error: If an error occurs while saving the dates in the PostgreSQL database.
+        '''
+        try:
+            if not dates:
+                return PostgresSaveOperationResponse(success=True, message="No GitHub file dates to save in the Postgres database.")
+
+            # Tutte le date vengono salvate con una sola istruzione; GREATEST ignora i valori NULL,
+            # così che i commit scaricati di nuovo per la sovrapposizione del watermark non cambino le date
+            upsert_github_file_dates_query = """
+            INSERT INTO github_file_dates (source, path, last_update, creation_date)
+            SELECT %s, path, last_update, creation_date
+            FROM unnest(%s::text[], %s::timestamp[], %s::timestamp[]) AS dates(path, last_update, creation_date)
+            ON CONFLICT (source, path)
+            DO UPDATE SET last_update = GREATEST(github_file_dates.last_update, EXCLUDED.last_update),
+                          creation_date = GREATEST(github_file_dates.creation_date, EXCLUDED.creation_date);
+            """
+
+            paths = sorted(dates)
+            params = (
+                source,
+                paths,
+                [dates[path][0] for path in paths],
+                [dates[path][1] for path in paths]
+            )
+            self.__execute_query(upsert_github_file_dates_query, params=params)
+
+            return PostgresSaveOperationResponse(success=True, message="GitHub file dates saved successfully in the Postgres database.")
+
+        except psycopg2.Error as e:
+            message = f"A connection error occurred while saving the GitHub file dates in the Postgres database: {e}"
+            logger.error(message)
+            return PostgresSaveOperationResponse(success=False, message=message)
+        except Exception as e:
+            logger.error(f"An error occurred while saving the GitHub file dates in the Postgres database: {e}")
+            raise e
@@ -23,6 +23,9 @@ class ConfluenceCleanerService:
         """
         try:
             for page in pages:
+                # Le pagine invariate non hanno contenuto da pulire: i loro chunk restano quelli già caricati
+                if page.get_metadata().get("unchanged"):
+                    continue
                 page = self.__remove_html_tags(page)
                 page = self.__replace_html_entities(page)
 
@@ -35,6 +38,7 @@ class ConfluenceCleanerService:
     def __remove_html_tags(self, document: Document) -> Document:
         """
         Removes HTML tags from the content of the given Document.
+        The headings are kept as Markdown headings on their own line, so that the page can be split on its sections.
         Args:
             document (Document): The Document from which HTML tags need to be removed.
         Returns:
@@ -46,7 +50,11 @@ class ConfluenceCleanerService:
             if not document.get_page_content():
                 raise ValueError("Document content is empty")
 
-            document.set_page_content(re.sub(r'<[^>]+>', ' ', document.get_page_content()))
+            # I titoli diventano titoli Markdown su una nuova riga, usati come confini dei chunk
+            content = re.sub(r'<h([1-6])(?:\s[^>]*)?>', lambda match: "\n" + "#" * int(match.group(1)) + " ",
+                             document.get_page_content())
+            content = re.sub(r'</h[1-6]>', '\n', content)
+            document.set_page_content(re.sub(r'<[^>]+>', ' ', content))
             return document
         except Exception as e:
             logger.error(f"Error removing HTML tags: {e}")
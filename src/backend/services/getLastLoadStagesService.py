@@ -0,0 +1,37 @@
+from beartype.typing import List
+
+from models.loggingModels import StageLog
+from use_cases.getLastLoadStagesUseCase import GetLastLoadStagesUseCase
+from ports.getLastLoadStagesPort import GetLastLoadStagesPort
+from utils.logger import logger
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class GetLastLoadStagesService(GetLastLoadStagesUseCase):
+    """
+    Service class to handle the retrieval of the logs of the stages of the last loading attempt.
+    Attributes:
+        get_last_load_stages_port (GetLastLoadStagesPort): Port to access the stage logs data.
+    """
+
+    def __init__(self, get_last_load_stages_port: GetLastLoadStagesPort):
+        """
+        Initializes the GetLastLoadStagesService with the provided port.
+        Args:
+            get_last_load_stages_port (GetLastLoadStagesPort): Port to access the stage logs data.
+        """
+        self.get_last_load_stages_port = get_last_load_stages_port
+
+    def get_last_load_stage_logs(self) -> List[StageLog]:
+        """
+        Retrieves the logs of the stages of the last loading attempt using the provided port.
+        Returns:
+            List[StageLog]: The logs of the stages of the last loading attempt.
+        Raises:
+            Exception: If there is an error during the retrieval process.
+        """
+        try:
+            return self.get_last_load_stages_port.get_last_load_stage_logs()
+        except Exception as e:
+            logger.error(f"Error getting last load stage logs in GetLastLoadStagesService: {e}")
+            raise e
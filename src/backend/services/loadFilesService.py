@@ -1,10 +1,12 @@
-from beartype.typing import List, Tuple
-from datetime import datetime
+from beartype.typing import Callable, List, Tuple, Optional, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from datetime import datetime, timedelta
 import pytz
-import re
 
 from models.document import Document
-from models.loggingModels import PlatformLog, VectorStoreLog, LoadingAttempt
+from models.loggingModels import PlatformLog, VectorStoreLog, LoadingAttempt, LoadingItems, LoadingStage, StageLog
+from models.watermark import Watermark
 from models.dbSaveOperationResponse import DbSaveOperationResponse
 from use_cases.loadFilesUseCase import LoadFilesUseCase
 from ports.gitHubPort import GitHubPort
@@ -12,7 +14,12 @@ from ports.jiraPort import JiraPort
 from ports.confluencePort import ConfluencePort
 from ports.loadFilesInVectorStorePort import LoadFilesInVectorStorePort
 from ports.saveLoadingAttemptInDbPort import SaveLoadingAttemptInDbPort
+from ports.watermarkPort import WatermarkPort
+from ports.gitHubFileDatesPort import GitHubFileDatesPort
 from services.confluenceCleanerService import ConfluenceCleanerService
+from utils.refresh_lease import RefreshLease
+from utils.run_checkpoint import RunCheckpoint
+from utils.stage_timer import StageTimer, get_peak_memory
 from utils.logger import logger, file_logger
 from utils.beartype_personalized import beartype_personalized
 
@@ -28,10 +35,28 @@ class LoadFilesService(LoadFilesUseCase):
         load_files_in_vector_store_port (LoadFilesInVectorStorePort): Port for loading files into a vector store.
         save_loading_attempt_in_db_port (SaveLoadingAttemptInDbPort): Port for saving loading attempts in the database.
         confluence_cleaner_service (ConfluenceCleanerService): Service for cleaning Confluence pages.
+        max_workers (int): Maximum number of platforms fetched concurrently.
+        watermark_port (Optional[WatermarkPort]): Port for reading and saving the watermarks of the incremental loadings.
+        full_sync (bool): Whether to ignore the watermarks and reload every platform from scratch.
+        refresh_lease (Optional[RefreshLease]): Lease letting a single replica at a time load the files.
+        run_checkpoint (Optional[RunCheckpoint]): Checkpoint of the fetched items, to resume an interrupted loading.
+        watermark_overlap (int): Seconds subtracted from the watermarks, so that the items near them are fetched again.
+        github_file_dates_port (Optional[GitHubFileDatesPort]): Port for reading and saving the dates of the GitHub files.
     """
 
+    # Tipo, nei metadati dei documenti, degli elementi caricati da ciascuna piattaforma
+    __ITEM_TYPES = {
+        LoadingItems.GitHubCommits: "GitHub Commit",
+        LoadingItems.GitHubFiles: "GitHub File",
+        LoadingItems.JiraIssues: "Jira Issue",
+        LoadingItems.ConfluencePages: "Confluence Page"
+    }
+
     def __init__(self, github_port: GitHubPort, jira_port: JiraPort, confluence_port: ConfluencePort, confluence_cleaner_service: ConfluenceCleanerService, 
-                 load_files_in_vector_store_port: LoadFilesInVectorStorePort, save_loading_attempt_in_db_port: SaveLoadingAttemptInDbPort):
+                 load_files_in_vector_store_port: LoadFilesInVectorStorePort, save_loading_attempt_in_db_port: SaveLoadingAttemptInDbPort,
+                 max_workers: int = 4, watermark_port: Optional[WatermarkPort] = None, full_sync: bool = False,
+                 refresh_lease: Optional[RefreshLease] = None, run_checkpoint: Optional[RunCheckpoint] = None,
+                 watermark_overlap: int = 7200, github_file_dates_port: Optional[GitHubFileDatesPort] = None):
         """
         Initializes the LoadFilesService with the given ports and services.
         Args:
@@ -41,6 +66,23 @@ class LoadFilesService(LoadFilesUseCase):
             load_files_in_vector_store_port (LoadFilesInVectorStorePort): Port for loading files into a vector store.
             save_loading_attempt_in_db_port (SaveLoadingAttemptInDbPort): Port for saving loading attempts in the database.
             confluence_cleaner_service (ConfluenceCleanerService): Service for cleaning Confluence pages.
+            max_workers (int, optional): Maximum number of platforms fetched concurrently. Defaults to 4.
+            watermark_port (Optional[WatermarkPort], optional): Port for reading and saving the watermarks of the
+                incremental loadings. If None, every platform is always loaded from scratch. Defaults to None.
+            full_sync (bool, optional): Whether to ignore the saved watermarks and reload every platform from scratch.
+                Defaults to False.
+            refresh_lease (Optional[RefreshLease], optional): Lease letting a single replica at a time load the files.
+                If None, the files are always loaded. Defaults to None.
+            run_checkpoint (Optional[RunCheckpoint], optional): Checkpoint of the items fetched from each platform, to
+                resume an interrupted loading without fetching them again. If None, every loading fetches all the
+                platforms. Defaults to None.
+            watermark_overlap (int, optional): Seconds subtracted from the watermarks before fetching the items changed
+                since them, so that the items whose date does not match the filter of the platform (e.g. the commits
+                with an author date older than their committer date) are not skipped. The items fetched again are
+                deduplicated when merged with the loaded ones. Defaults to 7200.
+            github_file_dates_port (Optional[GitHubFileDatesPort], optional): Port for reading and saving the dates of the
+                GitHub files, updated from the fetched commits only. If None, the dates are taken from the fetched commits,
+                so the GitHub commits are always loaded from scratch. Defaults to None.
         """
         self.__github_port = github_port
         self.__jira_port = jira_port
@@ -48,28 +90,112 @@ class LoadFilesService(LoadFilesUseCase):
         self.__confluence_cleaner_service = confluence_cleaner_service
         self.__load_files_in_vector_store_port = load_files_in_vector_store_port
         self.__save_loading_attempt_in_db_port = save_loading_attempt_in_db_port
+        self.__max_workers = max_workers
+        self.__watermark_port = watermark_port
+        self.__full_sync = full_sync
+        self.__refresh_lease = refresh_lease
+        self.__run_checkpoint = run_checkpoint
+        self.__watermark_overlap = timedelta(seconds=watermark_overlap)
+        self.__github_file_dates_port = github_file_dates_port
 
     def load(self):
         """
         Loads data from GitHub, Jira, and Confluence, cleans Confluence pages, and saves the loading attempt logs.
+        With a refresh lease, the loading is skipped if the lease is held by another replica, and the time spent
+        acquiring and holding the lease is logged among the stages of the loading.
+        """
+        try:
+            if self.__refresh_lease is None:
+                self.__load([])
+                return
+
+            with StageTimer(LoadingStage.LeaseWait) as lease_timer:
+                acquired = self.__refresh_lease.acquire()
+            if not acquired:
+                logger.info("Loading skipped: another replica is loading the files.")
+                return
+            try:
+                self.__load([lease_timer.get_stage_log(1, num_api_calls=1)])
+            finally:
+                self.__refresh_lease.release()
+        except Exception as e:
+            logger.error(f"Error in load method of LoadFilesService: {e}")
+            raise e
+
+    def __load(self, stage_logs: List[StageLog]):
+        """
+        Loads data from GitHub, Jira, and Confluence, cleans Confluence pages, and saves the loading attempt logs.
+        With a run checkpoint, a loading interrupted before its completion is resumed: the platforms already fetched are
+        taken from the checkpoint, and the loading keeps the starting moment of the interrupted one, so that the watermarks
+        do not skip the items updated meanwhile. The checkpoint is discarded once the loading completes; a full loading
+        never resumes an interrupted one, and neither does a replica taking over the refresh lease from another one.
+        Args:
+            stage_logs (List[StageLog]): The logs of the stages preceding the loading, to which the logs of the stages
+                of the loading are added.
         """
         try:
             italy_tz = pytz.timezone('Europe/Rome')
             starting_timestamp = datetime.now(italy_tz)
+            # Il manifest e il checkpoint sono locali alla replica: se un'altra replica ha aggiornato il database vettoriale
+            # dopo questa, il manifest viene ricostruito dal database vettoriale e il checkpoint viene scartato
+            taken_over = self.__refresh_lease is not None and self.__refresh_lease.is_taken_over()
+            if taken_over:
+                self.__load_files_in_vector_store_port.resync()
+            if self.__run_checkpoint is not None:
+                if self.__full_sync or taken_over:
+                    self.__run_checkpoint.clear()
+                starting_timestamp = self.__run_checkpoint.begin(starting_timestamp)
 
-            github_commits_log, github_commits = self.load_github_commits()
-            github_files_log, github_files = self.load_github_files()
-            jira_issues_log, jira_issues = self.load_jira_issues()
-            confluence_pages_log, confluence_pages = self.load_confluence_pages()
+            (
+                (github_commits_log, github_commits),
+                (github_files_log, github_files),
+                (jira_issues_log, jira_issues),
+                (confluence_pages_log, confluence_pages),
+            ) = self.load_all_platforms(stage_logs)
 
-            github_files_with_new_metadata = self.get_github_files_new_metadata(github_files, github_commits)
-            cleaned_confluence_pages = self.clean_confluence_pages(confluence_pages)
-
-            documents = github_commits + github_files_with_new_metadata + jira_issues + cleaned_confluence_pages
-            vector_store_log = self.load_in_vector_store(documents)
+            with StageTimer(LoadingStage.GitHubMetadataEnrichment) as enrichment_timer:
+                github_files_with_new_metadata = self.get_github_files_new_metadata(github_files, github_commits)
+            stage_logs.append(enrichment_timer.get_stage_log(len(github_files)))
+            with StageTimer(LoadingStage.ConfluenceCleaning) as cleaning_timer:
+                cleaned_confluence_pages = self.clean_confluence_pages(confluence_pages)
+            stage_logs.append(cleaning_timer.get_stage_log(len(confluence_pages)))
 
+            # I documenti delle piattaforme fallite, anche se parziali, vengono scartati: quelli già caricati restano invariati
             platform_logs = [github_commits_log, github_files_log, jira_issues_log, confluence_pages_log]
-            loading_attempt = LoadingAttempt(platform_logs, vector_store_log, starting_timestamp)
+            preserved_item_types = {self.__ITEM_TYPES[log.get_loading_items()] for log in platform_logs if not log.get_outcome()}
+            # Senza i commit le date dei file sarebbero errate, e i file indicizzati non verrebbero più aggiornati
+            # finché non cambia il loro contenuto: anche i file vengono mantenuti, e caricati dall'aggiornamento successivo
+            if not github_commits_log.get_outcome():
+                preserved_item_types.add(self.__ITEM_TYPES[LoadingItems.GitHubFiles])
+
+            # I documenti vengono concatenati senza copiarli in una nuova lista: il database vettoriale li consuma in batch
+            documents = (
+                document
+                for document in chain(github_commits, github_files_with_new_metadata, jira_issues, cleaned_confluence_pages)
+                if document.get_metadata().get("item_type") not in preserved_item_types
+            )
+            if self.__refresh_lease is not None:
+                documents = self.__check_refresh_lease(documents)
+            vector_store_log = self.load_in_vector_store(documents, preserved_item_types)
+
+            if vector_store_log.get_outcome() and github_commits_log.get_outcome():
+                self.save_github_commits_watermark(github_commits)
+            if vector_store_log.get_outcome() and jira_issues_log.get_outcome():
+                self.save_jira_issues_watermark(starting_timestamp)
+            if vector_store_log.get_outcome() and confluence_pages_log.get_outcome():
+                self.save_confluence_pages_watermark(starting_timestamp)
+
+            # Le fasi del database vettoriale (suddivisione, confronto, eliminazioni e aggiunte) seguono le altre
+            stage_logs.extend(vector_store_log.get_stage_logs())
+            if self.__refresh_lease is not None:
+                # Il lease resta detenuto fino al rilascio, dopo il salvataggio: la durata è misurata fino a qui
+                stage_logs.append(StageLog(LoadingStage.LeaseHold, self.__refresh_lease.get_hold_duration(), 1,
+                                           num_api_calls=self.__refresh_lease.get_num_renewals() + 1,
+                                           peak_memory=get_peak_memory()))
+            for stage_log in stage_logs:
+                logger.info(f"Loading stage -> {stage_log}")
+
+            loading_attempt = LoadingAttempt(platform_logs, vector_store_log, starting_timestamp, stage_logs)
 
             db_save_operation_response = self.save_loading_attempt_in_db(loading_attempt)
             if db_save_operation_response.get_success():
@@ -79,30 +205,251 @@ class LoadFilesService(LoadFilesUseCase):
                                 "Details: " + db_save_operation_response.get_message())
 
             self.save_loading_attempt_in_txt(loading_attempt)
+
+            # Il checkpoint viene mantenuto se il caricamento nel database vettoriale non è riuscito, per riprenderlo
+            if self.__run_checkpoint is not None and vector_store_log.get_outcome():
+                self.__run_checkpoint.clear()
         except Exception as e:
-            logger.error(f"Error in load method of LoadFilesService: {e}")
+            logger.error(f"Error loading files in LoadFilesService: {e}")
+            raise e
+
+    def __check_refresh_lease(self, documents: Iterable[Document]) -> Iterator[Document]:
+        """
+        Passes on the given documents while the refresh lease is held, so that the vector store stops consuming them,
+        and so writing, as soon as the lease is lost.
+        Args:
+            documents (Iterable[Document]): The documents to be loaded into the vector store.
+        Yields:
+            Document: The documents, one at a time.
+        Raises:
+            Exception: If the refresh lease is lost, before a document or at the end of the documents.
+        """
+        for document in documents:
+            if self.__refresh_lease.is_lost():
+                raise Exception("Refresh lease lost: loading aborted, another replica may be loading the files.")
+            yield document
+        # Alla fine dei documenti il database vettoriale elimina quelli obsoleti: anche questo richiede il lease
+        if self.__refresh_lease.is_lost():
+            raise Exception("Refresh lease lost: loading aborted, another replica may be loading the files.")
+
+    def load_all_platforms(self, stage_logs: Optional[List[StageLog]] = None) -> List[Tuple[PlatformLog, List[Document]]]:
+        """
+        Loads GitHub commits, GitHub files, Jira issues and Confluence pages concurrently.
+        Every platform is fetched in its own task, so a failure of one platform does not interrupt the others.
+        The results are always returned in the same order, regardless of the order in which the tasks complete.
+        Args:
+            stage_logs (Optional[List[StageLog]], optional): The list to which the logs of the fetch of each platform are
+                appended, in the same order as the results. Defaults to None.
+        Returns:
+            List[Tuple[PlatformLog, List[Document]]]: The platform log and the documents of GitHub commits, GitHub files,
+            Jira issues and Confluence pages, in this order.
+        Raises:
+            Exception: The first exception raised by a platform, following the order above, once all the tasks are completed.
+        """
+        try:
+            loaders = [
+                (self.load_github_commits, LoadingStage.GitHubCommitsFetch, LoadingItems.GitHubCommits),
+                (self.load_github_files, LoadingStage.GitHubFilesFetch, LoadingItems.GitHubFiles),
+                (self.load_jira_issues, LoadingStage.JiraIssuesFetch, LoadingItems.JiraIssues),
+                (self.load_confluence_pages, LoadingStage.ConfluencePagesFetch, LoadingItems.ConfluencePages),
+            ]
+
+            # All'uscita dal blocco with tutti i task sono terminati, anche quelli successivi a un eventuale task fallito
+            with ThreadPoolExecutor(max_workers=self.__max_workers, thread_name_prefix="load_files") as executor:
+                futures = [executor.submit(self.__timed_load, loader, stage, loading_items) for loader, stage, loading_items in loaders]
+
+            # I risultati vengono raccolti nell'ordine di sottomissione, per mantenere deterministica l'unione dei documenti
+            results = [future.result() for future in futures]
+            if stage_logs is not None:
+                stage_logs.extend(stage_log for _, _, stage_log in results)
+            return [(platform_log, documents) for platform_log, documents, _ in results]
+        except Exception as e:
+            logger.error(f"Error loading platforms concurrently: {e}")
             raise e
 
+    def __timed_load(self, loader: Callable[[], Tuple[PlatformLog, List[Document]]], stage: LoadingStage,
+                     loading_items: LoadingItems) -> Tuple[PlatformLog, List[Document], StageLog]:
+        """
+        Loads the items of a platform, measuring the fetch.
+        With a run checkpoint, the items already fetched by the interrupted loading are taken from its snapshot, and the
+        items fetched successfully are saved in a snapshot.
+        Args:
+            loader (Callable[[], Tuple[PlatformLog, List[Document]]]): The method loading the items of the platform.
+            stage (LoadingStage): The fetch stage of the platform.
+            loading_items (LoadingItems): The type of the items of the platform.
+        Returns:
+            Tuple[PlatformLog, List[Document], StageLog]: The platform log, the documents and the log of the fetch,
+                with the bytes and the API calls reported by the platform log.
+        """
+        with StageTimer(stage) as timer:
+            snapshot = self.__run_checkpoint.get_snapshot(loading_items) if self.__run_checkpoint is not None else None
+            if snapshot is not None:
+                logger.info(f"{loading_items.value} taken from the checkpoint of the interrupted loading.")
+                platform_log, documents = snapshot
+            else:
+                platform_log, documents = loader()
+                if self.__run_checkpoint is not None and platform_log.get_outcome():
+                    self.__run_checkpoint.save_snapshot(loading_items, platform_log, documents)
+        return platform_log, documents, timer.get_stage_log(len(documents), platform_log.get_num_bytes(),
+                                                            platform_log.get_num_api_calls())
+
     def load_github_commits(self) -> Tuple[PlatformLog, List[Document]]:
         """
         Loads GitHub commits.
+        If a watermark of a previous loading is available, only the commits since the watermark, minus the overlap, are
+        fetched from GitHub. The commits already loaded in the vector store are returned as documents without content,
+        with the "unchanged" metadata set to True, so that the vector store keeps their chunks untouched without
+        reading them.
         Returns:
             Tuple[PlatformLog, List[Document]]: A tuple containing the platform log and a list of documents.
         """
         try:
-            return self.__github_port.load_github_commits()
+            watermark = self.get_github_commits_watermark()
+            if watermark is None:
+                return self.__github_port.load_github_commits()
+
+            # GitHub filtra per data del committer, mentre il watermark è la data dell'autore dell'ultimo commit:
+            # la sovrapposizione recupera i commit con una data dell'autore precedente (ad esempio dopo un rebase),
+            # e i commit già caricati vengono deduplicati dall'unione per sha
+            log, new_commits = self.__github_port.load_github_commits(watermark.get_last_timestamp() - self.__watermark_overlap)
+            if not log.get_outcome():
+                return log, new_commits
+
+            # Gli id dei commit già caricati vengono letti dal manifest, senza scaricarne i chunk
+            loaded_commit_ids = self.__load_files_in_vector_store_port.get_loaded_ids("GitHub Commit")
+
+            # Se il commit del watermark non è più nel database vettoriale, il watermark non è affidabile:
+            # si ricaricano tutti i commit da zero
+            if watermark.get_last_id() not in loaded_commit_ids:
+                logger.info("Watermark commit not found in vector store: loading the whole GitHub commits history.")
+                return self.__github_port.load_github_commits()
+
+            # Le date dei file vengono aggiornate solo dai nuovi commit: senza date salvate servono tutti i commit
+            if not self.__github_file_dates_port.has_github_file_dates(self.__github_port.get_repository_name()):
+                logger.info("GitHub file dates not found: loading the whole GitHub commits history.")
+                return self.__github_port.load_github_commits()
+
+            if not new_commits:
+                logger.info(f"No new GitHub commits since {watermark.get_last_timestamp()}.")
+                return log, self.merge_github_commits([], loaded_commit_ids)
+
+            logger.info(f"Fetched {len(new_commits)} new GitHub commits since {watermark.get_last_timestamp()}.")
+            return log, self.merge_github_commits(new_commits, loaded_commit_ids)
         except Exception as e:
             logger.error(f"Error loading GitHub commits: {e}")
             raise e
 
+    def get_github_commits_watermark(self) -> Optional[Watermark]:
+        """
+        Retrieves the watermark of the GitHub commits loaded in the previous loadings.
+        Without a port for the dates of the GitHub files, the dates are taken from the fetched commits, so the watermark
+        is never used.
+        Returns:
+            Optional[Watermark]: The watermark, or None if a full loading of the GitHub commits is required.
+        """
+        try:
+            if self.__github_file_dates_port is None:
+                return None
+            return self.get_watermark(LoadingItems.GitHubCommits, self.__github_port.get_repository_name())
+        except Exception as e:
+            logger.error(f"Error getting GitHub commits watermark: {e}")
+            raise e
+
+    def get_watermark(self, loading_items: LoadingItems, source: str) -> Optional[Watermark]:
+        """
+        Retrieves the watermark of the given items of the given source loaded in the previous loadings.
+        Args:
+            loading_items (LoadingItems): The type of the loaded items.
+            source (str): The source the items are loaded from.
+        Returns:
+            Optional[Watermark]: The watermark, or None if there is no watermark port, no saved watermark,
+                or if a full loading is required.
+        """
+        try:
+            if self.__watermark_port is None or self.__full_sync:
+                return None
+            return self.__watermark_port.get_watermark(loading_items, source)
+        except Exception as e:
+            logger.error(f"Error getting watermark of {loading_items.value}: {e}")
+            raise e
+
+    def save_watermark(self, watermark: Watermark):
+        """
+        Saves the given watermark for the next loadings.
+        A failure in saving the watermark does not invalidate the loading: the next one will simply fetch more items.
+        Args:
+            watermark (Watermark): The watermark to save.
+        """
+        try:
+            db_save_operation_response = self.__watermark_port.save_watermark(watermark)
+            if db_save_operation_response.get_success():
+                logger.info(f"{watermark.get_loading_items().value} watermark saved: "
+                            f"{watermark.get_last_id()} ({watermark.get_last_timestamp()}).")
+            else:
+                logger.error(f"Failed to save {watermark.get_loading_items().value} watermark: {db_save_operation_response.get_message()}")
+        except Exception as e:
+            logger.error(f"Error saving watermark: {e}")
+            raise e
+
+    def merge_github_commits(self, new_commits: List[Document], loaded_commit_ids: set[str]) -> List[Document]:
+        """
+        Merges the commits fetched since the watermark with the commits already loaded in the vector store.
+        The new commits come first, in the order returned by GitHub, followed by the loaded commits not fetched again,
+        as documents without content marked as unchanged.
+        Args:
+            new_commits (List[Document]): The commits fetched since the watermark.
+            loaded_commit_ids (set[str]): The ids of the commits already loaded in the vector store.
+        Returns:
+            List[Document]: The merged list of commits, without duplicates.
+        """
+        try:
+            new_commit_ids = {commit.get_metadata().get("id") for commit in new_commits}
+            # I commit invariati servono solo a indicare al database vettoriale quali chunk mantenere
+            unchanged_commits = [
+                Document(page_content="", metadata={"item_type": "GitHub Commit", "id": commit_id, "unchanged": True})
+                for commit_id in sorted(loaded_commit_ids - new_commit_ids)
+            ]
+            return new_commits + unchanged_commits
+        except Exception as e:
+            logger.error(f"Error merging GitHub commits: {e}")
+            raise e
+
+    def save_github_commits_watermark(self, github_commits: List[Document]):
+        """
+        Saves the most recent of the given GitHub commits as watermark for the next loadings.
+        A failure in saving the watermark does not invalidate the loading: the next one will simply fetch more commits.
+        Args:
+            github_commits (List[Document]): The GitHub commits loaded in the vector store.
+        """
+        try:
+            if self.__watermark_port is None:
+                return
+
+            dated_commits = [commit for commit in github_commits if commit.get_metadata().get("date", "/") != "/"]
+            if not dated_commits:
+                return
+
+            last_commit = max(dated_commits, key=lambda commit: commit.get_metadata()["date"])
+            italy_tz = pytz.timezone('Europe/Rome')
+            last_timestamp = italy_tz.localize(datetime.strptime(last_commit.get_metadata()["date"], '%Y-%m-%d %H:%M:%S'))
+            watermark = Watermark(LoadingItems.GitHubCommits, self.__github_port.get_repository_name(),
+                                  last_timestamp, last_commit.get_metadata().get("id"))
+            self.save_watermark(watermark)
+        except Exception as e:
+            logger.error(f"Error saving GitHub commits watermark: {e}")
+            raise e
+
     def load_github_files(self) -> Tuple[PlatformLog, List[Document]]:
         """
         Loads GitHub files.
+        The content is downloaded only for the files not already loaded in the vector store with the same SHA,
+        unless a full loading is required.
         Returns:
             Tuple[PlatformLog, List[Document]]: A tuple containing the platform log and a list of documents.
         """
         try:
-            return self.__github_port.load_github_files()
+            known_shas = set() if self.__full_sync else self.__load_files_in_vector_store_port.get_loaded_ids("GitHub File")
+            return self.__github_port.load_github_files(known_shas)
         except Exception as e:
             logger.error(f"Error loading GitHub files: {e}")
             raise e
@@ -110,38 +457,90 @@ class LoadFilesService(LoadFilesUseCase):
     def load_jira_issues(self) -> Tuple[PlatformLog, List[Document]]:
         """
         Loads Jira issues.
+        If a watermark of a previous loading is available, only the issues updated since the watermark, minus the overlap,
+        are downloaded, while the other issues still present in Jira are kept untouched in the vector store.
         Returns:
             Tuple[PlatformLog, List[Document]]: A tuple containing the platform log and a list of documents.
         """
         try:
-            return self.__jira_port.load_jira_issues()
+            watermark = self.get_watermark(LoadingItems.JiraIssues, self.__jira_port.get_project_key())
+            if watermark is None:
+                return self.__jira_port.load_jira_issues()
+
+            # JQL interpreta le date nel fuso orario del profilo dell'utente Jira: la sovrapposizione evita di perdere
+            # le issue aggiornate nella differenza di fuso orario, e le issue non modificate non vengono riscritte
+            updated_since = watermark.get_last_timestamp() - self.__watermark_overlap
+            logger.info(f"Loading Jira issues updated since {updated_since}.")
+            return self.__jira_port.load_jira_issues(updated_since)
         except Exception as e:
             logger.error(f"Error loading Jira issues: {e}")
             raise e
 
+    def save_jira_issues_watermark(self, starting_timestamp: datetime):
+        """
+        Saves the starting moment of the current loading as watermark of the Jira issues.
+        The starting moment is used, instead of the end of the loading, so that the issues updated while the loading
+        was running are loaded again by the next one.
+        Args:
+            starting_timestamp (datetime): The moment the current loading started.
+        """
+        try:
+            if self.__watermark_port is None:
+                return
+            self.save_watermark(Watermark(LoadingItems.JiraIssues, self.__jira_port.get_project_key(), starting_timestamp))
+        except Exception as e:
+            logger.error(f"Error saving Jira issues watermark: {e}")
+            raise e
+
     def load_confluence_pages(self) -> Tuple[PlatformLog, List[Document]]:
         """
         Loads Confluence pages.
+        If a watermark of a previous loading is available, only the pages modified since the watermark, minus the overlap,
+        are downloaded, while the other pages still present in Confluence are kept untouched in the vector store.
         Returns:
             Tuple[PlatformLog, List[Document]]: A tuple containing the platform log and a list of documents.
         """
         try:
-            return self.__confluence_port.load_confluence_pages()
+            watermark = self.get_watermark(LoadingItems.ConfluencePages, self.__confluence_port.get_space_key())
+            if watermark is None:
+                return self.__confluence_port.load_confluence_pages()
+
+            # CQL interpreta le date nel fuso orario del profilo dell'utente Confluence: la sovrapposizione evita di
+            # perdere le pagine modificate nella differenza di fuso orario, e le pagine non modificate non vengono riscritte
+            modified_since = watermark.get_last_timestamp() - self.__watermark_overlap
+            logger.info(f"Loading Confluence pages modified since {modified_since}.")
+            return self.__confluence_port.load_confluence_pages(modified_since)
         except Exception as e:
             logger.error(f"Error loading Confluence pages: {e}")
             raise e
 
+    def save_confluence_pages_watermark(self, starting_timestamp: datetime):
+        """
+        Saves the starting moment of the current loading as watermark of the Confluence pages.
+        The starting moment is used, instead of the end of the loading, so that the pages modified while the loading
+        was running are loaded again by the next one.
+        Args:
+            starting_timestamp (datetime): The moment the current loading started.
+        """
+        try:
+            if self.__watermark_port is None:
+                return
+            self.save_watermark(Watermark(LoadingItems.ConfluencePages, self.__confluence_port.get_space_key(), starting_timestamp))
+        except Exception as e:
+            logger.error(f"Error saving Confluence pages watermark: {e}")
+            raise e
+
     def get_github_files_new_metadata(self, github_files: List[Document], github_commits: List[Document]) -> List[Document]:
         """
         Aggiorna i metadati dei GitHub File impostando:
         1) "last_update": data dell'ultimo commit (indipendentemente dallo status) in cui il file compare.
         2) "creation_date": data dell'ultimo commit in cui il file compare con status "added" oppure "renamed".
-        
-        Per ogni file in github_files, viene scansionata la lista dei commit (github_commits). 
-        In ciascun commit viene iterata la lista di stringhe presente nel campo "files". 
-        Utilizziamo una espressione regolare per estrarre:
-        - Il filename, cioè il testo compreso tra "- " e " (Status: "
-        - Lo status, cioè il testo compreso tra " (Status: " e ", Changes: "
+
+        I commit vengono scansionati una sola volta per costruire un indice che associa ad ogni percorso le due date;
+        i metadati di ciascun file vengono poi aggiornati con una ricerca nell'indice.
+        Con la porta delle date dei file, l'indice dei commit scaricati viene unito alle date salvate, e le date dei file
+        vengono lette da queste: i commit già caricati, non scaricati di nuovo, contribuiscono così alle date.
+        I file invariati non hanno contenuto e non vengono riscritti, quindi i loro metadati non vengono aggiornati.
 
         Args:
             github_files (List[Document]): La lista di file caricati da GitHub.
@@ -155,48 +554,33 @@ class LoadFilesService(LoadFilesUseCase):
                         o se il formato della data nei commit di GitHub non è valido.
         """
         try:
-            # L'espressione regolare per estrarre il percorso del file e lo status:
-            # - Cattura il filename: tutto ciò che si trova tra "- " e " (Status: "
-            # - Cattura lo status: tutto ciò che si trova tra " (Status: " e ", Changes: "
-            file_info_pattern = re.compile(r'-\s+(.*?)\s+\(Status:\s+([^,]+),')
+            path_index = self.build_github_files_dates_index(github_commits)
+            if self.__github_file_dates_port is not None:
+                # Le date vengono salvate anche senza file da aggiornare: i commit non verranno scaricati di nuovo
+                self.save_github_file_dates(path_index)
+
+            if not github_files:
+                return github_files
 
-            # Itera su ogni file caricato da GitHub
-            for gh_file in github_files:
+            changed_files = [gh_file for gh_file in github_files if not gh_file.get_metadata().get("unchanged")]
+            file_paths = set()
+            for gh_file in changed_files:
                 file_path = gh_file.get_metadata().get("path", "").strip()
                 if not file_path:
                     raise ValueError("File path not found in GitHub file metadata.")
+                file_paths.add(file_path)
 
-                last_update_date = None
-                creation_date_date = None
-
-                # Scorri tutti i commit per cercare quelli che riguardano questo file
-                for commit in github_commits:
-                    commit_date_str = commit.get_metadata().get("date", "")
-                    try:
-                        commit_date = datetime.strptime(commit_date_str, '%Y-%m-%d %H:%M:%S')
-                    except Exception as e:
-                        raise ValueError(f"Invalid date format in GitHub commit: {commit_date_str}") from e
-
-                    # Il campo "files" del commit è una lista di stringhe
-                    commit_files_list = commit.get_metadata().get("files", [])
-                    for file_str in commit_files_list:
-                        # Estrae filename e status utilizzando la regex
-                        match = file_info_pattern.search(file_str)
-                        if match:
-                            commit_file_path = match.group(1).strip()
-                            status = match.group(2).strip().lower()
-                            # Se il filename del commit corrisponde al path del file corrente
-                            if commit_file_path == file_path:
-                                # Aggiorna "last_update" se il commit è più recente
-                                if (last_update_date is None) or (commit_date > last_update_date):
-                                    last_update_date = commit_date
-                                # Se lo status è "added" o "renamed", aggiorna "creation_date"
-                                if status in ["added", "renamed"]:
-                                    if (creation_date_date is None) or (commit_date > creation_date_date):
-                                        creation_date_date = commit_date
+            if self.__github_file_dates_port is not None:
+                path_index = self.__github_file_dates_port.get_github_file_dates(self.__github_port.get_repository_name(), file_paths)
+
+            for gh_file in changed_files:
+                metadata = gh_file.get_metadata()
+                file_path = metadata.get("path", "").strip()
+
+                last_update_date, creation_date_date = path_index.get(file_path, (None, None))
 
                 # Crea un dizionario temporaneo per i metadati aggiornati
-                updated_metadata = gh_file.get_metadata().copy()
+                updated_metadata = metadata.copy()
 
                 # Aggiorna i metadati del file se sono state trovate date valide
                 if last_update_date is not None:
@@ -212,6 +596,77 @@ class LoadFilesService(LoadFilesUseCase):
             logger.error(f"Error in get_github_files_new_metadata: {e}")
             raise e
 
+    def save_github_file_dates(self, path_index: dict[str, tuple[Optional[datetime], Optional[datetime]]]):
+        """
+        Saves the dates of the GitHub files taken from the fetched commits, merging them with the saved ones.
+        Args:
+            path_index (dict[str, tuple[Optional[datetime], Optional[datetime]]]): The index of the dates, by file path.
+        Raises:
+            Exception: If the dates cannot be saved: the commits are not fetched again by the next loadings, so their
+                dates would be lost.
+        """
+        try:
+            db_save_operation_response = self.__github_file_dates_port.save_github_file_dates(
+                self.__github_port.get_repository_name(), path_index)
+            if not db_save_operation_response.get_success():
+                raise Exception("Failed to save GitHub file dates: " + db_save_operation_response.get_message())
+            logger.info(f"Dates of {len(path_index)} GitHub files saved.")
+        except Exception as e:
+            logger.error(f"Error saving GitHub file dates: {e}")
+            raise e
+
+    def build_github_files_dates_index(self, github_commits: List[Document]) -> dict[str, tuple[Optional[datetime], Optional[datetime]]]:
+        """
+        Costruisce, con una sola passata sui commit, l'indice che associa ad ogni percorso di file:
+        1) la data dell'ultimo commit in cui il file compare;
+        2) la data dell'ultimo commit in cui il file compare con status "added" oppure "renamed", oppure None.
+
+        Il campo "files" di ciascun commit contiene la lista strutturata (CommitFile) dei file coinvolti, con percorso e status.
+        I commit marcati come invariati vengono ignorati.
+
+        Args:
+            github_commits (List[Document]): La lista di commit caricati da GitHub.
+
+        Returns:
+            dict[str, tuple[Optional[datetime], Optional[datetime]]]: L'indice delle date, per percorso del file.
+
+        Raises:
+            ValueError: Se il formato della data nei commit di GitHub non è valido.
+        """
+        try:
+            path_index = {}
+
+            for commit in github_commits:
+                commit_metadata = commit.get_metadata()
+                # I commit invariati, già caricati, non hanno né data né file
+                if commit_metadata.get("unchanged"):
+                    continue
+                # La data viene convertita una sola volta per commit
+                commit_date_str = commit_metadata.get("date", "")
+                try:
+                    commit_date = datetime.strptime(commit_date_str, '%Y-%m-%d %H:%M:%S')
+                except Exception as e:
+                    raise ValueError(f"Invalid date format in GitHub commit: {commit_date_str}") from e
+
+                for commit_file in commit_metadata.get("files", []):
+                    commit_file_path = commit_file.get_filename().strip()
+                    status = commit_file.get_status().strip().lower()
+
+                    last_update_date, creation_date_date = path_index.get(commit_file_path, (None, None))
+                    # Aggiorna "last_update" se il commit è più recente
+                    if (last_update_date is None) or (commit_date > last_update_date):
+                        last_update_date = commit_date
+                    # Se lo status è "added" o "renamed", aggiorna "creation_date"
+                    if status in ["added", "renamed"]:
+                        if (creation_date_date is None) or (commit_date > creation_date_date):
+                            creation_date_date = commit_date
+                    path_index[commit_file_path] = (last_update_date, creation_date_date)
+
+            return path_index
+        except Exception as e:
+            logger.error(f"Error in build_github_files_dates_index: {e}")
+            raise e
+
     def clean_confluence_pages(self, pages: List[Document]) -> List[Document]:
         """
         Cleans Confluence pages.
@@ -226,16 +681,18 @@ class LoadFilesService(LoadFilesUseCase):
             logger.error(f"Error cleaning Confluence pages: {e}")
             raise e
 
-    def load_in_vector_store(self, documents: List[Document]) -> VectorStoreLog:
+    def load_in_vector_store(self, documents: Iterable[Document], preserved_item_types: Optional[set[str]] = None) -> VectorStoreLog:
         """
         Loads documents into a vector store.
         Args:
-            documents (List[Document]): A list of documents to be loaded into the vector store.
+            documents (Iterable[Document]): The documents to be loaded into the vector store, possibly as a stream.
+            preserved_item_types (Optional[set[str]], optional): The item types whose documents already in the vector
+                store are kept even if not among the given ones. Defaults to None.
         Returns:
             VectorStoreLog: The log of the vector store loading operation.
         """
         try:
-            return self.__load_files_in_vector_store_port.load(documents)
+            return self.__load_files_in_vector_store_port.load(documents, preserved_item_types)
         except Exception as e:
             logger.error(f"Error loading documents in vector store: {e}")
             raise e
@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from beartype.typing import List
+
+from models.loggingModels import StageLog
+
+class GetLastLoadStagesUseCase(ABC):
+    """
+    Interface for the use case to get the logs of the stages of the last loading attempt.
+    """
+
+    @abstractmethod
+    def get_last_load_stage_logs(self) -> List[StageLog]:
+        """
+        Abstract method to retrieve the logs of the stages of the last loading attempt.
+        Returns:
+            List[StageLog]: The logs of the stages of the last loading attempt.
+        """
@@ -16,13 +16,20 @@ def beartype_personalized(func):
                 setattr(func, attr_name, decorated)
         return func
 
+    # La funzione decorata da beartype viene creata alla prima chiamata e poi riutilizzata:
+    # generarla ad ogni chiamata ne moltiplicherebbe il costo
+    checked_func = None
+
     @wraps(func)
     def wrapper(*args, **kwargs):
+        nonlocal checked_func
         # Se uno degli argomenti è un mock (o una funzione lambda), bypassa il controllo dei tipi.
         for arg in args:
             if isinstance(arg, MagicMock) or isinstance(arg, AsyncMock) or isinstance(arg, type(lambda: None)):
                 print("Mock rilevato, bypassando il controllo dei tipi")
                 return func(*args, **kwargs)
         # Altrimenti, applica beartype al momento della chiamata.
-        return beartype(func)(*args, **kwargs)
+        if checked_func is None:
+            checked_func = beartype(func)
+        return checked_func(*args, **kwargs)
     return wrapper
@@ -0,0 +1,214 @@
+import chromadb
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from beartype.typing import Callable, Optional
+
+from utils.embedding_cache import EmbeddingCache
+from utils.logger import logger
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class ChromaBatchWriter:
+    """
+    Writes chunks to a Chroma collection in batches no larger than the maximum batch size accepted by the server.
+    With more than one worker the batches are written in parallel, keeping at most max_workers batches pending,
+    so that the memory used stays bounded. Each batch is retried on its own, with an exponential backoff, so that
+    a failure does not require to write again the batches already written. The duration of each batch is logged,
+    and the chunks, requests, bytes and time of each operation are collected for the loading logs.
+    If an embedding cache is given, the embeddings of the added chunks are taken from the cache, or computed and cached,
+    in the thread writing the batch, and passed to Chroma together with the chunks.
+    Attributes:
+        collection (chromadb.Collection): The collection to write to.
+        batch_size (int): The maximum number of chunks written in a single request.
+        max_workers (int): The maximum number of batches written at the same time.
+        max_retries (int): The maximum number of retries of a failed batch.
+        retry_delay (float): The delay before the first retry of a failed batch, doubled at each retry.
+        embedding_cache (Optional[EmbeddingCache]): The cache of the embeddings of the chunks.
+    """
+
+    def __init__(self, collection: chromadb.Collection, batch_size: int, max_workers: int = 1, max_retries: int = 0,
+                 retry_delay: float = 1.0, embedding_cache: Optional[EmbeddingCache] = None):
+        """
+        Initializes the ChromaBatchWriter with the given parameters.
+        Args:
+            collection (chromadb.Collection): The collection to write to.
+            batch_size (int): The maximum number of chunks written in a single request.
+            max_workers (int): The maximum number of batches written at the same time. With 1, the batches are
+                written synchronously.
+            max_retries (int): The maximum number of retries of a failed batch.
+            retry_delay (float): The delay in seconds before the first retry of a failed batch, doubled at each retry.
+            embedding_cache (Optional[EmbeddingCache]): The cache of the embeddings of the chunks. If None, the embeddings
+                are computed by the collection.
+        """
+        self.__collection = collection
+        self.__batch_size = batch_size
+        self.__max_workers = max_workers
+        self.__max_retries = max_retries
+        self.__retry_delay = retry_delay
+        self.__embedding_cache = embedding_cache
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chroma_writer") if max_workers > 1 else None
+        self.__pending = deque()
+        self.__error = None
+        self.__timings = []
+        self.__lock = threading.Lock()
+        # Statistiche per operazione: [chunk, richieste, byte inviati, secondi]
+        self.__operation_stats = {}
+
+    def get_timings(self) -> list[float]:
+        """
+        Returns the durations of the batches written so far.
+        Returns:
+            list[float]: The duration in seconds of each batch, including its retries, in order of completion.
+        """
+        return list(self.__timings)
+
+    def get_operation_stats(self, operation: str) -> tuple[int, int, int, float]:
+        """
+        Returns the statistics of the batches of the given operation written so far.
+        Args:
+            operation (str): The name of the operation ("add", "upsert", "update" or "delete").
+        Returns:
+            tuple[int, int, int, float]: The number of chunks, the number of requests including the retries, the bytes
+                of the ids, contents and metadata sent, and the total duration in seconds of the batches.
+        """
+        with self.__lock:
+            num_chunks, num_requests, num_bytes, duration = self.__operation_stats.get(operation, (0, 0, 0, 0.0))
+            return num_chunks, num_requests, num_bytes, duration
+
+    def add(self, ids: list[str], documents: list[str], metadatas: list[dict]):
+        """
+        Adds the given chunks to the collection.
+        Args:
+            ids (list[str]): The ids of the chunks.
+            documents (list[str]): The contents of the chunks.
+            metadatas (list[dict]): The metadata of the chunks.
+        """
+        for i in range(0, len(ids), self.__batch_size):
+            j = i + self.__batch_size
+            self.__submit("add", self.__collection.add, ids=ids[i:j], documents=documents[i:j], metadatas=metadatas[i:j])
+
+    def upsert(self, ids: list[str], documents: list[str], metadatas: list[dict]):
+        """
+        Replaces the given chunks in the collection, adding them if missing.
+        Args:
+            ids (list[str]): The ids of the chunks.
+            documents (list[str]): The contents of the chunks.
+            metadatas (list[dict]): The metadata of the chunks.
+        """
+        for i in range(0, len(ids), self.__batch_size):
+            j = i + self.__batch_size
+            self.__submit("upsert", self.__collection.upsert, ids=ids[i:j], documents=documents[i:j], metadatas=metadatas[i:j])
+
+    def update(self, ids: list[str], metadatas: list[dict]):
+        """
+        Replaces the metadata of the given chunks, leaving their contents and embeddings untouched.
+        Args:
+            ids (list[str]): The ids of the chunks.
+            metadatas (list[dict]): The new metadata of the chunks.
+        """
+        for i in range(0, len(ids), self.__batch_size):
+            j = i + self.__batch_size
+            self.__submit("update", self.__collection.update, ids=ids[i:j], metadatas=metadatas[i:j])
+
+    def delete(self, ids: list[str]):
+        """
+        Deletes the chunks with the given ids from the collection.
+        Args:
+            ids (list[str]): The ids of the chunks.
+        """
+        for i in range(0, len(ids), self.__batch_size):
+            self.__submit("delete", self.__collection.delete, ids=ids[i:i + self.__batch_size])
+
+    def flush(self):
+        """
+        Waits for all the pending batches to be written.
+        Raises:
+            Exception: The error of the first batch that failed after all its retries.
+        """
+        while self.__pending:
+            self.__wait_oldest()
+        if self.__error is not None:
+            raise self.__error
+
+    def close(self):
+        """
+        Waits for the pending batches and releases the threads of the writer, without raising the errors of the batches.
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True)
+        self.__pending.clear()
+
+    def __submit(self, operation: str, write: Callable, **kwargs):
+        """
+        Writes a batch, synchronously or in a worker thread, waiting for the oldest pending batch if there are already
+        max_workers batches pending.
+        Args:
+            operation (str): The name of the operation, for the logs.
+            write (Callable): The method of the collection performing the operation.
+            **kwargs: The arguments of the operation.
+        Raises:
+            Exception: The error of the batch, if written synchronously and failed after all its retries.
+        """
+        if self.__executor is None:
+            self.__write(operation, write, **kwargs)
+            return
+        # Si ferma alla prima batch fallita: le successive non vengono inviate, quelle già scritte restano valide
+        if self.__error is not None:
+            raise self.__error
+        while len(self.__pending) >= self.__max_workers:
+            self.__wait_oldest()
+        self.__pending.append(self.__executor.submit(self.__write, operation, write, **kwargs))
+
+    def __wait_oldest(self):
+        """
+        Waits for the oldest pending batch, recording its error if it failed.
+        """
+        future: Future = self.__pending.popleft()
+        try:
+            future.result()
+        except Exception as e:
+            if self.__error is None:
+                self.__error = e
+
+    def __write(self, operation: str, write: Callable, **kwargs):
+        """
+        Writes a batch, retrying it with an exponential backoff if it fails.
+        The embeddings of the chunks, if a cache is available, are obtained once, before the first attempt.
+        Args:
+            operation (str): The name of the operation, for the logs.
+            write (Callable): The method of the collection performing the operation.
+            **kwargs: The arguments of the operation.
+        Raises:
+            Exception: The error of the last attempt, if all the attempts failed.
+        """
+        started = time.monotonic()
+        if self.__embedding_cache is not None and "documents" in kwargs:
+            kwargs["embeddings"] = self.__embedding_cache.embed(kwargs["documents"])
+        attempt = 0
+        while True:
+            try:
+                write(**kwargs)
+                break
+            except Exception as e:
+                if attempt >= self.__max_retries:
+                    logger.error(f"Chroma {operation} batch of {len(kwargs['ids'])} chunks failed after {attempt + 1} attempts: {e}")
+                    raise e
+                delay = self.__retry_delay * 2 ** attempt
+                logger.info(f"Chroma {operation} batch of {len(kwargs['ids'])} chunks failed ({e}): retrying in {delay:.1f} seconds")
+                time.sleep(delay)
+                attempt += 1
+        elapsed = time.monotonic() - started
+        self.__timings.append(elapsed)
+        # Gli embedding non vengono contati: la loro dimensione dipende solo dal numero di chunk
+        payload = {key: kwargs[key] for key in ("ids", "documents", "metadatas") if key in kwargs}
+        num_bytes = len(json.dumps(payload, default=str).encode("utf-8"))
+        with self.__lock:
+            stats = self.__operation_stats.setdefault(operation, [0, 0, 0, 0.0])
+            stats[0] += len(kwargs["ids"])
+            stats[1] += attempt + 1
+            stats[2] += num_bytes
+            stats[3] += elapsed
+        logger.info(f"Chroma {operation} batch of {len(kwargs['ids'])} chunks written in {elapsed:.2f} seconds")
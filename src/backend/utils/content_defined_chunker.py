@@ -0,0 +1,144 @@
+import re
+import zlib
+from beartype.typing import Callable, Optional
+
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class ContentDefinedChunker:
+    """
+    Splits texts into chunks whose boundaries depend on the content rather than on fixed offsets.
+    A chunk can end only at the end of a unit, and it ends after a unit when the hash of the first line of the unit falls
+    below a threshold proportional to the size of the unit, so that on average a boundary is found every
+    target_chunk_size after the minimum size. Since each boundary depends only on the unit where it falls, inserting or
+    removing text changes only the chunks around the edit: the following boundaries stay where they were.
+    The units are the lines of the text or, with a boundary pattern, the sections starting at each match of the pattern
+    (e.g. a function definition or a heading), so that the chunks follow the structure of the text.
+    A chunk never exceeds max_chunk_size: the sections larger than that are split into lines, and the lines larger
+    than that are cut at fixed offsets.
+    The sizes are measured by the size function: the number of characters by default, or e.g. the number of tokens.
+    Attributes:
+        max_chunk_size (int): The maximum size of a chunk.
+        min_chunk_size (int): The minimum size of a chunk, except the last chunk of a text.
+        target_chunk_size (int): The average size of a chunk beyond the minimum size.
+        size_function (Callable[[str], int]): The function measuring the size of a text.
+        boundary_pattern (Optional[re.Pattern]): The pattern matching the start of the sections of the text.
+        overlap_size (int): The maximum size of the lines at the end of a chunk to repeat at the start of the next one.
+    """
+
+    __HASH_RANGE = 2 ** 32
+
+    def __init__(self, max_chunk_size: int, min_chunk_size: Optional[int] = None, target_chunk_size: Optional[int] = None,
+                 size_function: Optional[Callable[[str], int]] = None, boundary_pattern: Optional[str] = None,
+                 overlap_size: int = 0):
+        """
+        Initializes the ContentDefinedChunker with the given sizes.
+        Args:
+            max_chunk_size (int): The maximum size of a chunk.
+            min_chunk_size (Optional[int], optional): The minimum size of a chunk. Defaults to a quarter
+                of the maximum size.
+            target_chunk_size (Optional[int], optional): The average size of a chunk beyond the minimum
+                size. Defaults to a quarter of the maximum size.
+            size_function (Optional[Callable[[str], int]], optional): The function measuring the size of a text.
+                Defaults to the number of characters.
+            boundary_pattern (Optional[str], optional): The regular expression, in multiline mode, matching the start
+                of the sections of the text. Defaults to None, to split on any line.
+            overlap_size (int, optional): The maximum size of the lines at the end of a chunk to repeat at the start
+                of the next one, returned by overlap. Defaults to 0, for no overlap.
+        """
+        self.__max_chunk_size = max_chunk_size
+        self.__min_chunk_size = min_chunk_size if min_chunk_size is not None else max_chunk_size // 4
+        self.__target_chunk_size = target_chunk_size if target_chunk_size is not None else max(max_chunk_size // 4, 1)
+        self.__size_function = size_function if size_function is not None else len
+        self.__boundary_pattern = re.compile(boundary_pattern, re.MULTILINE) if boundary_pattern else None
+        self.__overlap_size = overlap_size
+
+    def split(self, text: str) -> list[str]:
+        """
+        Splits the given text into chunks.
+        Args:
+            text (str): The text to split.
+        Returns:
+            list[str]: The chunks, which joined together give back the text. An empty text gives no chunks.
+        """
+        chunks = []
+        current = []
+        current_size = 0
+
+        for unit in self.__units(text):
+            unit_size = self.__size_function(unit)
+            if current_size + unit_size > self.__max_chunk_size and current:
+                chunks.append("".join(current))
+                current, current_size = [], 0
+            current.append(unit)
+            current_size += unit_size
+            if current_size >= self.__min_chunk_size and self.__is_boundary(unit, unit_size):
+                chunks.append("".join(current))
+                current, current_size = [], 0
+
+        if current:
+            chunks.append("".join(current))
+        return chunks
+
+    def __units(self, text: str) -> list[str]:
+        """
+        Splits the given text into the units where a chunk can end: the sections starting at each match of the boundary
+        pattern, or the lines without a pattern. The units larger than max_chunk_size are split into lines, and the lines
+        larger than that are cut at fixed offsets.
+        Args:
+            text (str): The text to split.
+        Returns:
+            list[str]: The units of the text, which joined together give back the text.
+        """
+        if self.__boundary_pattern is not None:
+            starts = sorted({0} | {match.start() for match in self.__boundary_pattern.finditer(text)})
+            sections = [text[start:end] for start, end in zip(starts, starts[1:] + [len(text)]) if start < end]
+        else:
+            sections = text.splitlines(keepends=True)
+
+        units = []
+        for section in sections:
+            if self.__size_function(section) <= self.__max_chunk_size:
+                units.append(section)
+                continue
+            for line in section.splitlines(keepends=True):
+                line_size = self.__size_function(line)
+                if line_size <= self.__max_chunk_size:
+                    units.append(line)
+                    continue
+                # Lunghezza in caratteri dei pezzi della riga, stimata dalla dimensione media di un carattere
+                piece_length = max(len(line) * self.__max_chunk_size // line_size, 1)
+                units.extend(line[i:i + piece_length] for i in range(0, len(line), piece_length))
+        return units
+
+    def __is_boundary(self, unit: str, unit_size: int) -> bool:
+        """
+        Decides whether a chunk ends after the given unit, with a probability proportional to the size of the unit.
+        Only the first line of the unit is hashed, so that editing the body of a section does not move the boundary.
+        Args:
+            unit (str): The unit.
+            unit_size (int): The size of the unit.
+        Returns:
+            bool: True if a chunk ends after the unit.
+        """
+        threshold = min(unit_size * self.__HASH_RANGE // self.__target_chunk_size, self.__HASH_RANGE)
+        first_line = unit.splitlines(keepends=True)[0]
+        return zlib.crc32(first_line.encode("utf-8")) < threshold
+
+    def overlap(self, chunk: str) -> str:
+        """
+        Returns the last lines of the given chunk whose total size does not exceed overlap_size, to be repeated at the
+        start of the next chunk so that the context across the boundary is not lost.
+        Args:
+            chunk (str): The chunk.
+        Returns:
+            str: The last lines of the chunk, possibly empty.
+        """
+        overlap = []
+        overlap_size = 0
+        for line in reversed(chunk.splitlines(keepends=True)):
+            overlap_size += self.__size_function(line)
+            if overlap_size > self.__overlap_size:
+                break
+            overlap.append(line)
+        return "".join(reversed(overlap))
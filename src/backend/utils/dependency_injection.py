@@ -2,9 +2,16 @@ import os
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 import chromadb
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction, OpenAIEmbeddingFunction
 from github import Github
+from github.GithubRetry import GithubRetry
+from github.Requester import Requester
 import base64
 import psycopg2
+import json
+import socket
+import tiktoken
+from beartype.typing import Callable, Optional
 
 from models.header import Header
 from models.documentConstraints import DocumentConstraints
@@ -14,6 +21,7 @@ from controllers.saveMessageController import SaveMessageController
 from controllers.getMessagesController import GetMessagesController
 from controllers.getNextPossibleQuestionsController import GetNextPossibleQuestionsController
 from controllers.getLastLoadOutcomeController import GetLastLoadOutcomeController
+from controllers.getLastLoadStagesController import GetLastLoadStagesController
 from services.similaritySearchService import SimilaritySearchService
 from services.generateAnswerService import GenerateAnswerService
 from services.chatService import ChatService
@@ -23,6 +31,7 @@ from services.saveMessageService import SaveMessageService
 from services.getMessagesService import GetMessagesService
 from services.getNextPossibleQuestionsService import GetNextPossibleQuestionsService
 from services.getLastLoadOutcomeService import GetLastLoadOutcomeService
+from services.getLastLoadStagesService import GetLastLoadStagesService
 from adapters.chromaVectorStoreAdapter import ChromaVectorStoreAdapter
 from adapters.langChainAdapter import LangChainAdapter
 from adapters.gitHubAdapter import GitHubAdapter
@@ -30,11 +39,20 @@ from adapters.jiraAdapter import JiraAdapter
 from adapters.confluenceAdapter import ConfluenceAdapter
 from adapters.postgresAdapter import PostgresAdapter
 from repositories.chromaVectorStoreRepository import ChromaVectorStoreRepository
+from repositories.chromaManifestRepository import ChromaManifestRepository
 from repositories.langChainRepository import LangChainRepository
 from repositories.gitHubRepository import GitHubRepository
+from repositories.gitMirrorRepository import GitMirrorRepository
 from repositories.jiraRepository import JiraRepository
 from repositories.confluenceRepository import ConfluenceRepository
 from repositories.postgresRepository import PostgresRepository
+from utils.http_client import HttpClient
+from utils.embedding_cache import EmbeddingCache
+from utils.parallel_embedder import ParallelEmbedder
+from utils.refresh_lease import RefreshLease
+from utils.run_checkpoint import RunCheckpoint
+from utils.github_http_cache import GitHubHttpCache
+from utils.rate_limit_budget import RateLimitBudget
 from utils.logger import logger
 from utils.beartype_personalized import beartype_personalized
 
@@ -65,6 +83,42 @@ def initialize_langchain() -> LangChainAdapter:
         logger.error(f"Error during LangChain initialization: {e}")
         raise e
 
+@beartype_personalized
+def initialize_embedding_function() -> tuple[Callable, str]:
+    """
+    Initializes and returns the embedding function of the chunks, chosen through the EMBEDDING_FUNCTION environment variable:
+    "default" for the local ONNX MiniLM model shipped with Chroma, "openai" for the OpenAI embedding model specified
+    in the EMBEDDING_MODEL_NAME environment variable.
+    Returns:
+      - tuple[Callable, str]: The embedding function and the name of its model.
+    Raises:
+      - ValueError: If the embedding function is not supported.
+    """
+    embedding_function_name = os.getenv("EMBEDDING_FUNCTION", "default")
+    if embedding_function_name == "default":
+        return DefaultEmbeddingFunction(), "all-MiniLM-L6-v2"
+    if embedding_function_name == "openai":
+        model_name = os.getenv("EMBEDDING_MODEL_NAME", "text-embedding-3-small")
+        return OpenAIEmbeddingFunction(api_key=os.getenv("OPENAI_API_KEY"), model_name=model_name), model_name
+    raise ValueError(f"Unsupported embedding function: {embedding_function_name}")
+
+@beartype_personalized
+def initialize_token_counter() -> Optional[Callable[[str], int]]:
+    """
+    Initializes and returns the function counting the tokens of a text with the tokenizer of the LLM model specified
+    in the OPENAI_MODEL_NAME environment variable.
+    Returns:
+      - Optional[Callable[[str], int]]: The function counting the tokens, or None if the tokenizer cannot be loaded,
+        e.g. because its encoding cannot be downloaded: the tokens are then approximated from the characters.
+    """
+    model_name = os.getenv("OPENAI_MODEL_NAME", "gpt-4o")
+    try:
+        encoding = tiktoken.encoding_for_model(model_name)
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception as e:
+        logger.info(f"Tokenizer of {model_name} not available, approximating the tokens of the chunks: {e}")
+        return None
+
 @beartype_personalized
 def initialize_chroma() -> ChromaVectorStoreAdapter:
     """
@@ -80,10 +134,34 @@ def initialize_chroma() -> ChromaVectorStoreAdapter:
                                             port=int(os.getenv("CHROMA_PORT", "8000")))  # Connessione al server Chroma
         chroma_client.heartbeat()  # Verifica connessione
         chroma_collection_name = "buddybot-vector-store"
-        chroma_collection = chroma_client.get_or_create_collection(name=chroma_collection_name)  # Crea o ottieni una collezione esistente
-        chroma_vector_store_repository = ChromaVectorStoreRepository(chroma_collection)
+        embedding_function, embedding_model_name = initialize_embedding_function()
+        chroma_collection = chroma_client.get_or_create_collection(name=chroma_collection_name,
+                                                                   embedding_function=embedding_function)  # Crea o ottieni una collezione esistente
+        # La dimensione delle batch non può superare quella massima accettata dal server
+        chroma_batch_size = min(int(os.getenv("CHROMA_BATCH_SIZE", "500")), chroma_client.get_max_batch_size())
+        chroma_write_workers = int(os.getenv("CHROMA_WRITE_WORKERS", "4"))
+        chroma_write_retries = int(os.getenv("CHROMA_WRITE_RETRIES", "3"))
+        chroma_manifest_repository = ChromaManifestRepository(os.getenv("CHROMA_MANIFEST_PATH", "chroma_manifest.sqlite"))
+        # Gli embedding dei chunk da scrivere vengono calcolati sul client, in batch distribuite su tutti i core
+        parallel_embedder = ParallelEmbedder(embedding_function, int(os.getenv("EMBEDDING_BATCH_SIZE", "64")),
+                                             int(os.getenv("EMBEDDING_WORKERS", str(os.cpu_count() or 1))))
+        embedding_cache = EmbeddingCache(os.getenv("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite"), parallel_embedder,
+                                         embedding_model_name, int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100000")))
+        # Il manifest viene salvato ogni CHROMA_CHECKPOINT_SIZE chunk scritti: un caricamento interrotto riprende da lì
+        chroma_checkpoint_size = int(os.getenv("CHROMA_CHECKPOINT_SIZE", "5000"))
+        chroma_vector_store_repository = ChromaVectorStoreRepository(chroma_collection, chroma_manifest_repository, chroma_batch_size,
+                                                                     chroma_write_workers, chroma_write_retries, embedding_cache,
+                                                                     chroma_checkpoint_size)
         max_chunk_size = 41666  # 42 KB
-        chroma_vector_store_adapter = ChromaVectorStoreAdapter(max_chunk_size, chroma_vector_store_repository)
+        # Target e sovrapposizione in token dei chunk per tipo di documento. Di default tutto viene suddiviso a righe:
+        # attivare la suddivisione in token cambia gli id dei chunk, e comporta la riscrittura e il ricalcolo degli
+        # embedding di tutti i documenti dei tipi indicati al primo aggiornamento
+        token_settings = json.loads(os.getenv("CHUNK_TOKEN_SETTINGS", "{}"))
+        chroma_vector_store_adapter = ChromaVectorStoreAdapter(
+            max_chunk_size, chroma_vector_store_repository,
+            {item_type: (int(target), int(overlap)) for item_type, (target, overlap) in token_settings.items()},
+            initialize_token_counter()
+        )
         logger.info("Chroma collection loaded")
         return chroma_vector_store_adapter
     except Exception as e:
@@ -154,6 +232,49 @@ def initialize_postgres() -> PostgresAdapter:
                 num_deleted_items INTEGER
             );
             """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS leases (
+                name VARCHAR(50) PRIMARY KEY,
+                holder VARCHAR(255),
+                expires_at TIMESTAMP WITH TIME ZONE
+            );
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS lease_replicas (
+                name VARCHAR(50) PRIMARY KEY,
+                replica VARCHAR(255)
+            );
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS stage_logs (
+                id SERIAL PRIMARY KEY,
+                loading_attempt_id INTEGER REFERENCES loading_attempts(id),
+                stage VARCHAR(50),
+                duration DOUBLE PRECISION,
+                num_items INTEGER,
+                num_bytes BIGINT,
+                num_api_calls INTEGER,
+                peak_memory BIGINT
+            );
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS watermarks (
+                loading_item VARCHAR(50),
+                source VARCHAR(255),
+                last_timestamp TIMESTAMP WITH TIME ZONE,
+                last_id VARCHAR(255),
+                PRIMARY KEY (loading_item, source)
+            );
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS github_file_dates (
+                source VARCHAR(255),
+                path TEXT,
+                last_update TIMESTAMP,
+                creation_date TIMESTAMP,
+                PRIMARY KEY (source, path)
+            );
+            """)
         conn.commit()
 
         postgres_repository = PostgresRepository(conn)
@@ -169,6 +290,10 @@ def initialize_github() -> GitHubAdapter:
     """
     Initializes and returns an instance of GitHubAdapter.
     Configures the GitHub client using the token specified in the environment variables and retrieves the specified repository.
+    If the GITHUB_BACKEND environment variable is set to "mirror", commits and files are read from a bare git mirror
+    kept in GITHUB_MIRROR_PATH instead of through the GitHub API.
+    Otherwise the requests of PyGithub go through an on-disk HTTP cache, sending conditional requests for the cached
+    responses, and through a budget of the rate limit of the token.
     Returns:
       - GitHubAdapter: An instance of GitHubAdapter.
     Raises:
@@ -176,9 +301,25 @@ def initialize_github() -> GitHubAdapter:
     """
     try:
         github_token = os.getenv("GITHUB_TOKEN")
-        github = Github(github_token)
-        github_repo = github.get_repo(f"{os.getenv('OWNER')}/{os.getenv('REPO')}")
-        github_repository = GitHubRepository(github_repo)
+        full_name = f"{os.getenv('OWNER')}/{os.getenv('REPO')}"
+        if os.getenv("GITHUB_BACKEND", "api") == "mirror":
+            github_repository = GitMirrorRepository(f"https://github.com/{full_name}.git",
+                                                    os.getenv("GITHUB_MIRROR_PATH", "github_mirror.git"),
+                                                    full_name, f"https://github.com/{full_name}", github_token)
+        else:
+            # I dettagli dei commit vengono scaricati in parallelo, entro i limiti secondari di GitHub sulle richieste concorrenti
+            github_max_concurrency = int(os.getenv("GITHUB_MAX_CONCURRENCY", "8"))
+            # Le risposte 304 (Not Modified) alle richieste condizionali non vengono conteggiate nel rate limit
+            rate_limit_budget = RateLimitBudget(int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", "100")),
+                                                int(os.getenv("GITHUB_RATE_LIMIT_PACING_THRESHOLD", "1000")))
+            github_http_cache = GitHubHttpCache(os.getenv("GITHUB_HTTP_CACHE_PATH", "github_http_cache.sqlite"),
+                                                rate_limit_budget, int(os.getenv("GITHUB_HTTP_CACHE_MAX_ENTRIES", "100000")),
+                                                max_retries=GithubRetry(),
+                                                pool_maxsize=github_max_concurrency)
+            Requester.injectConnectionClasses(*github_http_cache.connection_classes())
+            github = Github(github_token)
+            github_repo = github.get_repo(full_name)
+            github_repository = GitHubRepository(github_repo, github_max_concurrency, github_http_cache, rate_limit_budget)
         github_adapter = GitHubAdapter(github_repository)
         logger.info("GitHub repository loaded")
         return github_adapter
@@ -187,12 +328,13 @@ def initialize_github() -> GitHubAdapter:
         raise e
 
 @beartype_personalized
-def initialize_atlassian() -> tuple[int, dict[str, str]]:
+def initialize_atlassian() -> tuple[int, dict[str, str], HttpClient]:
     """
     Initializes and returns the configuration parameters for Atlassian.
-    Configures the authentication and timeout parameters for Atlassian requests.
+    Configures the authentication and timeout parameters for Atlassian requests, and the HTTP client
+    shared by Jira and Confluence, which pools the connections and bounds the request rate and concurrency.
     Returns:
-      - tuple[int, dict[str, str]]: Request timeout and authentication headers.
+      - tuple[int, dict[str, str], HttpClient]: Request timeout, authentication headers and HTTP client.
     Raises:
       - Exception: If an error occurs during Atlassian initialization.
     """
@@ -207,19 +349,24 @@ def initialize_atlassian() -> tuple[int, dict[str, str]]:
             "Accept": "application/json",
             "Content-Type": "application/json"
         }
-        return requests_timeout, requests_headers
+        atlassian_max_in_flight = int(os.getenv("ATLASSIAN_MAX_IN_FLIGHT", "4"))
+        atlassian_rate_limit = float(os.getenv("ATLASSIAN_RATE_LIMIT", "10"))
+        http_client = HttpClient(requests_timeout, requests_headers, atlassian_max_in_flight,
+                                 requests_per_second=atlassian_rate_limit if atlassian_rate_limit > 0 else None)
+        return requests_timeout, requests_headers, http_client
     except Exception as e:
         logger.error(f"Error during Atlassian initialization: {e}")
         raise e
 
 @beartype_personalized
-def initialize_jira(requests_timeout: int, requests_headers: dict[str, str]) -> JiraAdapter:
+def initialize_jira(requests_timeout: int, requests_headers: dict[str, str], http_client: HttpClient) -> JiraAdapter:
     """
     Initializes and returns an instance of JiraAdapter.
     Configures the Jira client using the specified configuration parameters.
     Args:
       - requests_timeout (int): Request timeout.
       - requests_headers (dict[str, str]): Authentication headers.
+      - http_client (HttpClient): HTTP client shared by the Atlassian repositories.
     Returns:
       - JiraAdapter: An instance of JiraAdapter.
     Raises:
@@ -228,7 +375,7 @@ def initialize_jira(requests_timeout: int, requests_headers: dict[str, str]) ->
     try:
         jira_base_url = os.getenv("JIRA_BASE_URL")
         jira_project_key = os.getenv("JIRA_PROJECT_KEY")
-        jira_repository = JiraRepository(jira_base_url, jira_project_key, requests_timeout, requests_headers)
+        jira_repository = JiraRepository(jira_base_url, jira_project_key, requests_timeout, requests_headers, http_client)
         jira_adapter = JiraAdapter(jira_repository)
         logger.info("Jira project loaded")
         return jira_adapter
@@ -237,13 +384,14 @@ def initialize_jira(requests_timeout: int, requests_headers: dict[str, str]) ->
         raise e
 
 @beartype_personalized
-def initialize_confluence(requests_timeout: int, requests_headers: dict[str, str]) -> ConfluenceAdapter:
+def initialize_confluence(requests_timeout: int, requests_headers: dict[str, str], http_client: HttpClient) -> ConfluenceAdapter:
     """
     Initializes and returns an instance of ConfluenceAdapter.
     Configures the Confluence client using the specified configuration parameters.
     Args:
       - requests_timeout (int): Request timeout.
       - requests_headers (dict[str, str]): Authentication headers.
+      - http_client (HttpClient): HTTP client shared by the Atlassian repositories.
     Returns:
       - ConfluenceAdapter: An instance of ConfluenceAdapter.
     Raises:
@@ -252,7 +400,7 @@ def initialize_confluence(requests_timeout: int, requests_headers: dict[str, str
     try:
         confluence_base_url = os.getenv("CONFLUENCE_BASE_URL")
         confluence_space_key = os.getenv("CONFLUENCE_SPACE_KEY")
-        confluence_repository = ConfluenceRepository(confluence_base_url, confluence_space_key, requests_timeout, requests_headers)
+        confluence_repository = ConfluenceRepository(confluence_base_url, confluence_space_key, requests_timeout, requests_headers, http_client)
         confluence_adapter = ConfluenceAdapter(confluence_repository)
         logger.info("Confluence space loaded")
         return confluence_adapter
@@ -320,6 +468,8 @@ def dependency_injection_frontend() -> dict[str, object]:
 
         get_last_load_outcome_service = GetLastLoadOutcomeService(postgres_adapter)
         get_last_load_outcome_controller = GetLastLoadOutcomeController(get_last_load_outcome_service)
+        get_last_load_stages_service = GetLastLoadStagesService(postgres_adapter)
+        get_last_load_stages_controller = GetLastLoadStagesController(get_last_load_stages_service)
 
 
         # =========================== 7. Architettura del salvataggio dei messaggi nello storico ============================
@@ -364,6 +514,7 @@ def dependency_injection_frontend() -> dict[str, object]:
         return {
             "chat_controller": chat_controller,
             "get_last_load_outcome_controller": get_last_load_outcome_controller,
+            "get_last_load_stages_controller": get_last_load_stages_controller,
             "save_message_controller": save_message_controller,
             "get_messages_controller": get_messages_controller,
             "get_next_possible_questions_controller": get_next_possible_questions_controller
@@ -376,9 +527,11 @@ def dependency_injection_frontend() -> dict[str, object]:
 
 
 @beartype_personalized
-def dependency_injection_cron() -> dict[str, object]:
+def dependency_injection_cron(full_sync: bool = False) -> dict[str, object]:
     """
     Configures and returns the dependencies needed for the cron functionality.
+    Args:
+      - full_sync (bool): Whether to ignore the watermarks of the previous loadings and reload everything from scratch.
     Returns:
       - dict[str, object]: A dictionary containing the configured dependencies.
     Raises:
@@ -396,13 +549,13 @@ def dependency_injection_cron() -> dict[str, object]:
         github_adapter = initialize_github()
 
         # Atlassian (Jira e Confluence)
-        requests_timeout, requests_headers = initialize_atlassian()
+        requests_timeout, requests_headers, http_client = initialize_atlassian()
 
         # Jira
-        jira_adapter = initialize_jira(requests_timeout, requests_headers)
+        jira_adapter = initialize_jira(requests_timeout, requests_headers, http_client)
 
         # Confluence
-        confluence_adapter = initialize_confluence(requests_timeout, requests_headers)
+        confluence_adapter = initialize_confluence(requests_timeout, requests_headers, http_client)
         confluence_cleaner_service = ConfluenceCleanerService()
 
         # Chroma
@@ -411,9 +564,24 @@ def dependency_injection_cron() -> dict[str, object]:
         # Postgres
         postgres_adapter = initialize_postgres()
 
+        # Lease dell'aggiornamento, con una connessione dedicata: i rinnovi non devono confermare le transazioni del caricamento
+        refresh_lease_ttl = int(os.getenv("REFRESH_LEASE_TTL", "300"))
+        # Il manifest, i checkpoint e le cache sono file locali al container: la replica è identificata dall'host
+        refresh_lease = RefreshLease(initialize_postgres(), "vector_store_refresh", f"{socket.gethostname()}:{os.getpid()}",
+                                     refresh_lease_ttl, socket.gethostname())
+
+        # Checkpoint degli elementi scaricati, per riprendere un aggiornamento interrotto senza scaricarli di nuovo
+        run_checkpoint = RunCheckpoint(os.getenv("RUN_CHECKPOINT_PATH", "run_checkpoint.sqlite"),
+                                       int(os.getenv("RUN_CHECKPOINT_MAX_AGE", "3600")))
+
         # Catena di load_files
+        loading_max_workers = int(os.getenv("LOADING_MAX_WORKERS", "4"))
+        # Secondi sottratti ai watermark, per scaricare di nuovo gli elementi a cavallo del watermark
+        watermark_overlap = int(os.getenv("WATERMARK_OVERLAP", "7200"))
         load_files_service = LoadFilesService(github_adapter, jira_adapter, confluence_adapter, confluence_cleaner_service,
-                                              chroma_vector_store_adapter, postgres_adapter)
+                                              chroma_vector_store_adapter, postgres_adapter, loading_max_workers,
+                                              postgres_adapter, full_sync, refresh_lease, run_checkpoint, watermark_overlap,
+                                              postgres_adapter)
         load_files_controller = LoadFilesController(load_files_service)
 
 
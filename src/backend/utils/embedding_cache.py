@@ -0,0 +1,140 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import numpy as np
+from contextlib import closing
+from beartype.typing import Callable
+
+from utils.logger import logger
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class EmbeddingCache:
+    """
+    On-disk cache of the embeddings of the chunks, keyed by embedding model and hash of the content, so that a chunk
+    already embedded, e.g. a file renamed or moved, or a document written again after a failed loading, is not embedded again.
+    The cache is kept in a SQLite database, created if missing, and holds at most max_entries embeddings:
+    when it is full, the least recently used embeddings are evicted.
+    Attributes:
+        path (str): The path of the SQLite database file.
+        embedding_function (Callable): The function computing the embeddings of a list of texts.
+        model_name (str): The name of the embedding model, part of the key of the cached embeddings.
+        max_entries (int): The maximum number of cached embeddings.
+    """
+
+    def __init__(self, path: str, embedding_function: Callable, model_name: str, max_entries: int = 100000):
+        """
+        Initializes the EmbeddingCache, creating the embeddings table if it does not exist.
+        Args:
+            path (str): The path of the SQLite database file.
+            embedding_function (Callable): The function computing the embeddings of a list of texts.
+            model_name (str): The name of the embedding model, part of the key of the cached embeddings.
+            max_entries (int, optional): The maximum number of cached embeddings. Defaults to 100000.
+        Raises:
+            sqlite3.Error: If an error occurs while creating the table.
+        """
+        self.__path = path
+        self.__embedding_function = embedding_function
+        self.__model_name = model_name
+        self.__max_entries = max_entries
+        # Le batch vengono scritte da più thread: gli accessi al database sono serializzati, il calcolo degli embedding no
+        self.__lock = threading.Lock()
+        self.__num_hits = 0
+        self.__num_misses = 0
+
+        with self.__lock, closing(sqlite3.connect(self.__path)) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    last_used INTEGER NOT NULL,
+                    PRIMARY KEY (model, content_hash)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+
+    def get_num_hits(self) -> int:
+        return self.__num_hits
+
+    def get_num_misses(self) -> int:
+        return self.__num_misses
+
+    def embed(self, texts: list[str]) -> list[np.ndarray]:
+        """
+        Returns the embeddings of the given texts, computing only those missing from the cache.
+        Args:
+            texts (list[str]): The texts to embed.
+        Returns:
+            list[np.ndarray]: The embedding of each text, in the same order as the texts.
+        Raises:
+            Exception: If an error occurs while computing the embeddings or accessing the cache.
+        """
+        try:
+            hashes = [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in texts]
+            embeddings = self.__get(set(hashes))
+
+            # I testi identici all'interno della stessa batch vengono calcolati una sola volta
+            missing = {content_hash: text for content_hash, text in zip(hashes, texts) if content_hash not in embeddings}
+            if missing:
+                computed = self.__embedding_function(list(missing.values()))
+                new_embeddings = {
+                    content_hash: np.asarray(embedding, dtype=np.float32)
+                    for content_hash, embedding in zip(missing.keys(), computed)
+                }
+                self.__put(new_embeddings)
+                embeddings.update(new_embeddings)
+
+            with self.__lock:
+                self.__num_hits += len(texts) - len(missing)
+                self.__num_misses += len(missing)
+
+            return [embeddings[content_hash] for content_hash in hashes]
+        except Exception as e:
+            logger.error(f"Error getting embeddings from the cache: {e}")
+            raise e
+
+    def __get(self, hashes: set[str]) -> dict[str, np.ndarray]:
+        """
+        Reads the cached embeddings with the given hashes, marking them as recently used.
+        Args:
+            hashes (set[str]): The hashes of the contents.
+        Returns:
+            dict[str, np.ndarray]: The cached embeddings, by hash of the content.
+        """
+        embeddings = {}
+        with self.__lock, closing(sqlite3.connect(self.__path)) as conn, conn:
+            for content_hash in hashes:
+                row = conn.execute(
+                    "SELECT embedding FROM embeddings WHERE model = ? AND content_hash = ?",
+                    (self.__model_name, content_hash)
+                ).fetchone()
+                if row is not None:
+                    embeddings[content_hash] = np.frombuffer(row[0], dtype=np.float32)
+            conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND content_hash = ?",
+                [(time.time_ns(), self.__model_name, content_hash) for content_hash in embeddings]
+            )
+        return embeddings
+
+    def __put(self, embeddings: dict[str, np.ndarray]):
+        """
+        Saves the given embeddings in the cache, evicting the least recently used ones beyond max_entries.
+        Args:
+            embeddings (dict[str, np.ndarray]): The embeddings to save, by hash of the content.
+        """
+        with self.__lock, closing(sqlite3.connect(self.__path)) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, content_hash, embedding, last_used) VALUES (?, ?, ?, ?)",
+                [(self.__model_name, content_hash, embedding.tobytes(), time.time_ns())
+                 for content_hash, embedding in embeddings.items()]
+            )
+            num_entries = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if num_entries > self.__max_entries:
+                conn.execute(
+                    "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (num_entries - self.__max_entries,)
+                )
@@ -0,0 +1,274 @@
+import json
+import sqlite3
+import threading
+import time
+import requests
+from contextlib import closing
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from beartype.typing import Optional, Tuple
+from urllib.parse import urlsplit
+from github.Requester import Requester, HTTPSRequestsConnectionClass
+
+from models.httpStats import HttpStats
+from utils.rate_limit_budget import RateLimitBudget
+from utils.logger import logger
+
+# Senza beartype_personalized: beartype verificherebbe anche i metodi ereditati da HTTPAdapter, le cui annotazioni
+# contengono riferimenti non risolvibili
+class GitHubHttpCache(HTTPAdapter):
+    """
+    Transport adapter of the requests of PyGithub, caching on disk the GET responses with an ETag or a Last-Modified
+    header and sending them again as conditional requests (If-None-Match, If-Modified-Since): when the resource has not
+    changed, GitHub replies with a 304 (Not Modified), not counted against the rate limit, and the cached response is
+    returned in its place. Every request goes through the rate limit budget, if given.
+    The cache is kept in a SQLite database, created if missing, and holds at most max_entries responses: when it is full,
+    the least recently used responses are evicted.
+    Attributes:
+        path (str): The path of the SQLite database file.
+        rate_limit_budget (Optional[RateLimitBudget]): The budget of the requests to the GitHub API.
+        max_entries (int): The maximum number of cached responses.
+    """
+
+    # Header che descrivono la codifica del corpo ricevuto: il corpo salvato è già decodificato
+    __TRANSFER_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+    def __init__(self, path: str, rate_limit_budget: Optional[RateLimitBudget] = None, max_entries: int = 100000,
+                 **kwargs):
+        """
+        Initializes the GitHubHttpCache, creating the responses table if it does not exist.
+        Args:
+            path (str): The path of the SQLite database file.
+            rate_limit_budget (Optional[RateLimitBudget], optional): The budget of the requests to the GitHub API.
+                Defaults to None, for no budget.
+            max_entries (int, optional): The maximum number of cached responses. Defaults to 100000.
+            **kwargs: The arguments of HTTPAdapter, e.g. max_retries and pool_maxsize.
+        Raises:
+            sqlite3.Error: If an error occurs while creating the table.
+        """
+        super().__init__(**kwargs)
+        self.__path = path
+        self.__rate_limit_budget = rate_limit_budget
+        self.__max_entries = max_entries
+        # Le richieste possono essere inviate da più thread: gli accessi al database e ai contatori sono serializzati
+        self.__lock = threading.Lock()
+        self.__num_requests = 0
+        self.__num_not_modified = 0
+        self.__num_bytes = 0
+        self.__total_latency = 0.0
+        # Statistiche per risorsa della repository (ad esempio "commits"): richieste, risposte 304, byte e latenza
+        self.__stats_by_key = {}
+
+        with self.__lock, closing(sqlite3.connect(self.__path)) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    last_used INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    def get_stats(self, stats_key: Optional[str] = None) -> HttpStats:
+        """
+        Returns the statistics of the requests sent since the creation of the adapter.
+        Args:
+            stats_key (Optional[str], optional): The resource of the repository of the requests to consider, i.e. the
+                first segment of the path after /repos/{owner}/{repo}/, e.g. "commits". Defaults to None, for all the
+                requests.
+        Returns:
+            HttpStats: The number of requests, the downloaded bytes and the total latency. The retries are handled by
+                max_retries inside each request, and are not counted.
+        """
+        with self.__lock:
+            if stats_key is not None:
+                num_requests, _, num_bytes, total_latency = self.__stats_by_key.get(stats_key, [0, 0, 0, 0.0])
+                return HttpStats(num_requests, 0, num_bytes, total_latency)
+            return HttpStats(self.__num_requests, 0, self.__num_bytes, self.__total_latency)
+
+    def get_num_not_modified(self, stats_key: Optional[str] = None) -> int:
+        """
+        Returns the number of conditional requests answered with a 304 (Not Modified) since the creation of the adapter,
+        i.e. of the responses read from the cache without consuming the rate limit.
+        Args:
+            stats_key (Optional[str], optional): The resource of the repository of the requests to consider, as in
+                get_stats. Defaults to None, for all the requests.
+        Returns:
+            int: The number of responses 304.
+        """
+        with self.__lock:
+            if stats_key is not None:
+                return self.__stats_by_key.get(stats_key, [0, 0, 0, 0.0])[1]
+            return self.__num_not_modified
+
+    def connection_classes(self) -> Tuple[type, type]:
+        """
+        Creates the HTTP and HTTPS connection classes of PyGithub sending the requests through this adapter, to be passed
+        to Requester.injectConnectionClasses.
+        All the connections share a single session, so that the connections to GitHub stay open in the pool of the
+        adapter even if PyGithub creates a connection for each request.
+        Returns:
+            Tuple[type, type]: The HTTP and the HTTPS connection classes.
+        """
+        session = requests.Session()
+        # Con auth impostato la sessione non legge le credenziali dal file .netrc, come nelle connessioni di PyGithub
+        session.auth = Requester.noopAuth
+        session.mount("https://", self)
+        session.mount("http://", self)
+
+        def init(connection, host: str, port: Optional[int] = None, strict: bool = False, timeout: Optional[int] = None,
+                 retry=None, pool_size: Optional[int] = None, **kwargs):
+            connection.port = port if port else (443 if connection.protocol == "https" else 80)
+            connection.host = host
+            connection.timeout = timeout
+            connection.verify = kwargs.get("verify", True)
+            connection.session = session
+
+        # La sessione condivisa non viene chiusa insieme alle singole connessioni
+        members = {"__init__": init, "close": lambda connection: None}
+        http_class = type("GitHubHttpCacheConnection", (HTTPSRequestsConnectionClass,), {"protocol": "http", **members})
+        https_class = type("GitHubHttpsCacheConnection", (HTTPSRequestsConnectionClass,), {"protocol": "https", **members})
+        return http_class, https_class
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False, **kwargs) -> requests.Response:
+        """
+        Sends a request, as a conditional request if a response with the same URL is cached.
+        Args:
+            request (requests.PreparedRequest): The request to send.
+            stream (bool, optional): Whether the body of the response is streamed: such responses are not cached.
+                Defaults to False.
+            **kwargs: The other arguments of HTTPAdapter.send.
+        Returns:
+            requests.Response: The response, or the cached response if the resource has not changed.
+        Raises:
+            RateLimitExceededException: If the request is deferred by the rate limit budget.
+            requests.RequestException: If the request fails.
+        """
+        cacheable = request.method == "GET" and not stream
+        key = f"{request.url} {request.headers.get('Accept', '')}"
+        cached = self.__get(key) if cacheable else None
+        if cached is not None:
+            etag, last_modified, _, _ = cached
+            if etag is not None:
+                request.headers["If-None-Match"] = etag
+            if last_modified is not None:
+                request.headers["If-Modified-Since"] = last_modified
+
+        if self.__rate_limit_budget is not None:
+            self.__rate_limit_budget.acquire(conditional=cached is not None)
+        started = time.monotonic()
+        response = super().send(request, stream=stream, **kwargs)
+        if self.__rate_limit_budget is not None:
+            self.__rate_limit_budget.update(response.headers)
+
+        not_modified = cached is not None and response.status_code == 304
+        num_bytes = len(response.content or b"") if not stream else 0
+        latency = time.monotonic() - started
+        stats_key = self.__stats_key(request.url)
+        with self.__lock:
+            self.__num_requests += 1
+            self.__num_not_modified += 1 if not_modified else 0
+            self.__num_bytes += num_bytes
+            self.__total_latency += latency
+            if stats_key is not None:
+                key_stats = self.__stats_by_key.setdefault(stats_key, [0, 0, 0, 0.0])
+                key_stats[0] += 1
+                key_stats[1] += 1 if not_modified else 0
+                key_stats[2] += num_bytes
+                key_stats[3] += latency
+
+        if not_modified:
+            return self.__cached_response(response, cached)
+        if cacheable and response.status_code == 200 and ("ETag" in response.headers or "Last-Modified" in response.headers):
+            self.__put(key, response)
+        return response
+
+    @staticmethod
+    def __stats_key(url: str) -> Optional[str]:
+        """
+        Returns the resource of the repository requested by the given URL, under which the statistics are collected.
+        Args:
+            url (str): The URL of the request.
+        Returns:
+            Optional[str]: The first segment of the path after /repos/{owner}/{repo}/, or None for the other requests.
+        """
+        segments = urlsplit(url).path.strip("/").split("/")
+        # Con GitHub Enterprise il percorso delle API inizia con /api/v3
+        if segments[:2] == ["api", "v3"]:
+            segments = segments[2:]
+        return segments[3] if len(segments) > 3 and segments[0] == "repos" else None
+
+    def __cached_response(self, response: requests.Response, cached: tuple) -> requests.Response:
+        """
+        Builds the response to return in place of a 304 (Not Modified), from the cached response.
+        The headers of the 304, e.g. the rate limit ones, replace those of the cached response.
+        Args:
+            response (requests.Response): The 304 response.
+            cached (tuple): The ETag, the Last-Modified, the headers and the body of the cached response.
+        Returns:
+            requests.Response: The cached response, with status 200.
+        """
+        _, _, headers, body = cached
+        cached_response = requests.Response()
+        cached_response.status_code = 200
+        cached_response.reason = "OK"
+        cached_response.headers = CaseInsensitiveDict(headers)
+        cached_response.headers.update({name: value for name, value in response.headers.items()
+                                        if name.lower() not in self.__TRANSFER_HEADERS})
+        cached_response._content = body
+        cached_response.encoding = get_encoding_from_headers(cached_response.headers)
+        cached_response.url = response.url
+        cached_response.request = response.request
+        cached_response.elapsed = response.elapsed
+        cached_response.connection = response.connection
+        return cached_response
+
+    def __get(self, key: str) -> Optional[tuple]:
+        """
+        Reads the cached response with the given key, marking it as recently used.
+        Args:
+            key (str): The URL and the Accept header of the request.
+        Returns:
+            Optional[tuple]: The ETag, the Last-Modified, the headers and the body of the response, or None if not cached.
+        """
+        try:
+            with self.__lock, closing(sqlite3.connect(self.__path)) as conn, conn:
+                row = conn.execute("SELECT etag, last_modified, headers, body FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time_ns(), key))
+            return row[0], row[1], json.loads(row[2]), row[3]
+        except Exception as e:
+            # Un errore della cache non deve far fallire la richiesta: viene inviata senza condizioni
+            logger.error(f"Error reading the GitHub HTTP cache: {e}")
+            return None
+
+    def __put(self, key: str, response: requests.Response):
+        """
+        Saves the given response in the cache, evicting the least recently used ones beyond max_entries.
+        Args:
+            key (str): The URL and the Accept header of the request.
+            response (requests.Response): The response to save.
+        """
+        try:
+            headers = {name: value for name, value in response.headers.items() if name.lower() not in self.__TRANSFER_HEADERS}
+            with self.__lock, closing(sqlite3.connect(self.__path)) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, etag, last_modified, headers, body, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, response.headers.get("ETag"), response.headers.get("Last-Modified"), json.dumps(headers),
+                     response.content, time.time_ns())
+                )
+                num_entries = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                if num_entries > self.__max_entries:
+                    conn.execute(
+                        "DELETE FROM responses WHERE rowid IN (SELECT rowid FROM responses ORDER BY last_used LIMIT ?)",
+                        (num_entries - self.__max_entries,)
+                    )
+        except Exception as e:
+            logger.error(f"Error writing the GitHub HTTP cache: {e}")
@@ -0,0 +1,230 @@
+import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from beartype.typing import Optional
+
+from models.httpStats import HttpStats
+from utils.logger import logger
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class HttpClient:
+    """
+    HTTP client shared by the repositories of the same platform, to fetch the pages of paginated REST APIs.
+    The requests go through a single session, which keeps the connections alive in a pool and negotiates
+    gzip compression. The client limits the request rate with a token bucket and the requests in flight to the
+    same host with a semaphore. The responses with status 429 (Too Many Requests) or 5xx, and the connection
+    errors, are retried after the delay indicated by the Retry-After header, or after an exponential backoff;
+    meanwhile no other request is sent, so that the whole client slows down instead of hammering the server.
+    The number of requests, the downloaded bytes and the latency are collected for the loading logs, in total and
+    for each stats key given with the requests, so that the repositories sharing the client can tell their own requests apart.
+    Attributes:
+        timeout (int): The timeout for API requests.
+        headers (dict[str, str]): The headers to include in API requests.
+        max_in_flight (int): The maximum number of requests in flight at the same time to the same host.
+        max_retries (int): The maximum number of retries of a failed request.
+        requests_per_second (Optional[float]): The maximum average number of requests per second, or None for no limit.
+    """
+
+    __RETRY_STATUSES = (429, 500, 502, 503, 504)
+    __MAX_RETRY_DELAY = 60
+
+    def __init__(self, timeout: int, headers: dict[str, str], max_in_flight: int = 4, max_retries: int = 5,
+                 requests_per_second: Optional[float] = None):
+        """
+        Initializes the HttpClient with the given parameters.
+        Args:
+            timeout (int): The timeout for API requests.
+            headers (dict[str, str]): The headers to include in API requests.
+            max_in_flight (int): The maximum number of requests in flight at the same time to the same host.
+            max_retries (int): The maximum number of retries of a failed request.
+            requests_per_second (Optional[float]): The maximum average number of requests per second, or None for no limit.
+                Up to max_in_flight requests can be sent in a burst.
+        """
+        self.__timeout = timeout
+        self.__max_in_flight = max_in_flight
+        self.__max_retries = max_retries
+        self.__requests_per_second = requests_per_second
+        self.__lock = threading.Lock()
+
+        # Una sola sessione per tutte le richieste: le connessioni restano aperte nel pool e vengono riutilizzate
+        self.__session = requests.Session()
+        self.__session.headers.update(headers)
+        self.__session.headers["Accept-Encoding"] = "gzip, deflate"
+        adapter = HTTPAdapter(pool_connections=max_in_flight, pool_maxsize=max_in_flight)
+        self.__session.mount("https://", adapter)
+        self.__session.mount("http://", adapter)
+
+        # Istante prima del quale nessuna richiesta può partire, impostato quando il server chiede di rallentare
+        self.__not_before = 0.0
+        # Token bucket: i token si ricaricano alla velocità richiesta, fino a un massimo di max_in_flight
+        self.__tokens = float(max_in_flight)
+        self.__last_refill = time.monotonic()
+        self.__host_semaphores = {}
+
+        self.__num_requests = 0
+        self.__num_retries = 0
+        self.__num_bytes = 0
+        self.__total_latency = 0.0
+        # Statistiche per chiave: [richieste, retry, byte, latenza totale]
+        self.__stats_by_key = {}
+
+    def get_max_in_flight(self) -> int:
+        """
+        Returns the maximum number of requests in flight at the same time to each host.
+        Returns:
+            int: The maximum number of concurrent requests per host.
+        """
+        return self.__max_in_flight
+
+    def get_stats(self, stats_key: Optional[str] = None) -> HttpStats:
+        """
+        Returns the statistics of the requests sent since the creation of the client.
+        Args:
+            stats_key (Optional[str], optional): The key of the requests to consider. Defaults to None, for all the requests.
+        Returns:
+            HttpStats: The number of requests and retries, the downloaded bytes and the total latency.
+        """
+        with self.__lock:
+            if stats_key is not None:
+                return HttpStats(*self.__stats_by_key.get(stats_key, [0, 0, 0, 0.0]))
+            return HttpStats(self.__num_requests, self.__num_retries, self.__num_bytes, self.__total_latency)
+
+    def __host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        """
+        Returns the semaphore bounding the requests in flight to the host of the given URL.
+        Args:
+            url (str): The URL of the request.
+        Returns:
+            threading.BoundedSemaphore: The semaphore of the host.
+        """
+        host = urlparse(url).netloc
+        with self.__lock:
+            if host not in self.__host_semaphores:
+                self.__host_semaphores[host] = threading.BoundedSemaphore(self.__max_in_flight)
+            return self.__host_semaphores[host]
+
+    def __wait_turn(self):
+        """
+        Waits until a request can be sent, respecting both the pause requested by the server and the rate limit.
+        """
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+                wait = self.__not_before - now
+                if wait <= 0 and self.__requests_per_second is not None:
+                    self.__tokens = min(float(self.__max_in_flight),
+                                        self.__tokens + (now - self.__last_refill) * self.__requests_per_second)
+                    self.__last_refill = now
+                    if self.__tokens >= 1:
+                        self.__tokens -= 1
+                    else:
+                        wait = (1 - self.__tokens) / self.__requests_per_second
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def __retry_delay(self, response: Optional[requests.Response], attempt: int) -> float:
+        """
+        Computes how long to wait before retrying a failed request.
+        Args:
+            response (Optional[requests.Response]): The failed response, or None if the connection failed.
+            attempt (int): The number of the attempt, starting from 0.
+        Returns:
+            float: The delay in seconds.
+        """
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after is not None:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                # Retry-After può essere anche una data HTTP
+                delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+        else:
+            delay = float(2 ** attempt)
+        return min(max(delay, 0.0), float(self.__MAX_RETRY_DELAY))
+
+    def fetch(self, url: str, params: dict, stats_key: Optional[str] = None) -> dict:
+        """
+        Fetches a single page, retrying it if the server asks to slow down or fails temporarily.
+        Args:
+            url (str): The URL of the API endpoint.
+            params (dict): The query parameters of the request.
+            stats_key (Optional[str], optional): The key under which the statistics of the request are also collected.
+                Defaults to None.
+        Returns:
+            dict: The JSON body of the response.
+        Raises:
+            requests.RequestException: If the request fails, or still fails after the maximum number of retries.
+        """
+        try:
+            attempt = 0
+            while True:
+                self.__wait_turn()
+
+                response = None
+                started = time.monotonic()
+                try:
+                    with self.__host_semaphore(url):
+                        response = self.__session.get(url, params=params, timeout=self.__timeout)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    if attempt >= self.__max_retries:
+                        raise e
+                    logger.info(f"Request to {url} failed ({e})")
+                finally:
+                    latency = time.monotonic() - started
+                    num_bytes = len(response.content or b"") if response is not None else 0
+                    with self.__lock:
+                        self.__num_requests += 1
+                        self.__num_retries += 1 if attempt > 0 else 0
+                        self.__total_latency += latency
+                        self.__num_bytes += num_bytes
+                        if stats_key is not None:
+                            key_stats = self.__stats_by_key.setdefault(stats_key, [0, 0, 0, 0.0])
+                            key_stats[0] += 1
+                            key_stats[1] += 1 if attempt > 0 else 0
+                            key_stats[2] += num_bytes
+                            key_stats[3] += latency
+
+                if response is not None and (response.status_code not in self.__RETRY_STATUSES or attempt >= self.__max_retries):
+                    response.raise_for_status()
+                    return response.json()
+
+                delay = self.__retry_delay(response, attempt)
+                if response is not None:
+                    logger.info(f"Request to {url} failed with status {response.status_code}: retrying in {delay:.1f} seconds")
+                with self.__lock:
+                    self.__not_before = max(self.__not_before, time.monotonic() + delay)
+                attempt += 1
+        except Exception as e:
+            logger.error(f"Error fetching page from {url}: {e}")
+            raise e
+
+    def fetch_all(self, url: str, params_list: list[dict], stats_key: Optional[str] = None) -> list[dict]:
+        """
+        Fetches the given pages in parallel, with at most max_in_flight requests at the same time.
+        Args:
+            url (str): The URL of the API endpoint.
+            params_list (list[dict]): The query parameters of each page.
+            stats_key (Optional[str], optional): The key under which the statistics of the requests are also collected.
+                Defaults to None.
+        Returns:
+            list[dict]: The JSON body of each page, in the same order as the given parameters.
+        Raises:
+            requests.RequestException: If the request of any page fails.
+        """
+        try:
+            if not params_list:
+                return []
+            workers = min(self.__max_in_flight, len(params_list))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http_client") as executor:
+                # map restituisce i risultati nell'ordine delle richieste, indipendentemente da quando terminano
+                return list(executor.map(lambda params: self.fetch(url, params, stats_key), params_list))
+        except Exception as e:
+            logger.error(f"Error fetching pages from {url}: {e}")
+            raise e
@@ -0,0 +1,149 @@
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+import pytz
+from beartype.typing import Callable, Optional
+
+from models.ingestionDaemonState import IngestionDaemonState
+from utils.logger import logger
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class IngestionDaemon:
+    """
+    Runs the updates of the vector store in a single long-running process, every interval seconds.
+    The dependencies (clients of the platforms, connections to Chroma and Postgres) are created once by the load factory
+    and reused by all the updates, so that the imports and the connections are not paid at every update. After a failed
+    update they are created again, so that a broken connection does not make all the following updates fail too.
+    After a failure the update is retried with an exponential backoff, from retry_interval up to max_backoff seconds,
+    reduced by a random jitter so that the retries of several instances do not happen at the same time.
+    The state of the daemon is kept in memory and returned by get_state.
+    Attributes:
+        load_factory (Callable[[], Callable[[], None]]): The function creating the dependencies and returning the
+            function performing an update.
+        interval (float): The seconds between the starts of two successful updates.
+        retry_interval (float): The seconds before the first retry of a failed update.
+        max_backoff (float): The maximum seconds before a retry.
+        jitter (float): The maximum fraction of the backoff removed at random.
+        random_function (Callable[[], float]): The function returning a random number in [0, 1).
+    """
+
+    def __init__(self, load_factory: Callable[[], Callable[[], None]], interval: float, retry_interval: float,
+                 max_backoff: float, jitter: float = 0.5, random_function: Callable[[], float] = random.random):
+        """
+        Initializes the IngestionDaemon with the given parameters.
+        Args:
+            load_factory (Callable[[], Callable[[], None]]): The function creating the dependencies and returning the
+                function performing an update.
+            interval (float): The seconds between the starts of two successful updates.
+            retry_interval (float): The seconds before the first retry of a failed update.
+            max_backoff (float): The maximum seconds before a retry.
+            jitter (float, optional): The maximum fraction of the backoff removed at random. Defaults to 0.5.
+            random_function (Callable[[], float], optional): The function returning a random number in [0, 1).
+                Defaults to random.random.
+        """
+        self.__load_factory = load_factory
+        self.__interval = interval
+        self.__retry_interval = retry_interval
+        self.__max_backoff = max_backoff
+        self.__jitter = jitter
+        self.__random_function = random_function
+        self.__load = None
+        self.__stop_event = threading.Event()
+        self.__lock = threading.Lock()
+        self.__state = IngestionDaemonState(running=False, consecutive_failures=0)
+
+    def get_state(self) -> IngestionDaemonState:
+        """
+        Returns the current state of the daemon.
+        Returns:
+            IngestionDaemonState: Whether an update is running, the number of consecutive failures, the start, end,
+                outcome and error of the last update and the time of the next one.
+        """
+        with self.__lock:
+            return self.__state
+
+    def stop(self):
+        """
+        Stops the daemon: the update in progress is completed, and no other update is started.
+        """
+        self.__stop_event.set()
+
+    def run(self, max_runs: Optional[int] = None):
+        """
+        Runs the updates until the daemon is stopped, starting immediately with the first one.
+        Args:
+            max_runs (Optional[int], optional): The maximum number of updates to run. Defaults to None, for no limit.
+        """
+        italy_tz = pytz.timezone('Europe/Rome')
+        num_runs = 0
+        while not self.__stop_event.is_set() and (max_runs is None or num_runs < max_runs):
+            started = time.monotonic()
+            self.__run_once(datetime.now(italy_tz))
+            num_runs += 1
+
+            failures = self.get_state().get_consecutive_failures()
+            if failures == 0:
+                # Gli aggiornamenti riusciti partono a intervalli regolari, indipendentemente dalla loro durata
+                delay = max(self.__interval - (time.monotonic() - started), 0.0)
+            else:
+                delay = self.__backoff(failures)
+            self.__update_state(next_run=datetime.now(italy_tz) + timedelta(seconds=delay))
+            logger.info(f"Next vector store update in {delay:.0f} seconds.")
+
+            if max_runs is not None and num_runs >= max_runs:
+                break
+            self.__stop_event.wait(delay)
+
+    def __run_once(self, start: datetime):
+        """
+        Runs a single update, creating the dependencies if they do not exist, and records its outcome in the state.
+        Args:
+            start (datetime): The start of the update.
+        """
+        self.__update_state(running=True, last_start=start, last_end=None)
+        try:
+            if self.__load is None:
+                self.__load = self.__load_factory()
+            self.__load()
+            self.__update_state(running=False, consecutive_failures=0, last_end=datetime.now(start.tzinfo),
+                                last_outcome=True, last_error=None)
+            logger.info("Vector store update completed.")
+        except Exception as e:
+            # Le dipendenze vengono ricreate al prossimo tentativo, nel caso l'errore sia dovuto a una connessione interrotta
+            self.__load = None
+            self.__update_state(running=False, consecutive_failures=self.get_state().get_consecutive_failures() + 1,
+                                last_end=datetime.now(start.tzinfo), last_outcome=False, last_error=str(e))
+            logger.error(f"Error in vector store update: {e}")
+
+    def __backoff(self, failures: int) -> float:
+        """
+        Computes the seconds before the retry after the given number of consecutive failures.
+        Args:
+            failures (int): The number of consecutive failed updates.
+        Returns:
+            float: The seconds before the retry, between (1 - jitter) and 1 times the exponential backoff.
+        """
+        backoff = min(self.__retry_interval * 2 ** (failures - 1), self.__max_backoff)
+        return backoff * (1 - self.__jitter * self.__random_function())
+
+    def __update_state(self, **changes):
+        """
+        Replaces the state of the daemon with a copy having the given changes.
+        Args:
+            **changes: The new values of the attributes of the state.
+        """
+        with self.__lock:
+            state = self.__state
+            values = {
+                "running": state.get_running(),
+                "consecutive_failures": state.get_consecutive_failures(),
+                "last_start": state.get_last_start(),
+                "last_end": state.get_last_end(),
+                "last_outcome": state.get_last_outcome(),
+                "last_error": state.get_last_error(),
+                "next_run": state.get_next_run()
+            }
+            values.update(changes)
+            self.__state = IngestionDaemonState(**values)
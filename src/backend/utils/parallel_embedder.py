@@ -0,0 +1,75 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from beartype.typing import Callable
+
+from utils.logger import logger
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class ParallelEmbedder:
+    """
+    Computes the embeddings of the chunks on the client, splitting the texts in batches of batch_size texts and
+    embedding up to max_workers batches at the same time, so that all the cores are used. The local ONNX models
+    release the GIL while computing, so a pool of threads is enough and the model is loaded only once.
+    The number of embedded chunks and the throughput are logged.
+    Attributes:
+        embedding_function (Callable): The function computing the embeddings of a list of texts.
+        batch_size (int): The maximum number of texts embedded in a single call of the embedding function.
+        max_workers (int): The maximum number of batches embedded at the same time.
+    """
+
+    def __init__(self, embedding_function: Callable, batch_size: int = 64, max_workers: int = 1):
+        """
+        Initializes the ParallelEmbedder with the given parameters.
+        Args:
+            embedding_function (Callable): The function computing the embeddings of a list of texts.
+            batch_size (int, optional): The maximum number of texts embedded in a single call of the embedding function.
+                Defaults to 64.
+            max_workers (int, optional): The maximum number of batches embedded at the same time. With 1, the batches are
+                embedded synchronously. Defaults to 1.
+        """
+        self.__embedding_function = embedding_function
+        self.__batch_size = batch_size
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="embedder") if max_workers > 1 else None
+        self.__lock = threading.Lock()
+        self.__num_chunks = 0
+
+    def get_num_chunks(self) -> int:
+        """
+        Returns the number of chunks embedded since the creation of the embedder.
+        Returns:
+            int: The number of embedded chunks.
+        """
+        return self.__num_chunks
+
+    def __call__(self, texts: list[str]) -> list:
+        """
+        Computes the embeddings of the given texts.
+        Args:
+            texts (list[str]): The texts to embed.
+        Returns:
+            list: The embedding of each text, in the same order as the texts.
+        Raises:
+            Exception: If an error occurs while computing the embeddings.
+        """
+        try:
+            started = time.monotonic()
+            batches = [texts[i:i + self.__batch_size] for i in range(0, len(texts), self.__batch_size)]
+            if self.__executor is None or len(batches) == 1:
+                results = [self.__embedding_function(batch) for batch in batches]
+            else:
+                # map restituisce i risultati nell'ordine delle batch, indipendentemente da quando terminano
+                results = list(self.__executor.map(self.__embedding_function, batches))
+            embeddings = [embedding for result in results for embedding in result]
+
+            elapsed = time.monotonic() - started
+            with self.__lock:
+                self.__num_chunks += len(texts)
+            logger.info(f"Embedded {len(texts)} chunks in {elapsed:.2f} seconds "
+                        f"({len(texts) / elapsed if elapsed > 0 else 0.0:.1f} chunks/s)")
+
+            return embeddings
+        except Exception as e:
+            logger.error(f"Error computing embeddings: {e}")
+            raise e
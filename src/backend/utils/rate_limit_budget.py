@@ -0,0 +1,115 @@
+import threading
+import time
+from beartype.typing import Callable, Mapping, Optional
+from github.GithubException import RateLimitExceededException
+
+from utils.logger import logger
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class RateLimitBudget:
+    """
+    Budget of the requests to the GitHub API, kept from the X-RateLimit-Remaining and X-RateLimit-Reset headers of the
+    responses, so that the quota of the token does not run out in the middle of a loading.
+    When fewer than pacing_threshold requests remain, the requests are spread evenly until the reset of the quota; when
+    only reserve requests remain, the requests are deferred, raising the same exception PyGithub raises when the quota is
+    exhausted: the loading of the platform fails, its documents are kept in the vector store and are fetched again by the
+    next loading. The conditional requests are never deferred, since a response 304 (Not Modified) is not counted.
+    Attributes:
+        reserve (int): The number of requests left to the other uses of the token.
+        pacing_threshold (int): The number of remaining requests below which the requests are spread until the reset.
+        clock (Callable[[], float]): The function returning the current time, in seconds since the epoch.
+        sleep (Callable[[float], None]): The function waiting for the given seconds.
+    """
+
+    def __init__(self, reserve: int = 100, pacing_threshold: int = 1000, clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Initializes the RateLimitBudget with the given parameters.
+        Args:
+            reserve (int, optional): The number of requests left to the other uses of the token. Defaults to 100.
+            pacing_threshold (int, optional): The number of remaining requests below which the requests are spread until
+                the reset. Defaults to 1000.
+            clock (Callable[[], float], optional): The function returning the current time, in seconds since the epoch.
+                Defaults to time.time.
+            sleep (Callable[[float], None], optional): The function waiting for the given seconds. Defaults to time.sleep.
+        """
+        self.__reserve = reserve
+        self.__pacing_threshold = pacing_threshold
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__lock = threading.Lock()
+        self.__remaining = None
+        self.__reset = None
+        # Istante in cui può partire la prossima richiesta, quando le richieste vengono distribuite fino al reset
+        self.__next_slot = 0.0
+        self.__num_deferred = 0
+
+    def get_remaining(self) -> Optional[int]:
+        """
+        Returns the number of requests left in the quota of the token, as estimated from the last responses.
+        Returns:
+            Optional[int]: The number of remaining requests, or None if no response has been received yet.
+        """
+        with self.__lock:
+            return self.__remaining
+
+    def get_num_deferred(self) -> int:
+        """
+        Returns the number of requests deferred since the creation of the budget.
+        Returns:
+            int: The number of deferred requests.
+        """
+        with self.__lock:
+            return self.__num_deferred
+
+    def update(self, headers: Mapping[str, str]):
+        """
+        Updates the budget from the headers of a response of the GitHub API.
+        Only the quota of the REST API is considered: the responses of the other resources (e.g. search) are ignored.
+        Args:
+            headers (Mapping[str, str]): The headers of the response, with case-insensitive keys.
+        """
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None or headers.get("X-RateLimit-Resource", "core") != "core":
+            return
+        with self.__lock:
+            # Le risposte di richieste concorrenti possono arrivare in disordine: vale il valore più basso dello stesso periodo
+            reset = float(reset)
+            if self.__reset is None or reset > self.__reset:
+                self.__remaining = int(float(remaining))
+            else:
+                self.__remaining = min(self.__remaining, int(float(remaining)))
+            self.__reset = max(reset, self.__reset or 0.0)
+
+    def acquire(self, conditional: bool = False):
+        """
+        Waits until a request can be sent within the budget.
+        Args:
+            conditional (bool, optional): Whether the request is conditional, and so possibly not counted. Defaults to False.
+        Raises:
+            RateLimitExceededException: If the request is not conditional and only the reserved requests remain.
+        """
+        with self.__lock:
+            now = self.__clock()
+            if self.__remaining is None or self.__reset is None or now >= self.__reset:
+                return
+            if self.__remaining <= self.__reserve:
+                if conditional:
+                    return
+                self.__num_deferred += 1
+                message = (f"GitHub rate limit budget exhausted: {self.__remaining} requests left until "
+                           f"{time.strftime('%H:%M:%S', time.localtime(self.__reset))}, fetch deferred")
+                logger.info(message)
+                raise RateLimitExceededException(403, {"message": message}, None, message)
+            if self.__remaining > self.__pacing_threshold:
+                self.__remaining -= 1
+                return
+            # Le richieste rimaste oltre la riserva vengono distribuite uniformemente fino al reset
+            interval = (self.__reset - now) / (self.__remaining - self.__reserve)
+            start = max(self.__next_slot, now)
+            self.__next_slot = start + interval
+            self.__remaining -= 1
+        if start > now:
+            self.__sleep(start - now)
@@ -0,0 +1,157 @@
+import threading
+import time
+from beartype.typing import Optional
+
+from ports.refreshLeasePort import RefreshLeasePort
+from utils.logger import logger
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class RefreshLease:
+    """
+    A lease with a time to live, letting a single replica at a time refresh the vector store.
+    While the lease is held, a background thread renews it every third of the time to live, so that a long refresh
+    does not lose it, while the lease of a replica that stopped without releasing it expires after the time to live.
+    If a renewal finds the lease acquired by another replica, or the renewals fail until the lease expires, the lease is
+    marked as lost: the refresh must check is_lost and stop writing, since another replica may be refreshing meanwhile.
+    The renewals should go through a connection of their own, so that they do not interfere with the transactions of
+    the refresh.
+    With a replica identifier, the last replica that acquired the lease is recorded, so that a replica taking over from
+    another one knows that the state it keeps locally about the shared data may be stale (see is_taken_over).
+    Attributes:
+        refresh_lease_port (RefreshLeasePort): Port to acquire, renew and release the lease.
+        name (str): The name of the lease.
+        holder (str): The identifier of this process.
+        ttl (int): The seconds after which the lease expires if not renewed.
+        replica (Optional[str]): The identifier of the replica of this process, i.e. of its local state.
+    """
+
+    def __init__(self, refresh_lease_port: RefreshLeasePort, name: str, holder: str, ttl: int, replica: Optional[str] = None):
+        """
+        Initializes the RefreshLease with the given parameters.
+        Args:
+            refresh_lease_port (RefreshLeasePort): Port to acquire, renew and release the lease.
+            name (str): The name of the lease.
+            holder (str): The identifier of this process.
+            ttl (int): The seconds after which the lease expires if not renewed.
+            replica (Optional[str], optional): The identifier of the replica of this process, shared by the processes
+                using the same local state (e.g. the host). Defaults to None, for no tracking of the replicas.
+        """
+        self.__refresh_lease_port = refresh_lease_port
+        self.__name = name
+        self.__holder = holder
+        self.__ttl = ttl
+        self.__replica = replica
+        self.__taken_over = False
+        self.__acquired = None
+        self.__renewed = None
+        self.__num_renewals = 0
+        self.__stop_event = threading.Event()
+        self.__lost_event = threading.Event()
+        self.__heartbeat = None
+
+    def acquire(self) -> bool:
+        """
+        Tries to acquire the lease, without waiting if it is held by another replica, and starts renewing it.
+        Returns:
+            bool: True if the lease has been acquired, False if it is held by another replica.
+        Raises:
+            Exception: If an error occurs while acquiring the lease.
+        """
+        try:
+            if not self.__refresh_lease_port.acquire_lease(self.__name, self.__holder, self.__ttl):
+                logger.info(f"Lease {self.__name} held by another replica.")
+                return False
+
+            if self.__replica is not None:
+                previous_replica = self.__refresh_lease_port.swap_lease_replica(self.__name, self.__replica)
+                self.__taken_over = previous_replica != self.__replica
+                if self.__taken_over:
+                    logger.info(f"Lease {self.__name} taken over from replica {previous_replica}.")
+
+            self.__acquired = time.monotonic()
+            self.__renewed = self.__acquired
+            self.__num_renewals = 0
+            self.__stop_event.clear()
+            self.__lost_event.clear()
+            self.__heartbeat = threading.Thread(target=self.__renew, name="lease-heartbeat", daemon=True)
+            self.__heartbeat.start()
+            logger.info(f"Lease {self.__name} acquired by {self.__holder}.")
+            return True
+        except Exception as e:
+            logger.error(f"Error acquiring lease {self.__name}: {e}")
+            raise e
+
+    def release(self):
+        """
+        Stops renewing the lease and releases it, so that another replica can acquire it without waiting for it to expire.
+        Raises:
+            Exception: If an error occurs while releasing the lease.
+        """
+        try:
+            self.__stop_event.set()
+            if self.__heartbeat is not None:
+                self.__heartbeat.join()
+                self.__heartbeat = None
+            self.__refresh_lease_port.release_lease(self.__name, self.__holder)
+            logger.info(f"Lease {self.__name} released by {self.__holder} after {self.get_hold_duration():.2f} seconds.")
+            self.__acquired = None
+        except Exception as e:
+            logger.error(f"Error releasing lease {self.__name}: {e}")
+            raise e
+
+    def get_hold_duration(self) -> float:
+        """
+        Returns the time elapsed since the lease has been acquired.
+        Returns:
+            float: The seconds since the acquisition, or 0 if the lease is not held.
+        """
+        return time.monotonic() - self.__acquired if self.__acquired is not None else 0.0
+
+    def is_taken_over(self) -> bool:
+        """
+        Returns whether the lease has been acquired taking over from another replica, which may have changed the shared
+        data since this replica last acquired it. Without a replica identifier, the replicas are not tracked.
+        Returns:
+            bool: True if the last acquisition took over from another replica, or from no recorded replica.
+        """
+        return self.__taken_over
+
+    def is_lost(self) -> bool:
+        """
+        Returns whether the lease has been lost while held, i.e. acquired by another replica or expired because the
+        renewals failed.
+        Returns:
+            bool: True if the lease has been lost since it has been acquired, False otherwise.
+        """
+        return self.__lost_event.is_set()
+
+    def get_num_renewals(self) -> int:
+        """
+        Returns the number of renewals of the lease since it has been acquired.
+        Returns:
+            int: The number of renewals.
+        """
+        return self.__num_renewals
+
+    def __renew(self):
+        """
+        Renews the lease every third of its time to live, until it is released or lost.
+        A failed renewal is logged and retried at the next interval: the lease is lost if it is acquired by another
+        replica, or if it expires meanwhile.
+        """
+        while not self.__stop_event.wait(self.__ttl / 3):
+            try:
+                if self.__refresh_lease_port.acquire_lease(self.__name, self.__holder, self.__ttl):
+                    self.__renewed = time.monotonic()
+                    self.__num_renewals += 1
+                    continue
+                logger.error(f"Lease {self.__name} lost: it has been acquired by another replica.")
+            except Exception as e:
+                logger.error(f"Error renewing lease {self.__name}: {e}")
+                # Finché il lease non è scaduto nessun'altra replica può acquisirlo: il rinnovo viene ritentato
+                if time.monotonic() - self.__renewed < self.__ttl:
+                    continue
+                logger.error(f"Lease {self.__name} lost: it expired before being renewed.")
+            self.__lost_event.set()
+            return
@@ -0,0 +1,127 @@
+import pickle
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+from beartype.typing import List, Optional, Tuple
+
+from models.document import Document
+from models.loggingModels import LoadingItems, PlatformLog
+from utils.logger import logger
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+class RunCheckpoint:
+    """
+    On-disk checkpoint of a loading, holding its starting moment and the snapshots of the items fetched from each platform,
+    so that a loading interrupted before its completion is resumed without fetching again the platforms already fetched.
+    The checkpoint is kept in a SQLite database, created if missing, and is discarded when the loading completes, or when
+    it is older than max_age seconds, so that a loading is never resumed from snapshots too far behind the platforms.
+    Attributes:
+        path (str): The path of the SQLite database file.
+        max_age (int): The maximum age, in seconds, of the checkpoint of an interrupted loading to resume it.
+    """
+
+    def __init__(self, path: str, max_age: int = 3600):
+        """
+        Initializes the RunCheckpoint, creating the tables if they do not exist.
+        Args:
+            path (str): The path of the SQLite database file.
+            max_age (int, optional): The maximum age, in seconds, of the checkpoint of an interrupted loading to resume it.
+                Defaults to 3600.
+        Raises:
+            sqlite3.Error: If an error occurs while creating the tables.
+        """
+        self.__path = path
+        self.__max_age = max_age
+        self.__execute("CREATE TABLE IF NOT EXISTS run (id INTEGER PRIMARY KEY CHECK (id = 0), starting_timestamp TEXT NOT NULL)")
+        self.__execute("CREATE TABLE IF NOT EXISTS snapshots (loading_items TEXT PRIMARY KEY, snapshot BLOB NOT NULL)")
+
+    def __execute(self, query: str, params: tuple = ()):
+        """
+        Executes the given SQL query in a transaction of its own.
+        Args:
+            query (str): The SQL query to be executed.
+            params (tuple, optional): The parameters of the query. Defaults to no parameters.
+        Raises:
+            sqlite3.Error: If an error occurs while executing the query.
+        """
+        try:
+            # Il context manager della connessione esegue il commit, o il rollback in caso di errore
+            with closing(sqlite3.connect(self.__path)) as conn, conn:
+                conn.execute(query, params)
+        except Exception as e:
+            logger.error(f"An error occurred while writing the loading checkpoint: {e}")
+            raise e
+
+    def begin(self, starting_timestamp: datetime) -> datetime:
+        """
+        Begins a loading, resuming the interrupted one if its checkpoint is not expired.
+        Args:
+            starting_timestamp (datetime): The starting moment of the new loading, with its time zone.
+        Returns:
+            datetime: The starting moment of the interrupted loading, if resumed, otherwise the given one.
+        Raises:
+            sqlite3.Error: If an error occurs while reading or writing the checkpoint.
+        """
+        try:
+            with closing(sqlite3.connect(self.__path)) as conn:
+                row = conn.execute("SELECT starting_timestamp FROM run").fetchone()
+            if row is not None:
+                previous_timestamp = datetime.fromisoformat(row[0])
+                if starting_timestamp - previous_timestamp <= timedelta(seconds=self.__max_age):
+                    logger.info(f"Resuming the loading started at {previous_timestamp} from its checkpoint.")
+                    return previous_timestamp
+                logger.info(f"Discarding the expired checkpoint of the loading started at {previous_timestamp}.")
+                self.clear()
+
+            self.__execute("INSERT INTO run (id, starting_timestamp) VALUES (0, ?)", (starting_timestamp.isoformat(),))
+            return starting_timestamp
+        except Exception as e:
+            logger.error(f"An error occurred while beginning the loading checkpoint: {e}")
+            raise e
+
+    def get_snapshot(self, loading_items: LoadingItems) -> Optional[Tuple[PlatformLog, List[Document]]]:
+        """
+        Retrieves the snapshot of the given items saved by the current loading, or by the interrupted one it resumes.
+        Args:
+            loading_items (LoadingItems): The type of the loaded items.
+        Returns:
+            Optional[Tuple[PlatformLog, List[Document]]]: The platform log and the documents of the items, or None if they
+                have not been fetched yet.
+        Raises:
+            sqlite3.Error: If an error occurs while reading the checkpoint.
+        """
+        try:
+            with closing(sqlite3.connect(self.__path)) as conn:
+                row = conn.execute("SELECT snapshot FROM snapshots WHERE loading_items = ?", (loading_items.value,)).fetchone()
+            return pickle.loads(row[0]) if row is not None else None
+        except Exception as e:
+            logger.error(f"An error occurred while reading the loading checkpoint: {e}")
+            raise e
+
+    def save_snapshot(self, loading_items: LoadingItems, platform_log: PlatformLog, documents: List[Document]):
+        """
+        Saves the snapshot of the given items fetched by the current loading.
+        Args:
+            loading_items (LoadingItems): The type of the loaded items.
+            platform_log (PlatformLog): The log of the fetch of the items.
+            documents (List[Document]): The fetched documents.
+        Raises:
+            sqlite3.Error: If an error occurs while writing the checkpoint.
+        """
+        self.__execute("INSERT OR REPLACE INTO snapshots (loading_items, snapshot) VALUES (?, ?)",
+                       (loading_items.value, pickle.dumps((platform_log, documents), protocol=pickle.HIGHEST_PROTOCOL)))
+
+    def clear(self):
+        """
+        Discards the checkpoint, once the loading has completed.
+        Raises:
+            sqlite3.Error: If an error occurs while writing the checkpoint.
+        """
+        try:
+            with closing(sqlite3.connect(self.__path)) as conn, conn:
+                conn.execute("DELETE FROM snapshots")
+                conn.execute("DELETE FROM run")
+        except Exception as e:
+            logger.error(f"An error occurred while clearing the loading checkpoint: {e}")
+            raise e
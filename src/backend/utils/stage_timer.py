@@ -0,0 +1,64 @@
+import resource
+import time
+
+from models.loggingModels import LoadingStage, StageLog
+from utils.beartype_personalized import beartype_personalized
+
+@beartype_personalized
+def get_peak_memory() -> int:
+    """
+    Returns the peak resident memory of the process since its start.
+    Returns:
+        int: The peak resident memory, in bytes.
+    """
+    # Su Linux ru_maxrss è espresso in KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+@beartype_personalized
+class StageTimer:
+    """
+    Measures the duration of a stage of a loading, as a context manager.
+    The time of every block executed within the timer is summed, so that a stage interleaved with others (e.g. the
+    splitting of the documents, performed one document at a time while they are written) can be measured in parts.
+    The peak memory of the process is read when the log of the stage is created.
+    Attributes:
+        stage (LoadingStage): The measured stage.
+    """
+
+    def __init__(self, stage: LoadingStage):
+        """
+        Initializes the StageTimer for the given stage.
+        Args:
+            stage (LoadingStage): The measured stage.
+        """
+        self.__stage = stage
+        self.__duration = 0.0
+        self.__started = 0.0
+
+    def __enter__(self) -> "StageTimer":
+        self.__started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.__duration += time.monotonic() - self.__started
+        return False
+
+    def get_duration(self) -> float:
+        """
+        Returns the time spent within the timer so far.
+        Returns:
+            float: The duration, in seconds.
+        """
+        return self.__duration
+
+    def get_stage_log(self, num_items: int, num_bytes: int = 0, num_api_calls: int = 0) -> StageLog:
+        """
+        Creates the log of the measured stage.
+        Args:
+            num_items (int): The number of items processed by the stage.
+            num_bytes (int, optional): The number of bytes transferred by the stage. Defaults to 0.
+            num_api_calls (int, optional): The number of API calls sent by the stage. Defaults to 0.
+        Returns:
+            StageLog: The log of the stage, with its duration and the peak memory of the process.
+        """
+        return StageLog(self.__stage, self.__duration, num_items, num_bytes, num_api_calls, get_peak_memory())
@@ -0,0 +1,86 @@
+"""
+Benchmark della suddivisione in chunk con confini definiti dal contenuto.
+
+Ripercorre la storia di una repository git e, per ogni file modificato da un commit, confronta i chunk da embeddare
+di nuovo con la suddivisione precedente a offset fissi e con ContentDefinedChunker:
+ - offset fissi, tutti i chunk: il comportamento precedente, in cui ogni chunk di un documento modificato veniva riscritto;
+ - offset fissi, chunk nuovi: i chunk il cui contenuto non compariva nella versione precedente (con la cache degli embedding);
+ - contenuto, chunk nuovi: i chunk il cui contenuto, e quindi il cui id, non compariva nella versione precedente.
+
+Esecuzione (dalla root della repository):
+    python tests/benchmark/content_defined_chunking_benchmark.py --repo /path/to/repo --max-chunk-size 41666
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "src", "backend")))
+
+from utils.content_defined_chunker import ContentDefinedChunker
+
+
+def git(repo, *args):
+    return subprocess.run(["git", "-C", repo, *args], capture_output=True, check=True).stdout
+
+
+def fixed_split(text, max_chunk_size):
+    return [text[i:i + max_chunk_size] for i in range(0, len(text), max_chunk_size)]
+
+
+def file_edits(repo, max_commits):
+    # Coppie (versione precedente, versione nuova) dei file modificati da ogni commit, dal più vecchio al più recente
+    commits = git(repo, "rev-list", "--reverse", "--no-merges", f"--max-count={max_commits}", "HEAD").decode().split()
+    for commit in commits:
+        parents = git(repo, "rev-list", "--parents", "-n", "1", commit).decode().split()[1:]
+        if not parents:
+            continue
+        paths = git(repo, "diff", "--name-only", "--diff-filter=M", parents[0], commit).decode().splitlines()
+        for path in paths:
+            try:
+                old = git(repo, "show", f"{parents[0]}:{path}").decode("utf-8")
+                new = git(repo, "show", f"{commit}:{path}").decode("utf-8")
+            except (subprocess.CalledProcessError, UnicodeDecodeError):
+                continue
+            yield old, new
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dei chunk da embeddare di nuovo dopo una modifica")
+    parser.add_argument("--repo", default=os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")),
+                        help="Percorso della repository git di cui ripercorrere la storia")
+    parser.add_argument("--max-chunk-size", type=int, default=41666, help="Dimensione massima di un chunk")
+    parser.add_argument("--max-commits", type=int, default=1000, help="Numero massimo di commit da ripercorrere")
+    args = parser.parse_args()
+
+    chunker = ContentDefinedChunker(args.max_chunk_size)
+    num_edits = 0
+    fixed_all = fixed_new = cdc_new = 0
+    fixed_all_chars = fixed_new_chars = cdc_new_chars = 0
+
+    for old, new in file_edits(args.repo, args.max_commits):
+        num_edits += 1
+        old_fixed = set(fixed_split(old, args.max_chunk_size))
+        new_fixed = fixed_split(new, args.max_chunk_size)
+        old_cdc = set(chunker.split(old))
+        new_cdc = chunker.split(new)
+
+        fixed_all += len(new_fixed)
+        fixed_all_chars += len(new)
+        changed_fixed = [chunk for chunk in new_fixed if chunk not in old_fixed]
+        fixed_new += len(changed_fixed)
+        fixed_new_chars += sum(len(chunk) for chunk in changed_fixed)
+        changed_cdc = [chunk for chunk in new_cdc if chunk not in old_cdc]
+        cdc_new += len(changed_cdc)
+        cdc_new_chars += sum(len(chunk) for chunk in changed_cdc)
+
+    print(f"{num_edits} file edits from {args.repo} (max chunk size {args.max_chunk_size})")
+    print(f"fixed offsets, all chunks rewritten: {fixed_all:8d} chunks {fixed_all_chars:12d} chars")
+    print(f"fixed offsets, new chunks only:      {fixed_new:8d} chunks {fixed_new_chars:12d} chars")
+    print(f"content-defined, new chunks only:    {cdc_new:8d} chunks {cdc_new_chars:12d} chars")
+    if cdc_new_chars:
+        print(f"re-embedded chars vs fixed offsets:  {fixed_new_chars / cdc_new_chars:8.1f}x less")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark di LoadFilesService.get_github_files_new_metadata.
+
+Confronta l'indice dei percorsi costruito con una sola passata sui commit con l'algoritmo precedente, che per ogni
+file riscansionava tutti i commit. L'algoritmo precedente viene eseguito su un campione di file e il suo tempo
+viene esteso linearmente al numero totale di file, dato che il suo costo è proporzionale al numero di file.
+
+Esecuzione (dalla root della repository):
+    python tests/benchmark/github_files_new_metadata_benchmark.py --files 10000 --commits 20000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "src", "backend")))
+
+from models.document import Document
+from models.commitFile import CommitFile
+from services.loadFilesService import LoadFilesService
+
+
+def legacy_get_github_files_new_metadata(github_files, github_commits):
+    # Algoritmo precedente: O(file × commit × file per commit)
+    file_info_pattern = re.compile(r'-\s+(.*?)\s+\(Status:\s+([^,]+),')
+    for gh_file in github_files:
+        file_path = gh_file.get_metadata().get("path", "").strip()
+        last_update_date = None
+        creation_date_date = None
+        for commit in github_commits:
+            commit_date = datetime.strptime(commit.get_metadata().get("date", ""), '%Y-%m-%d %H:%M:%S')
+            for file_str in commit.get_metadata().get("files", []):
+                match = file_info_pattern.search(file_str)
+                if match and match.group(1).strip() == file_path:
+                    status = match.group(2).strip().lower()
+                    if (last_update_date is None) or (commit_date > last_update_date):
+                        last_update_date = commit_date
+                    if status in ["added", "renamed"]:
+                        if (creation_date_date is None) or (commit_date > creation_date_date):
+                            creation_date_date = commit_date
+        updated_metadata = gh_file.get_metadata().copy()
+        if last_update_date is not None:
+            updated_metadata["last_update"] = last_update_date.strftime('%Y-%m-%d %H:%M:%S')
+        if creation_date_date is not None:
+            updated_metadata["creation_date"] = creation_date_date.strftime('%Y-%m-%d %H:%M:%S')
+        gh_file.set_metadata(updated_metadata)
+    return github_files
+
+
+def generate_documents(num_files, num_commits, files_per_commit, seed):
+    rng = random.Random(seed)
+    paths = [f"src/module{i % 100}/file{i}.py" for i in range(num_files)]
+    start = datetime(2020, 1, 1)
+    commits = []
+    for i in range(num_commits):
+        files = [
+            CommitFile(path, rng.choice(['added', 'modified', 'modified', 'renamed']), 4, 2, 2, "@@ -1,2 +1,2 @@\n-old\n+new")
+            for path in rng.sample(paths, files_per_commit)
+        ]
+        date = (start + timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S')
+        commits.append(Document(page_content=f"commit {i}", metadata={"date": date, "files": files}))
+    files = [Document(page_content=f"file {i}", metadata={"path": path}) for i, path in enumerate(paths)]
+    return files, commits
+
+
+def render_commits(commits):
+    # L'algoritmo precedente riceveva i file dei commit come stringhe formattate
+    return [
+        Document(page_content=c.get_page_content(), metadata={**c.get_metadata(), "files": [f.to_text() for f in c.get_metadata()["files"]]})
+        for c in commits
+    ]
+
+
+def copy_files(files):
+    return [Document(page_content=f.get_page_content(), metadata=f.get_metadata().copy()) for f in files]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark di get_github_files_new_metadata")
+    parser.add_argument("--files", type=int, default=10000, help="Numero di file di GitHub")
+    parser.add_argument("--commits", type=int, default=20000, help="Numero di commit di GitHub")
+    parser.add_argument("--files-per-commit", type=int, default=3, help="Numero di file modificati in ogni commit")
+    parser.add_argument("--legacy-sample", type=int, default=20, help="Numero di file su cui eseguire l'algoritmo precedente")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    files, commits = generate_documents(args.files, args.commits, args.files_per_commit, args.seed)
+    service = LoadFilesService(MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock())
+
+    start = time.perf_counter()
+    indexed_files = service.get_github_files_new_metadata(copy_files(files), commits)
+    indexed_time = time.perf_counter() - start
+
+    sample_size = min(args.legacy_sample, args.files)
+    start = time.perf_counter()
+    legacy_files = legacy_get_github_files_new_metadata(copy_files(files[:sample_size]), render_commits(commits))
+    legacy_time = (time.perf_counter() - start) * args.files / sample_size
+
+    # I due algoritmi devono produrre gli stessi metadati
+    assert [f.get_metadata() for f in legacy_files] == [f.get_metadata() for f in indexed_files[:sample_size]]
+
+    print(f"{args.files} files x {args.commits} commits ({args.files_per_commit} files per commit)")
+    print(f"legacy (extrapolated from {sample_size} files): {legacy_time:10.2f} s")
+    print(f"path index:                              {indexed_time:10.2f} s")
+    print(f"speedup:                                 {legacy_time / indexed_time:10.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import hashlib
 from unittest.mock import MagicMock
 from datetime import datetime
 import pytz
@@ -53,8 +54,8 @@ def test_load_calls_repository():
     ]
     italy_tz = pytz.timezone('Europe/Rome')
     document_entities = [
-        ChromaDocumentEntity(page_content='doc1', metadata={'author': 'Author1', 'id': '1', 'vector_store_insertion_date': '2025-03-01 13:00:00', 'chunk_index': 0, 'doc_id': '1_0'}),
-        ChromaDocumentEntity(page_content='doc2', metadata={'author': 'Author2', 'id': '2', 'vector_store_insertion_date': '2025-03-01 13:00:00', 'chunk_index': 0, 'doc_id': '2_0'})
+        ChromaDocumentEntity(page_content='doc1', metadata={'author': 'Author1', 'id': '1', 'vector_store_insertion_date': '2025-03-01 13:00:00', 'chunk_index': 0, 'doc_id': f"1_{hashlib.sha256(b'doc1').hexdigest()[:16]}"}),
+        ChromaDocumentEntity(page_content='doc2', metadata={'author': 'Author2', 'id': '2', 'vector_store_insertion_date': '2025-03-01 13:00:00', 'chunk_index': 0, 'doc_id': f"2_{hashlib.sha256(b'doc2').hexdigest()[:16]}"})
     ]
 
     vector_store_log = VectorStoreLog(
@@ -70,5 +71,6 @@ def test_load_calls_repository():
     result = adapter.load(documents)
 
     # Assert
-    mock_repository.load.assert_called_once_with(document_entities)
+    mock_repository.load.assert_called_once()
+    assert list(mock_repository.load.call_args.args[0]) == document_entities
     assert result == vector_store_log
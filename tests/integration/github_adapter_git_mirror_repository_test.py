@@ -0,0 +1,74 @@
+import subprocess
+
+from models.commitFile import CommitFile
+from adapters.gitHubAdapter import GitHubAdapter
+from repositories.gitMirrorRepository import GitMirrorRepository
+
+
+def create_remote(tmp_path):
+    # Crea una repository bare con un solo commit, usata come remote del mirror
+    work = tmp_path / "work"
+    work.mkdir()
+    env = {"GIT_AUTHOR_DATE": "2025-02-28T12:34:56+00:00", "GIT_COMMITTER_DATE": "2025-02-28T12:34:56+00:00",
+           "HOME": str(tmp_path), "PATH": "/usr/bin:/bin:/usr/local/bin"}
+    (work / "file1.txt").write_text("new content\n")
+    for args in (["init", "-q", "-b", "main"], ["add", "."], ["commit", "-q", "-m", "Fix bug in feature X"],
+                 ["clone", "-q", "--bare", str(work), str(tmp_path / "remote.git")]):
+        subprocess.run(["git", "-c", "user.name=John Doe", "-c", "user.email=john.doe@example.com", *args],
+                       cwd=work, env=env, check=True, capture_output=True)
+    return tmp_path / "remote.git"
+
+
+# Verifica che GitHubAdapter produca a partire da GitMirrorRepository documenti dei commit con gli stessi metadati
+# prodotti a partire da GitHubRepository
+
+def test_load_github_commits_from_mirror(tmp_path):
+    # Arrange
+    remote = create_remote(tmp_path)
+    github_adapter = GitHubAdapter(GitMirrorRepository(str(remote), str(tmp_path / "mirror.git"), "owner/repo", "https://github.com/owner/repo"))
+
+    # Act
+    log, documents = github_adapter.load_github_commits()
+
+    # Assert
+    assert log.get_outcome() is True
+    assert len(documents) == 1
+    assert documents[0].get_page_content() == "Fix bug in feature X"
+    sha = documents[0].get_metadata()["id"]
+    assert documents[0].get_metadata() == {
+        "author": "John Doe",
+        "email": "john.doe@example.com",
+        "date": "2025-02-28 13:34:56",
+        "files": [CommitFile("file1.txt", "added", 1, 1, 0, "@@ -0,0 +1 @@\n+new content")],
+        "item_type": "GitHub Commit",
+        "url": f"https://github.com/owner/repo/commit/{sha}",
+        "id": sha,
+        "last_update": "2025-02-28 13:34:56",
+    }
+
+
+# Verifica che GitHubAdapter produca a partire da GitMirrorRepository documenti dei file con gli stessi metadati
+# prodotti a partire da GitHubRepository
+
+def test_load_github_files_from_mirror(tmp_path):
+    # Arrange
+    remote = create_remote(tmp_path)
+    github_adapter = GitHubAdapter(GitMirrorRepository(str(remote), str(tmp_path / "mirror.git"), "owner/repo", "https://github.com/owner/repo"))
+
+    # Act
+    log, documents = github_adapter.load_github_files(set())
+
+    # Assert
+    assert log.get_outcome() is True
+    assert len(documents) == 1
+    assert documents[0].get_page_content() == "new content\n"
+    assert documents[0].get_metadata() == {
+        "type": "file",
+        "name": "file1.txt",
+        "path": "file1.txt",
+        "item_type": "GitHub File",
+        "url": "https://github.com/owner/repo/blob/main/file1.txt",
+        "id": documents[0].get_metadata()["id"],
+        "last_update": "/",
+        "creation_date": "/",
+    }
@@ -2,6 +2,7 @@ from unittest.mock import MagicMock
 from datetime import datetime, timedelta
 
 from models.document import Document
+from models.commitFile import CommitFile
 from models.loggingModels import PlatformLog, LoadingItems
 from entities.commitEntity import CommitEntity, CommitFileEntity
 from entities.fileEntity import FileEntity
@@ -30,8 +31,8 @@ def test_load_github_commits_calls_repository_method():
                     "email": "john.doe@example.com",
                     "date": "2025-02-28 13:34:56",
                     "files": [
-                        "- file1.txt (Status: modified, Changes: 10, Additions: 5, Deletions: 5)\n  Patch:\n@@ -1,2 +1,2 @@\n- old line\n+ new line",
-                        "- file2.txt (Status: added, Changes: 20, Additions: 20, Deletions: 0)\n  Patch:\n@@ -0,0 +1,20 @@\n+ new content"
+                        CommitFile("file1.txt", "modified", 10, 5, 5, "@@ -1,2 +1,2 @@\n- old line\n+ new line"),
+                        CommitFile("file2.txt", "added", 20, 20, 0, "@@ -0,0 +1,20 @@\n+ new content")
                     ],
                     "item_type": "GitHub Commit",
                     "url": "https://github.com/owner/repo/commit/abc123",
@@ -88,7 +89,7 @@ def test_load_github_commits_calls_repository_method():
     assert result == expected_result
 
 
-# Verifica che il metodo load_github_files di GitHubAdapter chiami il metodo load_github_files di GitHubtRepository
+# Verifica che il metodo load_github_files di GitHubAdapter chiami il metodo load_github_files_from_tree di GitHubRepository
 
 def test_load_github_files_calls_repository_method():
     # Arrange
@@ -141,11 +142,11 @@ def test_load_github_files_calls_repository_method():
         ]
     )
 
-    mock_github_repository.load_github_files.return_value = repository_return_value
+    mock_github_repository.load_github_files_from_tree.return_value = repository_return_value
 
     # Act
     result = github_adapter.load_github_files()
 
     # Assert
-    mock_github_repository.load_github_files.assert_called_once()
+    mock_github_repository.load_github_files_from_tree.assert_called_once()
     assert result == expected_result
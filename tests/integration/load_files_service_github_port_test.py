@@ -58,8 +58,8 @@ def test_load_github_files_calls_port_method():
     mock_confluence_cleaner_service = MagicMock(spec=ConfluenceCleanerService)
     load_files_service = LoadFilesService(
         mock_github_port, mock_jira_port,
-        mock_confluence_port, mock_load_files_in_vector_store_port,
-        mock_save_loading_attempt_in_db_port, mock_confluence_cleaner_service
+        mock_confluence_port, mock_confluence_cleaner_service,
+        mock_load_files_in_vector_store_port, mock_save_loading_attempt_in_db_port
     )
 
     expected_result = (
@@ -46,5 +46,5 @@ def test_load_calls_port_method():
     result = load_files_service.load_in_vector_store(documents)
 
     # Assert
-    mock_load_files_in_vector_store_port.load.assert_called_once_with(documents)
+    mock_load_files_in_vector_store_port.load.assert_called_once_with(documents, None)
     assert result == vector_store_log
@@ -1,11 +1,15 @@
+import hashlib
 import pytest
 from unittest.mock import MagicMock
 from datetime import datetime
+import json
 import pytz
 from freezegun import freeze_time
 
 from models.document import Document
+from models.commitFile import CommitFile
 from models.question import Question
+from models.loggingModels import VectorStoreLog
 from entities.queryResultEntity import QueryResultEntity
 from adapters.chromaVectorStoreAdapter import ChromaVectorStoreAdapter
 from repositories.chromaVectorStoreRepository import ChromaVectorStoreRepository
@@ -94,14 +98,20 @@ def test_split_files_list_conversion():
     max_chunk_size = 41666
     adapter = ChromaVectorStoreAdapter(max_chunk_size, mock_repository)
     documents = [
-        Document(page_content="doc1", metadata={"author": "Author1", "id": "1", "files": ["file1", "file2"]}),
+        Document(page_content="doc1", metadata={"author": "Author1", "id": "1", "files": [
+            CommitFile("file1", "added", 1, 1, 0, "+ x"), CommitFile("file2", "removed", 1, 0, 1)
+        ]}),
     ]
 
     # Act
     result = adapter._ChromaVectorStoreAdapter__split(documents)
 
     # Assert
-    assert result[0].get_metadata()["files"] == "file1\nfile2"
+    assert json.loads(result[0].get_metadata()["files"]) == [
+        {"filename": "file1", "status": "added", "changes": 1, "additions": 1, "deletions": 0},
+        {"filename": "file2", "status": "removed", "changes": 1, "additions": 0, "deletions": 1},
+    ]
+    assert result[0].get_page_content() == "doc1\n\ndiff --git a/file1 b/file1\n+ x"
 
 
 # Verifica che il metodo split di ChromaVectorStoreAdapter gestisca correttamente la formattazione delle date
@@ -192,3 +202,90 @@ def test_similarity_search_skip_null_documents():
     assert result[0].get_page_content() == "doc2"
     assert result[0].get_metadata()["distance"] == 0.2
 
+
+
+# Verifica che il metodo load di ChromaVectorStoreAdapter passi al repository i chunk come flusso, suddividendo i documenti
+# solo quando vengono letti e scartando i duplicati su tutto il flusso
+
+def test_load_splits_documents_lazily():
+    # Arrange
+    mock_repository = MagicMock(spec=ChromaVectorStoreRepository)
+    adapter = ChromaVectorStoreAdapter(4, mock_repository)
+    read_documents = []
+
+    def documents():
+        for doc_id, content in [("1", "abcdef"), ("2", "gh"), ("1", "duplicate")]:
+            read_documents.append(doc_id)
+            yield Document(page_content=content, metadata={"id": doc_id})
+
+    vector_store_log = VectorStoreLog(timestamp=datetime(2025, 3, 1), outcome=True, num_added_items=3, num_modified_items=0, num_deleted_items=0)
+    consumed_chunks = []
+
+    def load(chunks, preserved_item_types=None):
+        # Il primo chunk è disponibile prima che il resto del flusso venga letto
+        consumed_chunks.append(next(chunks))
+        assert read_documents == ["1"]
+        consumed_chunks.extend(chunks)
+        return vector_store_log
+    mock_repository.load.side_effect = load
+
+    # Act
+    result = adapter.load(documents())
+
+    # Assert
+    assert result == vector_store_log
+    assert [chunk.get_metadata()["doc_id"] for chunk in consumed_chunks] == [
+        f"1_{hashlib.sha256(b'abcd').hexdigest()[:16]}", f"1_{hashlib.sha256(b'ef').hexdigest()[:16]}",
+        f"2_{hashlib.sha256(b'gh').hexdigest()[:16]}"
+    ]
+    assert [chunk.get_page_content() for chunk in consumed_chunks] == ["abcd", "ef", "gh"]
+
+
+# Verifica che il metodo load di ChromaVectorStoreAdapter assegni ai chunk id derivati dal contenuto, distinguendo
+# i chunk ripetuti all'interno dello stesso documento
+
+def test_load_assigns_content_derived_chunk_ids():
+    # Arrange
+    mock_repository = MagicMock(spec=ChromaVectorStoreRepository)
+    consumed_chunks = []
+    vector_store_log = VectorStoreLog(timestamp=datetime(2025, 3, 1), outcome=True, num_added_items=1, num_modified_items=0, num_deleted_items=0)
+    mock_repository.load.side_effect = lambda chunks, preserved_item_types=None: consumed_chunks.extend(chunks) or vector_store_log
+    adapter = ChromaVectorStoreAdapter(4, mock_repository)
+    chunk_hash = hashlib.sha256(b"abcd").hexdigest()[:16]
+
+    # Act
+    adapter.load([Document(page_content="abcdabcd", metadata={"id": "1"})])
+
+    # Assert
+    assert [chunk.get_metadata()["doc_id"] for chunk in consumed_chunks] == [f"1_{chunk_hash}", f"1_{chunk_hash}_1"]
+    assert [chunk.get_metadata()["chunk_index"] for chunk in consumed_chunks] == [0, 1]
+
+
+# Verifica che il metodo load di ChromaVectorStoreAdapter suddivida in token i documenti dei tipi con le impostazioni
+# in token, sui confini strutturali del tipo e con la sovrapposizione indicata, e a righe gli altri documenti
+
+def test_load_splits_documents_by_tokens_on_structural_boundaries():
+    # Arrange
+    mock_repository = MagicMock(spec=ChromaVectorStoreRepository)
+    consumed_chunks = []
+    vector_store_log = VectorStoreLog(timestamp=datetime(2025, 3, 1), outcome=True, num_added_items=2, num_modified_items=0, num_deleted_items=0)
+    mock_repository.load.side_effect = lambda chunks, preserved_item_types=None: consumed_chunks.extend(chunks) or vector_store_log
+    count_words = lambda text: len(text.split())
+    adapter = ChromaVectorStoreAdapter(41666, mock_repository, {"Confluence Page": (20, 3)}, count_words)
+    page = "".join(f"# Section {i}\n" + "word " * 10 + "\nlast line\n" for i in range(20))
+
+    # Act
+    adapter.load([
+        Document(page_content=page, metadata={"id": "1", "item_type": "Confluence Page"}),
+        Document(page_content=page, metadata={"id": "2", "item_type": "Jira Issue"}),
+    ])
+
+    # Assert
+    page_chunks = [chunk for chunk in consumed_chunks if chunk.get_metadata()["id"] == "1"]
+    assert len(page_chunks) > 1
+    assert page_chunks[0].get_page_content().startswith("# Section 0")
+    for chunk in page_chunks[1:]:
+        assert chunk.get_metadata()["overlap_length"] == len("last line\n")
+        assert chunk.get_page_content()[len("last line\n"):].startswith("# Section")
+        assert count_words(chunk.get_page_content()) <= 40 + 3
+    assert [chunk.get_page_content() for chunk in consumed_chunks if chunk.get_metadata()["id"] == "2"] == [page]
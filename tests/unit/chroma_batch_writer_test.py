@@ -0,0 +1,131 @@
+import pytest
+import threading
+import time
+from unittest.mock import MagicMock
+
+from utils.chroma_batch_writer import ChromaBatchWriter
+
+
+# Verifica che ChromaBatchWriter divida le scritture in batch non più grandi di batch_size
+
+def test_add_splits_chunks_in_batches():
+    # Arrange
+    mock_collection = MagicMock()
+    writer = ChromaBatchWriter(mock_collection, batch_size=2)
+
+    # Act
+    writer.add(ids=["a", "b", "c"], documents=["A", "B", "C"], metadatas=[{"n": 1}, {"n": 2}, {"n": 3}])
+    writer.delete(["d", "e", "f", "g"])
+    writer.flush()
+    writer.close()
+
+    # Assert
+    assert [call.kwargs for call in mock_collection.add.call_args_list] == [
+        {"ids": ["a", "b"], "documents": ["A", "B"], "metadatas": [{"n": 1}, {"n": 2}]},
+        {"ids": ["c"], "documents": ["C"], "metadatas": [{"n": 3}]},
+    ]
+    assert [call.kwargs["ids"] for call in mock_collection.delete.call_args_list] == [["d", "e"], ["f", "g"]]
+    assert len(writer.get_timings()) == 4
+
+# Verifica che ChromaBatchWriter raccolga per ogni operazione i chunk, le richieste, i byte inviati e la durata delle batch
+
+def test_get_operation_stats():
+    # Arrange
+    mock_collection = MagicMock()
+    writer = ChromaBatchWriter(mock_collection, batch_size=2)
+
+    # Act
+    writer.add(ids=["a", "b", "c"], documents=["A", "B", "C"], metadatas=[{"n": 1}, {"n": 2}, {"n": 3}])
+    writer.flush()
+    writer.close()
+
+    # Assert
+    num_chunks, num_requests, num_bytes, duration = writer.get_operation_stats("add")
+    assert (num_chunks, num_requests) == (3, 2)
+    assert num_bytes > 0
+    assert duration >= 0
+    assert writer.get_operation_stats("delete") == (0, 0, 0, 0.0)
+
+# Verifica che ChromaBatchWriter scriva più batch in parallelo, senza superare max_workers batch in corso
+
+def test_upsert_writes_batches_in_parallel():
+    # Arrange
+    mock_collection = MagicMock()
+    lock = threading.Lock()
+    state = {"in_flight": 0, "max_in_flight": 0}
+
+    def slow_upsert(**kwargs):
+        with lock:
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        time.sleep(0.05)
+        with lock:
+            state["in_flight"] -= 1
+
+    mock_collection.upsert.side_effect = slow_upsert
+    writer = ChromaBatchWriter(mock_collection, batch_size=1, max_workers=3)
+    ids = [str(i) for i in range(9)]
+
+    # Act
+    writer.upsert(ids=ids, documents=ids, metadatas=[{} for _ in ids])
+    writer.flush()
+    writer.close()
+
+    # Assert
+    assert mock_collection.upsert.call_count == 9
+    assert state["max_in_flight"] == 3
+
+# Verifica che ChromaBatchWriter riprovi solo la batch fallita, senza riscrivere quelle già scritte
+
+def test_failed_batch_is_retried_alone():
+    # Arrange
+    mock_collection = MagicMock()
+    mock_collection.add.side_effect = [None, Exception("Chroma unavailable"), None, None]
+    writer = ChromaBatchWriter(mock_collection, batch_size=1, max_retries=2, retry_delay=0.0)
+
+    # Act
+    writer.add(ids=["a", "b", "c"], documents=["A", "B", "C"], metadatas=[{}, {}, {}])
+    writer.flush()
+    writer.close()
+
+    # Assert
+    assert [call.kwargs["ids"] for call in mock_collection.add.call_args_list] == [["a"], ["b"], ["b"], ["c"]]
+    assert len(writer.get_timings()) == 3
+
+# Verifica che ChromaBatchWriter sollevi l'errore di una batch fallita dopo tutti i tentativi al momento del flush
+
+def test_flush_raises_error_of_failed_batch():
+    # Arrange
+    mock_collection = MagicMock()
+    mock_collection.delete.side_effect = Exception("Chroma unavailable")
+    writer = ChromaBatchWriter(mock_collection, batch_size=1, max_workers=2, max_retries=1, retry_delay=0.0)
+
+    # Act
+    writer.delete(["a"])
+    with pytest.raises(Exception) as exc_info:
+        writer.flush()
+    writer.close()
+
+    # Assert
+    assert str(exc_info.value) == "Chroma unavailable"
+    assert mock_collection.delete.call_count == 2
+
+# Verifica che ChromaBatchWriter passi a Chroma gli embedding ottenuti dalla cache per i chunk scritti
+
+def test_upsert_passes_cached_embeddings():
+    # Arrange
+    mock_collection = MagicMock()
+    mock_cache = MagicMock()
+    mock_cache.embed.side_effect = lambda texts: [[float(len(text))] for text in texts]
+    writer = ChromaBatchWriter(mock_collection, batch_size=2, embedding_cache=mock_cache)
+
+    # Act
+    writer.upsert(ids=["a", "b", "c"], documents=["A", "BB", "CCC"], metadatas=[{}, {}, {}])
+    writer.delete(["d"])
+    writer.flush()
+    writer.close()
+
+    # Assert
+    assert [call.kwargs["embeddings"] for call in mock_collection.upsert.call_args_list] == [[[1.0], [2.0]], [[3.0]]]
+    mock_collection.delete.assert_called_once_with(ids=["d"])
+    assert mock_cache.embed.call_count == 2
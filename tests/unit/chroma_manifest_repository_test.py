@@ -0,0 +1,90 @@
+import sqlite3
+import pytest
+
+from entities.chromaManifestEntryEntity import ChromaManifestEntryEntity
+from repositories.chromaManifestRepository import ChromaManifestRepository
+
+
+@pytest.fixture
+def manifest_path(tmp_path):
+    return str(tmp_path / "manifest.sqlite")
+
+
+# Verifica che il metodo save_entries di ChromaManifestRepository salvi le voci del manifest, sostituendo quelle con lo stesso id
+
+def test_save_entries_success(manifest_path):
+    # Arrange
+    repository = ChromaManifestRepository(manifest_path)
+    repository.save_entries([ChromaManifestEntryEntity("1", "Jira Issue", "hash-1", ["1_a"], "2023-01-01 00:00:00")])
+    new_entry = ChromaManifestEntryEntity("1", "Jira Issue", "hash-2", ["1_a", "1_b"], "2023-01-02 00:00:00")
+    other_entry = ChromaManifestEntryEntity("sha", "GitHub File", "hash-3", ["sha_a"], None, "a.py")
+
+    # Act
+    repository.save_entries([new_entry, other_entry])
+
+    # Assert
+    assert ChromaManifestRepository(manifest_path).get_entries() == {"1": new_entry, "sha": other_entry}
+
+
+# Verifica che il metodo delete_entries di ChromaManifestRepository elimini solo le voci indicate
+
+def test_delete_entries_success(manifest_path):
+    # Arrange
+    repository = ChromaManifestRepository(manifest_path)
+    entries = [ChromaManifestEntryEntity(str(i), "Jira Issue", f"hash-{i}", [f"{i}_a"]) for i in range(3)]
+    repository.save_entries(entries)
+
+    # Act
+    repository.delete_entries(["0", "2"])
+
+    # Assert
+    assert repository.get_entries() == {"1": entries[1]}
+
+
+# Verifica che il metodo replace_entries di ChromaManifestRepository sostituisca l'intero contenuto del manifest
+
+def test_replace_entries_success(manifest_path):
+    # Arrange
+    repository = ChromaManifestRepository(manifest_path)
+    repository.save_entries([ChromaManifestEntryEntity("old", "Jira Issue", "hash-old", ["old_a"])])
+    new_entry = ChromaManifestEntryEntity("new", "Confluence Page", "hash-new", ["new_a", "new_b", "new_c"])
+
+    # Act
+    repository.replace_entries([new_entry])
+
+    # Assert
+    assert repository.get_entries() == {"new": new_entry}
+    assert new_entry.get_num_chunks() == 3
+
+
+# Verifica che ChromaManifestRepository elimini un manifest nel formato di una versione precedente, per ricostruirlo
+
+def test_init_drops_manifest_in_previous_format(manifest_path):
+    # Arrange
+    with sqlite3.connect(manifest_path) as conn:
+        conn.execute("CREATE TABLE manifest (id TEXT PRIMARY KEY, item_type TEXT, content_hash TEXT, num_chunks INTEGER)")
+        conn.execute("INSERT INTO manifest VALUES ('1', 'Jira Issue', 'hash-1', 1)")
+    conn.close()
+
+    # Act
+    repository = ChromaManifestRepository(manifest_path)
+
+    # Assert
+    assert repository.get_entries() == {}
+
+
+# Verifica che ChromaManifestRepository registri i chunk in sospeso senza duplicati e li dimentichi con clear_pending_chunk_ids
+
+def test_pending_chunk_ids_success(manifest_path):
+    # Arrange
+    repository = ChromaManifestRepository(manifest_path)
+
+    # Act
+    repository.add_pending_chunk_ids(["1_a", "1_b"])
+    repository.add_pending_chunk_ids(["1_b", "2_a"])
+    pending_chunk_ids = ChromaManifestRepository(manifest_path).get_pending_chunk_ids()
+    repository.clear_pending_chunk_ids()
+
+    # Assert
+    assert sorted(pending_chunk_ids) == ["1_a", "1_b", "2_a"]
+    assert repository.get_pending_chunk_ids() == []
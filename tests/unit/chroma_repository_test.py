@@ -4,27 +4,44 @@ import requests
 from requests.exceptions import ConnectTimeout
 
 from entities.chromaDocumentEntity import ChromaDocumentEntity
+from entities.chromaManifestEntryEntity import ChromaManifestEntryEntity
+from repositories.chromaManifestRepository import ChromaManifestRepository
 from repositories.chromaVectorStoreRepository import ChromaVectorStoreRepository
 
 
+@pytest.fixture
+def manifest_repository(tmp_path):
+    return ChromaManifestRepository(str(tmp_path / "manifest.sqlite"))
+
+
+def chunk(doc_id: str, content: str, chunk_index: int = 0, **metadata) -> ChromaDocumentEntity:
+    # Come nell'adapter, l'id del chunk deriva dal suo contenuto
+    return ChromaDocumentEntity(page_content=content, metadata={"id": doc_id, "doc_id": f"{doc_id}_{content}",
+                                                                "chunk_index": chunk_index, **metadata})
+
+
+def load_previous(manifest_repository: ChromaManifestRepository, mock_collection: MagicMock, documents: list) -> None:
+    # Simula un caricamento precedente, registrando i documenti nel manifest e allineando il numero di chunk della collezione
+    ChromaVectorStoreRepository(MagicMock(count=MagicMock(return_value=0)), manifest_repository).load(documents)
+    mock_collection.count.return_value = len(documents)
+
+
 # Verifica che il metodo load di ChromaVectorStoreRepository carichi correttamente i documenti nel database vettoriale
 
-def test_load_success():
+def test_load_success(manifest_repository):
     # Arrange
     mock_collection = MagicMock()
-    repository = ChromaVectorStoreRepository(mock_collection)
-    documents = [
-        MagicMock(spec=ChromaDocumentEntity),
-        MagicMock(spec=ChromaDocumentEntity)
-    ]
-    for i, doc in enumerate(documents):
-        doc.get_metadata.return_value = {"doc_id": str(i)}
-        doc.get_page_content.return_value = f"content_{i}"
+    mock_collection.count.return_value = 0
+    repository = ChromaVectorStoreRepository(mock_collection, manifest_repository)
+    documents = [chunk("1", "content_1"), chunk("2", "content_2")]
 
     # Act
     result = repository.load(documents)
 
     # Assert
+    mock_collection.upsert.assert_called_once_with(ids=["1_content_1", "2_content_2"], documents=["content_1", "content_2"],
+                                                   metadatas=[documents[0].get_metadata(), documents[1].get_metadata()])
+    assert set(manifest_repository.get_entries()) == {"1", "2"}
     assert result.get_outcome() is True
     assert result.get_num_added_items() == 2
     assert result.get_num_modified_items() == 0
@@ -32,21 +49,20 @@ def test_load_success():
 
 
 # Verifica che il metodo load di ChromaVectorStoreRepository gestisca correttamente le eccezioni durante l'aggiunta dei documenti
-# nel database vettoriale
+# nel database vettoriale, senza aggiornare il manifest
 
-def test_load_exception():
+def test_load_exception(manifest_repository):
     # Arrange
     mock_collection = MagicMock()
-    repository = ChromaVectorStoreRepository(mock_collection)
-    documents = [MagicMock(spec=ChromaDocumentEntity)]
-    documents[0].get_metadata.return_value = {"doc_id": "1"}
-    documents[0].get_page_content.return_value = "content_1"
-    mock_collection.add.side_effect = ConnectTimeout("Load error")
+    mock_collection.count.return_value = 0
+    repository = ChromaVectorStoreRepository(mock_collection, manifest_repository)
+    mock_collection.upsert.side_effect = ConnectTimeout("Load error")
 
     # Act
-    result = repository.load(documents)
+    result = repository.load([chunk("1", "content_1")])
 
     # Assert
+    assert manifest_repository.get_entries() == {}
     assert result.get_outcome() is False
     assert result.get_num_added_items() == 0
     assert result.get_num_modified_items() == 0
@@ -56,10 +72,11 @@ def test_load_exception():
 # Verifica che il metodo load di ChromaVectorStoreRepository gestisca correttamente le eccezioni durante la preparazione dei dati
 # per l'aggiunta nel database vettoriale
 
-def test_load_exception_preparing_new_data():
+def test_load_exception_preparing_new_data(manifest_repository):
     # Arrange
     mock_collection = MagicMock()
-    repository = ChromaVectorStoreRepository(mock_collection)
+    mock_collection.count.return_value = 0
+    repository = ChromaVectorStoreRepository(mock_collection, manifest_repository)
     documents = [MagicMock(spec=ChromaDocumentEntity)]
     documents[0].get_metadata.side_effect = Exception("Metadata error")
 
@@ -71,20 +88,17 @@ def test_load_exception_preparing_new_data():
     assert str(exc_info.value) == "Metadata error"
 
 
-# Verifica che il metodo load di ChromaVectorStoreRepository gestisca correttamente le eccezioni durante il recupero dei vecchi dati
-# dal database vettoriale
+# Verifica che il metodo load di ChromaVectorStoreRepository gestisca correttamente le eccezioni durante il controllo
+# del numero di chunk presenti nel database vettoriale
 
-def test_load_exception_fetching_old_data():
+def test_load_exception_fetching_old_data(manifest_repository):
     # Arrange
     mock_collection = MagicMock()
-    mock_collection.get.side_effect = requests.exceptions.ConnectTimeout("Fetch error")
-    repository = ChromaVectorStoreRepository(mock_collection)
-    documents = [MagicMock(spec=ChromaDocumentEntity)]
-    documents[0].get_metadata.return_value = {"doc_id": "1"}
-    documents[0].get_page_content.return_value = "content_1"
+    mock_collection.count.side_effect = requests.exceptions.ConnectTimeout("Fetch error")
+    repository = ChromaVectorStoreRepository(mock_collection, manifest_repository)
 
     # Act
-    result = repository.load(documents)
+    result = repository.load([chunk("1", "content_1")])
 
     # Assert
     assert result.get_outcome() is False
@@ -93,175 +107,285 @@ def test_load_exception_fetching_old_data():
     assert result.get_num_deleted_items() == 0
 
 
-# Verifica che il metodo load di ChromaVectorStoreRepository gestisca correttamente le eccezioni durante il parsing delle date
-# per documenti non di tipo GitHub File
+# Verifica che il metodo load di ChromaVectorStoreRepository non legga né scriva nulla nel database vettoriale
+# se nessun documento è cambiato rispetto al manifest
 
-def test_load_exception_parsing_datetime_non_github_file():
+def test_load_skips_documents_with_same_hash(manifest_repository):
     # Arrange
     mock_collection = MagicMock()
-    repository = ChromaVectorStoreRepository(mock_collection)
-    documents = [MagicMock(spec=ChromaDocumentEntity)]
-    documents[0].get_metadata.return_value = {
-        "doc_id": "1",
-        "item_type": "Non-GitHub File",
-        "last_update": "2023-01-01 00:00:00",
-    }
-    documents[0].get_page_content.return_value = "content_1"
-    mock_collection.get.return_value = {
-        "ids": ["1"],
-        "metadatas": [{"last_update": "invalid_date"}],
-    }
+    load_previous(manifest_repository, mock_collection, [chunk("1", "content_1", vector_store_insertion_date="2023-01-01 00:00:00")])
+    repository = ChromaVectorStoreRepository(mock_collection, manifest_repository)
 
     # Act
-    with pytest.raises(Exception) as exc_info:
-        repository.load(documents)
+    result = repository.load([chunk("1", "content_1", vector_store_insertion_date="2023-01-02 00:00:00")])
 
     # Assert
-    assert str(exc_info.value) == "time data 'invalid_date' does not match format '%Y-%m-%d %H:%M:%S'"
+    mock_collection.get.assert_not_called()
+    mock_collection.upsert.assert_not_called()
+    mock_collection.delete.assert_not_called()
+    assert result.get_outcome() is True
+    assert result.get_num_added_items() == 0
+    assert result.get_num_modified_items() == 0
+    assert result.get_num_deleted_items() == 0
 
 
-# Verifica che il metodo load di ChromaVectorStoreRepository gestisca correttamente le eccezioni durante il parsing delle date
-# per documenti di tipo GitHub File
+# Verifica che il metodo load di ChromaVectorStoreRepository, per un documento il cui contenuto è cambiato, scriva solo
+# i chunk nuovi, aggiorni i soli metadati dei chunk già presenti ed elimini quelli della versione precedente non più presenti
 
-def test_load_exception_parsing_dates_github_file():
+def test_load_update_document_with_different_hash(manifest_repository):
     # Arrange
     mock_collection = MagicMock()
-    repository = ChromaVectorStoreRepository(mock_collection)
-    documents = [MagicMock(spec=ChromaDocumentEntity)]
-    documents[0].get_metadata.return_value = {
-        "doc_id": "sha-1",
-        "item_type": "GitHub File",
-        "creation_date": "2023-01-01 00:00:00",
-        "path": "/path/to/file",
-    }
-    documents[0].get_page_content.return_value = "content_1"
-    mock_collection.get.return_value = {
-        "ids": ["sha-2"],
-        "metadatas": [{"item_type": "GitHub File", "path": "/path/to/file", "vector_store_insertion_date": "invalid_date"}],
-    }
+    load_previous(manifest_repository, mock_collection, [chunk("1", "a", 0), chunk("1", "b", 1), chunk("1", "c", 2)])
+    repository = ChromaVectorStoreRepository(mock_collection, manifest_repository)
 
     # Act
-    with pytest.raises(Exception) as exc_info:
-        repository.load(documents)
+    result = repository.load([chunk("1", "a", 0), chunk("1", "new", 1), chunk("1", "c", 2)])
 
     # Assert
-    assert str(exc_info.value) == "time data 'invalid_date' does not match format '%Y-%m-%d %H:%M:%S'"
+    assert [call.kwargs["ids"] for call in mock_collection.upsert.call_args_list] == [["1_new"]]
+    assert [call.kwargs["ids"] for call in mock_collection.update.call_args_list] == [["1_a", "1_c"]]
+    mock_collection.delete.assert_called_once_with(ids=["1_b"])
+    assert manifest_repository.get_entries()["1"].get_chunk_ids() == ["1_a", "1_new", "1_c"]
+    assert result.get_num_added_items() == 0
+    assert result.get_num_modified_items() == 1
+    assert result.get_num_deleted_items() == 0
 
 
-# Verifica che il metodo load di ChromaVectorStoreRepository gestisca correttamente l'eccezione riguardante un documento
-# di tipo GitHub File senza il campo 'path'
+# Verifica che il metodo load di ChromaVectorStoreRepository segnali come modificato, e non come aggiunto ed eliminato,
+# un documento nuovo che sostituisce un documento obsoleto dello stesso tipo con lo stesso percorso
 
-def test_load_missing_path_field_in_github_file():
+def test_load_github_file_modification_based_on_path(manifest_repository):
     # Arrange
     mock_collection = MagicMock()
-    repository = ChromaVectorStoreRepository(mock_collection)
-    documents = [MagicMock(spec=ChromaDocumentEntity)]
-    documents[0].get_metadata.return_value = {"doc_id": "1", "item_type": "GitHub File"}
-    documents[0].get_page_content.return_value = "content_1"
+    load_previous(manifest_repository, mock_collection, [chunk("sha1", "old", item_type="GitHub File", path="/path/to/file")])
+    repository = ChromaVectorStoreRepository(mock_collection, manifest_repository)
 
     # Act
-    with pytest.raises(Exception) as exc_info:
-        repository.load(documents)
+    result = repository.load([chunk("sha2", "new", item_type="GitHub File", path="/path/to/file")])
 
     # Assert
-    assert str(exc_info.value) == "Missing 'path' field in metadata for GitHub File with doc_id 1"
+    mock_collection.upsert.assert_called_once()
+    mock_collection.delete.assert_called_once_with(ids=["sha1_old"])
+    assert set(manifest_repository.get_entries()) == {"sha2"}
+    assert result.get_num_added_items() == 0
+    assert result.get_num_modified_items() == 1
+    assert result.get_num_deleted_items() == 0
 
 
-# Verifica che il metodo load di ChromaVectorStoreRepository segnali correttamente la modifica di un documento di tipo GitHub File,
-# e non la sua creazione, se la data di creazione è più vecchia di quella dell'ultimo inserimento nel database vettoriale
+# Verifica che il metodo load di ChromaVectorStoreRepository gestisca correttamente le eccezioni durante la cancellazione dei documenti
+# dal database vettoriale, lasciando in sospeso i chunk non eliminati
 
-def test_load_github_file_modification_based_on_dates():
+def test_load_exception_while_deleting_documents(manifest_repository):
     # Arrange
     mock_collection = MagicMock()
-    repository = ChromaVectorStoreRepository(mock_collection)
-    documents = [MagicMock(spec=ChromaDocumentEntity)]
-    documents[0].get_metadata.return_value = {
-        "doc_id": "1",
-        "item_type": "GitHub File",
-        "creation_date": "2023-01-01 00:00:00",
-        "path": "/path/to/file",
-    }
-    documents[0].get_page_content.return_value = "content_1"
-    mock_collection.get.return_value = {
-        "ids": ["2"],
-        "metadatas": [{"item_type": "GitHub File", "path": "/path/to/file", "vector_store_insertion_date": "2023-01-02 00:00:00"}],
-    }
+    load_previous(manifest_repository, mock_collection, [chunk("2", "content_2")])
+    repository = ChromaVectorStoreRepository(mock_collection, manifest_repository)
+    mock_collection.delete.side_effect = ConnectTimeout("Delete error")
 
     # Act
-    result = repository.load(documents)
+    result = repository.load([chunk("1", "content_1")])
 
     # Assert
-    assert result.get_outcome() is True
+    assert set(manifest_repository.get_entries()) == {"1"}
+    assert set(manifest_repository.get_pending_chunk_ids()) == {"1_content_1", "2_content_2"}
+    assert result.get_outcome() is False
     assert result.get_num_added_items() == 0
-    assert result.get_num_modified_items() == 1
+    assert result.get_num_modified_items() == 0
     assert result.get_num_deleted_items() == 0
 
 
-# Verifica che il metodo load di ChromaVectorStoreRepository ignori i documenti di tipo GitHub File durante il controllo
-# di modifica basato sul metadato 'last_update'
+# Verifica che il metodo load di ChromaVectorStoreRepository non elimini i chunk dei documenti marcati come invariati
 
-def test_load_skip_github_file_during_update_check():
+def test_load_keeps_unchanged_documents(manifest_repository):
     # Arrange
     mock_collection = MagicMock()
-    repository = ChromaVectorStoreRepository(mock_collection)
-    documents = [MagicMock(spec=ChromaDocumentEntity)]
-    documents[0].get_metadata.return_value = {"doc_id": "1", "item_type": "GitHub File", "last_update": "2023-01-01 00:00:00"}
-    documents[0].get_page_content.return_value = "content_1"
-    mock_collection.get.return_value = {"ids": ["1"], "metadatas": [{"last_update": "2023-01-01 00:00:00"}]}
+    load_previous(manifest_repository, mock_collection, [
+        chunk("sha1", "a", 0, item_type="GitHub File", path="a.py"),
+        chunk("sha1", "b", 1, item_type="GitHub File", path="a.py"),
+        chunk("sha2", "c", 0, item_type="GitHub File", path="b.py"),
+    ])
+    repository = ChromaVectorStoreRepository(mock_collection, manifest_repository)
+    documents = [ChromaDocumentEntity(page_content="", metadata={"id": "sha1", "item_type": "GitHub File", "path": "a.py", "unchanged": True})]
 
     # Act
     result = repository.load(documents)
 
     # Assert
-    assert result.get_outcome() is True
+    mock_collection.delete.assert_called_once_with(ids=["sha2_c"])
+    mock_collection.upsert.assert_not_called()
+    assert set(manifest_repository.get_entries()) == {"sha1"}
+    assert result.get_num_added_items() == 0
+    assert result.get_num_deleted_items() == 1
+
+
+# Verifica che il metodo load di ChromaVectorStoreRepository non elimini i documenti dei tipi preservati, la cui sorgente
+# non è stata caricata, ed elimini invece quelli obsoleti degli altri tipi
+
+def test_load_keeps_documents_of_preserved_item_types(manifest_repository):
+    # Arrange
+    mock_collection = MagicMock()
+    load_previous(manifest_repository, mock_collection, [
+        chunk("BUD-1", "a", 0, item_type="Jira Issue"),
+        chunk("BUD-2", "b", 0, item_type="Jira Issue"),
+        chunk("sha1", "c", 0, item_type="GitHub File", path="a.py"),
+        chunk("sha2", "d", 0, item_type="GitHub File", path="b.py"),
+    ])
+    repository = ChromaVectorStoreRepository(mock_collection, manifest_repository)
+    documents = [chunk("sha1", "c", 0, item_type="GitHub File", path="a.py")]
+
+    # Act
+    result = repository.load(documents, {"Jira Issue"})
+
+    # Assert
+    mock_collection.delete.assert_called_once_with(ids=["sha2_d"])
+    assert set(manifest_repository.get_entries()) == {"BUD-1", "BUD-2", "sha1"}
+    assert result.get_num_deleted_items() == 1
+
+
+# Verifica che il metodo load di ChromaVectorStoreRepository ricostruisca il manifest dalla collezione se il numero di chunk
+# non corrisponde, senza riscrivere i documenti già presenti e invariati
+
+def test_load_rebuilds_manifest_out_of_sync(manifest_repository):
+    # Arrange
+    mock_collection = MagicMock()
+    documents = [chunk("1", "content_1"), chunk("2", "content_2")]
+    mock_collection.count.return_value = 2
+    mock_collection.get.return_value = {
+        "ids": ["1_content_1", "2_content_2"],
+        "documents": ["content_1", "content_2"],
+        "metadatas": [documents[0].get_metadata(), documents[1].get_metadata()],
+    }
+    repository = ChromaVectorStoreRepository(mock_collection, manifest_repository)
+
+    # Act
+    result = repository.load([documents[0]])
+
+    # Assert
+    mock_collection.get.assert_called_once_with(include=["documents", "metadatas"], limit=500, offset=0)
+    mock_collection.upsert.assert_not_called()
+    mock_collection.delete.assert_called_once_with(ids=["2_content_2"])
+    assert set(manifest_repository.get_entries()) == {"1"}
     assert result.get_num_added_items() == 0
     assert result.get_num_modified_items() == 0
-    assert result.get_num_deleted_items() == 0
+    assert result.get_num_deleted_items() == 1
 
 
-# Verifica che il metodo load di ChromaVectorStoreRepository segnali correttamente la modifica di un documento con il metadato
-# 'last_update' più recente rispetto al corrispondente presente nel database vettoriale
+# Verifica che il metodo get_ids di ChromaVectorStoreRepository recuperi dal manifest gli id dei documenti del tipo richiesto
 
-def test_load_update_document_with_recent_last_update():
+def test_get_ids_success(manifest_repository):
     # Arrange
     mock_collection = MagicMock()
-    repository = ChromaVectorStoreRepository(mock_collection)
-    documents = [MagicMock(spec=ChromaDocumentEntity)]
-    documents[0].get_metadata.return_value = {"doc_id": "1", "last_update": "2023-01-02 00:00:00"}
-    documents[0].get_page_content.return_value = "content_1"
-    mock_collection.get.return_value = {"ids": ["1"], "metadatas": [{"last_update": "2023-01-01 00:00:00"}]}
+    load_previous(manifest_repository, mock_collection, [
+        chunk("sha1", "a", 0, item_type="GitHub File"),
+        chunk("sha1", "b", 1, item_type="GitHub File"),
+        chunk("sha2", "c", 0, item_type="GitHub File"),
+        chunk("issue", "d", 0, item_type="Jira Issue"),
+    ])
+    repository = ChromaVectorStoreRepository(mock_collection, manifest_repository)
 
     # Act
-    result = repository.load(documents)
+    result = repository.get_ids("GitHub File")
+
+    # Assert
+    mock_collection.get.assert_not_called()
+    assert result == {"sha1", "sha2"}
+
+
+# Verifica che il metodo load di ChromaVectorStoreRepository consumi i documenti come flusso, scrivendo i chunk in batch
+# prima di leggere i documenti successivi, e produca gli stessi contatori del caricamento completo
+
+def test_load_streams_documents_in_batches(manifest_repository):
+    # Arrange
+    mock_collection = MagicMock()
+    load_previous(manifest_repository, mock_collection, [chunk("a", "content_a"), chunk("b", "content_b"), chunk("old", "content_old")])
+    repository = ChromaVectorStoreRepository(mock_collection, manifest_repository, batch_size=2)
+    upsert_calls_when_read = []
+
+    def documents():
+        # Registra quanti batch erano già stati scritti quando ciascun documento viene letto
+        for doc_id, content in [("a", "new_a"), ("b", "content_b"), ("c", "content_c"), ("d", "content_d"), ("e", "content_e")]:
+            upsert_calls_when_read.append(mock_collection.upsert.call_count)
+            yield chunk(doc_id, content)
+
+    # Act
+    result = repository.load(documents())
 
     # Assert
+    assert upsert_calls_when_read == [0, 0, 0, 0, 1]
+    assert [call.kwargs["ids"] for call in mock_collection.upsert.call_args_list] == [["a_new_a", "c_content_c"], ["d_content_d", "e_content_e"]]
+    assert [call.kwargs["ids"] for call in mock_collection.delete.call_args_list] == [["a_content_a", "old_content_old"]]
     assert result.get_outcome() is True
-    assert result.get_num_added_items() == 0
+    assert result.get_num_added_items() == 3
     assert result.get_num_modified_items() == 1
-    assert result.get_num_deleted_items() == 0
+    assert result.get_num_deleted_items() == 1
 
 
-# Verifica che il metodo load di ChromaVectorStoreRepository gestisca correttamente le eccezioni durante la cancellazione dei documenti
-# dal database vettoriale
+# Verifica che il metodo load di ChromaVectorStoreRepository salvi nel manifest i documenti scritti a ogni checkpoint, così che
+# quelli già scritti restino salvati se il caricamento si interrompe
 
-def test_load_exception_while_deleting_documents():
+def test_load_commits_manifest_at_checkpoints(manifest_repository):
     # Arrange
     mock_collection = MagicMock()
-    repository = ChromaVectorStoreRepository(mock_collection)
-    documents = [MagicMock(spec=ChromaDocumentEntity)]
-    documents[0].get_metadata.return_value = {"doc_id": "1"}
-    documents[0].get_page_content.return_value = "content_1"
-    mock_collection.get.return_value = {"ids": ["2"], "metadatas": [{}]}
-    mock_collection.delete.side_effect = ConnectTimeout("Delete error")
+    mock_collection.count.return_value = 0
+    repository = ChromaVectorStoreRepository(mock_collection, manifest_repository, batch_size=2, checkpoint_size=2)
+    mock_collection.upsert.side_effect = [None, ConnectionError("Upsert error")]
 
     # Act
-    result = repository.load(documents)
+    with pytest.raises(ConnectionError):
+        repository.load([chunk("a", "content_a"), chunk("b", "content_b"), chunk("c", "content_c"), chunk("d", "content_d")])
 
     # Assert
-    assert result.get_outcome() is False
-    assert result.get_num_added_items() == 0
+    assert set(manifest_repository.get_entries()) == {"a", "b"}
+    assert set(manifest_repository.get_pending_chunk_ids()) == {"c_content_c", "d_content_d"}
+
+
+# Verifica che il metodo load di ChromaVectorStoreRepository riprenda un caricamento interrotto dall'ultimo checkpoint,
+# eliminando solo i chunk non salvati nel manifest e riscrivendo solo i documenti non salvati
+
+def test_load_resumes_from_last_checkpoint(manifest_repository):
+    # Arrange
+    mock_collection = MagicMock()
+    load_previous(manifest_repository, mock_collection, [chunk("a", "content_a"), chunk("b", "content_b")])
+    manifest_repository.add_pending_chunk_ids(["b_content_b", "c_content_c"])
+    mock_collection.count.side_effect = [2]
+    repository = ChromaVectorStoreRepository(mock_collection, manifest_repository)
+
+    # Act
+    result = repository.load([chunk("a", "content_a"), chunk("b", "content_b"), chunk("c", "content_c")])
+
+    # Assert
+    mock_collection.delete.assert_called_once_with(ids=["c_content_c"])
+    mock_collection.get.assert_not_called()
+    mock_collection.upsert.assert_called_once_with(ids=["c_content_c"], documents=["content_c"],
+                                                   metadatas=[chunk("c", "content_c").get_metadata()])
+    assert manifest_repository.get_pending_chunk_ids() == []
+    assert result.get_num_added_items() == 1
+
+
+# Verifica che il metodo resync_manifest di ChromaVectorStoreRepository ricostruisca il manifest dalla collezione anche
+# se il numero di chunk corrisponde, dimenticando i chunk in sospeso senza eliminarli
+
+def test_resync_manifest_rebuilds_from_collection(manifest_repository):
+    # Arrange
+    mock_collection = MagicMock()
+    load_previous(manifest_repository, mock_collection, [chunk("1", "content_1")])
+    manifest_repository.add_pending_chunk_ids(["2_content_2"])
+    # Un'altra replica ha sostituito il documento con una nuova versione, con lo stesso numero di chunk
+    new_version = chunk("1", "content_1b")
+    mock_collection.get.return_value = {"ids": ["1_content_1b"], "documents": ["content_1b"],
+                                        "metadatas": [new_version.get_metadata()]}
+    repository = ChromaVectorStoreRepository(mock_collection, manifest_repository)
+
+    # Act
+    repository.resync_manifest()
+    result = repository.load([new_version])
+
+    # Assert
+    assert manifest_repository.get_entries()["1"].get_chunk_ids() == ["1_content_1b"]
+    assert manifest_repository.get_pending_chunk_ids() == []
+    mock_collection.delete.assert_not_called()
+    mock_collection.upsert.assert_not_called()
     assert result.get_num_modified_items() == 0
-    assert result.get_num_deleted_items() == 0
 
 
 # Verifica che il metodo similarity_search di ChromaVectorStoreRepository restituisca correttamente i risultati della ricerca di similarità
@@ -269,7 +393,7 @@ def test_load_exception_while_deleting_documents():
 def test_similarity_search_success():
     # Arrange
     mock_collection = MagicMock()
-    repository = ChromaVectorStoreRepository(mock_collection)
+    repository = ChromaVectorStoreRepository(mock_collection, MagicMock())
     query = "test query"
     mock_collection.query.return_value = {
         "documents": ["doc1", "doc2"],
@@ -292,7 +416,7 @@ def test_similarity_search_success():
 def test_similarity_search_exception():
     # Arrange
     mock_collection = MagicMock()
-    repository = ChromaVectorStoreRepository(mock_collection)
+    repository = ChromaVectorStoreRepository(mock_collection, MagicMock())
     query = "test query"
     mock_collection.query.side_effect = Exception("Search error")
 
@@ -1,5 +1,11 @@
 import pytest
 from unittest.mock import MagicMock
+from datetime import datetime
+import pytz
+
+from models.document import Document
+from models.loggingModels import PlatformLog, LoadingItems
+from entities.pageEntity import PageEntity
 
 from adapters.confluenceAdapter import ConfluenceAdapter
 from repositories.confluenceRepository import ConfluenceRepository
@@ -35,3 +41,66 @@ def test_utc_to_cet_exception():
 
     # Assert
     assert "time data 'invalid_timestamp' does not match format '%Y-%m-%dT%H:%M:%S.%fZ'" in str(exc_info.value)
+
+
+# Verifica che il metodo load_confluence_pages di ConfluenceAdapter, se riceve una data, restituisca le pagine modificate
+# e marchi come invariate le altre pagine ancora presenti in Confluence
+
+def test_load_confluence_pages_modified_since_marks_unchanged_pages():
+    # Arrange
+    mock_confluence_repository = MagicMock(spec=ConfluenceRepository)
+    confluence_adapter = ConfluenceAdapter(mock_confluence_repository)
+    modified_since = pytz.timezone('Europe/Rome').localize(datetime(2025, 3, 1, 10, 0))
+    page = PageEntity(id="12345", type="page", title="Example Page", space={"name": "Space Name"},
+                      body={"view": {"value": "<p>Content</p>"}},
+                      version={"by": {"displayName": "John Doe"}, "when": "2025-03-01T10:30:00.000Z"},
+                      status="current", ancestors=[], extensions={}, links={"webui": "/pages/12345"})
+    mock_confluence_repository.get_base_url.return_value = "https://confluence.example.com"
+    mock_confluence_repository.load_confluence_pages.return_value = (PlatformLog(LoadingItems.ConfluencePages, modified_since, True), [page])
+    mock_confluence_repository.load_confluence_page_ids.return_value = (PlatformLog(LoadingItems.ConfluencePages, modified_since, True), ["12345", "67890"])
+
+    # Act
+    log, documents = confluence_adapter.load_confluence_pages(modified_since)
+
+    # Assert
+    mock_confluence_repository.load_confluence_pages.assert_called_once_with(modified_since)
+    assert log.get_outcome() is True
+    assert len(documents) == 2
+    assert documents[0].get_page_content() == "<p>Content</p>"
+    assert documents[0].get_metadata()["id"] == "12345"
+    assert documents[1] == Document(page_content="", metadata={"item_type": "Confluence Page", "id": "67890", "unchanged": True})
+
+
+# Verifica che il metodo load_confluence_pages di ConfluenceAdapter restituisca un log di fallimento se l'elenco degli id non è disponibile
+
+def test_load_confluence_pages_modified_since_ids_failure():
+    # Arrange
+    mock_confluence_repository = MagicMock(spec=ConfluenceRepository)
+    confluence_adapter = ConfluenceAdapter(mock_confluence_repository)
+    modified_since = pytz.timezone('Europe/Rome').localize(datetime(2025, 3, 1, 10, 0))
+    mock_confluence_repository.load_confluence_pages.return_value = (PlatformLog(LoadingItems.ConfluencePages, modified_since, True), [])
+    mock_confluence_repository.load_confluence_page_ids.return_value = (PlatformLog(LoadingItems.ConfluencePages, modified_since, False), [])
+
+    # Act
+    log, documents = confluence_adapter.load_confluence_pages(modified_since)
+
+    # Assert
+    assert log.get_outcome() is False
+    assert documents == []
+
+
+# Verifica che il metodo load_confluence_pages di ConfluenceAdapter, senza data, non richieda l'elenco degli id
+
+def test_load_confluence_pages_full_does_not_list_ids():
+    # Arrange
+    mock_confluence_repository = MagicMock(spec=ConfluenceRepository)
+    confluence_adapter = ConfluenceAdapter(mock_confluence_repository)
+    mock_confluence_repository.load_confluence_pages.return_value = (PlatformLog(LoadingItems.ConfluencePages, datetime(2025, 3, 1), True), [])
+
+    # Act
+    log, documents = confluence_adapter.load_confluence_pages()
+
+    # Assert
+    mock_confluence_repository.load_confluence_pages.assert_called_once_with(None)
+    mock_confluence_repository.load_confluence_page_ids.assert_not_called()
+    assert documents == []
@@ -97,3 +97,33 @@ def test_replace_html_entities_exception():
 
     # Assert
     assert str(exc_info.value) == "Document content is empty"
+
+
+# Verifica che il metodo clean_confluence_pages di ConfluenceCleanerService lasci invariate le pagine marcate come invariate, prive di contenuto
+
+def test_clean_confluence_pages_skips_unchanged_pages():
+    # Arrange
+    service = ConfluenceCleanerService()
+    unchanged_page = Document(page_content="", metadata={"item_type": "Confluence Page", "id": "1", "unchanged": True})
+    pages = [unchanged_page, Document(page_content="<p>doc2</p>", metadata={"id": "2"})]
+
+    # Act
+    result = service.clean_confluence_pages(pages)
+
+    # Assert
+    assert result[0] == Document(page_content="", metadata={"item_type": "Confluence Page", "id": "1", "unchanged": True})
+    assert result[1].get_page_content() == " doc2 "
+
+
+# Verifica che il metodo remove_html_tags di ConfluenceCleanerService mantenga i titoli come titoli Markdown su una nuova riga
+
+def test_remove_html_tags_keeps_headings():
+    # Arrange
+    service = ConfluenceCleanerService()
+    document = Document(page_content='<h1>Title</h1><p>intro</p><h2 id="setup">Setup</h2><p>steps</p>', metadata={"id": 1})
+
+    # Act
+    result = service._ConfluenceCleanerService__remove_html_tags(document)
+
+    # Assert
+    assert result.get_page_content() == "\n# Title\n intro \n## Setup\n steps "
@@ -7,6 +7,7 @@ from requests.exceptions import RequestException
 from models.loggingModels import PlatformLog, LoadingItems
 from entities.pageEntity import PageEntity
 from repositories.confluenceRepository import ConfluenceRepository
+from utils.http_client import HttpClient
 
 # Verifica che il metodo get_base_url di ConfluenceRepository ritorni l'URL base corretto
 def test_get_base_url():
@@ -21,7 +22,7 @@ def test_get_base_url():
     assert result == base_url
 
 # Verifica che il metodo load_confluence_pages di ConfluenceRepository ritorni le pagine correttamente
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_load_confluence_pages(mock_get):
     # Arrange
     base_url = "https://confluence.example.com"
@@ -72,7 +73,7 @@ def test_load_confluence_pages(mock_get):
     assert pages == expected_pages
 
 # Verifica che il metodo load_confluence_pages di ConfluenceRepository gestisca correttamente le eccezioni di richiesta
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_load_confluence_pages_request_exception(mock_get):
     # Arrange
     base_url = "https://confluence.example.com"
@@ -92,7 +93,7 @@ def test_load_confluence_pages_request_exception(mock_get):
     assert pages == []
 
 # Verifica che il metodo load_confluence_pages di ConfluenceRepository gestisca correttamente le eccezioni generiche
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_load_confluence_pages_generic_exception(mock_get):
     # Arrange
     base_url = "https://confluence.example.com"
@@ -108,3 +109,84 @@ def test_load_confluence_pages_generic_exception(mock_get):
         repository.load_confluence_pages()
 
     assert str(exc_info.value) == "Generic error"
+
+# Verifica che il metodo load_confluence_pages di ConfluenceRepository scarichi in parallelo le pagine successive alla prima, mantenendone l'ordine
+@patch('requests.Session.get')
+def test_load_confluence_pages_multiple_pages(mock_get):
+    # Arrange
+    repository = ConfluenceRepository("https://confluence.example.com", "PROJECT_KEY", 30, {}, HttpClient(30, {}, max_in_flight=2))
+
+    def page(id):
+        return {"id": id, "type": "page", "title": f"Page {id}", "space": {}, "body": {}, "version": {},
+                "status": "current", "ancestors": [], "extensions": {}, "_links": {}}
+
+    def get(url, params, timeout):
+        # Il server riduce il limite a 2 risultati per pagina; le pagine disponibili sono 5
+        start = params["start"]
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {"limit": 2, "results": [page(str(i)) for i in range(start, min(start + 2, 5))]}
+        return response
+    mock_get.side_effect = get
+
+    # Act
+    log, pages = repository.load_confluence_pages()
+
+    # Assert
+    assert log.get_outcome() is True
+    assert [page.get_id() for page in pages] == ["0", "1", "2", "3", "4"]
+    assert sorted(call.kwargs["params"]["start"] for call in mock_get.call_args_list) == [0, 2, 4]
+
+# Verifica che il metodo load_confluence_pages di ConfluenceRepository, se riceve una data, usi la ricerca CQL per lastmodified
+@patch('requests.Session.get')
+def test_load_confluence_pages_modified_since(mock_get):
+    # Arrange
+    repository = ConfluenceRepository("https://confluence.example.com", "SPACEKEY", 30, {})
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"results": []}
+    mock_get.return_value = mock_response
+    modified_since = pytz.utc.localize(datetime(2025, 3, 1, 9, 0))
+
+    # Act
+    log, pages = repository.load_confluence_pages(modified_since)
+
+    # Assert
+    assert log.get_outcome() is True
+    assert pages == []
+    assert mock_get.call_args.args[0] == "https://confluence.example.com/rest/api/content/search"
+    assert mock_get.call_args.kwargs["params"]["cql"] == 'space="SPACEKEY" AND type=page AND lastmodified >= "2025/03/01 10:00"'
+    assert "spaceKey" not in mock_get.call_args.kwargs["params"]
+
+# Verifica che il metodo load_confluence_page_ids di ConfluenceRepository recuperi gli id di tutte le pagine, senza il loro corpo
+@patch('requests.Session.get')
+def test_load_confluence_page_ids(mock_get):
+    # Arrange
+    repository = ConfluenceRepository("https://confluence.example.com", "SPACEKEY", 30, {})
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"limit": 1000, "results": [{"id": "1", "title": "A"}, {"id": "2", "title": "B"}]}
+    mock_get.return_value = mock_response
+
+    # Act
+    log, ids = repository.load_confluence_page_ids()
+
+    # Assert
+    assert log.get_loading_items() == LoadingItems.ConfluencePages
+    assert log.get_outcome() is True
+    assert ids == ["1", "2"]
+    assert "expand" not in mock_get.call_args.kwargs["params"]
+
+# Verifica che il metodo load_confluence_page_ids di ConfluenceRepository gestisca correttamente le eccezioni di richiesta
+@patch('requests.Session.get')
+def test_load_confluence_page_ids_request_exception(mock_get):
+    # Arrange
+    repository = ConfluenceRepository("https://confluence.example.com", "SPACEKEY", 30, {})
+    mock_get.side_effect = RequestException("Request error")
+
+    # Act
+    log, ids = repository.load_confluence_page_ids()
+
+    # Assert
+    assert log.get_outcome() is False
+    assert ids == []
@@ -0,0 +1,96 @@
+import random
+
+from utils.content_defined_chunker import ContentDefinedChunker
+
+
+def generate_text(num_lines: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return "".join(f"line {i}: {'x' * rng.randint(0, 80)}\n" for i in range(num_lines))
+
+
+# Verifica che il metodo split di ContentDefinedChunker restituisca chunk che ricompongono il testo, non più grandi
+# della dimensione massima e terminanti a fine riga
+
+def test_split_respects_max_size_and_line_boundaries():
+    # Arrange
+    chunker = ContentDefinedChunker(2000)
+    text = generate_text(2000) + "y" * 5000
+
+    # Act
+    chunks = chunker.split(text)
+
+    # Assert
+    assert "".join(chunks) == text
+    assert all(len(chunk) <= 2000 for chunk in chunks)
+    assert all(chunk.endswith("\n") for chunk in chunks if "y" not in chunk)
+    assert chunker.split("") == []
+
+
+# Verifica che con ContentDefinedChunker l'inserimento di una riga in cima al testo modifichi solo uno o due chunk,
+# mentre con la suddivisione a offset fissi cambiano tutti i chunk successivi
+
+def test_split_insertion_changes_only_nearby_chunks():
+    # Arrange
+    chunker = ContentDefinedChunker(2000)
+    text = generate_text(2000)
+    edited_text = text.replace("line 3:", "inserted line\nline 3:", 1)
+    fixed_split = lambda value: [value[i:i + 2000] for i in range(0, len(value), 2000)]
+
+    # Act
+    original_chunks = set(chunker.split(text))
+    edited_chunks = chunker.split(edited_text)
+    changed_fixed_chunks = set(fixed_split(edited_text)) - set(fixed_split(text))
+
+    # Assert
+    assert len(edited_chunks) > 10
+    assert len([chunk for chunk in edited_chunks if chunk not in original_chunks]) <= 2
+    assert len(changed_fixed_chunks) >= len(fixed_split(text)) - 1
+
+
+# Verifica che con un pattern di confine ContentDefinedChunker divida il testo solo all'inizio delle sezioni,
+# misurando la dimensione dei chunk con la funzione data
+
+def test_split_on_structural_boundaries_with_size_function():
+    # Arrange
+    count_words = lambda value: len(value.split())
+    chunker = ContentDefinedChunker(60, 10, 10, size_function=count_words, boundary_pattern=r"^def ")
+    text = "".join(f"def function_{i}():\n" + "    x = 1\n" * (i % 5 + 1) for i in range(50))
+
+    # Act
+    chunks = chunker.split(text)
+
+    # Assert
+    assert "".join(chunks) == text
+    assert len(chunks) > 1
+    assert all(chunk.startswith("def ") for chunk in chunks)
+    assert all(count_words(chunk) <= 60 for chunk in chunks)
+
+
+# Verifica che con un pattern di confine ContentDefinedChunker divida in righe le sezioni più grandi della dimensione massima
+
+def test_split_oversized_section_into_lines():
+    # Arrange
+    chunker = ContentDefinedChunker(100, boundary_pattern=r"^# ")
+    text = "# Title\n" + "".join(f"line {i}\n" for i in range(100))
+
+    # Act
+    chunks = chunker.split(text)
+
+    # Assert
+    assert "".join(chunks) == text
+    assert all(len(chunk) <= 100 and chunk.endswith("\n") for chunk in chunks)
+
+
+# Verifica che il metodo overlap di ContentDefinedChunker restituisca le ultime righe del chunk entro la dimensione
+# di sovrapposizione
+
+def test_overlap_returns_last_lines_within_size():
+    # Arrange
+    chunker = ContentDefinedChunker(100, overlap_size=13)
+
+    # Act
+    overlap = chunker.overlap("first line\nsecond\nthird\n")
+
+    # Assert
+    assert overlap == "second\nthird\n"
+    assert ContentDefinedChunker(100).overlap("first line\n") == ""
@@ -0,0 +1,65 @@
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+
+from utils.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "embedding_cache.sqlite")
+
+
+@pytest.fixture
+def embedding_function():
+    return MagicMock(side_effect=lambda texts: [np.array([float(len(text)), 1.0]) for text in texts])
+
+
+# Verifica che il metodo embed di EmbeddingCache calcoli solo gli embedding mancanti, una sola volta per i testi identici
+
+def test_embed_computes_only_missing_embeddings(cache_path, embedding_function):
+    # Arrange
+    cache = EmbeddingCache(cache_path, embedding_function, "model")
+    cache.embed(["a", "bb"])
+
+    # Act
+    result = cache.embed(["bb", "ccc", "ccc"])
+
+    # Assert
+    assert embedding_function.call_args_list[1].args[0] == ["ccc"]
+    assert [embedding.tolist() for embedding in result] == [[2.0, 1.0], [3.0, 1.0], [3.0, 1.0]]
+    assert cache.get_num_hits() == 2
+    assert cache.get_num_misses() == 3
+
+
+# Verifica che EmbeddingCache mantenga gli embedding su disco, separati per modello di embedding
+
+def test_embed_persists_embeddings_by_model(cache_path, embedding_function):
+    # Arrange
+    EmbeddingCache(cache_path, embedding_function, "model").embed(["a"])
+    embedding_function.reset_mock()
+
+    # Act
+    EmbeddingCache(cache_path, embedding_function, "model").embed(["a"])
+    EmbeddingCache(cache_path, embedding_function, "other-model").embed(["a"])
+
+    # Assert
+    embedding_function.assert_called_once_with(["a"])
+
+
+# Verifica che EmbeddingCache elimini gli embedding usati meno di recente quando supera il numero massimo di voci
+
+def test_embed_evicts_least_recently_used(cache_path, embedding_function):
+    # Arrange
+    cache = EmbeddingCache(cache_path, embedding_function, "model", max_entries=2)
+    cache.embed(["a"])
+    cache.embed(["bb"])
+    cache.embed(["a"])
+
+    # Act
+    cache.embed(["ccc"])
+    embedding_function.reset_mock()
+    cache.embed(["a", "bb"])
+
+    # Assert
+    embedding_function.assert_called_once_with(["bb"])
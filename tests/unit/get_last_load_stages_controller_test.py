@@ -0,0 +1,44 @@
+import pytest
+from unittest.mock import MagicMock
+
+from dto.stageLogDTO import StageLogDTO
+from models.loggingModels import LoadingStage, StageLog
+from controllers.getLastLoadStagesController import GetLastLoadStagesController
+from use_cases.getLastLoadStagesUseCase import GetLastLoadStagesUseCase
+
+
+# Verifica che il metodo get_last_load_stages di GetLastLoadStagesController converta i log delle fasi in DTO
+
+def test_get_last_load_stages_success():
+    # Arrange
+    mock_get_last_load_stages_use_case = MagicMock(spec=GetLastLoadStagesUseCase)
+    get_last_load_stages_controller = GetLastLoadStagesController(mock_get_last_load_stages_use_case)
+    mock_get_last_load_stages_use_case.get_last_load_stage_logs.return_value = [
+        StageLog(LoadingStage.JiraIssuesFetch, 2.5, 100, 4096, 3, 1024),
+        StageLog(LoadingStage.Adds, 1.0, 50)
+    ]
+
+    # Act
+    result = get_last_load_stages_controller.get_last_load_stages()
+
+    # Assert
+    assert result == [
+        StageLogDTO("Jira Issues fetch", 2.5, 100, 4096, 3, 1024),
+        StageLogDTO("Adds", 1.0, 50, 0, 0, 0)
+    ]
+
+
+# Verifica che il metodo get_last_load_stages di GetLastLoadStagesController gestisca correttamente le eccezioni
+
+def test_get_last_load_stages_exception():
+    # Arrange
+    mock_get_last_load_stages_use_case = MagicMock(spec=GetLastLoadStagesUseCase)
+    get_last_load_stages_controller = GetLastLoadStagesController(mock_get_last_load_stages_use_case)
+    mock_get_last_load_stages_use_case.get_last_load_stage_logs.side_effect = Exception("Test exception")
+
+    # Act
+    with pytest.raises(Exception) as exc_info:
+        get_last_load_stages_controller.get_last_load_stages()
+
+    # Assert
+    assert str(exc_info.value) == "Test exception"
@@ -0,0 +1,38 @@
+import pytest
+from unittest.mock import MagicMock
+
+from models.loggingModels import LoadingStage, StageLog
+from services.getLastLoadStagesService import GetLastLoadStagesService
+from ports.getLastLoadStagesPort import GetLastLoadStagesPort
+
+
+# Verifica che il metodo get_last_load_stage_logs di GetLastLoadStagesService restituisca i log delle fasi forniti dalla porta
+
+def test_get_last_load_stage_logs_success():
+    # Arrange
+    mock_get_last_load_stages_port = MagicMock(spec=GetLastLoadStagesPort)
+    get_last_load_stages_service = GetLastLoadStagesService(mock_get_last_load_stages_port)
+    stage_logs = [StageLog(LoadingStage.Splitting, 1.5, 10, 2048)]
+    mock_get_last_load_stages_port.get_last_load_stage_logs.return_value = stage_logs
+
+    # Act
+    result = get_last_load_stages_service.get_last_load_stage_logs()
+
+    # Assert
+    assert result == stage_logs
+
+
+# Verifica che il metodo get_last_load_stage_logs di GetLastLoadStagesService gestisca correttamente le eccezioni
+
+def test_get_last_load_stage_logs_exception():
+    # Arrange
+    mock_get_last_load_stages_port = MagicMock(spec=GetLastLoadStagesPort)
+    get_last_load_stages_service = GetLastLoadStagesService(mock_get_last_load_stages_port)
+    mock_get_last_load_stages_port.get_last_load_stage_logs.side_effect = Exception("Port error")
+
+    # Act
+    with pytest.raises(Exception) as exc_info:
+        get_last_load_stages_service.get_last_load_stage_logs()
+
+    # Assert
+    assert str(exc_info.value) == "Port error"
@@ -0,0 +1,138 @@
+import pytest
+import base64
+import subprocess
+from datetime import datetime, timezone
+
+from models.loggingModels import LoadingItems
+from repositories.gitMirrorRepository import GitMirrorRepository
+
+
+def git(cwd, *args, date="2025-03-01T10:00:00+00:00"):
+    env = {"GIT_AUTHOR_DATE": date, "GIT_COMMITTER_DATE": date, "HOME": str(cwd), "PATH": "/usr/bin:/bin:/usr/local/bin"}
+    subprocess.run(["git", "-c", "user.name=John Doe", "-c", "user.email=john.doe@example.com", *args],
+                   cwd=cwd, env=env, check=True, capture_output=True)
+
+
+@pytest.fixture
+def remote(tmp_path):
+    # Crea una repository bare con due commit, usata come remote del mirror
+    work = tmp_path / "work"
+    work.mkdir()
+    git(work, "init", "-q", "-b", "main")
+    (work / "README.md").write_text("Hello\n")
+    (work / "src").mkdir()
+    (work / "src" / "app.py").write_text("print('a')\nprint('b')\n")
+    git(work, "add", ".")
+    git(work, "commit", "-q", "-m", "Initial commit")
+    (work / "src" / "app.py").write_text("print('a')\nprint('c')\n")
+    git(work, "mv", "README.md", "README.txt")
+    git(work, "add", ".")
+    git(work, "commit", "-q", "-m", "Fix app\n\nLonger description", date="2025-03-02T10:00:00+00:00")
+    bare = tmp_path / "remote.git"
+    git(tmp_path, "clone", "-q", "--bare", str(work), str(bare))
+    return work, bare
+
+
+# Verifica che il metodo load_github_commits di GitMirrorRepository carichi correttamente i commit dal mirror locale
+
+def test_load_github_commits_success(remote, tmp_path):
+    # Arrange
+    _, bare = remote
+    repository = GitMirrorRepository(str(bare), str(tmp_path / "mirror.git"), "owner/repo", "https://github.com/owner/repo")
+
+    # Act
+    log, commits = repository.load_github_commits()
+
+    # Assert
+    assert log.get_loading_items() == LoadingItems.GitHubCommits
+    assert log.get_outcome() is True
+    assert len(commits) == 2
+    assert commits[0].get_message() == "Fix app\n\nLonger description"
+    assert commits[0].get_author_name() == "John Doe"
+    assert commits[0].get_author_email() == "john.doe@example.com"
+    assert commits[0].get_author_date() == datetime(2025, 3, 2, 10, 0, tzinfo=timezone.utc)
+    assert commits[0].get_url() == f"https://github.com/owner/repo/commit/{commits[0].get_sha()}"
+    files = {file.get_filename(): file for file in commits[0].get_files()}
+    assert files["README.txt"].get_status() == "renamed"
+    assert files["README.txt"].get_patch() is None
+    assert files["src/app.py"].get_status() == "modified"
+    assert files["src/app.py"].get_additions() == 1
+    assert files["src/app.py"].get_deletions() == 1
+    assert files["src/app.py"].get_changes() == 2
+    assert files["src/app.py"].get_patch() == "@@ -1,2 +1,2 @@\n print('a')\n-print('b')\n+print('c')"
+    assert [file.get_status() for file in commits[1].get_files()] == ["added", "added"]
+
+
+# Verifica che il metodo load_github_commits di GitMirrorRepository carichi solo i commit successivi alla data indicata,
+# dopo aver aggiornato il mirror con i nuovi commit del remote
+
+def test_load_github_commits_since_after_fetch(remote, tmp_path):
+    # Arrange
+    work, bare = remote
+    repository = GitMirrorRepository(str(bare), str(tmp_path / "mirror.git"), "owner/repo", "https://github.com/owner/repo")
+    repository.load_github_commits()
+    (work / "new.txt").write_text("new\n")
+    git(work, "add", ".")
+    git(work, "commit", "-q", "-m", "Add new file", date="2025-03-03T10:00:00+00:00")
+    git(work, "push", "-q", str(bare), "main")
+
+    # Act
+    log, commits = repository.load_github_commits(datetime(2025, 3, 2, 12, 0, tzinfo=timezone.utc))
+
+    # Assert
+    assert log.get_outcome() is True
+    assert [commit.get_message() for commit in commits] == ["Add new file"]
+
+
+# Verifica che il metodo load_github_commits di GitMirrorRepository gestisca correttamente gli errori di git
+
+def test_load_github_commits_exception(tmp_path):
+    # Arrange
+    repository = GitMirrorRepository(str(tmp_path / "missing.git"), str(tmp_path / "mirror.git"), "owner/repo", "https://github.com/owner/repo")
+
+    # Act
+    log, commits = repository.load_github_commits()
+
+    # Assert
+    assert log.get_loading_items() == LoadingItems.GitHubCommits
+    assert log.get_outcome() is False
+    assert commits == []
+
+
+# Verifica che il metodo load_github_files_from_tree di GitMirrorRepository legga dal mirror solo i file nuovi o modificati
+
+def test_load_github_files_from_tree_success(remote, tmp_path):
+    # Arrange
+    work, bare = remote
+    known_sha = subprocess.run(["git", "rev-parse", "HEAD:README.txt"], cwd=work, check=True, capture_output=True, text=True).stdout.strip()
+    repository = GitMirrorRepository(str(bare), str(tmp_path / "mirror.git"), "owner/repo", "https://github.com/owner/repo")
+
+    # Act
+    log, files = repository.load_github_files_from_tree({known_sha})
+
+    # Assert
+    assert log.get_loading_items() == LoadingItems.GitHubFiles
+    assert log.get_outcome() is True
+    assert [file.get_path() for file in files] == ["README.txt", "src/app.py"]
+    assert files[0].get_sha() == known_sha
+    assert files[0].is_unchanged() is True
+    assert files[0].get_content() == ""
+    assert files[1].is_unchanged() is False
+    assert files[1].get_name() == "app.py"
+    assert base64.b64decode(files[1].get_content()).decode("utf-8") == "print('a')\nprint('c')\n"
+    assert files[1].get_html_url() == "https://github.com/owner/repo/blob/main/src/app.py"
+
+
+# Verifica che il metodo load_github_files_from_tree di GitMirrorRepository gestisca correttamente gli errori di git
+
+def test_load_github_files_from_tree_exception(tmp_path):
+    # Arrange
+    repository = GitMirrorRepository(str(tmp_path / "missing.git"), str(tmp_path / "mirror.git"), "owner/repo", "https://github.com/owner/repo")
+
+    # Act
+    log, files = repository.load_github_files_from_tree()
+
+    # Assert
+    assert log.get_loading_items() == LoadingItems.GitHubFiles
+    assert log.get_outcome() is False
+    assert files == []
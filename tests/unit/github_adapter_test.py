@@ -3,6 +3,7 @@ import unittest.mock
 from unittest.mock import MagicMock
 from datetime import datetime, timedelta
 
+from models.document import Document
 from models.loggingModels import PlatformLog, LoadingItems
 from entities.fileEntity import FileEntity
 from adapters.gitHubAdapter import GitHubAdapter
@@ -31,7 +32,7 @@ def test_load_github_files_exception():
     # Arrange
     mock_github_repository = MagicMock(spec=GitHubRepository)
     github_adapter = GitHubAdapter(mock_github_repository)
-    mock_github_repository.load_github_files.side_effect = Exception("Error while loading files")
+    mock_github_repository.load_github_files_from_tree.side_effect = Exception("Error while loading files")
 
     # Act
     with pytest.raises(Exception) as exc_info:
@@ -71,11 +72,52 @@ def test_load_github_files_unicode_decode_error():
         ]
     )
 
-    mock_github_repository.load_github_files.return_value = repository_return_value
+    mock_github_repository.load_github_files_from_tree.return_value = repository_return_value
 
     # Act
     result = github_adapter.load_github_files()
 
     # Assert
-    mock_github_repository.load_github_files.assert_called_once()
+    mock_github_repository.load_github_files_from_tree.assert_called_once()
     assert len(result[1]) == 0  # No documents should be returned due to UnicodeDecodeError
+
+
+# Verifica che il metodo load_github_files di GitHubAdapter converta i file invariati in documenti senza contenuto,
+# marcati come "unchanged"
+
+def test_load_github_files_unchanged_file():
+    # Arrange
+    mock_github_repository = MagicMock(spec=GitHubRepository)
+    github_adapter = GitHubAdapter(mock_github_repository)
+
+    log = PlatformLog(loading_items=LoadingItems.GitHubFiles, timestamp=datetime(2025, 2, 28, 12, 34, 56), outcome=True)
+    unchanged_file = FileEntity(
+        type="file",
+        encoding="base64",
+        size=1234,
+        name="example.txt",
+        path="path/to/example.txt",
+        content="",
+        sha="abc123",
+        url="https://api.github.com/repos/owner/repo/git/blobs/abc123",
+        html_url="https://github.com/owner/repo/blob/main/path/to/example.txt",
+        download_url="https://raw.githubusercontent.com/owner/repo/main/path/to/example.txt",
+        git_url="https://api.github.com/repos/owner/repo/git/blobs/abc123",
+        unchanged=True
+    )
+    mock_github_repository.load_github_files_from_tree.return_value = (log, [unchanged_file])
+
+    # Act
+    result = github_adapter.load_github_files({"abc123"})
+
+    # Assert
+    mock_github_repository.load_github_files_from_tree.assert_called_once_with({"abc123"})
+    assert result == (log, [
+        Document(page_content="", metadata={
+            "name": "example.txt",
+            "path": "path/to/example.txt",
+            "item_type": "GitHub File",
+            "id": "abc123",
+            "unchanged": True,
+        })
+    ])
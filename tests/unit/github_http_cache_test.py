@@ -0,0 +1,149 @@
+import pytest
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from github import Github
+from github.GithubException import RateLimitExceededException
+from github.Requester import Requester
+
+from utils.github_http_cache import GitHubHttpCache
+from utils.rate_limit_budget import RateLimitBudget
+
+
+class FakeGitHubServer:
+    """Server HTTP locale che simula l'API di GitHub, rispondendo 304 alle richieste condizionali con l'ETag corrente."""
+
+    def __init__(self):
+        self.etag = '"v1"'
+        self.full_name = "owner/repo"
+        self.rate_limit_remaining = 4000
+        self.conditional_requests = []
+        self.statuses = []
+        self.lock = threading.Lock()
+
+
+@pytest.fixture
+def fake_github():
+    state = FakeGitHubServer()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if_none_match = self.headers.get("If-None-Match")
+            with state.lock:
+                state.conditional_requests.append(if_none_match)
+                not_modified = if_none_match == state.etag
+                # Come su GitHub, le risposte 304 non vengono conteggiate nel rate limit
+                if not not_modified:
+                    state.rate_limit_remaining -= 1
+                state.statuses.append(304 if not_modified else 200)
+                remaining = state.rate_limit_remaining
+            body = b"" if not_modified else json.dumps({"full_name": state.full_name, "name": "repo"}).encode("utf-8")
+            self.send_response(304 if not_modified else 200)
+            self.send_header("ETag", state.etag)
+            self.send_header("X-RateLimit-Remaining", str(remaining))
+            self.send_header("X-RateLimit-Limit", "5000")
+            self.send_header("X-RateLimit-Reset", "9999999999")
+            if not not_modified:
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield state
+    server.shutdown()
+    server.server_close()
+    Requester.resetConnectionClasses()
+
+
+def get_repo(cache: GitHubHttpCache, base_url: str):
+    # Come nella dependency injection, PyGithub invia le richieste attraverso la cache
+    Requester.injectConnectionClasses(*cache.connection_classes())
+    return Github(base_url=base_url).get_repo("owner/repo")
+
+
+# Verifica che GitHubHttpCache invii come richiesta condizionale una richiesta già in cache, e che restituisca a PyGithub
+# la risposta in cache quando il server risponde 304 (Not Modified)
+
+def test_send_returns_cached_response_on_not_modified(fake_github, tmp_path):
+    # Arrange
+    cache = GitHubHttpCache(str(tmp_path / "github_http_cache.sqlite"))
+    get_repo(cache, fake_github.base_url)
+
+    # Act
+    repo = get_repo(GitHubHttpCache(str(tmp_path / "github_http_cache.sqlite")), fake_github.base_url)
+
+    # Assert
+    assert fake_github.conditional_requests == [None, '"v1"']
+    assert fake_github.statuses == [200, 304]
+    assert repo.full_name == "owner/repo"
+
+
+# Verifica che GitHubHttpCache restituisca e salvi la nuova risposta quando la risorsa è cambiata
+
+def test_send_updates_cache_on_modified_resource(fake_github, tmp_path):
+    # Arrange
+    cache = GitHubHttpCache(str(tmp_path / "github_http_cache.sqlite"))
+    get_repo(cache, fake_github.base_url)
+    fake_github.etag = '"v2"'
+    fake_github.full_name = "owner/renamed"
+
+    # Act
+    repo = get_repo(cache, fake_github.base_url)
+    cached_repo = get_repo(cache, fake_github.base_url)
+
+    # Assert
+    assert fake_github.statuses == [200, 200, 304]
+    assert fake_github.conditional_requests == [None, '"v1"', '"v2"']
+    assert repo.full_name == cached_repo.full_name == "owner/renamed"
+    assert cache.get_num_not_modified() == 1
+    assert cache.get_stats().get_num_requests() == 3
+
+
+# Verifica che GitHubHttpCache rinvii le richieste non condizionali quando il budget del rate limit è esaurito,
+# lasciando passare quelle condizionali, che non vengono conteggiate
+
+def test_send_defers_requests_when_budget_exhausted(fake_github, tmp_path):
+    # Arrange
+    fake_github.rate_limit_remaining = 11
+    budget = RateLimitBudget(reserve=10, pacing_threshold=10)
+    cache = GitHubHttpCache(str(tmp_path / "github_http_cache.sqlite"), budget)
+    get_repo(cache, fake_github.base_url)
+
+    # Act
+    cached_repo = get_repo(cache, fake_github.base_url)
+    with pytest.raises(RateLimitExceededException):
+        get_repo(GitHubHttpCache(str(tmp_path / "other_cache.sqlite"), budget), fake_github.base_url)
+
+    # Assert
+    assert cached_repo.full_name == "owner/repo"
+    assert fake_github.statuses == [200, 304]
+    assert budget.get_remaining() == 10
+    assert budget.get_num_deferred() == 1
+
+
+# Verifica che GitHubHttpCache raccolga le statistiche anche per risorsa della repository
+
+def test_get_stats_by_repository_resource(fake_github, tmp_path):
+    # Arrange
+    cache = GitHubHttpCache(str(tmp_path / "github_http_cache.sqlite"))
+    repo = get_repo(cache, fake_github.base_url)
+
+    # Act
+    repo.get_commit("sha1")
+    repo.get_commit("sha1")
+
+    # Assert
+    assert cache.get_stats("commits").get_num_requests() == 2
+    assert cache.get_stats("commits").get_num_bytes() > 0
+    assert cache.get_num_not_modified("commits") == 1
+    assert cache.get_stats("contents").get_num_requests() == 0
+    assert cache.get_stats().get_num_requests() == 3
@@ -1,10 +1,16 @@
 import pytest
-from unittest.mock import MagicMock
-from datetime import datetime
+import threading
+import time
+from unittest.mock import MagicMock, PropertyMock
+from datetime import datetime, timedelta, timezone
+import pytz
 from github.Repository import Repository
 
 from models.loggingModels import LoadingItems
 from repositories.gitHubRepository import GitHubRepository
+from models.httpStats import HttpStats
+from utils.github_http_cache import GitHubHttpCache
+from utils.rate_limit_budget import RateLimitBudget
 
 
 # Verifica che il metodo load_github_commits di GitHubRepository carichi correttamente i commit di GitHub
@@ -54,6 +60,45 @@ def test_load_github_commits_exception():
     assert commits == []
 
 
+# Verifica che il metodo load_github_commits di GitHubRepository scarichi in parallelo i file dei commit, senza superare
+# la concorrenza massima, e restituisca i commit nell'ordine della lista
+
+def test_load_github_commits_fetches_details_concurrently():
+    # Arrange
+    mock_repo = MagicMock(spec=Repository)
+    lock = threading.Lock()
+    in_flight = [0, 0]
+
+    def make_commit(index: int) -> MagicMock:
+        def fetch_files():
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight[1], in_flight[0])
+            # I primi commit rispondono più lentamente, per verificare che l'ordine non dipenda dai tempi di risposta
+            time.sleep(0.1 if index < 2 else 0.02)
+            with lock:
+                in_flight[0] -= 1
+            return [MagicMock(filename=f"file{index}.txt", status="modified", changes=1, additions=1, deletions=0, patch="")]
+
+        mock_commit = MagicMock()
+        mock_commit.sha = f"sha{index}"
+        mock_commit.commit.author.date = datetime(2025, 2, 28, 12, 34, index)
+        type(mock_commit).files = PropertyMock(side_effect=fetch_files)
+        return mock_commit
+
+    mock_repo.get_commits.return_value = [make_commit(index) for index in range(6)]
+    github_repository = GitHubRepository(mock_repo, max_concurrency=3)
+
+    # Act
+    log, commits = github_repository.load_github_commits()
+
+    # Assert
+    assert log.get_outcome() is True
+    assert [commit.get_sha() for commit in commits] == [f"sha{index}" for index in range(6)]
+    assert [commit.get_files()[0].get_filename() for commit in commits] == [f"file{index}.txt" for index in range(6)]
+    assert in_flight[1] == 3
+
+
 # Verifica che il metodo load_github_files di GitHubRepository carichi correttamente i file di GitHub
 
 def test_load_github_files_success():
@@ -135,3 +180,137 @@ def test_load_github_files_with_directory():
     assert files[0].get_name() == "example_in_dir.txt"
     assert files[0].get_content() == "SGVsbG8gd29ybGQhCg=="
 
+
+
+# Verifica che il metodo load_github_commits di GitHubRepository richieda solo i commit successivi alla data indicata
+
+def test_load_github_commits_since():
+    # Arrange
+    mock_repo = MagicMock(spec=Repository)
+    mock_repo.get_commits.return_value = []
+    github_repository = GitHubRepository(mock_repo)
+    since = datetime(2025, 2, 28, 12, 34, 56)
+
+    # Act
+    log, commits = github_repository.load_github_commits(since)
+
+    # Assert
+    mock_repo.get_commits.assert_called_once_with(since=since)
+    assert log.get_outcome() is True
+    assert commits == []
+
+
+# Verifica che il metodo load_github_commits di GitHubRepository converta in UTC la data con fuso orario indicata,
+# poiché PyGithub la invia a GitHub senza convertirla
+
+def test_load_github_commits_since_converts_to_utc():
+    # Arrange
+    mock_repo = MagicMock(spec=Repository)
+    mock_repo.get_commits.return_value = []
+    github_repository = GitHubRepository(mock_repo)
+    since = pytz.timezone('Europe/Rome').localize(datetime(2025, 7, 1, 12, 0, 0))
+
+    # Act
+    github_repository.load_github_commits(since)
+
+    # Assert
+    mock_repo.get_commits.assert_called_once_with(since=datetime(2025, 7, 1, 10, 0, 0, tzinfo=timezone.utc))
+    assert mock_repo.get_commits.call_args.kwargs["since"].utcoffset() == timedelta(0)
+
+
+# Verifica che il metodo load_github_files_from_tree di GitHubRepository scarichi il contenuto solo dei file nuovi o modificati
+
+def test_load_github_files_from_tree_downloads_only_changed_blobs():
+    # Arrange
+    mock_repo = MagicMock(spec=Repository)
+    mock_repo.default_branch = "main"
+    mock_repo.full_name = "owner/repo"
+    mock_repo.html_url = "https://github.com/owner/repo"
+    mock_tree = MagicMock()
+    mock_tree.truncated = False
+    mock_tree.tree = [
+        MagicMock(type="tree", path="src", sha="tree1", size=None, url="https://api.github.com/repos/owner/repo/git/trees/tree1"),
+        MagicMock(type="blob", path="src/new.py", sha="new123", size=12, url="https://api.github.com/repos/owner/repo/git/blobs/new123"),
+        MagicMock(type="blob", path="src/old.py", sha="old123", size=34, url="https://api.github.com/repos/owner/repo/git/blobs/old123"),
+    ]
+    mock_repo.get_git_tree.return_value = mock_tree
+    mock_repo.get_git_blob.return_value = MagicMock(content="SGVsbG8gd29ybGQhCg==", encoding="base64")
+    github_repository = GitHubRepository(mock_repo)
+
+    # Act
+    log, files = github_repository.load_github_files_from_tree({"old123"})
+
+    # Assert
+    mock_repo.get_git_tree.assert_called_once_with("main", recursive=True)
+    mock_repo.get_git_blob.assert_called_once_with("new123")
+    assert log.get_outcome() is True
+    assert len(files) == 2
+    assert files[0].get_name() == "new.py"
+    assert files[0].get_content() == "SGVsbG8gd29ybGQhCg=="
+    assert files[0].get_html_url() == "https://github.com/owner/repo/blob/main/src/new.py"
+    assert files[0].is_unchanged() is False
+    assert files[1].get_path() == "src/old.py"
+    assert files[1].get_content() == ""
+    assert files[1].is_unchanged() is True
+
+
+# Verifica che il metodo load_github_files_from_tree di GitHubRepository carichi i file directory per directory
+# se l'albero restituito da GitHub è troncato
+
+def test_load_github_files_from_tree_truncated_falls_back():
+    # Arrange
+    mock_repo = MagicMock(spec=Repository)
+    mock_repo.default_branch = "main"
+    mock_repo.get_git_tree.return_value = MagicMock(truncated=True)
+    mock_repo.get_contents.return_value = []
+    github_repository = GitHubRepository(mock_repo)
+
+    # Act
+    log, files = github_repository.load_github_files_from_tree(set())
+
+    # Assert
+    mock_repo.get_contents.assert_called_once_with("")
+    assert log.get_outcome() is True
+    assert files == []
+
+
+# Verifica che il metodo load_github_files_from_tree di GitHubRepository gestisca correttamente le eccezioni
+
+def test_load_github_files_from_tree_exception():
+    # Arrange
+    mock_repo = MagicMock(spec=Repository)
+    mock_repo.get_git_tree.side_effect = Exception("Error fetching tree")
+    github_repository = GitHubRepository(mock_repo)
+
+    # Act
+    log, files = github_repository.load_github_files_from_tree()
+
+    # Assert
+    assert log.get_loading_items() == LoadingItems.GitHubFiles
+    assert log.get_outcome() is False
+    assert files == []
+
+
+# Verifica che il metodo load_github_commits di GitHubRepository riporti nel log le richieste e i byte dei commit
+# inviati attraverso la cache HTTP durante il caricamento
+
+def test_load_github_commits_reports_http_cache_stats():
+    # Arrange
+    mock_repo = MagicMock(spec=Repository)
+    mock_repo.get_commits.return_value = []
+    mock_cache = MagicMock(spec=GitHubHttpCache)
+    mock_cache.get_stats.side_effect = [HttpStats(10, 0, 1000, 1.0), HttpStats(15, 0, 1800, 1.5)]
+    mock_cache.get_num_not_modified.side_effect = [4, 7]
+    mock_budget = MagicMock(spec=RateLimitBudget)
+    mock_budget.get_num_deferred.return_value = 0
+    mock_budget.get_remaining.return_value = 4000
+    github_repository = GitHubRepository(mock_repo, http_cache=mock_cache, rate_limit_budget=mock_budget)
+
+    # Act
+    log, commits = github_repository.load_github_commits()
+
+    # Assert
+    mock_cache.get_stats.assert_called_with("commits")
+    assert log.get_outcome() is True
+    assert log.get_num_api_calls() == 5
+    assert log.get_num_bytes() == 800
@@ -0,0 +1,207 @@
+import pytest
+import json
+import threading
+import time
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from requests.exceptions import HTTPError
+
+from utils.http_client import HttpClient
+
+
+class FakeApiServer:
+    """Server HTTP locale che simula un'API paginata, con la possibilità di limitare le richieste."""
+
+    def __init__(self):
+        self.throttled_responses = 0
+        self.throttled_status = 429
+        self.client_ports = set()
+        self.in_flight = 0
+        self.max_in_flight_seen = 0
+        self.requests = []
+        self.lock = threading.Lock()
+
+
+@pytest.fixture
+def fake_api():
+    state = FakeApiServer()
+
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.1 per mantenere aperte le connessioni tra una richiesta e l'altra
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            params = parse_qs(urlparse(self.path).query)
+            start = int(params.get("start", ["0"])[0])
+            with state.lock:
+                state.requests.append(start)
+                state.client_ports.add(self.client_address[1])
+                throttle = state.throttled_responses > 0
+                if throttle:
+                    state.throttled_responses -= 1
+                state.in_flight += 1
+                state.max_in_flight_seen = max(state.max_in_flight_seen, state.in_flight)
+
+            # Le pagine iniziali rispondono più lentamente, per verificare che l'ordine non dipenda dai tempi di risposta
+            time.sleep(0.05 if start < 2 else 0.01)
+
+            with state.lock:
+                state.in_flight -= 1
+            if throttle:
+                self.send_response(state.throttled_status)
+                if state.throttled_status == 429:
+                    self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = json.dumps({"start": start, "results": [f"item-{start}"]}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield state, f"http://127.0.0.1:{server.server_address[1]}/rest/api/content"
+    server.shutdown()
+    server.server_close()
+
+
+# Verifica che il metodo fetch_all di HttpClient scarichi le pagine in parallelo, restituendole nell'ordine richiesto
+
+def test_fetch_all_returns_pages_in_order(fake_api):
+    # Arrange
+    state, url = fake_api
+    http_client = HttpClient(5, {"Accept": "application/json"}, max_in_flight=3)
+    params_list = [{"start": start} for start in range(8)]
+
+    # Act
+    result = http_client.fetch_all(url, params_list)
+
+    # Assert
+    assert [page["start"] for page in result] == list(range(8))
+    assert sorted(state.requests) == list(range(8))
+    assert 1 < state.max_in_flight_seen <= 3
+
+# Verifica che il metodo fetch_all di HttpClient ritorni una lista vuota senza richieste se non ci sono pagine
+
+def test_fetch_all_without_pages(fake_api):
+    # Arrange
+    state, url = fake_api
+    http_client = HttpClient(5, {})
+
+    # Act
+    result = http_client.fetch_all(url, [])
+
+    # Assert
+    assert result == []
+    assert state.requests == []
+
+# Verifica che il metodo fetch di HttpClient ripeta le richieste limitate con status 429, rispettando Retry-After
+
+def test_fetch_retries_throttled_request(fake_api):
+    # Arrange
+    state, url = fake_api
+    state.throttled_responses = 2
+    http_client = HttpClient(5, {}, max_retries=3)
+
+    # Act
+    result = http_client.fetch(url, {"start": 4})
+
+    # Assert
+    assert result == {"start": 4, "results": ["item-4"]}
+    assert state.requests == [4, 4, 4]
+
+# Verifica che il metodo fetch di HttpClient sollevi un'eccezione se la richiesta è ancora limitata dopo il numero massimo di tentativi
+
+def test_fetch_raises_after_max_retries(fake_api):
+    # Arrange
+    state, url = fake_api
+    state.throttled_responses = 10
+    http_client = HttpClient(5, {}, max_retries=2)
+
+    # Act & Assert
+    with pytest.raises(HTTPError):
+        http_client.fetch(url, {"start": 0})
+    assert len(state.requests) == 3
+
+# Verifica che il metodo fetch di HttpClient ripeta le richieste fallite con status 5xx, con un backoff esponenziale
+
+def test_fetch_retries_server_error(fake_api):
+    # Arrange
+    state, url = fake_api
+    state.throttled_responses = 1
+    state.throttled_status = 503
+    http_client = HttpClient(5, {}, max_retries=3)
+
+    # Act
+    with patch("time.sleep") as mock_sleep:
+        result = http_client.fetch(url, {"start": 1})
+
+    # Assert
+    assert result == {"start": 1, "results": ["item-1"]}
+    assert state.requests == [1, 1]
+    assert any(call.args[0] == pytest.approx(1.0, abs=0.1) for call in mock_sleep.call_args_list)
+
+# Verifica che HttpClient riutilizzi le connessioni e raccolga le statistiche delle richieste
+
+def test_fetch_reuses_connections_and_collects_stats(fake_api):
+    # Arrange
+    state, url = fake_api
+    state.throttled_responses = 1
+    http_client = HttpClient(5, {})
+
+    # Act
+    for start in range(3):
+        http_client.fetch(url, {"start": start})
+    stats = http_client.get_stats()
+
+    # Assert
+    assert len(state.client_ports) == 1
+    assert stats.get_num_requests() == 4
+    assert stats.get_num_retries() == 1
+    assert stats.get_num_bytes() == sum(len(json.dumps({"start": start, "results": [f"item-{start}"]})) for start in range(3))
+    assert stats.get_average_latency() > 0
+
+# Verifica che HttpClient raccolga le statistiche anche separatamente per ogni chiave indicata nelle richieste
+
+def test_fetch_collects_stats_by_key(fake_api):
+    # Arrange
+    state, url = fake_api
+    http_client = HttpClient(5, {})
+
+    # Act
+    http_client.fetch(url, {"start": 0}, stats_key="jira")
+    http_client.fetch_all(url, [{"start": 1}, {"start": 2}], stats_key="confluence")
+    http_client.fetch(url, {"start": 3})
+
+    # Assert
+    assert http_client.get_stats("jira").get_num_requests() == 1
+    assert http_client.get_stats("confluence").get_num_requests() == 2
+    assert http_client.get_stats("confluence").get_num_bytes() == sum(
+        len(json.dumps({"start": start, "results": [f"item-{start}"]})) for start in (1, 2))
+    assert http_client.get_stats("github").get_num_requests() == 0
+    assert http_client.get_stats().get_num_requests() == 4
+
+# Verifica che HttpClient limiti la frequenza delle richieste, consentendo solo una raffica iniziale di max_in_flight richieste
+
+def test_fetch_all_respects_rate_limit(fake_api):
+    # Arrange
+    state, url = fake_api
+    http_client = HttpClient(5, {}, max_in_flight=2, requests_per_second=20.0)
+
+    # Act
+    started = time.monotonic()
+    http_client.fetch_all(url, [{"start": start} for start in range(6)])
+    elapsed = time.monotonic() - started
+
+    # Assert
+    # Dopo la raffica di 2 richieste, le altre 4 partono al ritmo di 20 al secondo
+    assert elapsed >= 4 / 20 - 0.02
+    assert len(state.requests) == 6
@@ -0,0 +1,98 @@
+import pytest
+import threading
+from unittest.mock import MagicMock, patch
+
+from utils.ingestion_daemon import IngestionDaemon
+
+
+# Verifica che IngestionDaemon crei le dipendenze una sola volta e le riusi per tutti gli aggiornamenti riusciti
+
+def test_run_reuses_dependencies():
+    # Arrange
+    mock_load = MagicMock()
+    mock_load_factory = MagicMock(return_value=mock_load)
+    daemon = IngestionDaemon(mock_load_factory, interval=1200, retry_interval=60, max_backoff=1200)
+
+    with patch.object(threading.Event, "wait", return_value=False) as mock_wait:
+        # Act
+        daemon.run(max_runs=3)
+
+    # Assert
+    mock_load_factory.assert_called_once()
+    assert mock_load.call_count == 3
+    assert len(mock_wait.call_args_list) == 2
+    assert all(1199 < call.args[0] <= 1200 for call in mock_wait.call_args_list)
+    state = daemon.get_state()
+    assert state.get_running() is False
+    assert state.get_consecutive_failures() == 0
+    assert state.get_last_outcome() is True
+    assert state.get_next_run() is not None
+
+# Verifica che IngestionDaemon ritenti gli aggiornamenti falliti con un backoff esponenziale limitato e ridotto dal jitter
+
+def test_run_retries_with_exponential_backoff():
+    # Arrange
+    mock_load = MagicMock(side_effect=Exception("Chroma error"))
+    mock_load_factory = MagicMock(return_value=mock_load)
+    daemon = IngestionDaemon(mock_load_factory, interval=1200, retry_interval=60, max_backoff=200, jitter=0.5,
+                             random_function=lambda: 0.5)
+
+    with patch.object(threading.Event, "wait", return_value=False) as mock_wait:
+        # Act
+        daemon.run(max_runs=5)
+
+    # Assert
+    assert [call.args[0] for call in mock_wait.call_args_list] == [45.0, 90.0, 150.0, 150.0]
+    state = daemon.get_state()
+    assert state.get_consecutive_failures() == 5
+    assert state.get_last_outcome() is False
+    assert state.get_last_error() == "Chroma error"
+
+# Verifica che IngestionDaemon ricrei le dipendenze dopo un aggiornamento fallito e azzeri i fallimenti dopo un successo
+
+def test_run_recreates_dependencies_after_failure():
+    # Arrange
+    mock_load = MagicMock(side_effect=[Exception("Connection closed"), None])
+    mock_load_factory = MagicMock(return_value=mock_load)
+    daemon = IngestionDaemon(mock_load_factory, interval=1200, retry_interval=60, max_backoff=1200)
+
+    with patch.object(threading.Event, "wait", return_value=False):
+        # Act
+        daemon.run(max_runs=2)
+
+    # Assert
+    assert mock_load_factory.call_count == 2
+    state = daemon.get_state()
+    assert state.get_consecutive_failures() == 0
+    assert state.get_last_outcome() is True
+    assert state.get_last_error() is None
+
+# Verifica che IngestionDaemon tratti come un aggiornamento fallito un errore nella creazione delle dipendenze
+
+def test_run_handles_dependencies_error():
+    # Arrange
+    mock_load_factory = MagicMock(side_effect=Exception("Postgres unreachable"))
+    daemon = IngestionDaemon(mock_load_factory, interval=1200, retry_interval=60, max_backoff=1200)
+
+    with patch.object(threading.Event, "wait", return_value=False):
+        # Act
+        daemon.run(max_runs=1)
+
+    # Assert
+    assert daemon.get_state().get_consecutive_failures() == 1
+    assert daemon.get_state().get_last_error() == "Postgres unreachable"
+
+# Verifica che IngestionDaemon non avvii altri aggiornamenti dopo essere stato fermato
+
+def test_stop_ends_run():
+    # Arrange
+    daemon = IngestionDaemon(MagicMock(return_value=MagicMock()), interval=0.01, retry_interval=0.01, max_backoff=0.01)
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+
+    # Act
+    daemon.stop()
+    thread.join(timeout=5)
+
+    # Assert
+    assert not thread.is_alive()
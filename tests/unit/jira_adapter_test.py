@@ -1,5 +1,11 @@
 import pytest
 from unittest.mock import MagicMock
+from datetime import datetime
+import pytz
+
+from models.document import Document
+from models.loggingModels import PlatformLog, LoadingItems
+from entities.issueEntity import IssueEntity
 from adapters.jiraAdapter import JiraAdapter
 from repositories.jiraRepository import JiraRepository
 
@@ -19,3 +25,65 @@ def test_load_jira_issues_exception_handling():
 
     # Assert
     assert str(exc_info.value) == "Loading Jira issues error"
+
+
+# Verifica che il metodo load_jira_issues di JiraAdapter, se riceve una data, restituisca le issues aggiornate
+# e marchi come invariate le altre issues ancora presenti in Jira
+
+def test_load_jira_issues_updated_since_marks_unchanged_issues():
+    # Arrange
+    mock_jira_repository = MagicMock(spec=JiraRepository)
+    jira_adapter = JiraAdapter(mock_jira_repository)
+    updated_since = pytz.timezone('Europe/Rome').localize(datetime(2025, 3, 1, 10, 0))
+    issue = IssueEntity(id="10001", key="PROJ-1", summary="Issue summary", description="", issuetype={"name": "Bug"},
+                        project={"name": "Project"}, status={"name": "Open"}, priority={}, assignee={}, reporter={},
+                        created="2025-02-28T12:34:56.000+0100", updated="2025-03-01T10:30:00.000+0100", attachment=[])
+    mock_jira_repository.get_base_url.return_value = "https://jira.example.com"
+    mock_jira_repository.load_jira_issues.return_value = (PlatformLog(LoadingItems.JiraIssues, updated_since, True), [issue])
+    mock_jira_repository.load_jira_issue_keys.return_value = (PlatformLog(LoadingItems.JiraIssues, updated_since, True), ["PROJ-1", "PROJ-2"])
+
+    # Act
+    log, documents = jira_adapter.load_jira_issues(updated_since)
+
+    # Assert
+    mock_jira_repository.load_jira_issues.assert_called_once_with(updated_since)
+    assert log.get_outcome() is True
+    assert len(documents) == 2
+    assert documents[0].get_metadata()["id"] == "PROJ-1"
+    assert documents[0].get_metadata()["last_update"] == "2025-03-01 10:30:00"
+    assert documents[1] == Document(page_content="", metadata={"item_type": "Jira Issue", "id": "PROJ-2", "unchanged": True})
+
+
+# Verifica che il metodo load_jira_issues di JiraAdapter restituisca un log di fallimento se l'elenco delle chiavi non è disponibile
+
+def test_load_jira_issues_updated_since_keys_failure():
+    # Arrange
+    mock_jira_repository = MagicMock(spec=JiraRepository)
+    jira_adapter = JiraAdapter(mock_jira_repository)
+    updated_since = pytz.timezone('Europe/Rome').localize(datetime(2025, 3, 1, 10, 0))
+    mock_jira_repository.load_jira_issues.return_value = (PlatformLog(LoadingItems.JiraIssues, updated_since, True), [])
+    mock_jira_repository.load_jira_issue_keys.return_value = (PlatformLog(LoadingItems.JiraIssues, updated_since, False), [])
+
+    # Act
+    log, documents = jira_adapter.load_jira_issues(updated_since)
+
+    # Assert
+    assert log.get_outcome() is False
+    assert documents == []
+
+
+# Verifica che il metodo load_jira_issues di JiraAdapter, senza data, non richieda l'elenco delle chiavi
+
+def test_load_jira_issues_full_does_not_list_keys():
+    # Arrange
+    mock_jira_repository = MagicMock(spec=JiraRepository)
+    jira_adapter = JiraAdapter(mock_jira_repository)
+    mock_jira_repository.load_jira_issues.return_value = (PlatformLog(LoadingItems.JiraIssues, datetime(2025, 3, 1), True), [])
+
+    # Act
+    log, documents = jira_adapter.load_jira_issues()
+
+    # Assert
+    mock_jira_repository.load_jira_issues.assert_called_once_with(None)
+    mock_jira_repository.load_jira_issue_keys.assert_not_called()
+    assert documents == []
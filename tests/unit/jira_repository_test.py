@@ -7,6 +7,7 @@ import pytz
 from models.loggingModels import PlatformLog, LoadingItems
 from entities.issueEntity import IssueEntity
 from repositories.jiraRepository import JiraRepository
+from utils.http_client import HttpClient
 
 
 # Verifica che il metodo get_base_url di JiraRepository restituisca l'URL base corretto
@@ -24,7 +25,7 @@ def test_get_base_url():
 
 # Verifica che il metodo load_jira_issues di JiraRepository restituisca correttamente le issues
 
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_load_jira_issues(mock_get):
     # Arrange
     base_url = "https://jira.example.com"
@@ -87,7 +88,7 @@ def test_load_jira_issues(mock_get):
 
 # Verifica che il metodo load_jira_issues di JiraRepository gestisca correttamente le eccezioni di richiesta
 
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_load_jira_issues_request_exception(mock_get):
     # Arrange
     base_url = "https://jira.example.com"
@@ -109,7 +110,7 @@ def test_load_jira_issues_request_exception(mock_get):
 
 # Verifica che il metodo load_jira_issues di JiraRepository gestisca correttamente le eccezioni generiche
 
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_load_jira_issues_generic_exception(mock_get):
     # Arrange
     base_url = "https://jira.example.com"
@@ -125,3 +126,88 @@ def test_load_jira_issues_generic_exception(mock_get):
         jira_repository.load_jira_issues()
 
     assert str(exc_info.value) == "Generic error"
+
+
+# Verifica che il metodo load_jira_issues di JiraRepository, se riceve una data, richieda solo le issues aggiornate da quel momento
+
+@patch('requests.Session.get')
+def test_load_jira_issues_updated_since(mock_get):
+    # Arrange
+    jira_repository = JiraRepository("https://jira.example.com", "PROJ", 10, {})
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"total": 0, "issues": []}
+    mock_get.return_value = mock_response
+    updated_since = pytz.utc.localize(datetime(2025, 3, 1, 9, 30, 45))
+
+    # Act
+    log, issues = jira_repository.load_jira_issues(updated_since)
+
+    # Assert
+    assert log.get_outcome() is True
+    assert issues == []
+    assert mock_get.call_args.kwargs["params"]["jql"] == 'project=PROJ AND updated >= "2025/03/01 10:30"'
+
+
+# Verifica che il metodo load_jira_issue_keys di JiraRepository recuperi le chiavi di tutte le issues, pagina per pagina
+
+@patch('requests.Session.get')
+def test_load_jira_issue_keys(mock_get):
+    # Arrange
+    jira_repository = JiraRepository("https://jira.example.com", "PROJ", 10, {})
+    first_page = MagicMock()
+    first_page.json.return_value = {"total": 3, "issues": [{"key": "PROJ-1"}, {"key": "PROJ-2"}]}
+    second_page = MagicMock()
+    second_page.json.return_value = {"total": 3, "issues": [{"key": "PROJ-3"}]}
+    mock_get.side_effect = [first_page, second_page]
+
+    # Act
+    log, keys = jira_repository.load_jira_issue_keys()
+
+    # Assert
+    assert log.get_loading_items() == LoadingItems.JiraIssues
+    assert log.get_outcome() is True
+    assert keys == ["PROJ-1", "PROJ-2", "PROJ-3"]
+    assert mock_get.call_count == 2
+    assert mock_get.call_args_list[0].kwargs["params"]["fields"] == "key"
+    assert mock_get.call_args_list[1].kwargs["params"]["startAt"] == 2
+
+
+
+# Verifica che il metodo load_jira_issue_keys di JiraRepository richieda in parallelo tutte le pagine successive alla prima, mantenendone l'ordine
+
+@patch('requests.Session.get')
+def test_load_jira_issue_keys_parallel_pages(mock_get):
+    # Arrange
+    jira_repository = JiraRepository("https://jira.example.com", "PROJ", 10, {}, HttpClient(10, {}, max_in_flight=3))
+
+    def get(url, params, timeout):
+        start_at = params["startAt"]
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {"total": 7, "issues": [{"key": f"PROJ-{i}"} for i in range(start_at, min(start_at + 2, 7))]}
+        return response
+    mock_get.side_effect = get
+
+    # Act
+    log, keys = jira_repository.load_jira_issue_keys()
+
+    # Assert
+    assert log.get_outcome() is True
+    assert keys == [f"PROJ-{i}" for i in range(7)]
+    assert sorted(call.kwargs["params"]["startAt"] for call in mock_get.call_args_list) == [0, 2, 4, 6]
+
+
+# Verifica che il metodo load_jira_issue_keys di JiraRepository gestisca correttamente le eccezioni di richiesta
+
+@patch('requests.Session.get')
+def test_load_jira_issue_keys_request_exception(mock_get):
+    # Arrange
+    jira_repository = JiraRepository("https://jira.example.com", "PROJ", 10, {})
+    mock_get.side_effect = RequestException("Request failed")
+
+    # Act
+    log, keys = jira_repository.load_jira_issue_keys()
+
+    # Assert
+    assert log.get_outcome() is False
+    assert keys == []
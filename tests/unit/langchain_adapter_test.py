@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import MagicMock
 
 from models.document import Document
+from models.commitFile import CommitFile
 from models.question import Question
 from models.header import Header
 from models.answer import Answer
@@ -33,6 +34,25 @@ def test_generate_answer_token_limit_exceeded():
     assert len(result.get_content()) > 0  # Ensure an answer is generated even if token limit is exceeded
 
 
+# Verifica che il metodo generate_answer di LangChainAdapter mostri al modello i file dei commit in forma testuale
+
+def test_generate_answer_renders_commit_files():
+    # Arrange
+    mock_langchain_repository = MagicMock(spec=LangChainRepository)
+    langchain_adapter = LangChainAdapter(128000, mock_langchain_repository)
+    commit_files = [CommitFile("src/a.py", "modified", 2, 1, 1, "@@ -1 +1 @@\n-old\n+new")]
+    relevant_docs = [Document(page_content="Fix bug", metadata={"item_type": "GitHub Commit", "files": commit_files})]
+    mock_langchain_repository.generate_answer.return_value = "test answer"
+
+    # Act
+    langchain_adapter.generate_answer(Question("test question"), relevant_docs, Header("test header"))
+
+    # Assert
+    passed_docs = mock_langchain_repository.generate_answer.call_args[0][1]
+    assert "- src/a.py (Status: modified, Changes: 2, Additions: 1, Deletions: 1)\\n  Patch:\\n@@ -1 +1 @@" in passed_docs[0].get_page_content()
+    assert relevant_docs[0].get_metadata()["files"] == commit_files
+
+
 # Verifica che il metodo generate_answer di LangChainAdapter gestisca correttamente le eccezioni
 
 def test_generate_answer_exception():
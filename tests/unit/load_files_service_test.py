@@ -1,10 +1,12 @@
 import pytest
+import time
 from unittest.mock import MagicMock, patch
 from datetime import datetime, timedelta
 import pytz
 
 from models.document import Document
-from models.loggingModels import PlatformLog, VectorStoreLog, LoadingAttempt, LoadingItems
+from models.commitFile import CommitFile
+from models.loggingModels import PlatformLog, VectorStoreLog, LoadingAttempt, LoadingItems, LoadingStage, StageLog
 from models.dbSaveOperationResponse import DbSaveOperationResponse
 from services.loadFilesService import LoadFilesService
 from services.confluenceCleanerService import ConfluenceCleanerService
@@ -13,6 +15,11 @@ from ports.jiraPort import JiraPort
 from ports.confluencePort import ConfluencePort
 from ports.loadFilesInVectorStorePort import LoadFilesInVectorStorePort
 from ports.saveLoadingAttemptInDbPort import SaveLoadingAttemptInDbPort
+from ports.watermarkPort import WatermarkPort
+from ports.gitHubFileDatesPort import GitHubFileDatesPort
+from models.watermark import Watermark
+from utils.refresh_lease import RefreshLease
+from utils.run_checkpoint import RunCheckpoint
 
 
 # Verifica che il metodo load di LoadFilesService carichi correttamente i dati dai vari servizi e salvi i log di caricamento
@@ -65,10 +72,344 @@ def test_load_calls_all_methods_and_handles_exceptions():
     mock_jira_port.load_jira_issues.assert_called_once()
     mock_confluence_port.load_confluence_pages.assert_called_once()
     mock_confluence_cleaner_service.clean_confluence_pages.assert_called_once_with(confluence_pages)
-    mock_load_files_in_vector_store_port.load.assert_called_once_with(github_commits + github_files + jira_issues + cleaned_confluence_pages)
+    mock_load_files_in_vector_store_port.load.assert_called_once()
+    assert list(mock_load_files_in_vector_store_port.load.call_args.args[0]) == github_commits + github_files + jira_issues + cleaned_confluence_pages
     mock_save_loading_attempt_in_db_port.save_loading_attempt.assert_called_once()
 
 
+# Verifica che il metodo load di LoadFilesService salvi nel tentativo di caricamento i log di tutte le fasi, in ordine
+
+def test_load_saves_stage_logs():
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_jira_port = MagicMock(spec=JiraPort)
+    mock_confluence_port = MagicMock(spec=ConfluencePort)
+    mock_load_files_in_vector_store_port = MagicMock(spec=LoadFilesInVectorStorePort)
+    mock_save_loading_attempt_in_db_port = MagicMock(spec=SaveLoadingAttemptInDbPort)
+    mock_confluence_cleaner_service = MagicMock(spec=ConfluenceCleanerService)
+    load_files_service = LoadFilesService(
+        mock_github_port, mock_jira_port,
+        mock_confluence_port, mock_confluence_cleaner_service,
+        mock_load_files_in_vector_store_port, mock_save_loading_attempt_in_db_port
+    )
+
+    timestamp = datetime(2023, 10, 1, 12, 0, 0)
+    jira_issues = [Document(page_content="issue1", metadata={"type": "text"}),
+                   Document(page_content="issue2", metadata={"type": "text"})]
+    vector_store_stage_logs = [StageLog(LoadingStage.Splitting, 0.5, 4), StageLog(LoadingStage.Adds, 0.2, 4, 100, 1)]
+
+    mock_github_port.load_github_commits.return_value = (PlatformLog(LoadingItems.GitHubCommits, timestamp, True), [])
+    mock_github_port.load_github_files.return_value = (PlatformLog(LoadingItems.GitHubFiles, timestamp, True), [])
+    mock_jira_port.load_jira_issues.return_value = (
+        PlatformLog(LoadingItems.JiraIssues, timestamp, True, num_bytes=2048, num_api_calls=2), jira_issues)
+    mock_confluence_port.load_confluence_pages.return_value = (PlatformLog(LoadingItems.ConfluencePages, timestamp, True), [])
+    mock_confluence_cleaner_service.clean_confluence_pages.return_value = []
+    mock_load_files_in_vector_store_port.load.return_value = VectorStoreLog(timestamp, True, 4, 0, 0, vector_store_stage_logs)
+    mock_save_loading_attempt_in_db_port.save_loading_attempt.return_value = DbSaveOperationResponse(success=True, message="Saved")
+
+    # Act
+    load_files_service.load()
+
+    # Assert
+    loading_attempt = mock_save_loading_attempt_in_db_port.save_loading_attempt.call_args.args[0]
+    stage_logs = loading_attempt.get_stage_logs()
+    assert [stage_log.get_stage() for stage_log in stage_logs] == [
+        LoadingStage.GitHubCommitsFetch, LoadingStage.GitHubFilesFetch, LoadingStage.JiraIssuesFetch,
+        LoadingStage.ConfluencePagesFetch, LoadingStage.GitHubMetadataEnrichment, LoadingStage.ConfluenceCleaning,
+        LoadingStage.Splitting, LoadingStage.Adds
+    ]
+    jira_stage_log = stage_logs[2]
+    assert (jira_stage_log.get_num_items(), jira_stage_log.get_num_bytes(), jira_stage_log.get_num_api_calls()) == (2, 2048, 2)
+
+
+# Verifica che il metodo load di LoadFilesService scarti i documenti delle piattaforme fallite e ne preservi il tipo
+# nel database vettoriale, così che i documenti già caricati da quelle piattaforme non vengano eliminati
+
+def test_load_preserves_item_types_of_failed_platforms():
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_jira_port = MagicMock(spec=JiraPort)
+    mock_confluence_port = MagicMock(spec=ConfluencePort)
+    mock_load_files_in_vector_store_port = MagicMock(spec=LoadFilesInVectorStorePort)
+    mock_save_loading_attempt_in_db_port = MagicMock(spec=SaveLoadingAttemptInDbPort)
+    mock_confluence_cleaner_service = MagicMock(spec=ConfluenceCleanerService)
+    load_files_service = LoadFilesService(
+        mock_github_port, mock_jira_port,
+        mock_confluence_port, mock_confluence_cleaner_service,
+        mock_load_files_in_vector_store_port, mock_save_loading_attempt_in_db_port
+    )
+
+    timestamp = datetime(2023, 10, 1, 12, 0, 0)
+    github_files = [Document(page_content="file1", metadata={"item_type": "GitHub File", "id": "sha1", "path": "a.py"})]
+    # Una piattaforma fallita può restituire documenti parziali, che non devono essere caricati
+    jira_issues = [Document(page_content="issue1", metadata={"item_type": "Jira Issue", "id": "BUD-1"})]
+
+    mock_github_port.load_github_commits.return_value = (PlatformLog(LoadingItems.GitHubCommits, timestamp, True), [])
+    mock_github_port.load_github_files.return_value = (PlatformLog(LoadingItems.GitHubFiles, timestamp, True), github_files)
+    mock_jira_port.load_jira_issues.return_value = (PlatformLog(LoadingItems.JiraIssues, timestamp, False), jira_issues)
+    mock_confluence_port.load_confluence_pages.return_value = (PlatformLog(LoadingItems.ConfluencePages, timestamp, False), [])
+    mock_confluence_cleaner_service.clean_confluence_pages.return_value = []
+    mock_load_files_in_vector_store_port.load.return_value = VectorStoreLog(timestamp, True, 1, 0, 0)
+    mock_save_loading_attempt_in_db_port.save_loading_attempt.return_value = DbSaveOperationResponse(success=True, message="Saved")
+
+    # Act
+    load_files_service.load()
+
+    # Assert
+    documents, preserved_item_types = mock_load_files_in_vector_store_port.load.call_args.args
+    assert list(documents) == github_files
+    assert preserved_item_types == {"Jira Issue", "Confluence Page"}
+
+
+# Verifica che il metodo load di LoadFilesService, se il caricamento dei commit fallisce, non carichi i file di GitHub,
+# le cui date verrebbero ricavate senza i nuovi commit, e ne preservi quelli già presenti nel database vettoriale
+
+def test_load_preserves_github_files_when_commits_fail():
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_jira_port = MagicMock(spec=JiraPort)
+    mock_confluence_port = MagicMock(spec=ConfluencePort)
+    mock_load_files_in_vector_store_port = MagicMock(spec=LoadFilesInVectorStorePort)
+    mock_save_loading_attempt_in_db_port = MagicMock(spec=SaveLoadingAttemptInDbPort)
+    mock_confluence_cleaner_service = MagicMock(spec=ConfluenceCleanerService)
+    load_files_service = LoadFilesService(
+        mock_github_port, mock_jira_port,
+        mock_confluence_port, mock_confluence_cleaner_service,
+        mock_load_files_in_vector_store_port, mock_save_loading_attempt_in_db_port
+    )
+
+    timestamp = datetime(2023, 10, 1, 12, 0, 0)
+    github_files = [Document(page_content="file1", metadata={"item_type": "GitHub File", "id": "sha1", "path": "a.py"})]
+    jira_issues = [Document(page_content="issue1", metadata={"item_type": "Jira Issue", "id": "BUD-1"})]
+
+    mock_github_port.load_github_commits.return_value = (PlatformLog(LoadingItems.GitHubCommits, timestamp, False), [])
+    mock_github_port.load_github_files.return_value = (PlatformLog(LoadingItems.GitHubFiles, timestamp, True), github_files)
+    mock_jira_port.load_jira_issues.return_value = (PlatformLog(LoadingItems.JiraIssues, timestamp, True), jira_issues)
+    mock_confluence_port.load_confluence_pages.return_value = (PlatformLog(LoadingItems.ConfluencePages, timestamp, True), [])
+    mock_confluence_cleaner_service.clean_confluence_pages.return_value = []
+    mock_load_files_in_vector_store_port.load.return_value = VectorStoreLog(timestamp, True, 1, 0, 0)
+    mock_save_loading_attempt_in_db_port.save_loading_attempt.return_value = DbSaveOperationResponse(success=True, message="Saved")
+
+    # Act
+    load_files_service.load()
+
+    # Assert
+    documents, preserved_item_types = mock_load_files_in_vector_store_port.load.call_args.args
+    assert list(documents) == jira_issues
+    assert preserved_item_types == {"GitHub Commit", "GitHub File"}
+
+
+# Verifica che il metodo load di LoadFilesService salti il caricamento se il lease è detenuto da un'altra replica
+
+def test_load_skips_when_lease_held_by_another_replica():
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_load_files_in_vector_store_port = MagicMock(spec=LoadFilesInVectorStorePort)
+    mock_save_loading_attempt_in_db_port = MagicMock(spec=SaveLoadingAttemptInDbPort)
+    mock_refresh_lease = MagicMock(spec=RefreshLease)
+    mock_refresh_lease.acquire.return_value = False
+    load_files_service = LoadFilesService(
+        mock_github_port, MagicMock(spec=JiraPort), MagicMock(spec=ConfluencePort), MagicMock(spec=ConfluenceCleanerService),
+        mock_load_files_in_vector_store_port, mock_save_loading_attempt_in_db_port, refresh_lease=mock_refresh_lease
+    )
+
+    # Act
+    load_files_service.load()
+
+    # Assert
+    mock_github_port.load_github_commits.assert_not_called()
+    mock_load_files_in_vector_store_port.load.assert_not_called()
+    mock_save_loading_attempt_in_db_port.save_loading_attempt.assert_not_called()
+    mock_refresh_lease.release.assert_not_called()
+
+
+# Verifica che il metodo load di LoadFilesService riprenda un caricamento interrotto senza scaricare di nuovo le piattaforme
+# già scaricate, e che elimini il checkpoint al termine del caricamento riuscito
+
+def test_load_resumes_interrupted_loading_from_checkpoint(tmp_path):
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_jira_port = MagicMock(spec=JiraPort)
+    mock_confluence_port = MagicMock(spec=ConfluencePort)
+    mock_load_files_in_vector_store_port = MagicMock(spec=LoadFilesInVectorStorePort)
+    mock_save_loading_attempt_in_db_port = MagicMock(spec=SaveLoadingAttemptInDbPort)
+    mock_confluence_cleaner_service = MagicMock(spec=ConfluenceCleanerService)
+    run_checkpoint = RunCheckpoint(str(tmp_path / "run_checkpoint.sqlite"))
+    load_files_service = LoadFilesService(
+        mock_github_port, mock_jira_port,
+        mock_confluence_port, mock_confluence_cleaner_service,
+        mock_load_files_in_vector_store_port, mock_save_loading_attempt_in_db_port, run_checkpoint=run_checkpoint
+    )
+
+    timestamp = datetime(2023, 10, 1, 12, 0, 0)
+    jira_issues = [Document(page_content="issue1", metadata={"item_type": "Jira Issue", "id": "BUD-1"})]
+    mock_github_port.load_github_commits.return_value = (PlatformLog(LoadingItems.GitHubCommits, timestamp, True), [])
+    mock_github_port.load_github_files.return_value = (PlatformLog(LoadingItems.GitHubFiles, timestamp, True), [])
+    mock_jira_port.load_jira_issues.return_value = (PlatformLog(LoadingItems.JiraIssues, timestamp, True), jira_issues)
+    # Le piattaforme fallite non vengono salvate nel checkpoint: il caricamento ripreso le scarica di nuovo
+    mock_confluence_port.load_confluence_pages.return_value = (PlatformLog(LoadingItems.ConfluencePages, timestamp, False), [])
+    mock_confluence_cleaner_service.clean_confluence_pages.return_value = []
+    mock_load_files_in_vector_store_port.load.side_effect = [Exception("Chroma error"), VectorStoreLog(timestamp, True, 1, 0, 0)]
+    mock_save_loading_attempt_in_db_port.save_loading_attempt.return_value = DbSaveOperationResponse(success=True, message="Saved")
+    with pytest.raises(Exception):
+        load_files_service.load()
+    mock_jira_port.load_jira_issues.return_value = (PlatformLog(LoadingItems.JiraIssues, timestamp, True), [])
+
+    # Act
+    load_files_service.load()
+
+    # Assert
+    mock_jira_port.load_jira_issues.assert_called_once()
+    mock_github_port.load_github_commits.assert_called_once()
+    assert mock_confluence_port.load_confluence_pages.call_count == 2
+    documents, _ = mock_load_files_in_vector_store_port.load.call_args.args
+    assert list(documents) == jira_issues
+    assert run_checkpoint.get_snapshot(LoadingItems.JiraIssues) is None
+
+
+# Verifica che il metodo load di LoadFilesService registri l'attesa e la detenzione del lease fra le fasi del caricamento
+# e rilasci il lease anche se il caricamento fallisce
+
+@pytest.mark.parametrize("save_fails", [False, True])
+def test_load_records_lease_stages_and_releases_lease(save_fails):
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_jira_port = MagicMock(spec=JiraPort)
+    mock_confluence_port = MagicMock(spec=ConfluencePort)
+    mock_load_files_in_vector_store_port = MagicMock(spec=LoadFilesInVectorStorePort)
+    mock_save_loading_attempt_in_db_port = MagicMock(spec=SaveLoadingAttemptInDbPort)
+    mock_confluence_cleaner_service = MagicMock(spec=ConfluenceCleanerService)
+    mock_refresh_lease = MagicMock(spec=RefreshLease)
+    mock_refresh_lease.acquire.return_value = True
+    mock_refresh_lease.is_lost.return_value = False
+    mock_refresh_lease.get_hold_duration.return_value = 12.5
+    mock_refresh_lease.get_num_renewals.return_value = 2
+    load_files_service = LoadFilesService(
+        mock_github_port, mock_jira_port,
+        mock_confluence_port, mock_confluence_cleaner_service,
+        mock_load_files_in_vector_store_port, mock_save_loading_attempt_in_db_port, refresh_lease=mock_refresh_lease
+    )
+
+    timestamp = datetime(2023, 10, 1, 12, 0, 0)
+    mock_github_port.load_github_commits.return_value = (PlatformLog(LoadingItems.GitHubCommits, timestamp, True), [])
+    mock_github_port.load_github_files.return_value = (PlatformLog(LoadingItems.GitHubFiles, timestamp, True), [])
+    mock_jira_port.load_jira_issues.return_value = (PlatformLog(LoadingItems.JiraIssues, timestamp, True), [])
+    mock_confluence_port.load_confluence_pages.return_value = (PlatformLog(LoadingItems.ConfluencePages, timestamp, True), [])
+    mock_confluence_cleaner_service.clean_confluence_pages.return_value = []
+    mock_load_files_in_vector_store_port.load.return_value = VectorStoreLog(timestamp, True, 0, 0, 0)
+    mock_save_loading_attempt_in_db_port.save_loading_attempt.return_value = DbSaveOperationResponse(
+        success=not save_fails, message="Saved" if not save_fails else "DB error")
+
+    # Act
+    if save_fails:
+        with pytest.raises(Exception):
+            load_files_service.load()
+    else:
+        load_files_service.load()
+
+    # Assert
+    mock_refresh_lease.release.assert_called_once()
+    stage_logs = mock_save_loading_attempt_in_db_port.save_loading_attempt.call_args.args[0].get_stage_logs()
+    assert stage_logs[0].get_stage() == LoadingStage.LeaseWait
+    assert stage_logs[-1].get_stage() == LoadingStage.LeaseHold
+    assert (stage_logs[-1].get_duration(), stage_logs[-1].get_num_api_calls()) == (12.5, 3)
+
+
+# Verifica che il metodo load di LoadFilesService, quando il lease è stato rilevato da un'altra replica, ricostruisca
+# lo stato locale del database vettoriale e scarti il checkpoint prima di scaricare le piattaforme
+
+def test_load_resyncs_local_state_when_lease_taken_over():
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_jira_port = MagicMock(spec=JiraPort)
+    mock_confluence_port = MagicMock(spec=ConfluencePort)
+    mock_load_files_in_vector_store_port = MagicMock(spec=LoadFilesInVectorStorePort)
+    mock_save_loading_attempt_in_db_port = MagicMock(spec=SaveLoadingAttemptInDbPort)
+    mock_confluence_cleaner_service = MagicMock(spec=ConfluenceCleanerService)
+    mock_refresh_lease = MagicMock(spec=RefreshLease)
+    mock_refresh_lease.acquire.return_value = True
+    mock_refresh_lease.is_taken_over.return_value = True
+    mock_refresh_lease.is_lost.return_value = False
+    mock_refresh_lease.get_hold_duration.return_value = 1.0
+    mock_refresh_lease.get_num_renewals.return_value = 0
+    mock_run_checkpoint = MagicMock(spec=RunCheckpoint)
+    mock_run_checkpoint.get_snapshot.return_value = None
+    load_files_service = LoadFilesService(
+        mock_github_port, mock_jira_port,
+        mock_confluence_port, mock_confluence_cleaner_service,
+        mock_load_files_in_vector_store_port, mock_save_loading_attempt_in_db_port,
+        refresh_lease=mock_refresh_lease, run_checkpoint=mock_run_checkpoint
+    )
+
+    timestamp = datetime(2023, 10, 1, 12, 0, 0)
+    mock_run_checkpoint.begin.return_value = timestamp
+    mock_github_port.load_github_commits.return_value = (PlatformLog(LoadingItems.GitHubCommits, timestamp, True), [])
+    mock_github_port.load_github_files.return_value = (PlatformLog(LoadingItems.GitHubFiles, timestamp, True), [])
+    mock_jira_port.load_jira_issues.return_value = (PlatformLog(LoadingItems.JiraIssues, timestamp, True), [])
+    mock_confluence_port.load_confluence_pages.return_value = (PlatformLog(LoadingItems.ConfluencePages, timestamp, True), [])
+    mock_confluence_cleaner_service.clean_confluence_pages.return_value = []
+    mock_load_files_in_vector_store_port.load.return_value = VectorStoreLog(timestamp, True, 0, 0, 0)
+    mock_save_loading_attempt_in_db_port.save_loading_attempt.return_value = DbSaveOperationResponse(success=True, message="Saved")
+    calls = MagicMock()
+    calls.attach_mock(mock_load_files_in_vector_store_port.resync, "resync")
+    calls.attach_mock(mock_run_checkpoint.clear, "clear")
+    calls.attach_mock(mock_run_checkpoint.begin, "begin")
+
+    # Act
+    load_files_service.load()
+
+    # Assert
+    assert [name for name, _, _ in calls.mock_calls][:3] == ["resync", "clear", "begin"]
+
+
+# Verifica che il metodo load di LoadFilesService interrompa il caricamento nel database vettoriale, senza salvare
+# i watermark, se il lease viene perso mentre i documenti vengono scritti
+
+def test_load_aborts_when_lease_lost():
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_jira_port = MagicMock(spec=JiraPort)
+    mock_confluence_port = MagicMock(spec=ConfluencePort)
+    mock_load_files_in_vector_store_port = MagicMock(spec=LoadFilesInVectorStorePort)
+    mock_watermark_port = MagicMock(spec=WatermarkPort)
+    mock_confluence_cleaner_service = MagicMock(spec=ConfluenceCleanerService)
+    mock_refresh_lease = MagicMock(spec=RefreshLease)
+    mock_refresh_lease.acquire.return_value = True
+    mock_refresh_lease.is_lost.side_effect = [False, True]
+    load_files_service = LoadFilesService(
+        mock_github_port, mock_jira_port,
+        mock_confluence_port, mock_confluence_cleaner_service,
+        mock_load_files_in_vector_store_port, MagicMock(spec=SaveLoadingAttemptInDbPort),
+        watermark_port=mock_watermark_port, refresh_lease=mock_refresh_lease
+    )
+
+    timestamp = datetime(2023, 10, 1, 12, 0, 0)
+    issues = [Document(page_content=f"issue{i}", metadata={"id": f"PROJ-{i}", "item_type": "Jira Issue"}) for i in range(3)]
+    mock_github_port.load_github_commits.return_value = (PlatformLog(LoadingItems.GitHubCommits, timestamp, True), [])
+    mock_github_port.load_github_files.return_value = (PlatformLog(LoadingItems.GitHubFiles, timestamp, True), [])
+    mock_jira_port.load_jira_issues.return_value = (PlatformLog(LoadingItems.JiraIssues, timestamp, True), issues)
+    mock_confluence_port.load_confluence_pages.return_value = (PlatformLog(LoadingItems.ConfluencePages, timestamp, True), [])
+    mock_confluence_cleaner_service.clean_confluence_pages.return_value = []
+    mock_watermark_port.get_watermark.return_value = None
+    written = []
+
+    def consume(documents, preserved_item_types):
+        for document in documents:
+            written.append(document)
+        return VectorStoreLog(timestamp, True, len(written), 0, 0)
+    mock_load_files_in_vector_store_port.load.side_effect = consume
+
+    # Act
+    with pytest.raises(Exception) as exc_info:
+        load_files_service.load()
+
+    # Assert
+    assert "lease lost" in str(exc_info.value)
+    assert written == issues[:1]
+    mock_watermark_port.save_watermark.assert_not_called()
+    mock_refresh_lease.release.assert_called_once()
+
+
 # Verifica che il metodo load di LoadFilesService gestisca correttamente le eccezioni
 
 def test_load_handles_exception():
@@ -144,6 +485,69 @@ def test_load_raises_exception_if_db_save_fails():
     assert str(exc_info.value) == "Failed to save loading attempt in Postgres database: Connection to the database failed. Details: Connection to the database failed"
 
 
+# Verifica che il metodo load_all_platforms di LoadFilesService restituisca i risultati nell'ordine delle piattaforme,
+# indipendentemente dall'ordine di completamento dei caricamenti
+
+def test_load_all_platforms_preserves_order():
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_jira_port = MagicMock(spec=JiraPort)
+    mock_confluence_port = MagicMock(spec=ConfluencePort)
+    load_files_service = LoadFilesService(
+        mock_github_port, mock_jira_port, mock_confluence_port, MagicMock(), MagicMock(), MagicMock(), max_workers=4
+    )
+
+    timestamp = datetime(2025, 2, 28, 12, 34, 56)
+    github_commits_result = (PlatformLog(LoadingItems.GitHubCommits, timestamp, True), [Document(page_content="commit1")])
+    github_files_result = (PlatformLog(LoadingItems.GitHubFiles, timestamp, True), [Document(page_content="file1")])
+    jira_issues_result = (PlatformLog(LoadingItems.JiraIssues, timestamp, True), [Document(page_content="issue1")])
+    confluence_pages_result = (PlatformLog(LoadingItems.ConfluencePages, timestamp, True), [Document(page_content="page1")])
+
+    def slow_github_commits():
+        time.sleep(0.2)
+        return github_commits_result
+
+    mock_github_port.load_github_commits.side_effect = slow_github_commits
+    mock_github_port.load_github_files.return_value = github_files_result
+    mock_jira_port.load_jira_issues.return_value = jira_issues_result
+    mock_confluence_port.load_confluence_pages.return_value = confluence_pages_result
+
+    # Act
+    results = load_files_service.load_all_platforms()
+
+    # Assert
+    assert results == [github_commits_result, github_files_result, jira_issues_result, confluence_pages_result]
+
+
+# Verifica che il metodo load_all_platforms di LoadFilesService completi il caricamento delle altre piattaforme
+# anche quando una di esse solleva un'eccezione, e che poi la rilanci
+
+def test_load_all_platforms_isolates_failing_platform():
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_jira_port = MagicMock(spec=JiraPort)
+    mock_confluence_port = MagicMock(spec=ConfluencePort)
+    load_files_service = LoadFilesService(
+        mock_github_port, mock_jira_port, mock_confluence_port, MagicMock(), MagicMock(), MagicMock(), max_workers=2
+    )
+
+    timestamp = datetime(2025, 2, 28, 12, 34, 56)
+    mock_github_port.load_github_commits.side_effect = Exception("GitHub commits error")
+    mock_github_port.load_github_files.return_value = (PlatformLog(LoadingItems.GitHubFiles, timestamp, True), [])
+    mock_jira_port.load_jira_issues.return_value = (PlatformLog(LoadingItems.JiraIssues, timestamp, True), [])
+    mock_confluence_port.load_confluence_pages.return_value = (PlatformLog(LoadingItems.ConfluencePages, timestamp, True), [])
+
+    # Act
+    with pytest.raises(Exception) as exc_info:
+        load_files_service.load_all_platforms()
+
+    # Assert
+    assert str(exc_info.value) == "GitHub commits error"
+    mock_github_port.load_github_files.assert_called_once()
+    mock_jira_port.load_jira_issues.assert_called_once()
+    mock_confluence_port.load_confluence_pages.assert_called_once()
+
+
 # Verifica che il metodo load_github_commits di LoadFilesService gestisca correttamente le eccezioni
 
 def test_load_github_commits_handles_exception():
@@ -163,6 +567,328 @@ def test_load_github_commits_handles_exception():
     assert str(exc_info.value) == "GitHub commits error"
 
 
+# Verifica che il metodo load_github_commits di LoadFilesService, in presenza di un watermark, carichi da GitHub solo
+# i commit successivi al watermark e passi quelli già presenti nel database vettoriale come invariati, senza leggerli
+
+def test_load_github_commits_incremental_marks_loaded_commits_unchanged():
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_load_files_in_vector_store_port = MagicMock(spec=LoadFilesInVectorStorePort)
+    mock_watermark_port = MagicMock(spec=WatermarkPort)
+    mock_github_file_dates_port = MagicMock(spec=GitHubFileDatesPort)
+    load_files_service = LoadFilesService(
+        mock_github_port, MagicMock(), MagicMock(), MagicMock(), mock_load_files_in_vector_store_port, MagicMock(),
+        watermark_port=mock_watermark_port, github_file_dates_port=mock_github_file_dates_port
+    )
+
+    watermark_timestamp = datetime(2025, 2, 28, 12, 0, 0, tzinfo=pytz.utc)
+    mock_github_port.get_repository_name.return_value = "owner/repo"
+    mock_watermark_port.get_watermark.return_value = Watermark(LoadingItems.GitHubCommits, "owner/repo", watermark_timestamp, "sha2")
+    mock_github_file_dates_port.has_github_file_dates.return_value = True
+
+    log = PlatformLog(LoadingItems.GitHubCommits, datetime(2025, 3, 1, 12, 0, 0), True)
+    new_commits = [
+        Document(page_content="commit3", metadata={"id": "sha3", "date": "2025-03-01 10:00:00"}),
+        Document(page_content="commit2", metadata={"id": "sha2", "date": "2025-02-28 13:00:00"}),
+    ]
+    mock_github_port.load_github_commits.return_value = (log, new_commits)
+    mock_load_files_in_vector_store_port.get_loaded_ids.return_value = {"sha1", "sha2"}
+
+    # Act
+    result_log, result_commits = load_files_service.load_github_commits()
+
+    # Assert
+    mock_watermark_port.get_watermark.assert_called_once_with(LoadingItems.GitHubCommits, "owner/repo")
+    mock_github_port.load_github_commits.assert_called_once_with(watermark_timestamp - timedelta(hours=2))
+    mock_load_files_in_vector_store_port.get_loaded_ids.assert_called_once_with("GitHub Commit")
+    assert result_log == log
+    assert result_commits == new_commits + [
+        Document(page_content="", metadata={"item_type": "GitHub Commit", "id": "sha1", "unchanged": True})
+    ]
+
+
+# Verifica che il metodo load_github_commits di LoadFilesService, senza nuovi commit, restituisca solo i commit già
+# caricati come invariati
+
+def test_load_github_commits_incremental_without_new_commits():
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_load_files_in_vector_store_port = MagicMock(spec=LoadFilesInVectorStorePort)
+    mock_watermark_port = MagicMock(spec=WatermarkPort)
+    mock_github_file_dates_port = MagicMock(spec=GitHubFileDatesPort)
+    load_files_service = LoadFilesService(
+        mock_github_port, MagicMock(), MagicMock(), MagicMock(), mock_load_files_in_vector_store_port, MagicMock(),
+        watermark_port=mock_watermark_port, github_file_dates_port=mock_github_file_dates_port
+    )
+
+    watermark_timestamp = datetime(2025, 2, 28, 12, 0, 0, tzinfo=pytz.utc)
+    mock_github_port.get_repository_name.return_value = "owner/repo"
+    mock_watermark_port.get_watermark.return_value = Watermark(LoadingItems.GitHubCommits, "owner/repo", watermark_timestamp, "sha2")
+    mock_github_file_dates_port.has_github_file_dates.return_value = True
+    log = PlatformLog(LoadingItems.GitHubCommits, datetime(2025, 3, 1, 12, 0, 0), True)
+    mock_github_port.load_github_commits.return_value = (log, [])
+    mock_load_files_in_vector_store_port.get_loaded_ids.return_value = {"sha2", "sha1"}
+
+    # Act
+    result_log, result_commits = load_files_service.load_github_commits()
+
+    # Assert
+    assert result_log == log
+    assert [commit.get_metadata() for commit in result_commits] == [
+        {"item_type": "GitHub Commit", "id": "sha1", "unchanged": True},
+        {"item_type": "GitHub Commit", "id": "sha2", "unchanged": True},
+    ]
+
+
+# Verifica che il metodo load_github_commits di LoadFilesService ricarichi tutti i commit se il commit del watermark
+# non è presente nel database vettoriale, o se non sono state salvate le date dei file
+
+@pytest.mark.parametrize("loaded_commit_ids, has_github_file_dates", [(set(), True), ({"sha2"}, False)])
+def test_load_github_commits_incremental_falls_back_to_full_loading(loaded_commit_ids, has_github_file_dates):
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_load_files_in_vector_store_port = MagicMock(spec=LoadFilesInVectorStorePort)
+    mock_watermark_port = MagicMock(spec=WatermarkPort)
+    mock_github_file_dates_port = MagicMock(spec=GitHubFileDatesPort)
+    load_files_service = LoadFilesService(
+        mock_github_port, MagicMock(), MagicMock(), MagicMock(), mock_load_files_in_vector_store_port, MagicMock(),
+        watermark_port=mock_watermark_port, github_file_dates_port=mock_github_file_dates_port
+    )
+
+    watermark_timestamp = datetime(2025, 2, 28, 12, 0, 0, tzinfo=pytz.utc)
+    mock_github_port.get_repository_name.return_value = "owner/repo"
+    mock_watermark_port.get_watermark.return_value = Watermark(LoadingItems.GitHubCommits, "owner/repo", watermark_timestamp, "sha2")
+    mock_github_file_dates_port.has_github_file_dates.return_value = has_github_file_dates
+
+    log = PlatformLog(LoadingItems.GitHubCommits, datetime(2025, 3, 1, 12, 0, 0), True)
+    all_commits = [Document(page_content="commit1", metadata={"id": "sha1", "date": "2025-02-27 09:00:00"})]
+    mock_github_port.load_github_commits.side_effect = [(log, []), (log, all_commits)]
+    mock_load_files_in_vector_store_port.get_loaded_ids.return_value = loaded_commit_ids
+
+    # Act
+    result_log, result_commits = load_files_service.load_github_commits()
+
+    # Assert
+    assert mock_github_port.load_github_commits.call_count == 2
+    mock_github_port.load_github_commits.assert_called_with()
+    assert result_commits == all_commits
+
+
+# Verifica che il metodo load_github_commits di LoadFilesService ignori il watermark senza la porta delle date dei file,
+# poiché le date dei file vengono ricavate dai soli commit scaricati
+
+def test_load_github_commits_without_file_dates_port_ignores_watermark():
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_watermark_port = MagicMock(spec=WatermarkPort)
+    load_files_service = LoadFilesService(
+        mock_github_port, MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock(),
+        watermark_port=mock_watermark_port
+    )
+
+    expected_result = (PlatformLog(LoadingItems.GitHubCommits, datetime(2025, 3, 1, 12, 0, 0), True), [])
+    mock_github_port.load_github_commits.return_value = expected_result
+
+    # Act
+    result = load_files_service.load_github_commits()
+
+    # Assert
+    mock_watermark_port.get_watermark.assert_not_called()
+    mock_github_port.load_github_commits.assert_called_once_with()
+    assert result == expected_result
+
+
+# Verifica che il metodo load_github_commits di LoadFilesService ignori il watermark quando è richiesto un caricamento completo
+
+def test_load_github_commits_full_sync_ignores_watermark():
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_watermark_port = MagicMock(spec=WatermarkPort)
+    load_files_service = LoadFilesService(
+        mock_github_port, MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock(),
+        watermark_port=mock_watermark_port, full_sync=True
+    )
+
+    expected_result = (PlatformLog(LoadingItems.GitHubCommits, datetime(2025, 3, 1, 12, 0, 0), True), [])
+    mock_github_port.load_github_commits.return_value = expected_result
+
+    # Act
+    result = load_files_service.load_github_commits()
+
+    # Assert
+    mock_watermark_port.get_watermark.assert_not_called()
+    mock_github_port.load_github_commits.assert_called_once_with()
+    assert result == expected_result
+
+
+# Verifica che il metodo save_github_commits_watermark di LoadFilesService salvi come watermark il commit più recente
+
+def test_save_github_commits_watermark_saves_most_recent_commit():
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_watermark_port = MagicMock(spec=WatermarkPort)
+    load_files_service = LoadFilesService(
+        mock_github_port, MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock(),
+        watermark_port=mock_watermark_port
+    )
+
+    mock_github_port.get_repository_name.return_value = "owner/repo"
+    mock_watermark_port.save_watermark.return_value = DbSaveOperationResponse(success=True, message="Saved")
+    github_commits = [
+        Document(page_content="commit1", metadata={"id": "sha1", "date": "2025-02-27 09:00:00"}),
+        Document(page_content="commit2", metadata={"id": "sha2", "date": "2025-02-28 13:00:00"}),
+        Document(page_content="commit0", metadata={"id": "sha0", "date": "/"}),
+    ]
+
+    # Act
+    load_files_service.save_github_commits_watermark(github_commits)
+
+    # Assert
+    italy_tz = pytz.timezone('Europe/Rome')
+    expected_watermark = Watermark(LoadingItems.GitHubCommits, "owner/repo",
+                                   italy_tz.localize(datetime(2025, 2, 28, 13, 0, 0)), "sha2")
+    mock_watermark_port.save_watermark.assert_called_once_with(expected_watermark)
+
+
+# Verifica che il metodo load_jira_issues di LoadFilesService, in presenza di un watermark, richieda a JiraPort
+# solo le issues aggiornate dopo il watermark
+
+def test_load_jira_issues_with_watermark():
+    # Arrange
+    mock_jira_port = MagicMock(spec=JiraPort)
+    mock_watermark_port = MagicMock(spec=WatermarkPort)
+    load_files_service = LoadFilesService(
+        MagicMock(), mock_jira_port, MagicMock(), MagicMock(), MagicMock(), MagicMock(),
+        watermark_port=mock_watermark_port
+    )
+    watermark_timestamp = pytz.timezone('Europe/Rome').localize(datetime(2025, 2, 28, 12, 0, 0))
+    mock_jira_port.get_project_key.return_value = "PROJ"
+    mock_watermark_port.get_watermark.return_value = Watermark(LoadingItems.JiraIssues, "PROJ", watermark_timestamp)
+    expected_result = (PlatformLog(LoadingItems.JiraIssues, datetime(2025, 3, 1), True), [])
+    mock_jira_port.load_jira_issues.return_value = expected_result
+
+    # Act
+    result = load_files_service.load_jira_issues()
+
+    # Assert
+    mock_watermark_port.get_watermark.assert_called_once_with(LoadingItems.JiraIssues, "PROJ")
+    mock_jira_port.load_jira_issues.assert_called_once_with(watermark_timestamp - timedelta(hours=2))
+    assert result == expected_result
+
+
+# Verifica che il metodo load_jira_issues di LoadFilesService carichi tutte le issues se non è presente un watermark
+# o se è richiesto un caricamento completo
+
+@pytest.mark.parametrize("full_sync", [False, True])
+def test_load_jira_issues_without_watermark(full_sync):
+    # Arrange
+    mock_jira_port = MagicMock(spec=JiraPort)
+    mock_watermark_port = MagicMock(spec=WatermarkPort)
+    load_files_service = LoadFilesService(
+        MagicMock(), mock_jira_port, MagicMock(), MagicMock(), MagicMock(), MagicMock(),
+        watermark_port=mock_watermark_port, full_sync=full_sync
+    )
+    mock_jira_port.get_project_key.return_value = "PROJ"
+    mock_watermark_port.get_watermark.return_value = None
+    mock_jira_port.load_jira_issues.return_value = (PlatformLog(LoadingItems.JiraIssues, datetime(2025, 3, 1), True), [])
+
+    # Act
+    load_files_service.load_jira_issues()
+
+    # Assert
+    mock_jira_port.load_jira_issues.assert_called_once_with()
+
+
+# Verifica che il metodo save_jira_issues_watermark di LoadFilesService salvi come watermark l'inizio del caricamento
+
+def test_save_jira_issues_watermark():
+    # Arrange
+    mock_jira_port = MagicMock(spec=JiraPort)
+    mock_watermark_port = MagicMock(spec=WatermarkPort)
+    load_files_service = LoadFilesService(
+        MagicMock(), mock_jira_port, MagicMock(), MagicMock(), MagicMock(), MagicMock(),
+        watermark_port=mock_watermark_port
+    )
+    mock_jira_port.get_project_key.return_value = "PROJ"
+    mock_watermark_port.save_watermark.return_value = DbSaveOperationResponse(success=True, message="Saved")
+    starting_timestamp = pytz.timezone('Europe/Rome').localize(datetime(2025, 3, 1, 10, 0, 0))
+
+    # Act
+    load_files_service.save_jira_issues_watermark(starting_timestamp)
+
+    # Assert
+    mock_watermark_port.save_watermark.assert_called_once_with(Watermark(LoadingItems.JiraIssues, "PROJ", starting_timestamp))
+
+
+# Verifica che il metodo load_confluence_pages di LoadFilesService, in presenza di un watermark, richieda a ConfluencePort
+# solo le pagine modificate dopo il watermark
+
+def test_load_confluence_pages_with_watermark():
+    # Arrange
+    mock_confluence_port = MagicMock(spec=ConfluencePort)
+    mock_watermark_port = MagicMock(spec=WatermarkPort)
+    load_files_service = LoadFilesService(
+        MagicMock(), MagicMock(), mock_confluence_port, MagicMock(), MagicMock(), MagicMock(),
+        watermark_port=mock_watermark_port
+    )
+    watermark_timestamp = pytz.timezone('Europe/Rome').localize(datetime(2025, 2, 28, 12, 0, 0))
+    mock_confluence_port.get_space_key.return_value = "SPACE"
+    mock_watermark_port.get_watermark.return_value = Watermark(LoadingItems.ConfluencePages, "SPACE", watermark_timestamp)
+    expected_result = (PlatformLog(LoadingItems.ConfluencePages, datetime(2025, 3, 1), True), [])
+    mock_confluence_port.load_confluence_pages.return_value = expected_result
+
+    # Act
+    result = load_files_service.load_confluence_pages()
+
+    # Assert
+    mock_watermark_port.get_watermark.assert_called_once_with(LoadingItems.ConfluencePages, "SPACE")
+    mock_confluence_port.load_confluence_pages.assert_called_once_with(watermark_timestamp - timedelta(hours=2))
+    assert result == expected_result
+
+
+# Verifica che il metodo save_confluence_pages_watermark di LoadFilesService salvi come watermark l'inizio del caricamento
+
+def test_save_confluence_pages_watermark():
+    # Arrange
+    mock_confluence_port = MagicMock(spec=ConfluencePort)
+    mock_watermark_port = MagicMock(spec=WatermarkPort)
+    load_files_service = LoadFilesService(
+        MagicMock(), MagicMock(), mock_confluence_port, MagicMock(), MagicMock(), MagicMock(),
+        watermark_port=mock_watermark_port
+    )
+    mock_confluence_port.get_space_key.return_value = "SPACE"
+    mock_watermark_port.save_watermark.return_value = DbSaveOperationResponse(success=True, message="Saved")
+    starting_timestamp = pytz.timezone('Europe/Rome').localize(datetime(2025, 3, 1, 10, 0, 0))
+
+    # Act
+    load_files_service.save_confluence_pages_watermark(starting_timestamp)
+
+    # Assert
+    mock_watermark_port.save_watermark.assert_called_once_with(Watermark(LoadingItems.ConfluencePages, "SPACE", starting_timestamp))
+
+
+# Verifica che il metodo load_github_files di LoadFilesService passi a GitHubPort gli SHA dei file già caricati
+# nel database vettoriale, tranne quando è richiesto un caricamento completo
+
+@pytest.mark.parametrize("full_sync, expected_known_shas", [(False, {"sha1", "sha2"}), (True, set())])
+def test_load_github_files_passes_known_shas(full_sync, expected_known_shas):
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_load_files_in_vector_store_port = MagicMock(spec=LoadFilesInVectorStorePort)
+    load_files_service = LoadFilesService(
+        mock_github_port, MagicMock(), MagicMock(), MagicMock(), mock_load_files_in_vector_store_port, MagicMock(),
+        full_sync=full_sync
+    )
+    mock_load_files_in_vector_store_port.get_loaded_ids.return_value = {"sha1", "sha2"}
+    mock_github_port.load_github_files.return_value = (PlatformLog(LoadingItems.GitHubFiles, datetime(2025, 3, 1), True), [])
+
+    # Act
+    load_files_service.load_github_files()
+
+    # Assert
+    mock_github_port.load_github_files.assert_called_once_with(expected_known_shas)
+
+
 # Verifica che il metodo load_github_files di LoadFilesService gestisca correttamente le eccezioni
 
 def test_load_github_files_handles_exception():
@@ -239,14 +965,14 @@ def test_get_github_files_new_metadata_updates_metadata_correctly():
         Document(page_content="commit1", metadata={
             "date": "2023-10-01 10:00:00",
             "files": [
-                "- src/file1.py (Status: added, Changes: 10)",
-                "- src/file2.py (Status: modified, Changes: 5)"
+                CommitFile("src/file1.py", "added", 10, 10, 0),
+                CommitFile("src/file2.py", "modified", 5, 5, 0)
             ]
         }),
         Document(page_content="commit2", metadata={
             "date": "2023-10-02 12:00:00",
             "files": [
-                "- src/file1.py (Status: renamed, Changes: 0)"
+                CommitFile("src/file1.py", "renamed", 0, 0, 0)
             ]
         }),
     ]
@@ -279,7 +1005,7 @@ def test_get_github_files_new_metadata_handles_missing_path():
         Document(page_content="commit1", metadata={
             "date": "2023-10-01 10:00:00",
             "files": [
-                "- src/file1.py (Status: added, Changes: 10)"
+                CommitFile("src/file1.py", "added", 10, 10, 0)
             ]
         }),
     ]
@@ -310,7 +1036,7 @@ def test_get_github_files_new_metadata_handles_invalid_date_exception():
         Document(page_content="commit1", metadata={
             "date": "invalid-date",
             "files": [
-                "- src/file1.py (Status: added, Changes: 10)"
+                CommitFile("src/file1.py", "added", 10, 10, 0)
             ]
         }),
     ]
@@ -323,6 +1049,102 @@ def test_get_github_files_new_metadata_handles_invalid_date_exception():
     assert str(exc_info.value) == "Invalid date format in GitHub commit: invalid-date"
 
 
+# Verifica che il metodo get_github_files_new_metadata di LoadFilesService salvi le date ricavate dai nuovi commit e
+# aggiorni i metadati dei soli file modificati con le date salvate, che comprendono quelle dei commit già caricati
+
+def test_get_github_files_new_metadata_uses_saved_dates():
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_github_file_dates_port = MagicMock(spec=GitHubFileDatesPort)
+    load_files_service = LoadFilesService(
+        mock_github_port, MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock(),
+        github_file_dates_port=mock_github_file_dates_port
+    )
+
+    mock_github_port.get_repository_name.return_value = "owner/repo"
+    mock_github_file_dates_port.save_github_file_dates.return_value = DbSaveOperationResponse(success=True, message="Saved")
+    mock_github_file_dates_port.get_github_file_dates.return_value = {
+        "src/file1.py": (datetime(2023, 10, 2, 12, 0, 0), datetime(2023, 9, 1, 8, 0, 0))
+    }
+    changed_file = Document(page_content="file1", metadata={"path": "src/file1.py"})
+    unchanged_file = Document(page_content="", metadata={"path": "src/file2.py", "unchanged": True})
+    github_commits = [
+        Document(page_content="commit2", metadata={
+            "date": "2023-10-02 12:00:00",
+            "files": [CommitFile("src/file1.py", "modified", 2, 2, 0)]
+        }),
+        Document(page_content="", metadata={"item_type": "GitHub Commit", "id": "sha1", "unchanged": True}),
+    ]
+
+    # Act
+    updated_files = load_files_service.get_github_files_new_metadata([changed_file, unchanged_file], github_commits)
+
+    # Assert
+    mock_github_file_dates_port.save_github_file_dates.assert_called_once_with(
+        "owner/repo", {"src/file1.py": (datetime(2023, 10, 2, 12, 0, 0), None)})
+    mock_github_file_dates_port.get_github_file_dates.assert_called_once_with("owner/repo", {"src/file1.py"})
+    assert updated_files[0].get_metadata() == {"path": "src/file1.py", "last_update": "2023-10-02 12:00:00",
+                                               "creation_date": "2023-09-01 08:00:00"}
+    assert updated_files[1].get_metadata() == {"path": "src/file2.py", "unchanged": True}
+
+
+# Verifica che il metodo get_github_files_new_metadata di LoadFilesService sollevi un'eccezione se le date dei file
+# non vengono salvate, poiché i commit non verranno scaricati di nuovo
+
+def test_get_github_files_new_metadata_raises_if_dates_not_saved():
+    # Arrange
+    mock_github_port = MagicMock(spec=GitHubPort)
+    mock_github_file_dates_port = MagicMock(spec=GitHubFileDatesPort)
+    load_files_service = LoadFilesService(
+        mock_github_port, MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock(),
+        github_file_dates_port=mock_github_file_dates_port
+    )
+    mock_github_port.get_repository_name.return_value = "owner/repo"
+    mock_github_file_dates_port.save_github_file_dates.return_value = DbSaveOperationResponse(success=False, message="DB error")
+
+    # Act
+    with pytest.raises(Exception) as exc_info:
+        load_files_service.get_github_files_new_metadata([], [])
+
+    # Assert
+    assert str(exc_info.value) == "Failed to save GitHub file dates: DB error"
+
+
+# Verifica che il metodo build_github_files_dates_index di LoadFilesService costruisca con una sola passata sui commit
+# l'indice delle date di ultima modifica e di creazione di ogni file
+
+def test_build_github_files_dates_index():
+    # Arrange
+    load_files_service = LoadFilesService(
+        MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock()
+    )
+
+    github_commits = [
+        Document(page_content="commit2", metadata={
+            "date": "2023-10-02 12:00:00",
+            "files": [
+                CommitFile("src/file1.py", "modified", 2, 2, 0),
+                CommitFile("src/file2.py", "added", 1, 1, 0)
+            ]
+        }),
+        Document(page_content="commit1", metadata={
+            "date": "2023-10-01 10:00:00",
+            "files": [
+                CommitFile("src/file1.py", "added", 10, 10, 0)
+            ]
+        }),
+    ]
+
+    # Act
+    path_index = load_files_service.build_github_files_dates_index(github_commits)
+
+    # Assert
+    assert path_index == {
+        "src/file1.py": (datetime(2023, 10, 2, 12, 0, 0), datetime(2023, 10, 1, 10, 0, 0)),
+        "src/file2.py": (datetime(2023, 10, 2, 12, 0, 0), datetime(2023, 10, 2, 12, 0, 0)),
+    }
+
+
 # Verifica che il metodo clean_confluence_pages di LoadFilesService gestisca correttamente le eccezioni
 
 def test_clean_confluence_pages_handles_exception():
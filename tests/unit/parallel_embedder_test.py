@@ -0,0 +1,44 @@
+import pytest
+import time
+from unittest.mock import MagicMock
+
+from utils.parallel_embedder import ParallelEmbedder
+
+
+# Verifica che ParallelEmbedder divida i testi in batch e restituisca gli embedding nell'ordine dei testi,
+# anche quando le batch terminano in ordine diverso
+
+def test_call_embeds_batches_in_parallel_preserving_order():
+    # Arrange
+    def embedding_function(texts):
+        # Le prime batch terminano più tardi delle successive
+        time.sleep(0.05 if texts[0] == "0" else 0.01)
+        return [[float(text)] for text in texts]
+
+    mock_embedding_function = MagicMock(side_effect=embedding_function)
+    embedder = ParallelEmbedder(mock_embedding_function, batch_size=2, max_workers=3)
+    texts = [str(i) for i in range(7)]
+
+    # Act
+    result = embedder(texts)
+
+    # Assert
+    assert result == [[float(i)] for i in range(7)]
+    assert sorted(call.args[0] for call in mock_embedding_function.call_args_list) == [["0", "1"], ["2", "3"], ["4", "5"], ["6"]]
+    assert embedder.get_num_chunks() == 7
+
+
+# Verifica che ParallelEmbedder propaghi gli errori della funzione di embedding
+
+def test_call_exception():
+    # Arrange
+    mock_embedding_function = MagicMock(side_effect=Exception("Embedding error"))
+    embedder = ParallelEmbedder(mock_embedding_function, batch_size=1, max_workers=2)
+
+    # Act
+    with pytest.raises(Exception) as exc_info:
+        embedder(["a", "b"])
+
+    # Assert
+    assert str(exc_info.value) == "Embedding error"
+    assert embedder.get_num_chunks() == 0
@@ -2,12 +2,15 @@ import pytest
 from unittest.mock import MagicMock
 from datetime import datetime
 
-from models.loggingModels import LoadingAttempt, LoadingItems, PlatformLog, VectorStoreLog
+from models.loggingModels import LoadingAttempt, LoadingItems, LoadingStage, PlatformLog, StageLog, VectorStoreLog
 from models.message import Message, MessageSender
 from models.quantity import Quantity
 from models.page import Page
 from entities.postgresSaveOperationResponse import PostgresSaveOperationResponse
 from entities.postgresMessage import PostgresMessage, PostgresMessageSender
+from entities.postgresWatermark import PostgresWatermark
+from entities.loggingEntities import PostgresLoadingItems, PostgresLoadingStage, PostgresStageLog
+from models.watermark import Watermark
 from adapters.postgresAdapter import PostgresAdapter
 from repositories.postgresRepository import PostgresRepository
 
@@ -106,6 +109,47 @@ def test_save_loading_attempt_exception():
     assert str(exc_info.value) == "Save loading attempt error"
 
 
+# Verifica che il metodo save_loading_attempt di PostgresAdapter converta i log delle fasi del tentativo di caricamento
+
+def test_save_loading_attempt_converts_stage_logs():
+    # Arrange
+    mock_postgres_repository = MagicMock(spec=PostgresRepository)
+    postgres_adapter = PostgresAdapter(mock_postgres_repository)
+
+    platform_log = PlatformLog(LoadingItems.JiraIssues, datetime(2023, 10, 1, 12, 0, 0), True, num_bytes=4096, num_api_calls=3)
+    vector_store_log = VectorStoreLog(datetime(2023, 10, 1, 12, 5, 0), True, 10, 5, 2)
+    stage_logs = [StageLog(LoadingStage.JiraIssuesFetch, 2.5, 100, 4096, 3, 1024)]
+    loading_attempt = LoadingAttempt([platform_log], vector_store_log, datetime(2023, 10, 1, 11, 55, 0), stage_logs)
+
+    mock_postgres_repository.save_loading_attempt.return_value = PostgresSaveOperationResponse(success=True, message="Saved")
+
+    # Act
+    postgres_adapter.save_loading_attempt(loading_attempt)
+
+    # Assert
+    postgres_loading_attempt = mock_postgres_repository.save_loading_attempt.call_args.args[0]
+    assert postgres_loading_attempt.get_postgres_stage_logs() == [
+        PostgresStageLog(PostgresLoadingStage.JiraIssuesFetch, 2.5, 100, 4096, 3, 1024)
+    ]
+
+
+# Verifica che il metodo get_last_load_stage_logs di PostgresAdapter converta i log delle fasi restituiti dal repository
+
+def test_get_last_load_stage_logs_converts_stage_logs():
+    # Arrange
+    mock_postgres_repository = MagicMock(spec=PostgresRepository)
+    postgres_adapter = PostgresAdapter(mock_postgres_repository)
+    mock_postgres_repository.get_last_load_stage_logs.return_value = [
+        PostgresStageLog(PostgresLoadingStage.Splitting, 1.5, 40, 8192, 0, 2048)
+    ]
+
+    # Act
+    stage_logs = postgres_adapter.get_last_load_stage_logs()
+
+    # Assert
+    assert stage_logs == [StageLog(LoadingStage.Splitting, 1.5, 40, 8192, 0, 2048)]
+
+
 # Verifica che il metodo get_last_load_outcome di PostgresAdapter gestisca correttamente le eccezioni
 
 def test_get_last_load_outcome_exception():
@@ -195,3 +239,75 @@ def test_postgres_loading_attempt_converter_value_error_empty_platform_logs():
 
     # Assert
     assert str(exc_info.value) == "The platform logs are empty."
+
+
+# Verifica che il metodo get_watermark di PostgresAdapter converta correttamente il watermark restituito dal repository
+
+def test_get_watermark_converts_postgres_watermark():
+    # Arrange
+    mock_postgres_repository = MagicMock(spec=PostgresRepository)
+    postgres_adapter = PostgresAdapter(mock_postgres_repository)
+    last_timestamp = datetime(2025, 2, 28, 12, 34, 56)
+    mock_postgres_repository.get_watermark.return_value = PostgresWatermark(
+        PostgresLoadingItems.GitHubCommits, "owner/repo", last_timestamp, "abc123"
+    )
+
+    # Act
+    result = postgres_adapter.get_watermark(LoadingItems.GitHubCommits, "owner/repo")
+
+    # Assert
+    mock_postgres_repository.get_watermark.assert_called_once_with(PostgresLoadingItems.GitHubCommits, "owner/repo")
+    assert result == Watermark(LoadingItems.GitHubCommits, "owner/repo", last_timestamp, "abc123")
+
+
+# Verifica che il metodo get_watermark di PostgresAdapter restituisca None se il repository non ha alcun watermark
+
+def test_get_watermark_returns_none():
+    # Arrange
+    mock_postgres_repository = MagicMock(spec=PostgresRepository)
+    postgres_adapter = PostgresAdapter(mock_postgres_repository)
+    mock_postgres_repository.get_watermark.return_value = None
+
+    # Act
+    result = postgres_adapter.get_watermark(LoadingItems.GitHubCommits, "owner/repo")
+
+    # Assert
+    assert result is None
+
+
+# Verifica che il metodo save_watermark di PostgresAdapter converta il watermark e la risposta del repository
+
+def test_save_watermark_converts_watermark_and_response():
+    # Arrange
+    mock_postgres_repository = MagicMock(spec=PostgresRepository)
+    postgres_adapter = PostgresAdapter(mock_postgres_repository)
+    last_timestamp = datetime(2025, 2, 28, 12, 34, 56)
+    mock_postgres_repository.save_watermark.return_value = PostgresSaveOperationResponse(success=True, message="Saved")
+
+    # Act
+    result = postgres_adapter.save_watermark(Watermark(LoadingItems.GitHubCommits, "owner/repo", last_timestamp, "abc123"))
+
+    # Assert
+    mock_postgres_repository.save_watermark.assert_called_once_with(
+        PostgresWatermark(PostgresLoadingItems.GitHubCommits, "owner/repo", last_timestamp, "abc123")
+    )
+    assert result.get_success() is True
+    assert result.get_message() == "Saved"
+
+
+# Verifica che il metodo save_github_file_dates di PostgresAdapter passi le date al repository e ne converta la risposta
+
+def test_save_github_file_dates_converts_response():
+    # Arrange
+    mock_postgres_repository = MagicMock(spec=PostgresRepository)
+    postgres_adapter = PostgresAdapter(mock_postgres_repository)
+    dates = {"src/a.py": (datetime(2025, 2, 28, 12, 0, 0), None)}
+    mock_postgres_repository.save_github_file_dates.return_value = PostgresSaveOperationResponse(success=True, message="Saved")
+
+    # Act
+    result = postgres_adapter.save_github_file_dates("owner/repo", dates)
+
+    # Assert
+    mock_postgres_repository.save_github_file_dates.assert_called_once_with("owner/repo", dates)
+    assert result.get_success() is True
+    assert result.get_message() == "Saved"
@@ -3,10 +3,12 @@ from unittest.mock import MagicMock, patch
 from datetime import datetime
 from psycopg2 import Error as Psycopg2Error
 
-from entities.loggingEntities import PostgresLoadingAttempt, PostgresLoadingItems, PostgresPlatformLog, PostgresVectorStoreLog
+from entities.loggingEntities import (PostgresLoadingAttempt, PostgresLoadingItems, PostgresPlatformLog, PostgresVectorStoreLog,
+                                      PostgresLoadingStage, PostgresStageLog)
 from entities.postgresSaveOperationResponse import PostgresSaveOperationResponse
 from entities.postgresMessage import PostgresMessage, PostgresMessageSender
 from entities.postgresLastLoadOutcome import PostgresLastLoadOutcome
+from entities.postgresWatermark import PostgresWatermark
 from repositories.postgresRepository import PostgresRepository
 
 
@@ -130,6 +132,30 @@ def test_save_loading_attempt_success(postgres_repository):
     assert response == expected_response
 
 
+# Verifica che il metodo save_loading_attempt di PostgresRepository salvi i log delle fasi collegandoli al tentativo di caricamento
+
+def test_save_loading_attempt_saves_stage_logs(postgres_repository):
+    # Arrange
+    platform_log = PostgresPlatformLog(PostgresLoadingItems.GitHubCommits, datetime(2023, 10, 1, 12, 0, 0), True)
+    vector_store_log = PostgresVectorStoreLog(datetime(2023, 10, 1, 12, 5, 0), True, 10, 5, 2)
+    stage_logs = [
+        PostgresStageLog(PostgresLoadingStage.GitHubCommitsFetch, 2.5, 100, 0, 0, 1024),
+        PostgresStageLog(PostgresLoadingStage.Adds, 1.0, 50, 4096, 2, 2048)
+    ]
+    loading_attempt = PostgresLoadingAttempt([platform_log], vector_store_log, datetime(2023, 10, 1, 11, 55, 0), stage_logs)
+
+    with patch.object(postgres_repository, '_PostgresRepository__execute_query', return_value=[7]) as mock_execute_query:
+        # Act
+        postgres_repository.save_loading_attempt(loading_attempt)
+
+    # Assert
+    stage_log_params = [call.kwargs["params"] for call in mock_execute_query.call_args_list if "stage_logs" in call.args[0]]
+    assert stage_log_params == [
+        (7, "GitHub Commits fetch", 2.5, 100, 0, 0, 1024),
+        (7, "Adds", 1.0, 50, 4096, 2, 2048)
+    ]
+
+
 # Verifica che il metodo save_loading_attempt di PostgresRepository restituisca False in caso di errore del database
 
 def test_save_loading_attempt_psycopg2_error(postgres_repository):
@@ -164,6 +190,94 @@ def test_save_loading_attempt_exception(postgres_repository):
         assert str(exc_info.value) == "Unexpected error"
 
 
+# Verifica che il metodo get_last_load_stage_logs di PostgresRepository converta le tuple dei log delle fasi
+
+def test_get_last_load_stage_logs_success(postgres_repository):
+    # Arrange
+    rows = [("Jira Issues fetch", 2.5, 100, 4096, 3, 1024), ("Diff", 1, 100, 0, 0, 1024)]
+    with patch.object(postgres_repository, '_PostgresRepository__execute_query', return_value=rows):
+        # Act
+        stage_logs = postgres_repository.get_last_load_stage_logs()
+
+    # Assert
+    assert stage_logs == [
+        PostgresStageLog(PostgresLoadingStage.JiraIssuesFetch, 2.5, 100, 4096, 3, 1024),
+        PostgresStageLog(PostgresLoadingStage.Diff, 1.0, 100, 0, 0, 1024)
+    ]
+
+
+# Verifica che il metodo get_last_load_stage_logs di PostgresRepository restituisca una lista vuota se non ci sono log
+
+def test_get_last_load_stage_logs_no_result(postgres_repository):
+    # Arrange
+    with patch.object(postgres_repository, '_PostgresRepository__execute_query', return_value=None):
+        # Act
+        stage_logs = postgres_repository.get_last_load_stage_logs()
+
+    # Assert
+    assert stage_logs == []
+
+
+# Verifica che il metodo acquire_lease di PostgresRepository restituisca True solo se l'upsert del lease restituisce una tupla,
+# cioè se il lease era libero, scaduto o già detenuto dallo stesso richiedente
+
+@pytest.mark.parametrize("result, expected", [(("replica-1",), True), (None, False)])
+def test_acquire_lease(postgres_repository, result, expected):
+    # Arrange
+    with patch.object(postgres_repository, '_PostgresRepository__execute_query', return_value=result) as mock_execute_query:
+        # Act
+        acquired = postgres_repository.acquire_lease("vector_store_refresh", "replica-1", 300)
+
+    # Assert
+    assert acquired is expected
+    assert mock_execute_query.call_args.kwargs["params"] == ("vector_store_refresh", "replica-1", 300)
+    assert mock_execute_query.call_args.kwargs["commit"] is True
+
+
+# Verifica che il metodo release_lease di PostgresRepository elimini il lease solo se detenuto dal richiedente
+
+@pytest.mark.parametrize("result, expected", [(("replica-1",), True), (None, False)])
+def test_release_lease(postgres_repository, result, expected):
+    # Arrange
+    with patch.object(postgres_repository, '_PostgresRepository__execute_query', return_value=result) as mock_execute_query:
+        # Act
+        released = postgres_repository.release_lease("vector_store_refresh", "replica-1")
+
+    # Assert
+    assert released is expected
+    assert "DELETE FROM leases" in mock_execute_query.call_args.args[0]
+
+
+# Verifica che il metodo swap_lease_replica di PostgresRepository restituisca la replica registrata in precedenza
+
+@pytest.mark.parametrize("result, expected", [(("host-2",), "host-2"), ((None,), None)])
+def test_swap_lease_replica(postgres_repository, result, expected):
+    # Arrange
+    with patch.object(postgres_repository, '_PostgresRepository__execute_query', return_value=result) as mock_execute_query:
+        # Act
+        previous_replica = postgres_repository.swap_lease_replica("vector_store_refresh", "host-1")
+
+    # Assert
+    assert previous_replica == expected
+    assert mock_execute_query.call_args.kwargs["params"] == ("vector_store_refresh", "vector_store_refresh", "host-1")
+    assert mock_execute_query.call_args.kwargs["commit"] is True
+
+
+# Verifica che il metodo __execute_query di PostgresRepository esegua il commit dopo la lettura se richiesto
+
+def test_execute_query_fetch_one_with_commit(postgres_repository, mock_conn):
+    # Arrange
+    mock_cursor = mock_conn.cursor.return_value.__enter__.return_value
+    mock_cursor.fetchone.return_value = ("replica-1",)
+
+    # Act
+    result = postgres_repository._PostgresRepository__execute_query("INSERT ... RETURNING holder;", fetch_one=True, commit=True)
+
+    # Assert
+    assert result == ("replica-1",)
+    mock_conn.commit.assert_called_once()
+
+
 # Verifica che il metodo get_last_load_outcome di PostgresRepository recuperi correttamente l'ultimo esito di caricamento dal database
 
 def test_get_last_load_outcome_success(postgres_repository):
@@ -301,3 +415,125 @@ def test_execute_query_commit(postgres_repository, mock_conn):
     # Assert
     mock_cursor.execute.assert_called_once_with(query, params)
     mock_conn.commit.assert_called_once()
+
+
+# Verifica che il metodo get_watermark di PostgresRepository recuperi correttamente il watermark salvato
+
+def test_get_watermark_success(postgres_repository):
+    # Arrange
+    last_timestamp = datetime(2025, 2, 28, 12, 34, 56)
+    expected_watermark = PostgresWatermark(PostgresLoadingItems.GitHubCommits, "owner/repo", last_timestamp, "abc123")
+
+    with patch.object(postgres_repository, '_PostgresRepository__execute_query', return_value=(last_timestamp, "abc123")) as mock_execute_query:
+        # Act
+        watermark = postgres_repository.get_watermark(PostgresLoadingItems.GitHubCommits, "owner/repo")
+
+    # Assert
+    assert watermark == expected_watermark
+    assert mock_execute_query.call_args.kwargs["params"] == ("GitHub Commits", "owner/repo")
+
+
+# Verifica che il metodo get_watermark di PostgresRepository restituisca None se non è stato salvato alcun watermark
+
+def test_get_watermark_not_found(postgres_repository):
+    # Arrange
+    with patch.object(postgres_repository, '_PostgresRepository__execute_query', return_value=None):
+        # Act
+        watermark = postgres_repository.get_watermark(PostgresLoadingItems.GitHubCommits, "owner/repo")
+
+    # Assert
+    assert watermark is None
+
+
+# Verifica che il metodo save_watermark di PostgresRepository salvi correttamente un watermark
+
+def test_save_watermark_success(postgres_repository):
+    # Arrange
+    watermark = PostgresWatermark(PostgresLoadingItems.GitHubCommits, "owner/repo", datetime(2025, 2, 28, 12, 34, 56), "abc123")
+    expected_response = PostgresSaveOperationResponse(success=True, message="Watermark saved successfully in the Postgres database.")
+
+    with patch.object(postgres_repository, '_PostgresRepository__execute_query', return_value=None) as mock_execute_query:
+        # Act
+        response = postgres_repository.save_watermark(watermark)
+
+    # Assert
+    assert response == expected_response
+    assert mock_execute_query.call_args.kwargs["params"] == ("GitHub Commits", "owner/repo", datetime(2025, 2, 28, 12, 34, 56), "abc123")
+
+
+# Verifica che il metodo save_watermark di PostgresRepository restituisca False in caso di errore del database
+
+def test_save_watermark_psycopg2_error(postgres_repository):
+    # Arrange
+    watermark = PostgresWatermark(PostgresLoadingItems.GitHubCommits, "owner/repo", datetime(2025, 2, 28, 12, 34, 56), "abc123")
+    with patch.object(postgres_repository, '_PostgresRepository__execute_query', side_effect=Psycopg2Error("DB error")):
+        # Act
+        response = postgres_repository.save_watermark(watermark)
+
+    # Assert
+    assert response.get_success() is False
+    assert "A connection error occurred" in response.get_message()
+
+
+# Verifica che il metodo get_github_file_dates di PostgresRepository restituisca le date dei file richiesti, per percorso
+
+def test_get_github_file_dates_success(postgres_repository):
+    # Arrange
+    rows = [("src/a.py", datetime(2025, 2, 28, 12, 0, 0), None)]
+    with patch.object(postgres_repository, '_PostgresRepository__execute_query', return_value=rows) as mock_execute_query:
+        # Act
+        dates = postgres_repository.get_github_file_dates("owner/repo", {"src/b.py", "src/a.py"})
+
+    # Assert
+    assert dates == {"src/a.py": (datetime(2025, 2, 28, 12, 0, 0), None)}
+    assert mock_execute_query.call_args.kwargs["params"] == ("owner/repo", ["src/a.py", "src/b.py"])
+
+
+# Verifica che il metodo save_github_file_dates di PostgresRepository salvi tutte le date con una sola istruzione
+
+def test_save_github_file_dates_success(postgres_repository):
+    # Arrange
+    dates = {
+        "src/b.py": (datetime(2025, 2, 28, 12, 0, 0), None),
+        "src/a.py": (datetime(2025, 2, 27, 9, 0, 0), datetime(2025, 2, 27, 9, 0, 0)),
+    }
+    with patch.object(postgres_repository, '_PostgresRepository__execute_query', return_value=None) as mock_execute_query:
+        # Act
+        response = postgres_repository.save_github_file_dates("owner/repo", dates)
+
+    # Assert
+    assert response.get_success() is True
+    mock_execute_query.assert_called_once()
+    assert mock_execute_query.call_args.kwargs["params"] == (
+        "owner/repo",
+        ["src/a.py", "src/b.py"],
+        [datetime(2025, 2, 27, 9, 0, 0), datetime(2025, 2, 28, 12, 0, 0)],
+        [datetime(2025, 2, 27, 9, 0, 0), None]
+    )
+
+
+# Verifica che il metodo save_github_file_dates di PostgresRepository restituisca False in caso di errore del database
+
+def test_save_github_file_dates_psycopg2_error(postgres_repository):
+    # Arrange
+    with patch.object(postgres_repository, '_PostgresRepository__execute_query', side_effect=Psycopg2Error("DB error")):
+        # Act
+        response = postgres_repository.save_github_file_dates("owner/repo", {"src/a.py": (datetime(2025, 2, 27, 9, 0, 0), None)})
+
+    # Assert
+    assert response.get_success() is False
+    assert "A connection error occurred" in response.get_message()
+
+
+# Verifica che il metodo has_github_file_dates di PostgresRepository indichi se sono state salvate date per la sorgente
+
+@pytest.mark.parametrize("result, expected", [((1,), True), (None, False)])
+def test_has_github_file_dates(postgres_repository, result, expected):
+    # Arrange
+    with patch.object(postgres_repository, '_PostgresRepository__execute_query', return_value=result) as mock_execute_query:
+        # Act
+        has_dates = postgres_repository.has_github_file_dates("owner/repo")
+
+    # Assert
+    assert has_dates is expected
+    assert mock_execute_query.call_args.kwargs["params"] == ("owner/repo",)
@@ -0,0 +1,77 @@
+import pytest
+from github.GithubException import RateLimitExceededException
+
+from utils.rate_limit_budget import RateLimitBudget
+
+
+def headers(remaining: int, reset: float, resource: str = "core") -> dict:
+    return {"X-RateLimit-Remaining": str(remaining), "X-RateLimit-Reset": str(reset), "X-RateLimit-Resource": resource}
+
+
+# Verifica che RateLimitBudget non rallenti le richieste finché restano più richieste della soglia di distribuzione
+
+def test_acquire_without_pacing_above_threshold():
+    # Arrange
+    sleeps = []
+    budget = RateLimitBudget(reserve=10, pacing_threshold=100, clock=lambda: 1000.0, sleep=sleeps.append)
+    budget.update(headers(500, 2000))
+
+    # Act
+    for _ in range(3):
+        budget.acquire()
+
+    # Assert
+    assert sleeps == []
+    assert budget.get_remaining() == 497
+
+
+# Verifica che RateLimitBudget distribuisca uniformemente fino al reset le richieste rimaste oltre la riserva
+
+def test_acquire_paces_requests_below_threshold():
+    # Arrange
+    sleeps = []
+    budget = RateLimitBudget(reserve=10, pacing_threshold=100, clock=lambda: 1000.0, sleep=sleeps.append)
+    budget.update(headers(60, 1500))
+
+    # Act
+    for _ in range(3):
+        budget.acquire()
+
+    # Assert
+    assert sleeps == pytest.approx([10.0, 10.0 + 500 / 49])
+
+
+# Verifica che RateLimitBudget rinvii le richieste non condizionali quando restano solo le richieste della riserva,
+# e che le consenta di nuovo dopo il reset del rate limit
+
+def test_acquire_defers_requests_within_reserve():
+    # Arrange
+    now = [1000.0]
+    budget = RateLimitBudget(reserve=10, pacing_threshold=100, clock=lambda: now[0], sleep=lambda seconds: None)
+    budget.update(headers(10, 1500))
+
+    # Act
+    with pytest.raises(RateLimitExceededException):
+        budget.acquire()
+    budget.acquire(conditional=True)
+    now[0] = 1500.0
+    budget.acquire()
+
+    # Assert
+    assert budget.get_num_deferred() == 1
+
+
+# Verifica che RateLimitBudget ignori le risposte delle altre risorse e, nello stesso periodo, i valori non aggiornati
+# delle risposte arrivate in disordine
+
+def test_update_keeps_lowest_remaining_of_core_resource():
+    # Arrange
+    budget = RateLimitBudget(clock=lambda: 1000.0)
+
+    # Act
+    budget.update(headers(300, 1500))
+    budget.update(headers(400, 1500))
+    budget.update(headers(20, 1500, resource="search"))
+
+    # Assert
+    assert budget.get_remaining() == 300
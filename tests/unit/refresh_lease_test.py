@@ -0,0 +1,135 @@
+import pytest
+import time
+from unittest.mock import MagicMock
+
+from ports.refreshLeasePort import RefreshLeasePort
+from utils.refresh_lease import RefreshLease
+
+
+# Verifica che RefreshLease non venga considerato acquisito se il lease è detenuto da un'altra replica
+
+def test_acquire_held_by_another_replica():
+    # Arrange
+    mock_refresh_lease_port = MagicMock(spec=RefreshLeasePort)
+    mock_refresh_lease_port.acquire_lease.return_value = False
+    refresh_lease = RefreshLease(mock_refresh_lease_port, "vector_store_refresh", "replica-1", 300)
+
+    # Act
+    acquired = refresh_lease.acquire()
+
+    # Assert
+    assert acquired is False
+    mock_refresh_lease_port.acquire_lease.assert_called_once_with("vector_store_refresh", "replica-1", 300)
+    assert refresh_lease.get_hold_duration() == 0.0
+
+# Verifica che RefreshLease rinnovi il lease mentre è detenuto e smetta di rinnovarlo dopo il rilascio
+
+def test_acquire_renews_until_release():
+    # Arrange
+    mock_refresh_lease_port = MagicMock(spec=RefreshLeasePort)
+    mock_refresh_lease_port.acquire_lease.return_value = True
+    refresh_lease = RefreshLease(mock_refresh_lease_port, "vector_store_refresh", "replica-1", 0.03)
+
+    # Act
+    acquired = refresh_lease.acquire()
+    time.sleep(0.1)
+    hold_duration = refresh_lease.get_hold_duration()
+    refresh_lease.release()
+    num_calls = mock_refresh_lease_port.acquire_lease.call_count
+    time.sleep(0.05)
+
+    # Assert
+    assert acquired is True
+    assert refresh_lease.get_num_renewals() >= 2
+    assert hold_duration >= 0.1
+    mock_refresh_lease_port.release_lease.assert_called_once_with("vector_store_refresh", "replica-1")
+    assert mock_refresh_lease_port.acquire_lease.call_count == num_calls
+
+# Verifica che RefreshLease continui a rinnovare il lease dopo un errore in un rinnovo
+
+def test_renewal_error_does_not_stop_heartbeat():
+    # Arrange
+    mock_refresh_lease_port = MagicMock(spec=RefreshLeasePort)
+    mock_refresh_lease_port.acquire_lease.side_effect = [True, Exception("Connection error")] + [True] * 100
+    refresh_lease = RefreshLease(mock_refresh_lease_port, "vector_store_refresh", "replica-1", 0.03)
+
+    # Act
+    refresh_lease.acquire()
+    time.sleep(0.1)
+    refresh_lease.release()
+
+    # Assert
+    assert refresh_lease.get_num_renewals() >= 1
+
+# Verifica che RefreshLease segnali il lease come perso, e smetta di rinnovarlo, se è stato acquisito da un'altra replica
+
+def test_renewal_marks_lease_lost_when_acquired_by_another_replica():
+    # Arrange
+    mock_refresh_lease_port = MagicMock(spec=RefreshLeasePort)
+    mock_refresh_lease_port.acquire_lease.side_effect = [True, True, False] + [True] * 100
+    refresh_lease = RefreshLease(mock_refresh_lease_port, "vector_store_refresh", "replica-1", 0.03)
+
+    # Act
+    refresh_lease.acquire()
+    lost_at_start = refresh_lease.is_lost()
+    time.sleep(0.1)
+    num_calls = mock_refresh_lease_port.acquire_lease.call_count
+    lost = refresh_lease.is_lost()
+    refresh_lease.release()
+
+    # Assert
+    assert lost_at_start is False
+    assert lost is True
+    assert num_calls == 3
+    assert refresh_lease.get_num_renewals() == 1
+
+# Verifica che RefreshLease segnali il lease come perso se i rinnovi falliscono fino alla sua scadenza
+
+def test_renewal_errors_mark_lease_lost_after_expiry():
+    # Arrange
+    mock_refresh_lease_port = MagicMock(spec=RefreshLeasePort)
+    mock_refresh_lease_port.acquire_lease.side_effect = [True] + [Exception("Connection error")] * 100
+    refresh_lease = RefreshLease(mock_refresh_lease_port, "vector_store_refresh", "replica-1", 0.03)
+
+    # Act
+    refresh_lease.acquire()
+    time.sleep(0.1)
+    lost = refresh_lease.is_lost()
+    refresh_lease.release()
+
+    # Assert
+    assert lost is True
+    assert refresh_lease.get_num_renewals() == 0
+
+# Verifica che RefreshLease registri la replica che acquisisce il lease, e segnali se lo ha rilevato da un'altra replica
+
+@pytest.mark.parametrize("previous_replica, taken_over", [("host-1", False), ("host-2", True), (None, True)])
+def test_acquire_records_replica(previous_replica, taken_over):
+    # Arrange
+    mock_refresh_lease_port = MagicMock(spec=RefreshLeasePort)
+    mock_refresh_lease_port.acquire_lease.return_value = True
+    mock_refresh_lease_port.swap_lease_replica.return_value = previous_replica
+    refresh_lease = RefreshLease(mock_refresh_lease_port, "vector_store_refresh", "host-1:42", 300, "host-1")
+
+    # Act
+    refresh_lease.acquire()
+    refresh_lease.release()
+
+    # Assert
+    mock_refresh_lease_port.swap_lease_replica.assert_called_once_with("vector_store_refresh", "host-1")
+    assert refresh_lease.is_taken_over() is taken_over
+
+# Verifica che RefreshLease propaghi gli errori nell'acquisizione del lease
+
+def test_acquire_exception():
+    # Arrange
+    mock_refresh_lease_port = MagicMock(spec=RefreshLeasePort)
+    mock_refresh_lease_port.acquire_lease.side_effect = Exception("Postgres error")
+    refresh_lease = RefreshLease(mock_refresh_lease_port, "vector_store_refresh", "replica-1", 300)
+
+    # Act
+    with pytest.raises(Exception) as exc_info:
+        refresh_lease.acquire()
+
+    # Assert
+    assert str(exc_info.value) == "Postgres error"
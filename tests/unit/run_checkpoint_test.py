@@ -0,0 +1,71 @@
+import pytest
+from datetime import datetime, timedelta
+import pytz
+
+from models.commitFile import CommitFile
+from models.document import Document
+from models.loggingModels import LoadingItems, PlatformLog
+from utils.run_checkpoint import RunCheckpoint
+
+
+@pytest.fixture
+def checkpoint_path(tmp_path):
+    return str(tmp_path / "run_checkpoint.sqlite")
+
+
+STARTING_TIMESTAMP = pytz.timezone('Europe/Rome').localize(datetime(2025, 3, 1, 12, 0, 0))
+
+
+# Verifica che RunCheckpoint salvi gli snapshot degli elementi scaricati e che un caricamento successivo, entro l'età massima,
+# riprenda quello interrotto con il suo istante di inizio e i suoi snapshot
+
+def test_begin_resumes_interrupted_loading(checkpoint_path):
+    # Arrange
+    checkpoint = RunCheckpoint(checkpoint_path, max_age=3600)
+    checkpoint.begin(STARTING_TIMESTAMP)
+    platform_log = PlatformLog(LoadingItems.GitHubCommits, STARTING_TIMESTAMP, True, 1024, 3)
+    documents = [Document(page_content="commit", metadata={"id": "sha", "files": [CommitFile("a.py", "added", 1, 1, 0, "@@ +1 @@")]})]
+    checkpoint.save_snapshot(LoadingItems.GitHubCommits, platform_log, documents)
+
+    # Act
+    resumed_checkpoint = RunCheckpoint(checkpoint_path, max_age=3600)
+    starting_timestamp = resumed_checkpoint.begin(STARTING_TIMESTAMP + timedelta(minutes=30))
+
+    # Assert
+    assert starting_timestamp == STARTING_TIMESTAMP
+    assert resumed_checkpoint.get_snapshot(LoadingItems.GitHubCommits) == (platform_log, documents)
+    assert resumed_checkpoint.get_snapshot(LoadingItems.JiraIssues) is None
+
+
+# Verifica che RunCheckpoint scarti il checkpoint di un caricamento interrotto più vecchio dell'età massima
+
+def test_begin_discards_expired_checkpoint(checkpoint_path):
+    # Arrange
+    checkpoint = RunCheckpoint(checkpoint_path, max_age=3600)
+    checkpoint.begin(STARTING_TIMESTAMP)
+    checkpoint.save_snapshot(LoadingItems.JiraIssues, PlatformLog(LoadingItems.JiraIssues, STARTING_TIMESTAMP, True), [])
+    new_timestamp = STARTING_TIMESTAMP + timedelta(hours=2)
+
+    # Act
+    starting_timestamp = checkpoint.begin(new_timestamp)
+
+    # Assert
+    assert starting_timestamp == new_timestamp
+    assert checkpoint.get_snapshot(LoadingItems.JiraIssues) is None
+
+
+# Verifica che il metodo clear di RunCheckpoint elimini il checkpoint, così che il caricamento successivo non riprenda nulla
+
+def test_clear_discards_checkpoint(checkpoint_path):
+    # Arrange
+    checkpoint = RunCheckpoint(checkpoint_path)
+    checkpoint.begin(STARTING_TIMESTAMP)
+    checkpoint.save_snapshot(LoadingItems.JiraIssues, PlatformLog(LoadingItems.JiraIssues, STARTING_TIMESTAMP, True), [])
+
+    # Act
+    checkpoint.clear()
+    new_timestamp = STARTING_TIMESTAMP + timedelta(minutes=1)
+
+    # Assert
+    assert checkpoint.begin(new_timestamp) == new_timestamp
+    assert checkpoint.get_snapshot(LoadingItems.JiraIssues) is None
@@ -0,0 +1,39 @@
+import time
+
+from models.loggingModels import LoadingStage
+from utils.stage_timer import StageTimer, get_peak_memory
+
+
+# Verifica che StageTimer sommi la durata di tutti i blocchi eseguiti al suo interno
+
+def test_stage_timer_sums_blocks():
+    # Arrange
+    timer = StageTimer(LoadingStage.Splitting)
+
+    # Act
+    with timer:
+        time.sleep(0.02)
+    time.sleep(0.05)
+    with timer:
+        time.sleep(0.02)
+
+    # Assert
+    assert 0.04 <= timer.get_duration() < 0.09
+
+# Verifica che StageTimer crei il log della fase con la durata, le quantità indicate e il picco di memoria del processo
+
+def test_stage_timer_get_stage_log():
+    # Arrange
+    with StageTimer(LoadingStage.JiraIssuesFetch) as timer:
+        pass
+
+    # Act
+    stage_log = timer.get_stage_log(10, num_bytes=2048, num_api_calls=3)
+
+    # Assert
+    assert stage_log.get_stage() == LoadingStage.JiraIssuesFetch
+    assert stage_log.get_duration() == timer.get_duration()
+    assert stage_log.get_num_items() == 10
+    assert stage_log.get_num_bytes() == 2048
+    assert stage_log.get_num_api_calls() == 3
+    assert 0 < stage_log.get_peak_memory() <= get_peak_memory()